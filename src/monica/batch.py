@@ -0,0 +1,239 @@
+"""Batched execution: many small audio jobs per FFmpeg invocation."""
+
+import subprocess
+from pathlib import Path
+from colorama import Fore, Style
+
+from monica.executor import JobQueue, ProgressIndicator
+from monica.logger import get_logger
+from monica.profiling import profiled
+from monica.recipes import Recipe, get_input_args
+from monica.settings import Settings
+
+
+# Inputs packed into one FFmpeg process
+BATCH_SIZE = 32
+
+# Only worth batching when there are at least this many files...
+MIN_BATCH_FILES = 8
+
+# ...and files at most this big (larger files run on their own)
+SMALL_FILE_BYTES = 20 * 1024 * 1024
+
+BATCH_TIMEOUT = 3600
+
+# Categories whose recipes map one audio stream in to one file out
+BATCHABLE_CATEGORIES = {"audio", "extract"}
+
+
+def is_batchable(recipe: Recipe) -> bool:
+    """Check whether a recipe's args can be repeated per output in one process."""
+    if recipe.category not in BATCHABLE_CATEGORIES:
+        return False
+    return not any(arg in ("-filter_complex", "-map", "-i") for arg in recipe.ffmpeg_args)
+
+
+def should_batch(files: list[Path], recipe: Recipe) -> bool:
+    """Decide whether a selection is better run in batches."""
+    if len(files) < MIN_BATCH_FILES or not is_batchable(recipe):
+        return False
+    small = 0
+    for f in files:
+        try:
+            if f.stat().st_size <= SMALL_FILE_BYTES:
+                small += 1
+        except OSError:
+            pass
+    return small >= MIN_BATCH_FILES
+
+
+def plan_batches(files: list[Path], batch_size: int = BATCH_SIZE) -> list[list[Path]]:
+    """Group small files into batches; large files get a batch of their own."""
+    batches = []
+    current = []
+    for f in files:
+        try:
+            size = f.stat().st_size
+        except OSError:
+            size = 0
+        if size > SMALL_FILE_BYTES:
+            batches.append([f])
+            continue
+        current.append(f)
+        if len(current) >= batch_size:
+            batches.append(current)
+            current = []
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_batch_command(ffmpeg_path: str, jobs: list[tuple[Path, Path, Recipe]]) -> list[str]:
+    """Build one FFmpeg command with an -i per input and a mapped output per input.
+
+    Output options are per output file in FFmpeg, so each output repeats its
+    recipe's args after mapping the audio of its own input.
+    """
+    cmd = [ffmpeg_path, "-hide_banner", "-nostdin", "-nostats", "-loglevel", "error", "-y"]
+    for input_file, _, recipe in jobs:
+        cmd += [*get_input_args(recipe), "-i", str(input_file)]
+    for i, (_, output_file, recipe) in enumerate(jobs):
+        cmd += ["-map", f"{i}:a:0", *recipe.ffmpeg_args, str(output_file)]
+    return cmd
+
+
+def _run(cmd: list[str]) -> tuple[bool, str]:
+    get_logger().debug(f"Running command: {' '.join(cmd)}")
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=BATCH_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return False, "Process timed out"
+    except OSError as e:
+        return False, str(e)
+    if result.returncode != 0:
+        return False, result.stderr.strip() or f"FFmpeg exited with code {result.returncode}"
+    return True, ""
+
+
+def _output_ok(output_file: Path) -> bool:
+    try:
+        return output_file.stat().st_size > 0
+    except OSError:
+        return False
+
+
+def run_batch(ffmpeg_path: str, jobs: list[tuple[Path, Path, Recipe]]) -> dict[Path, str]:
+    """Run a batch and attribute any failure to individual inputs.
+
+    If the combined invocation fails, each job of the batch is re-run on its
+    own so the error is reported against the file that caused it.
+
+    Returns:
+        Mapping of failed input file to its error message (empty on success)
+    """
+    ok, error = _run(build_batch_command(ffmpeg_path, jobs))
+    if ok:
+        return {
+            input_file: "No output written"
+            for input_file, output_file, _ in jobs
+            if not _output_ok(output_file)
+        }
+
+    if len(jobs) == 1:
+        return {jobs[0][0]: error}
+
+    failures = {}
+    for job in jobs:
+        ok, error = _run(build_batch_command(ffmpeg_path, [job]))
+        if not ok:
+            failures[job[0]] = error
+    return failures
+
+
+def _encode_batch(
+    ffmpeg_path: str,
+    queue: JobQueue,
+    prepared: list[tuple[Path, Path, str]],
+    label: str
+) -> dict[Path, str]:
+    """Encode (input, output, item id) jobs in one process and record each outcome.
+
+    Returns:
+        Mapping of failed input file to its error message
+    """
+    jobs = [
+        (queue.source(input_file), queue.work_path(output_file), queue.job_recipe(input_file))
+        for input_file, output_file, _ in prepared
+    ]
+    spinner = ProgressIndicator(label)
+    spinner.start()
+    failures = run_batch(ffmpeg_path, jobs)
+    spinner.stop()
+
+    errors = {}
+    for (input_file, output_file, item_id), (source, work_file, _) in zip(prepared, jobs):
+        queue.release(input_file)
+        error = failures.get(source)
+        if error is None:
+            queue.succeeded(input_file, work_file, output_file, item_id)
+        else:
+            queue.failed(input_file, work_file, item_id, error)
+            errors[input_file] = error
+    return errors
+
+
+@profiled
+def execute_batched_jobs(
+    ffmpeg_path: str,
+    files: list[Path],
+    recipe: Recipe,
+    export_dir: Path,
+    batch_size: int = BATCH_SIZE,
+    settings: Settings | None = None
+) -> bool:
+    """Execute a queue of small jobs, several inputs per FFmpeg process.
+
+    Like execute_jobs, processing stops after the batch in which an error
+    occurred; every failed file is logged individually. Duplicate inputs,
+    staging, write-behind and the size history are handled by the same
+    JobQueue: a duplicate is linked once its original's batch is done.
+
+    Returns:
+        True if all jobs completed successfully, False otherwise
+    """
+    logger = get_logger()
+    logger.job_start([str(f) for f in files], recipe.name, recipe.category)
+
+    total = len(files)
+    queue = JobQueue(ffmpeg_path, files, recipe, export_dir, settings)
+    batches = plan_batches([f for f in files if f not in queue.duplicates], batch_size)
+    print(f"\n{Fore.CYAN}Processing {total} file(s) with '{recipe.name}' "
+          f"in {len(batches)} batch(es)...{Style.RESET_ALL}")
+
+    try:
+        done = 0
+        for b, batch in enumerate(batches, 1):
+            prepared = [
+                (input_file, queue.output_path(input_file), logger.item_start(input_file.name, input_file))
+                for input_file in batch
+            ]
+            label = f"Batch {b}/{len(batches)} ({len(batch)} file(s))"
+            failures = _encode_batch(ffmpeg_path, queue, prepared, label)
+
+            if not failures:
+                # Duplicates of this batch's inputs reuse their outputs
+                in_batch = set(batch)
+                unlinked = []
+                for input_file in files:
+                    if queue.duplicates.get(input_file) not in in_batch:
+                        continue
+                    output_file = queue.output_path(input_file)
+                    item_id = logger.item_start(input_file.name, input_file)
+                    if not queue.link_duplicate(input_file, output_file, item_id):
+                        unlinked.append((input_file, output_file, item_id))
+                    done += 1
+                if unlinked:
+                    label = f"Re-encoding {len(unlinked)} duplicate(s)"
+                    failures = _encode_batch(ffmpeg_path, queue, unlinked, label)
+
+            done += len(batch)
+            print(f"{Fore.CYAN}[{done}/{total}]{Style.RESET_ALL} Batch {b}/{len(batches)} "
+                  + (f"{Fore.GREEN}Done{Style.RESET_ALL}" if not failures else
+                     f"{Fore.RED}{len(failures)} failed{Style.RESET_ALL}"))
+
+            if failures:
+                for input_file in failures:
+                    print(f"{Fore.RED}Error:{Style.RESET_ALL} Failed to process {input_file.name}")
+                print(f"{Fore.RED}Job stopped. See logs for details.{Style.RESET_ALL}")
+                logger.job_end(False, recipe.name)
+                return False
+
+        if not queue.finish():
+            logger.job_end(False, recipe.name)
+            return False
+
+        logger.job_end(True, recipe.name)
+        print(f"\n{Fore.GREEN}All {total} file(s) processed successfully!{Style.RESET_ALL}")
+        return True
+    finally:
+        queue.close()
@@ -0,0 +1,362 @@
+"""Cost breakdown of a recipe's FFmpeg job, stage by stage.
+
+With options["benchmark"], the job runs with `-benchmark -benchmark_all`:
+FFmpeg then prints the CPU and wall time of every decode and encode call,
+and the totals for the process. Time spent in the filter graph isn't
+reported separately, so each filter is then timed on its own: a short
+sample of the input runs through the recipe's graph with a `bench=start`
+/ `bench=stop` pair (`abench` for audio) around that one filter, into the
+null muxer. bench prints its running average per frame, but not which
+instance printed it, which is why there is one sample run per filter
+rather than one run with every filter wrapped.
+
+Filters with several outputs (split, asplit) only pass frame references
+on and aren't timed. For filters with several inputs (overlay, vstack),
+the time runs from the main (first) input, so it includes waiting for
+the other inputs' frames.
+"""
+
+import re
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+
+from monica.recipes import Recipe
+from monica.tracing import span
+
+
+BENCHMARK_ARGS = ["-benchmark", "-benchmark_all"]
+
+# Options whose value is a filter graph, and the media they filter
+# (None: a complex graph, media follows the stream labels)
+FILTER_OPTIONS = {
+    "-filter_complex": None,
+    "-vf": "video",
+    "-filter:v": "video",
+    "-af": "audio",
+    "-filter:a": "audio",
+}
+
+# Seconds of input each filter is timed on
+SAMPLE_SECONDS = 10.0
+
+# Give up on a sample run after this long
+SAMPLE_TIMEOUT = 300
+
+# Audio filters whose names don't start with "a"
+AUDIO_FILTERS = {"volume", "loudnorm", "pan", "highpass", "lowpass", "equalizer", "dynaudnorm"}
+
+# Video filters whose names do start with "a"
+VIDEO_A_FILTERS = {"alphamerge", "alphaextract", "amplify", "atadenoise", "avgblur"}
+
+# Pad label inserted before a multi-input filter's main input
+BENCH_LABEL = "[monica_bench]"
+
+# `-benchmark_all`: microseconds of one decode/encode call
+BENCH_CALL = re.compile(r"^bench:\s*(\d+) user\s*(\d+) sys\s*(\d+) real (\w+)")
+# `-benchmark`: totals for the process
+BENCH_TOTAL = re.compile(r"^bench: utime=([\d.]+)s stime=([\d.]+)s rtime=([\d.]+)s")
+BENCH_MAXRSS = re.compile(r"^bench: maxrss=(\d+)")
+# bench=stop: seconds for one frame, then the running average, max and min
+BENCH_FILTER = re.compile(r"\[a?bench @ [^\]]*\] t:([\d.]+) avg:([\d.]+) max:([\d.]+) min:([\d.]+)")
+
+FILTER_PARTS = re.compile(r"^\s*((?:\[[^\]]*\]\s*)*)(.*?)\s*((?:\[[^\]]*\]\s*)*)$", re.DOTALL)
+LABEL = re.compile(r"\[([^\]]*)\]")
+STREAM_LABEL = re.compile(r"^\d+:([va])")
+
+
+def _split(text: str, separator: str) -> list[str]:
+    """Split on a separator outside quotes, keeping escapes as written."""
+    parts = []
+    current = []
+    quoted = False
+    escaped = False
+    for char in text:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == "'":
+            quoted = not quoted
+        elif char == separator and not quoted:
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current))
+    return parts
+
+
+def split_filtergraph(graph: str) -> list[list[str]]:
+    """The graph's chains (";"), each a list of filters (",") with their pad labels."""
+    return [_split(chain, ",") for chain in _split(graph, ";")]
+
+
+def parse_filter(text: str) -> tuple[list[str], str, list[str]]:
+    """Split a filter into input labels, the filter itself and output labels."""
+    inputs, body, outputs = FILTER_PARTS.match(text).groups()
+    return LABEL.findall(inputs), body, LABEL.findall(outputs)
+
+
+def filter_name(body: str) -> str:
+    """The filter's name, without its arguments or "@instance"."""
+    return body.split("=", 1)[0].split("@", 1)[0].strip()
+
+
+def _guess_media(name: str) -> str:
+    if name in AUDIO_FILTERS or (name.startswith("a") and name not in VIDEO_A_FILTERS):
+        return "audio"
+    return "video"
+
+
+def find_filtergraph(args: list[str]) -> tuple[int, str | None] | None:
+    """Position of the recipe's filter graph argument and the media it filters.
+
+    Returns:
+        Tuple of (index of the graph in args, media or None for a complex
+        graph), or None if the recipe has no filters
+    """
+    for i, arg in enumerate(args[:-1]):
+        if arg in FILTER_OPTIONS:
+            return i + 1, FILTER_OPTIONS[arg]
+    return None
+
+
+def list_stages(graph: str, media: str | None = None) -> list[dict]:
+    """The filters that can be timed, in graph order.
+
+    Each stage is a dict with "stage" (the filter name, numbered when it
+    appears more than once), "filter" (as written), "media", and the
+    "chain" / "position" of the filter in the graph.
+    """
+    labels = {}
+    stages = []
+    counts = defaultdict(int)
+    for c, chain in enumerate(split_filtergraph(graph)):
+        chain_media = media
+        for p, text in enumerate(chain):
+            inputs, body, outputs = parse_filter(text)
+            name = filter_name(body)
+            if chain_media is None and inputs:
+                stream = STREAM_LABEL.match(inputs[0])
+                if stream:
+                    chain_media = "video" if stream.group(1) == "v" else "audio"
+                else:
+                    chain_media = labels.get(inputs[0])
+            if chain_media is None:
+                chain_media = _guess_media(name)
+            for label in outputs:
+                labels[label] = chain_media
+            if not name or len(outputs) > 1:
+                continue
+            counts[name] += 1
+            stages.append({
+                "stage": name if counts[name] == 1 else f"{name}#{counts[name]}",
+                "filter": body,
+                "media": chain_media,
+                "chain": c,
+                "position": p,
+            })
+    return stages
+
+
+def instrument_stage(graph: str, stage: dict) -> str:
+    """The graph with a bench start/stop pair around one stage."""
+    chains = split_filtergraph(graph)
+    inputs, body, outputs = parse_filter(chains[stage["chain"]][stage["position"]])
+    bench = "abench" if stage["media"] == "audio" else "bench"
+
+    extra = []
+    if len(inputs) > 1:
+        # Stamp frames on the main input in a chain of their own
+        extra = [f"[{inputs[0]}]{bench}=start{BENCH_LABEL}"]
+        head = BENCH_LABEL + "".join(f"[{label}]" for label in inputs[1:])
+    else:
+        head = "".join(f"[{label}]" for label in inputs) + f"{bench}=start,"
+    tail = f",{bench}=stop" + "".join(f"[{label}]" for label in outputs)
+
+    chain = list(chains[stage["chain"]])
+    chain[stage["position"]] = head + body + tail
+    result = [",".join(c) for c in chains]
+    result[stage["chain"]] = ",".join(chain)
+    result[stage["chain"]:stage["chain"]] = extra
+    return ";".join(result)
+
+
+def is_benchmark_line(line: str) -> bool:
+    """Whether a stderr line is -benchmark output (kept out of progress parsing)."""
+    return line.startswith("bench:")
+
+
+class BenchmarkTotals:
+    """Running sums of -benchmark / -benchmark_all output, fed line by line.
+
+    -benchmark_all prints a line per decode and encode call, so a long
+    encode would otherwise hold millions of them until it ends.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget everything added so far (e.g. before a retry)."""
+        self._stages = defaultdict(lambda: {"user_s": 0.0, "sys_s": 0.0, "real_s": 0.0, "calls": 0})
+        self._total = {}
+
+    def add(self, line: str) -> bool:
+        """Count a stderr line in, if it's benchmark output.
+
+        Returns:
+            Whether the line was benchmark output
+        """
+        if not is_benchmark_line(line):
+            return False
+        match = BENCH_CALL.match(line)
+        if match:
+            stage = self._stages[match.group(4)]
+            stage["user_s"] += int(match.group(1)) / 1e6
+            stage["sys_s"] += int(match.group(2)) / 1e6
+            stage["real_s"] += int(match.group(3)) / 1e6
+            stage["calls"] += 1
+            return True
+        match = BENCH_TOTAL.match(line)
+        if match:
+            self._total.update(
+                utime_s=float(match.group(1)),
+                stime_s=float(match.group(2)),
+                rtime_s=float(match.group(3)),
+            )
+            return True
+        match = BENCH_MAXRSS.match(line)
+        if match:
+            self._total["maxrss_kb"] = int(match.group(1))
+        return True
+
+    def result(self) -> dict:
+        """The breakdown so far, in the form parse_benchmark() returns."""
+        stages = {
+            name: {**stage, **{key: round(stage[key], 6) for key in ("user_s", "sys_s", "real_s")}}
+            for name, stage in self._stages.items()
+        }
+        return {"total": dict(self._total), "stages": stages}
+
+
+def parse_benchmark(lines: list[str]) -> dict:
+    """Per-call and total costs from -benchmark / -benchmark_all output.
+
+    Returns:
+        Dict with "total" (utime_s, stime_s, rtime_s, maxrss_kb, as far as
+        reported) and "stages": per kind of call (decode_video,
+        encode_audio, ...), the summed user_s, sys_s, real_s and calls
+    """
+    totals = BenchmarkTotals()
+    for line in lines:
+        totals.add(line)
+    return totals.result()
+
+
+def parse_filter_timing(output: str) -> dict | None:
+    """Frames and per-frame milliseconds (avg, max, min) from bench=stop output."""
+    frames = 0
+    last = None
+    for match in BENCH_FILTER.finditer(output):
+        frames += 1
+        last = match
+    if last is None:
+        return None
+    avg, max_, min_ = (float(value) * 1000 for value in last.groups()[1:])
+    return {"frames": frames, "avg_ms": round(avg, 3), "max_ms": round(max_, 3), "min_ms": round(min_, 3)}
+
+
+def _sample_command(
+    ffmpeg_path: str,
+    input_file: Path,
+    recipe: Recipe,
+    graph_index: int,
+    graph: str,
+    sample_seconds: float
+) -> list[str]:
+    args = list(recipe.ffmpeg_args)
+    args[graph_index] = graph
+    start = recipe.options.get("start")
+    return [
+        ffmpeg_path,
+        *(["-ss", f"{float(start):.3f}"] if start else []),
+        "-t", f"{sample_seconds:.3f}",
+        "-i", str(input_file),
+        *args,
+        # Skip the real encoders; only the filters are being timed
+        "-c:v", "wrapped_avframe", "-c:a", "pcm_s16le",
+        "-f", "null", "-",
+    ]
+
+
+def time_filters(
+    ffmpeg_path: str,
+    input_file: Path,
+    recipe: Recipe,
+    sample_seconds: float = SAMPLE_SECONDS
+) -> list[dict]:
+    """Time each filter of the recipe's graph on a sample of the input.
+
+    Returns:
+        The stages from list_stages(), with the parse_filter_timing()
+        fields, "share" (percent of the summed averages of the same media)
+        and "error" for stages that couldn't be timed
+    """
+    found = find_filtergraph(recipe.ffmpeg_args)
+    if found is None:
+        return []
+    graph_index, media = found
+    graph = recipe.ffmpeg_args[graph_index]
+
+    results = []
+    for stage in list_stages(graph, media):
+        cmd = _sample_command(
+            ffmpeg_path, input_file, recipe, graph_index, instrument_stage(graph, stage), sample_seconds
+        )
+        result = {key: stage[key] for key in ("stage", "filter", "media")}
+        with span("benchmark.filter", stage=stage["stage"]):
+            try:
+                process = subprocess.run(cmd, capture_output=True, text=True, timeout=SAMPLE_TIMEOUT)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                process = None
+                result["error"] = str(e)
+        if process is not None:
+            timing = parse_filter_timing(process.stderr)
+            if timing is not None:
+                result.update(timing)
+            elif process.returncode != 0:
+                result["error"] = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "failed"
+            else:
+                result["error"] = "no frames reached the filter"
+        results.append(result)
+
+    for media in ("video", "audio"):
+        timed = [r for r in results if r["media"] == media and "avg_ms" in r]
+        total = sum(r["avg_ms"] for r in timed)
+        for r in timed:
+            r["share"] = round(100 * r["avg_ms"] / total, 1) if total else 0.0
+    return results
+
+
+def format_breakdown(breakdown: dict) -> list[str]:
+    """Readable lines for a breakdown of parse_benchmark() plus "filters"."""
+    lines = []
+    total = breakdown.get("total", {})
+    if "rtime_s" in total:
+        lines.append(f"Total: {total['rtime_s']:.2f} s wall, "
+                     f"{total['utime_s'] + total['stime_s']:.2f} s CPU")
+    for name, stage in sorted(breakdown.get("stages", {}).items(), key=lambda item: -item[1]["user_s"]):
+        lines.append(f"  {name:<20} {stage['user_s'] + stage['sys_s']:8.2f} s CPU  "
+                     f"{stage['real_s']:8.2f} s wall  ({stage['calls']} calls)")
+    filters = breakdown.get("filters", [])
+    if filters:
+        lines.append("Filters (per frame, on a sample):")
+    for f in sorted(filters, key=lambda f: -f.get("avg_ms", -1)):
+        if "avg_ms" in f:
+            lines.append(f"  {f['stage']:<20} {f['avg_ms']:8.2f} ms avg  {f['max_ms']:8.2f} ms max  "
+                         f"{f['share']:5.1f}% of {f['media']}")
+        else:
+            lines.append(f"  {f['stage']:<20} not timed: {f['error']}")
+    return lines
@@ -0,0 +1,308 @@
+"""Headless command-line mode for scripting and pipelines."""
+
+import argparse
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+from monica.executor import execute_jobs
+from monica.ffmpeg_manager import get_ffmpeg_path, verify_ffmpeg
+from monica.file_selector import sort_entries
+from monica.import_index import get_import_index
+from monica.logger import get_logger
+from monica.loudness import NORMALIZE_CATEGORIES, apply_normalization, measure_files
+from monica.pipeline import STREAM_CONTAINERS, describe_target, is_pipe, run_stream_job
+from monica.prober import BackgroundProber
+from monica.profiling import PROFILE_MODES
+from monica.query import COLUMNS, MediaTable, QueryError, validate_query
+from monica.recipes import BUILTIN_RECIPES, find_recipe, get_input_extensions_for_category
+from monica.settings import SETTINGS_FILE, get_settings
+from monica.watch import BATCH_WINDOW, SETTLE_SECONDS, watch_folder
+
+
+# Categories that need several FFmpeg steps and can't run as a single stream
+MULTI_STEP_CATEGORIES = {"thumbnail", "trim"}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the headless commands."""
+    parser = argparse.ArgumentParser(
+        prog="monica",
+        description="MONICA - FFmpeg Interactive CLI Tool. "
+                    "Run without arguments for the interactive menu."
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Record how long each stage takes and save it as a Chrome trace in logs/"
+    )
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        help="Profile MONICA's Python code and save the stats and collapsed stacks in logs/ "
+             "('sample' is cheap enough for production batches)"
+    )
+    parser.add_argument(
+        "--profile-batches",
+        action="store_true",
+        help="With --profile, save a profile per batch instead of one for the whole session"
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    run = subparsers.add_parser(
+        "run",
+        help="Apply a recipe to one input without the menu",
+        description="Apply a recipe to one input. Use '-' for stdin/stdout to "
+                    "chain MONICA with other tools."
+    )
+    run.add_argument("input", help="Input file, '-' for stdin, or pipe:N")
+    run.add_argument("output", help="Output file, '-' for stdout, or pipe:N")
+    run.add_argument("--recipe", "-r", required=True, help="Recipe name, e.g. \"MP4 (H.264)\"")
+    run.add_argument(
+        "--category", "-c",
+        choices=list(BUILTIN_RECIPES),
+        help="Recipe category (needed when a name exists in several categories)"
+    )
+    run.add_argument(
+        "--container", "-f",
+        choices=list(STREAM_CONTAINERS),
+        help="Streamable output container (default: based on the recipe's format)"
+    )
+    run.add_argument(
+        "--normalize",
+        action="store_true",
+        help="Normalize loudness (EBU R128); single-pass when reading from a pipe"
+    )
+
+    query = subparsers.add_parser(
+        "query",
+        help="List import files matching a metadata query",
+        description="Print the import files whose probed metadata matches a "
+                    "filter, one path per line. Files are probed once and "
+                    "the results kept in the import index."
+    )
+    query.add_argument(
+        "expression",
+        nargs="?",
+        default="",
+        help="Filter, e.g. \"height > 1080 and vcodec != h264 and duration > 5m\""
+    )
+    query.add_argument("--order-by", "-o", choices=COLUMNS, help="Column to sort by")
+    query.add_argument("--desc", action="store_true", help="Sort in descending order")
+    query.add_argument("--limit", "-n", type=int, help="Print at most this many files")
+    query.add_argument(
+        "--category", "-c",
+        choices=list(BUILTIN_RECIPES),
+        help="Only files this category's recipes accept (default: any media file)"
+    )
+    query.add_argument("--recursive", "-R", action="store_true", help="Include files in subfolders")
+
+    watch = subparsers.add_parser(
+        "watch",
+        help="Convert files as they are dropped into the import folder",
+        description="Watch the import folder and apply a recipe to each new "
+                    "file once it's completely written. Runs until Ctrl+C."
+    )
+    watch.add_argument("--recipe", "-r", required=True, help="Recipe name, e.g. \"MP4 (H.264)\"")
+    watch.add_argument(
+        "--category", "-c",
+        choices=list(BUILTIN_RECIPES),
+        help="Recipe category (needed when a name exists in several categories)"
+    )
+    watch.add_argument("--normalize", action="store_true", help="Normalize loudness (EBU R128)")
+    watch.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Print and log each job's cost per FFmpeg stage and filter"
+    )
+    watch.add_argument("--recursive", "-R", action="store_true", help="Also watch subfolders")
+    watch.add_argument(
+        "--existing",
+        action="store_true",
+        help="Also convert files already in the import folder"
+    )
+    watch.add_argument(
+        "--settle",
+        type=float,
+        default=SETTLE_SECONDS,
+        help=f"Seconds a file must stay unchanged before converting (default: {SETTLE_SECONDS:g})"
+    )
+    watch.add_argument(
+        "--batch-window",
+        type=float,
+        default=BATCH_WINDOW,
+        help=f"Seconds to wait for more files before starting a batch (default: {BATCH_WINDOW:g})"
+    )
+    watch.add_argument(
+        "--poll",
+        action="store_true",
+        help="Poll instead of using inotify (needed for files written by other machines to a network share)"
+    )
+    watch.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve job metrics (OpenMetrics) on http://127.0.0.1:PORT/metrics"
+    )
+
+    return parser
+
+
+def resolve_ffmpeg(base_dir: Path) -> str | None:
+    """Find a working FFmpeg without prompting (headless mode never downloads)."""
+    ffmpeg_path = get_ffmpeg_path(base_dir)
+    if ffmpeg_path and verify_ffmpeg(ffmpeg_path):
+        return ffmpeg_path
+    return None
+
+
+def error(message: str) -> None:
+    """Print an error to stderr (stdout may be carrying media data)."""
+    print(f"monica: error: {message}", file=sys.stderr)
+
+
+def cmd_run(args: argparse.Namespace, base_dir: Path) -> int:
+    """Handle the 'run' command."""
+    logger = get_logger()
+
+    recipe = find_recipe(args.recipe, args.category)
+    if recipe is None:
+        error(f"unknown recipe: {args.recipe}")
+        return 1
+    if recipe.category in MULTI_STEP_CATEGORIES:
+        error(f"'{recipe.name}' is only available from the interactive menu")
+        return 1
+    if args.normalize and recipe.category not in NORMALIZE_CATEGORIES:
+        error(f"--normalize only applies to audio recipes ({', '.join(NORMALIZE_CATEGORIES)})")
+        return 1
+
+    ffmpeg_path = resolve_ffmpeg(base_dir)
+    if ffmpeg_path is None:
+        error("FFmpeg not found; run 'monica' interactively to install it")
+        return 1
+
+    if args.normalize:
+        # Two-pass needs to read the input twice, which a pipe can't do
+        measurement = None
+        if not is_pipe(args.input):
+            measurement = measure_files(ffmpeg_path, [Path(args.input)])[Path(args.input)]
+        recipe = apply_normalization(recipe, measurement)
+
+    source_name = describe_target(args.input)
+    logger.job_start([source_name], recipe.name, recipe.category)
+    item_id = logger.item_start(source_name, None if is_pipe(args.input) else Path(args.input))
+
+    success, message = run_stream_job(ffmpeg_path, args.input, args.output, recipe, args.container)
+
+    output_path = None if is_pipe(args.output) else Path(args.output)
+    logger.item_end(source_name, success, output_path=output_path, error=message or None, item_id=item_id)
+    logger.job_end(success, recipe.name)
+
+    if not success:
+        error(message)
+        return 1
+    return 0
+
+
+def cmd_query(args: argparse.Namespace, base_dir: Path) -> int:
+    """Handle the 'query' command."""
+    try:
+        validate_query(args.expression)
+    except QueryError as e:
+        error(str(e))
+        return 1
+
+    import_dir = base_dir / "import"
+    if not import_dir.is_dir():
+        error(f"import folder not found: {import_dir}")
+        return 1
+
+    ffmpeg_path = resolve_ffmpeg(base_dir)
+    if ffmpeg_path is None:
+        error("FFmpeg not found; run 'monica' interactively to install it")
+        return 1
+
+    if args.category:
+        extensions = get_input_extensions_for_category(args.category)
+    else:
+        extensions = sorted({ext for category in BUILTIN_RECIPES for ext in get_input_extensions_for_category(category)})
+
+    settings = get_settings(base_dir / SETTINGS_FILE)
+    recursive = args.recursive or settings.scan_recursive
+    index = get_import_index(import_dir, get_logger().logs_dir)
+    index.refresh(recursive, settings.scan_exclude)
+    entries = index.entries(extensions, recursive, settings.scan_include, settings.scan_exclude)
+    entries = sort_entries(entries, import_dir)
+
+    results = BackgroundProber([e.path for e in entries], ffmpeg_path, index).start().wait()
+    index.save()
+
+    table = MediaTable.build(entries, [results.get(i) for i in range(len(entries))], import_dir)
+    for path in table.select(args.expression, args.order_by, args.desc, args.limit):
+        print(path)
+    return 0
+
+
+def cmd_watch(args: argparse.Namespace, base_dir: Path) -> int:
+    """Handle the 'watch' command."""
+    recipe = find_recipe(args.recipe, args.category)
+    if recipe is None:
+        error(f"unknown recipe: {args.recipe}")
+        return 1
+    if recipe.category in MULTI_STEP_CATEGORIES:
+        error(f"'{recipe.name}' is only available from the interactive menu")
+        return 1
+    if args.normalize and recipe.category not in NORMALIZE_CATEGORIES:
+        error(f"--normalize only applies to audio recipes ({', '.join(NORMALIZE_CATEGORIES)})")
+        return 1
+    if args.normalize:
+        recipe = replace(recipe, options={**recipe.options, "normalize": True})
+    if args.benchmark:
+        recipe = replace(recipe, options={**recipe.options, "benchmark": True})
+
+    ffmpeg_path = resolve_ffmpeg(base_dir)
+    if ffmpeg_path is None:
+        error("FFmpeg not found; run 'monica' interactively to install it")
+        return 1
+
+    import_dir = base_dir / "import"
+    export_dir = base_dir / "export"
+    if not import_dir.is_dir():
+        error(f"import folder not found: {import_dir}")
+        return 1
+    export_dir.mkdir(parents=True, exist_ok=True)
+
+    settings = get_settings(base_dir / SETTINGS_FILE)
+    print(f"Watching {import_dir} for '{recipe.name}' (Ctrl+C to stop)")
+    try:
+        watch_folder(
+            import_dir,
+            lambda files: execute_jobs(ffmpeg_path, files, recipe, export_dir, settings),
+            extensions=recipe.input_extensions,
+            recursive=args.recursive or settings.scan_recursive,
+            include=settings.scan_include,
+            exclude=settings.scan_exclude,
+            settle_seconds=args.settle,
+            batch_window=args.batch_window,
+            process_existing=args.existing,
+            polling=args.poll,
+        )
+    except KeyboardInterrupt:
+        print("Stopped watching")
+    return 0
+
+
+COMMANDS = {
+    "run": cmd_run,
+    "query": cmd_query,
+    "watch": cmd_watch,
+}
+
+
+def run_command(args: argparse.Namespace, base_dir: Path) -> int:
+    """Dispatch a parsed headless command.
+
+    Returns:
+        Process exit code
+    """
+    handler = COMMANDS[args.command]
+    return handler(args, base_dir)
@@ -0,0 +1,214 @@
+"""Pluggable transcoding engines.
+
+Every engine implements Engine. The FFmpeg subprocess (executor.FFmpegEngine)
+handles every recipe and is always tried last. Recipes marked `in_process`
+may first run through an in-process engine (PyAV, if installed), which skips
+process startup and gives frame-accurate progress; anything an engine can't
+handle falls back to the subprocess.
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Optional
+
+from monica.logger import get_logger
+from monica.recipes import Recipe, get_input_args
+
+
+# Channel counts to PyAV layout names
+CHANNEL_LAYOUT_NAMES = {1: "mono", 2: "stereo", 6: "5.1"}
+
+# Options the PyAV engine understands; any other recipe arg means fallback
+PYAV_FLAGS = {"-vn", "-sn", "-dn"}
+PYAV_OPTIONS = {"-c:a", "-b:a", "-ar", "-ac"}
+
+
+def parse_bitrate(text: str) -> int:
+    """Parse an FFmpeg bitrate ("192k", "1M", "128000") to bits per second.
+
+    Raises:
+        ValueError: If the text is not a bitrate
+    """
+    multipliers = {"k": 1000, "m": 1000000}
+    text = text.strip().lower()
+    if text and text[-1] in multipliers:
+        return int(float(text[:-1]) * multipliers[text[-1]])
+    return int(text)
+
+
+def parse_audio_args(args: list[str]) -> dict | None:
+    """Translate a simple audio recipe's args to encoder settings.
+
+    Returns:
+        Dict with codec, bit_rate, sample_rate and channels (None when not
+        set), or None if the args use anything beyond plain audio encoding
+    """
+    settings = {"codec": None, "bit_rate": None, "sample_rate": None, "channels": None}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg in PYAV_FLAGS:
+            i += 1
+            continue
+        if arg not in PYAV_OPTIONS or i + 1 >= len(args):
+            return None
+        value = args[i + 1]
+        try:
+            if arg == "-c:a":
+                settings["codec"] = value
+            elif arg == "-b:a":
+                settings["bit_rate"] = parse_bitrate(value)
+            elif arg == "-ar":
+                settings["sample_rate"] = int(value)
+            elif arg == "-ac":
+                settings["channels"] = int(value)
+        except ValueError:
+            return None
+        i += 2
+
+    if settings["codec"] is None or settings["codec"] == "copy":
+        return None
+    if settings["channels"] is not None and settings["channels"] not in CHANNEL_LAYOUT_NAMES:
+        return None
+    return settings
+
+
+def copy_tags(source: dict, dest: dict) -> None:
+    """Copy metadata tags the way FFmpeg does by default.
+
+    FFmpeg keeps the first input's container and stream tags; the encoder
+    tag is left for the muxer to write.
+    """
+    dest.update({key: value for key, value in source.items() if key.lower() != "encoder"})
+
+
+class Engine(ABC):
+    """Interface for a transcoding engine."""
+
+    name = ""
+
+    @abstractmethod
+    def available(self) -> bool:
+        """Check whether the engine's dependencies are installed."""
+
+    @abstractmethod
+    def supports(self, recipe: Recipe) -> bool:
+        """Check whether the engine can run a recipe."""
+
+    @abstractmethod
+    def run(
+        self,
+        input_file: Path,
+        output_file: Path,
+        recipe: Recipe,
+        on_progress: Optional[Callable[[float], None]] = None
+    ) -> tuple[bool, str]:
+        """Run one job, reporting progress as a percentage.
+
+        Returns:
+            Tuple of (success, error_message)
+        """
+
+
+class PyAVEngine(Engine):
+    """Audio transcoding through PyAV's libav bindings."""
+
+    name = "pyav"
+
+    def __init__(self):
+        self._available = None
+
+    def available(self) -> bool:
+        if self._available is None:
+            try:
+                import av  # noqa: F401
+                self._available = True
+            except ImportError:
+                self._available = False
+        return self._available
+
+    def supports(self, recipe: Recipe) -> bool:
+        return (
+            recipe.in_process
+            and not get_input_args(recipe)
+            and parse_audio_args(recipe.ffmpeg_args) is not None
+        )
+
+    def run(
+        self,
+        input_file: Path,
+        output_file: Path,
+        recipe: Recipe,
+        on_progress: Optional[Callable[[float], None]] = None
+    ) -> tuple[bool, str]:
+        import av
+
+        settings = parse_audio_args(recipe.ffmpeg_args)
+        if settings is None:
+            return False, "Recipe not supported by the PyAV engine"
+
+        try:
+            with av.open(str(input_file)) as source:
+                if not source.streams.audio:
+                    return False, "No audio stream found"
+                in_stream = source.streams.audio[0]
+                duration = source.duration / av.time_base if source.duration else None
+
+                with av.open(str(output_file), "w") as dest:
+                    out_stream = dest.add_stream(
+                        settings["codec"],
+                        rate=settings["sample_rate"] or in_stream.rate
+                    )
+                    copy_tags(source.metadata, dest.metadata)
+                    copy_tags(in_stream.metadata, out_stream.metadata)
+                    ctx = out_stream.codec_context
+                    if settings["bit_rate"]:
+                        ctx.bit_rate = settings["bit_rate"]
+                    if settings["channels"]:
+                        ctx.layout = CHANNEL_LAYOUT_NAMES[settings["channels"]]
+                    elif in_stream.codec_context.layout:
+                        ctx.layout = in_stream.codec_context.layout.name
+
+                    # Convert to the encoder's sample format, layout, rate and frame size
+                    resampler = av.AudioResampler(
+                        format=ctx.format.name,
+                        layout=ctx.layout.name,
+                        rate=ctx.sample_rate,
+                        frame_size=ctx.frame_size or None,
+                    )
+
+                    for frame in source.decode(in_stream):
+                        position = frame.time
+                        frame.pts = None
+                        for resampled in resampler.resample(frame):
+                            dest.mux(out_stream.encode(resampled))
+                        if on_progress and duration and position is not None:
+                            on_progress(min(99.9, position / duration * 100))
+
+                    for resampled in resampler.resample(None):
+                        dest.mux(out_stream.encode(resampled))
+                    dest.mux(out_stream.encode(None))
+
+            return True, ""
+
+        except Exception as e:
+            return False, str(e)
+
+
+# In-process engines, in order of preference
+IN_PROCESS_ENGINES: list[Engine] = [PyAVEngine()]
+
+
+def find_in_process_engine(recipe: Recipe) -> Engine | None:
+    """Find an installed in-process engine that can run the recipe.
+
+    Returns:
+        The engine, or None to use the FFmpeg subprocess
+    """
+    if not recipe.in_process:
+        return None
+    for engine in IN_PROCESS_ENGINES:
+        if engine.available() and engine.supports(recipe):
+            get_logger().debug(f"Using in-process engine '{engine.name}' for {recipe.name}")
+            return engine
+    return None
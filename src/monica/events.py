@@ -0,0 +1,71 @@
+"""Structured job events (JSON Lines) for dashboards and analysis.
+
+Every line of logs/events.jsonl is one JSON object with at least:
+
+- "v": schema version (SCHEMA_VERSION)
+- "ts": UTC time, ISO 8601 with milliseconds
+- "event": "job_start", "item_start", "item_end" or "job_end"
+- "job_id": shared by all events of one job
+
+Item events also carry "item_id" and "input"; item_end adds "output",
+"status" ("success"/"failed"), "duration_s", "input_bytes",
+"output_bytes", "exit_code", "media_duration_s", "speed_factor",
+"error_class" and "error". job_end sums up the items. Fields that don't
+apply or aren't known are null. The file rotates like monica.log
+(events.jsonl.1, .2, ...); lines are never split across files.
+"""
+
+import json
+import re
+from datetime import datetime, timezone
+
+
+EVENTS_FILE = "events.jsonl"
+SCHEMA_VERSION = 1
+
+EVENTS_MAX_BYTES = 10 * 1024 * 1024
+EVENTS_BACKUP_COUNT = 10
+
+# Error messages kept in item_end events (the full text is in monica.log)
+MAX_ERROR_CHARS = 300
+
+# (pattern in FFmpeg's output or the error message, error class), first match wins
+ERROR_CLASSES = [
+    (r"No such file or directory|does not exist", "input_missing"),
+    (r"Permission denied", "permission_denied"),
+    (r"No space left on device", "disk_full"),
+    (r"Invalid data found|moov atom not found|could not find codec parameters", "invalid_input"),
+    (r"Unknown encoder|Encoder not found|Unrecognized option|Invalid argument", "bad_arguments"),
+    (r"timed out|Timeout", "timeout"),
+    (r"Conversion failed|Error", "ffmpeg_error"),
+]
+
+
+def classify_error(message: str | None) -> str | None:
+    """Short, stable class for an error message (None for no error)."""
+    if not message:
+        return None
+    for pattern, error_class in ERROR_CLASSES:
+        if re.search(pattern, message, re.IGNORECASE):
+            return error_class
+    return "other"
+
+
+def summarize_error(message: str | None) -> str | None:
+    """Last non-empty line of an error message, shortened."""
+    if not message:
+        return None
+    lines = [line.strip() for line in message.strip().splitlines() if line.strip()]
+    summary = lines[-1] if lines else message.strip()
+    return summary[:MAX_ERROR_CHARS]
+
+
+def make_event(event: str, job_id: str, **fields) -> dict:
+    """Build an event record with the common fields first."""
+    timestamp = datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    return {"v": SCHEMA_VERSION, "ts": timestamp, "event": event, "job_id": job_id, **fields}
+
+
+def format_event(record: dict) -> str:
+    """Serialize an event as one JSON line (without the newline)."""
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
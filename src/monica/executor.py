@@ -1,16 +1,39 @@
 """FFmpeg job executor with progress display."""
 
+import os
 import re
+import shutil
 import subprocess
 import sys
 import time
 import threading
+from dataclasses import replace
 from datetime import datetime
 from pathlib import Path
+from typing import Callable, Optional
 from colorama import Fore, Style
 
-from monica.recipes import Recipe
+from monica.benchmark import (
+    BENCHMARK_ARGS,
+    SAMPLE_SECONDS,
+    BenchmarkTotals,
+    find_filtergraph,
+    format_breakdown,
+    time_filters,
+)
+from monica.engines import Engine, find_in_process_engine
+from monica.faststart import apply_faststart, has_faststart, moov_space_exceeded
+from monica.fingerprint import find_duplicates
+from monica.mover import OutputMover
+from monica.preflight import get_size_history
+from monica.settings import Settings, get_settings
+from monica.staging import create_stager
+from monica.recipes import Recipe, get_input_args, get_range_duration
 from monica.logger import get_logger
+from monica.loudness import apply_normalization, measure_files
+from monica.probe import probe_media
+from monica.profiling import profiled
+from monica.tracing import span, traced
 
 
 # Spinner animation frames
@@ -71,6 +94,21 @@ def generate_output_filename(input_file: Path, recipe: Recipe, export_dir: Path)
     return export_dir / output_name
 
 
+def unique_output_path(output_file: Path, used: set) -> Path:
+    """Avoid two outputs of one run getting the same timestamped name.
+
+    Inputs with the same name from different subfolders would otherwise
+    overwrite each other's output.
+    """
+    candidate = output_file
+    n = 2
+    while candidate in used or candidate.exists():
+        candidate = output_file.with_name(f"{output_file.stem}_{n}{output_file.suffix}")
+        n += 1
+    used.add(candidate)
+    return candidate
+
+
 def parse_duration(line: str) -> float | None:
     """Parse duration from FFmpeg output (in seconds)."""
     match = re.search(r"Duration:\s*(\d+):(\d+):(\d+)\.(\d+)", line)
@@ -115,13 +153,62 @@ def display_progress_bar(percent: float, elapsed: float = 0, eta: float = 0, wid
         print(f"\r    {Fore.GREEN}{bar}{Style.RESET_ALL} {percent:5.1f}% | {elapsed_str} elapsed  ", end="", flush=True)
 
 
+class FFmpegEngine(Engine):
+    """The FFmpeg subprocess: runs every recipe, and is the last engine tried."""
+
+    name = "ffmpeg"
+
+    def __init__(self, ffmpeg_path: str):
+        self.ffmpeg_path = ffmpeg_path
+        # -benchmark figures of the last run, for report_benchmark()
+        self.benchmark = BenchmarkTotals()
+
+    def available(self) -> bool:
+        return True  # The FFmpeg path is resolved before any job runs
+
+    def supports(self, recipe: Recipe) -> bool:
+        return True
+
+    def run(
+        self,
+        input_file: Path,
+        output_file: Path,
+        recipe: Recipe,
+        on_progress: Optional[Callable[[float], None]] = None
+    ) -> tuple[bool, str]:
+        self.benchmark = BenchmarkTotals()
+        return run_ffmpeg_subprocess(
+            self.ffmpeg_path, input_file, output_file, recipe, on_progress, self.benchmark
+        )
+
+
+def select_engines(ffmpeg_path: str, recipe: Recipe) -> list[Engine]:
+    """Engines to try for a recipe, in order; the FFmpeg subprocess comes last.
+
+    Benchmarks measure FFmpeg's own stages, so they only use the subprocess.
+    """
+    engines: list[Engine] = [FFmpegEngine(ffmpeg_path)]
+    if not recipe.options.get("benchmark"):
+        in_process = find_in_process_engine(recipe)
+        if in_process is not None:
+            engines.insert(0, in_process)
+    return engines
+
+
+@traced("ffmpeg.job")
 def run_ffmpeg_job(
     ffmpeg_path: str,
     input_file: Path,
     output_file: Path,
     recipe: Recipe
 ) -> tuple[bool, str]:
-    """Run a single FFmpeg job with progress display.
+    """Run a single job with progress display.
+
+    The engines from select_engines() are tried in turn until one
+    succeeds: recipes marked `in_process` may run in an in-process engine,
+    and fall back to the FFmpeg subprocess if that fails. With
+    options["benchmark"], the job's cost breakdown is printed and attached
+    to its item_end event.
 
     Args:
         ffmpeg_path: Path to FFmpeg executable
@@ -132,104 +219,152 @@ def run_ffmpeg_job(
     Returns:
         Tuple of (success, error_message)
     """
-    # Use -stats for stderr progress (more reliable than -progress pipe on Windows)
-    cmd = [
-        ffmpeg_path,
-        "-i", str(input_file),
-        "-y",  # Overwrite output
-        *recipe.ffmpeg_args,
-        str(output_file)
-    ]
+    logger = get_logger()
+    engines = select_engines(ffmpeg_path, recipe)
+
+    for engine in engines:
+        engine_start_time = time.time()
+
+        def show_progress(percent: float) -> None:
+            elapsed = time.time() - engine_start_time
+            eta = (elapsed / percent) * (100 - percent) if percent > 0 else 0
+            display_progress_bar(percent, elapsed, eta)
+
+        with span(f"engine.{engine.name}"):
+            success, error = engine.run(input_file, output_file, recipe, on_progress=show_progress)
+        if success:
+            display_progress_bar(100, time.time() - engine_start_time, 0)
+        print()  # New line after progress bar
+        if success or engine is engines[-1]:
+            break
+        logger.warning(f"Engine '{engine.name}' failed for {input_file.name}, "
+                       f"falling back to {engines[-1].name}: {error}")
+
+    if success and recipe.options.get("benchmark"):
+        report_benchmark(ffmpeg_path, input_file, recipe, engines[-1].benchmark.result())
+    return success, error
 
+
+def run_ffmpeg_subprocess(
+    ffmpeg_path: str,
+    input_file: Path,
+    output_file: Path,
+    recipe: Recipe,
+    on_progress: Optional[Callable[[float], None]] = None,
+    benchmark_totals: BenchmarkTotals = None
+) -> tuple[bool, str]:
+    """Run a job through an FFmpeg subprocess, reporting progress as a percentage.
+
+    Args:
+        ffmpeg_path: Path to FFmpeg executable
+        input_file: Input file path
+        output_file: Output file path
+        recipe: The recipe to apply
+        on_progress: Called with the percentage done, when the duration is known
+        benchmark_totals: With options["benchmark"], sums the -benchmark lines as they're read
+
+    Returns:
+        Tuple of (success, error_message)
+    """
     logger = get_logger()
-    logger.debug(f"Running command: {' '.join(cmd)}")
+    benchmark = recipe.options.get("benchmark", False)
+    if benchmark_totals is None:
+        benchmark_totals = BenchmarkTotals()
 
     # Start spinner for initialization
     spinner = ProgressIndicator("Analyzing file")
     spinner.start()
 
     try:
-        # First, get the duration using ffprobe-style call
-        duration_cmd = [
-            ffmpeg_path,
-            "-i", str(input_file),
-            "-f", "null",
-            "-"
-        ]
-
-        duration = None
-        probe_result = subprocess.run(
-            duration_cmd,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
-
-        # Duration is in stderr
-        for line in probe_result.stderr.split("\n"):
-            duration = parse_duration(line)
-            if duration:
-                break
+        # Get the duration from the container headers (no decoding)
+        with span("ffmpeg.probe", file=input_file.name):
+            info = probe_media(ffmpeg_path, input_file, timeout=60)
+        duration = get_range_duration(info.duration, recipe)
 
         spinner.stop()
         print(f"    Duration: {format_time(duration) if duration else 'unknown'}")
 
+        # Place the MP4 index without rewriting the whole file, if the recipe allows
+        run_recipe, faststart = apply_faststart(recipe, info)
+
+        # Use -stats for stderr progress (more reliable than -progress pipe on Windows)
+        cmd = [
+            ffmpeg_path,
+            *(BENCHMARK_ARGS if benchmark else []),
+            *get_input_args(recipe),  # Optional time range, applied before decoding
+            "-i", str(input_file),
+            "-y",  # Overwrite output
+            *run_recipe.ffmpeg_args,
+            str(output_file)
+        ]
+        logger.debug(f"Running command: {' '.join(cmd)}")
+
         # Run the actual conversion with stderr for progress
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-        )
+        with span("ffmpeg.spawn"):
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
 
         job_start_time = time.time()
-        last_percent = 0
         stderr_output = []
 
         # Read stderr in a separate thread to avoid blocking
         def read_stderr():
             for line in process.stderr:
-                stderr_output.append(line)
+                # -benchmark_all prints lines per frame; sum them up, out of the progress scan
+                if not benchmark_totals.add(line):
+                    stderr_output.append(line)
 
         stderr_thread = threading.Thread(target=read_stderr, daemon=True)
         stderr_thread.start()
 
         # Poll for progress
-        while process.poll() is None:
-            time.sleep(0.3)
-            elapsed = time.time() - job_start_time
-
-            # Parse latest stderr for time= pattern
-            current_time = 0
-            for line in reversed(stderr_output[-20:]):  # Check last 20 lines
-                time_match = parse_time(line)
-                if time_match:
-                    current_time = time_match
-                    break
-
-            if duration and duration > 0 and current_time > 0:
-                percent = min(99.9, (current_time / duration) * 100)
-                eta = 0
-                if percent > 0:
-                    eta = (elapsed / percent) * (100 - percent)
-                display_progress_bar(percent, elapsed, eta)
-                last_percent = percent
-            else:
-                # Show elapsed time even without duration
-                spinner_char = SPINNER_FRAMES[int(elapsed * 10) % len(SPINNER_FRAMES)]
-                print(f"\r    {Fore.CYAN}{spinner_char}{Style.RESET_ALL} Encoding... ({format_time(elapsed)} elapsed)  ", end="", flush=True)
+        with span("ffmpeg.encode", file=input_file.name, media_duration_s=duration):
+            while process.poll() is None:
+                time.sleep(0.3)
+                elapsed = time.time() - job_start_time
+
+                # Parse latest stderr for time= pattern
+                current_time = 0
+                for line in reversed(stderr_output[-20:]):  # Check last 20 lines
+                    time_match = parse_time(line)
+                    if time_match:
+                        current_time = time_match
+                        break
+
+                if duration and duration > 0 and current_time > 0:
+                    if on_progress:
+                        on_progress(min(99.9, (current_time / duration) * 100))
+                else:
+                    # Show elapsed time even without duration
+                    spinner_char = SPINNER_FRAMES[int(elapsed * 10) % len(SPINNER_FRAMES)]
+                    print(f"\r    {Fore.CYAN}{spinner_char}{Style.RESET_ALL} Encoding... ({format_time(elapsed)} elapsed)  ", end="", flush=True)
 
         # Process finished
-        stderr_thread.join(timeout=2)
-        elapsed = time.time() - job_start_time
+        with span("ffmpeg.join"):
+            stderr_thread.join(timeout=2)
+        logger.annotate_item(exit_code=process.returncode, media_duration_s=duration)
 
         if process.returncode == 0:
-            display_progress_bar(100, elapsed, 0)
-            print()  # New line after progress bar
+            if faststart != "rewrite" and has_faststart(recipe.ffmpeg_args):
+                logger.info(f"Faststart '{faststart}': skipped rewriting "
+                            f"{output_file.stat().st_size / (1024 * 1024):.1f} MB for {output_file.name}")
             return True, ""
         else:
-            print()  # New line
             full_stderr = "".join(stderr_output)
+            if faststart == "reserve" and moov_space_exceeded(full_stderr):
+                # The reserved index space was too small; redo it the slow way
+                logger.warning(f"Reserved moov space too small for {input_file.name}, retrying with +faststart")
+                print()
+                benchmark_totals.clear()
+                return run_ffmpeg_subprocess(
+                    ffmpeg_path, input_file, output_file,
+                    replace(recipe, options={**recipe.options, "faststart": "rewrite"}),
+                    on_progress, benchmark_totals
+                )
             logger.error(f"FFmpeg failed: {full_stderr}")
             return False, full_stderr
 
@@ -242,54 +377,282 @@ def run_ffmpeg_job(
         return False, str(e)
 
 
+def report_benchmark(ffmpeg_path: str, input_file: Path, recipe: Recipe, breakdown: dict) -> None:
+    """Time the recipe's filters, then print and record the job's cost breakdown.
+
+    Args:
+        ffmpeg_path: Path to FFmpeg executable
+        input_file: Input file path
+        recipe: The recipe that was run
+        breakdown: The job's -benchmark figures, from BenchmarkTotals.result()
+    """
+    logger = get_logger()
+    if find_filtergraph(recipe.ffmpeg_args) is not None:
+        print(f"    Timing filter stages ({SAMPLE_SECONDS:g} s sample each)...")
+        breakdown["filters"] = time_filters(ffmpeg_path, input_file, recipe)
+
+    logger.annotate_item(benchmark=breakdown)
+    lines = format_breakdown(breakdown)
+    for line in lines:
+        print(f"    {line}")
+    logger.info(f"Benchmark for {input_file.name}:\n" + "\n".join(lines))
+
+
+def history_fraction(ffmpeg_path: str, input_file: Path, recipe: Recipe) -> float:
+    """Share of the input a time-ranged job converted, for SizeHistory.record().
+
+    Returns 0.0 (nothing is recorded) when the input's duration is unknown.
+    """
+    info = probe_media(ffmpeg_path, input_file)
+    duration = get_range_duration(info.duration, recipe)
+    if not info.duration or not duration:
+        return 0.0
+    return min(1.0, duration / info.duration)
+
+
+def link_output(existing: Path, output_file: Path) -> None:
+    """Reuse an existing output for a duplicate input (hard link, else copy)."""
+    try:
+        os.link(existing, output_file)
+    except OSError:
+        shutil.copy2(existing, output_file)
+
+
+class JobQueue:
+    """The steps around each encode that every way of running a queue shares.
+
+    Inputs with the same contents as an earlier input are linked to its
+    output instead of being encoded, loudness is measured up front,
+    upcoming inputs are staged, outputs are written behind through
+    scratch, and each finished job feeds the size history.
+    execute_jobs and execute_batched_jobs only differ in how they encode.
+    """
+
+    def __init__(
+        self,
+        ffmpeg_path: str,
+        files: list[Path],
+        recipe: Recipe,
+        export_dir: Path,
+        settings: Settings | None = None
+    ):
+        self.ffmpeg_path = ffmpeg_path
+        self.recipe = recipe
+        self.export_dir = export_dir
+        self.logger = get_logger()
+
+        with span("job.fingerprint", files=len(files)):
+            self.duplicates = find_duplicates(files)
+        if self.duplicates:
+            self.logger.info(f"{len(self.duplicates)} duplicate input(s) will be linked, not re-encoded")
+
+        # Loudness normalization: measure the whole batch up front (in parallel)
+        self.measurements = {}
+        if recipe.options.get("normalize"):
+            spinner = ProgressIndicator("Measuring loudness")
+            spinner.start()
+            with span("job.loudness"):
+                self.measurements = measure_files(ffmpeg_path, [f for f in files if f not in self.duplicates])
+            spinner.stop()
+
+        # Output/input size ratios feed future preflight estimates
+        self.history = get_size_history(self.logger.logs_dir)
+        self.has_range = recipe.options.get("start") is not None or recipe.options.get("end") is not None
+
+        settings = settings or get_settings()
+
+        # Copy or read ahead upcoming inputs while the current one encodes
+        self.stager = create_stager([f for f in files if f not in self.duplicates], settings)
+
+        # Encode into scratch; finished outputs move to the export directory in the background
+        self.mover = OutputMover(settings.get_scratch_dir()) if settings.write_behind else None
+
+        self.outputs: dict[Path, Path] = {}
+        self._used_outputs = set()
+
+    def output_path(self, input_file: Path) -> Path:
+        """Reserve the export path for an input's output."""
+        return unique_output_path(
+            generate_output_filename(input_file, self.recipe, self.export_dir), self._used_outputs
+        )
+
+    def link_duplicate(self, input_file: Path, output_file: Path, item_id: str) -> bool:
+        """Link a duplicate input's output to its original's, once that exists.
+
+        Returns:
+            True if the output was linked (the job is done)
+        """
+        original = self.duplicates.get(input_file)
+        if original not in self.outputs or self.outputs[original] == output_file:
+            return False
+        if self.mover:
+            self.mover.flush()
+        try:
+            link_output(self.outputs[original], output_file)
+        except OSError as e:
+            self.logger.warning(f"Could not link output for {input_file.name}, re-encoding: {e}")
+            return False
+        self.logger.info(f"{input_file.name} is a duplicate of {original.name}; linked output")
+        self.logger.item_end(input_file.name, True, output_path=output_file, item_id=item_id)
+        self.outputs[input_file] = output_file
+        return True
+
+    def job_recipe(self, input_file: Path) -> Recipe:
+        """The recipe for one input (with its loudness measurement applied)."""
+        if self.recipe.options.get("normalize"):
+            return apply_normalization(self.recipe, self.measurements.get(input_file))
+        return self.recipe
+
+    def source(self, input_file: Path) -> Path:
+        """Path to read an input from (its staged copy, if there is one)."""
+        with span("stage.wait", file=input_file.name):
+            return self.stager.get(input_file) if self.stager else input_file
+
+    def release(self, input_file: Path) -> None:
+        """Free an input's staged copy once its job has run."""
+        if self.stager:
+            self.stager.release(input_file)
+
+    def work_path(self, output_file: Path) -> Path:
+        """Path to encode an output into (in scratch with write-behind)."""
+        return self.mover.work_path(output_file) if self.mover else output_file
+
+    def succeeded(self, input_file: Path, work_file: Path, output_file: Path, item_id: str) -> None:
+        """Record a finished job and send its output on to the export directory."""
+        # Record where the file ends up, sized before the mover takes it
+        try:
+            output_bytes = work_file.stat().st_size
+        except OSError:
+            output_bytes = None
+        self.logger.item_end(input_file.name, True, output_path=output_file, item_id=item_id,
+                             output_bytes=output_bytes)
+        self.outputs[input_file] = output_file
+        with span("finalize.history"):
+            try:
+                self.history.record(
+                    self.recipe, input_file.stat().st_size, work_file.stat().st_size,
+                    history_fraction(self.ffmpeg_path, input_file, self.recipe) if self.has_range else 1.0
+                )
+                self.history.save()
+            except OSError:
+                pass
+        if self.mover:
+            with span("move.submit"):
+                self.mover.submit(work_file, output_file)
+
+    def failed(self, input_file: Path, work_file: Path, item_id: str, error: str) -> None:
+        """Record a failed job and drop its partial output."""
+        if self.mover:
+            work_file.unlink(missing_ok=True)
+        self.logger.item_end(input_file.name, False, error=error, item_id=item_id)
+        self.logger.error(f"Error processing {input_file.name}: {error}")
+
+    def finish(self) -> bool:
+        """Wait for outputs still being moved to the export directory.
+
+        Returns:
+            True if every output reached the export directory
+        """
+        if not self.mover:
+            return True
+        with span("move.wait"):
+            errors, self.mover = self.mover.close(), None
+        if errors:
+            print(f"\n{Fore.RED}Error:{Style.RESET_ALL} {len(errors)} output(s) could not be "
+                  f"moved to the export folder. See logs for details.")
+            return False
+        return True
+
+    def close(self) -> None:
+        """Stop staging and clean up scratch (also after a failed job)."""
+        if self.stager:
+            self.stager.close()
+        if self.mover:
+            self.mover.close()
+
+
+def get_job_runner(recipe: Recipe):
+    """Get the function that runs a single job for a recipe.
+
+    Most recipes are a single FFmpeg invocation; some categories need
+    several steps and provide their own runner with the same signature.
+    """
+    if recipe.category == "trim":
+        from monica.trim import run_trim_job
+        return run_trim_job
+    return run_ffmpeg_job
+
+
+@profiled
+@traced("job")
 def execute_jobs(
     ffmpeg_path: str,
     files: list[Path],
     recipe: Recipe,
-    export_dir: Path
+    export_dir: Path,
+    settings: Settings | None = None
 ) -> bool:
     """Execute a queue of FFmpeg jobs.
 
-    Processes files one at a time. Stops immediately on error.
+    Processes files one at a time. Stops immediately on error. Inputs with
+    the same contents as an earlier input are not re-encoded; their output
+    is linked to the earlier one's.
 
     Args:
         ffmpeg_path: Path to FFmpeg executable
         files: List of input files
         recipe: The recipe to apply
         export_dir: The export directory
+        settings: Staging/write-behind settings (default: the global settings)
 
     Returns:
         True if all jobs completed successfully, False otherwise
     """
     logger = get_logger()
-    logger.job_start([str(f) for f in files], recipe.name)
+    logger.job_start([str(f) for f in files], recipe.name, recipe.category)
 
     total = len(files)
     print(f"\n{Fore.CYAN}Processing {total} file(s) with '{recipe.name}'...{Style.RESET_ALL}")
 
-    for i, input_file in enumerate(files, 1):
-        output_file = generate_output_filename(input_file, recipe, export_dir)
+    run_job = get_job_runner(recipe)
+    queue = JobQueue(ffmpeg_path, files, recipe, export_dir, settings)
 
-        print(f"\n{Fore.CYAN}[{i}/{total}]{Style.RESET_ALL} {input_file.name}")
-        print(f"    -> {output_file.name}")
+    try:
+        for i, input_file in enumerate(files, 1):
+            output_file = queue.output_path(input_file)
 
-        logger.item_start(input_file.name)
+            print(f"\n{Fore.CYAN}[{i}/{total}]{Style.RESET_ALL} {input_file.name}")
+            print(f"    -> {output_file.name}")
 
-        success, error = run_ffmpeg_job(ffmpeg_path, input_file, output_file, recipe)
+            item_id = logger.item_start(input_file.name, input_file)
 
-        if success:
-            logger.item_end(input_file.name, True)
-            print(f"{Fore.GREEN}Done!{Style.RESET_ALL}")
-        else:
-            logger.item_end(input_file.name, False)
-            logger.error(f"Error processing {input_file.name}: {error}")
+            if queue.link_duplicate(input_file, output_file, item_id):
+                print(f"{Fore.GREEN}Done!{Style.RESET_ALL} (duplicate of {queue.duplicates[input_file].name})")
+                continue
+
+            source = queue.source(input_file)
+            work_file = queue.work_path(output_file)
+            success, error = run_job(ffmpeg_path, source, work_file, queue.job_recipe(input_file))
+            queue.release(input_file)
+
+            if success:
+                queue.succeeded(input_file, work_file, output_file, item_id)
+                print(f"{Fore.GREEN}Done!{Style.RESET_ALL}")
+            else:
+                queue.failed(input_file, work_file, item_id, error)
+
+                print(f"\n{Fore.RED}Error:{Style.RESET_ALL} Failed to process {input_file.name}")
+                print(f"{Fore.RED}Job stopped. See logs for details.{Style.RESET_ALL}")
 
-            print(f"\n{Fore.RED}Error:{Style.RESET_ALL} Failed to process {input_file.name}")
-            print(f"{Fore.RED}Job stopped. See logs for details.{Style.RESET_ALL}")
+                logger.job_end(False, recipe.name)
+                return False
 
+        if not queue.finish():
             logger.job_end(False, recipe.name)
             return False
 
-    logger.job_end(True, recipe.name)
-    print(f"\n{Fore.GREEN}All {total} file(s) processed successfully!{Style.RESET_ALL}")
-    return True
+        logger.job_end(True, recipe.name)
+        print(f"\n{Fore.GREEN}All {total} file(s) processed successfully!{Style.RESET_ALL}")
+        return True
+    finally:
+        queue.close()
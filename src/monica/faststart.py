@@ -0,0 +1,135 @@
+"""Faststart strategies for MP4 outputs.
+
+`-movflags +faststart` writes the file, then rewrites all of it to move the
+moov atom (the index) to the front: one extra full read and write of the
+output. Recipes can pick a strategy with options["faststart"]:
+
+- "rewrite": +faststart as written in the recipe (the default)
+- "reserve": reserve space for the moov at the start (-moov_size), sized
+  from the probed duration, so it's written in place with no rewrite
+- "fragmented": fragmented MP4 (index per fragment, playable while written)
+- "none": leave the moov at the end
+"""
+
+import re
+from dataclasses import replace
+
+from monica.probe import MediaInfo
+from monica.recipes import Recipe, get_range_duration
+
+
+FASTSTART_STRATEGIES = ("rewrite", "reserve", "fragmented", "none")
+
+MP4_EXTENSIONS = {".mp4", ".m4v", ".mov", ".m4a"}
+
+FRAGMENTED_FLAGS = "+frag_keyframe+empty_moov+default_base_moof"
+
+# Worst-case moov bytes per sample (stsz, stts, ctts, stss, plus one chunk
+# entry per sample), fixed overhead and a safety margin
+VIDEO_BYTES_PER_FRAME = 48
+AUDIO_BYTES_PER_PACKET = 24
+AUDIO_SAMPLES_PER_PACKET = 1024
+MOOV_OVERHEAD_BYTES = 64 * 1024
+MOOV_MARGIN = 1.25
+
+# Assumed when the source frame rate or sample rate is unknown
+DEFAULT_FPS = 60.0
+DEFAULT_SAMPLE_RATE = 48000
+
+# What the MP4 muxer prints when the index outgrew the -moov_size space
+MOOV_SIZE_OVERFLOW = re.compile(r"reserved_moov_size is too small")
+
+
+def _arg(args: list[str], name: str) -> str | None:
+    if name in args:
+        i = args.index(name)
+        if i + 1 < len(args):
+            return args[i + 1]
+    return None
+
+
+def has_faststart(args: list[str]) -> bool:
+    """Check whether the args ask for the +faststart rewrite."""
+    movflags = _arg(args, "-movflags")
+    return movflags is not None and "faststart" in movflags
+
+
+def moov_space_exceeded(stderr: str) -> bool:
+    """Check whether FFmpeg failed because the reserved moov space was too small."""
+    return MOOV_SIZE_OVERFLOW.search(stderr) is not None
+
+
+def get_faststart_strategy(recipe: Recipe) -> str:
+    """The recipe's faststart strategy ("none" for non-MP4 outputs)."""
+    if recipe.extension.lower() not in MP4_EXTENSIONS:
+        return "none"
+    strategy = recipe.options.get("faststart")
+    if strategy in FASTSTART_STRATEGIES:
+        return strategy
+    return "rewrite" if has_faststart(recipe.ffmpeg_args) else "none"
+
+
+def set_movflags(args: list[str], flags: str | None) -> list[str]:
+    """Replace the faststart movflag with other flags (or drop it)."""
+    result = list(args)
+    if "-movflags" in result:
+        i = result.index("-movflags")
+        remaining = re.sub(r"[+-]?faststart", "", result[i + 1] if i + 1 < len(result) else "")
+        del result[i:i + 2]
+        flags = (flags or "") + remaining
+    if flags:
+        result += ["-movflags", flags]
+    return result
+
+
+def estimate_moov_size(duration: float, fps: float | None = None, sample_rate: int | None = None) -> int:
+    """Upper estimate of the moov atom size for an output.
+
+    An fps of 0 means no video track; None means unknown.
+    """
+    frames = duration * (DEFAULT_FPS if fps is None else fps)
+    packets = duration * (sample_rate or DEFAULT_SAMPLE_RATE) / AUDIO_SAMPLES_PER_PACKET
+    size = MOOV_OVERHEAD_BYTES + frames * VIDEO_BYTES_PER_FRAME + packets * AUDIO_BYTES_PER_PACKET
+    return int(size * MOOV_MARGIN)
+
+
+def apply_faststart(recipe: Recipe, info: MediaInfo) -> tuple[Recipe, str]:
+    """Rewrite a recipe's movflags for its faststart strategy.
+
+    "reserve" needs the duration; without it this falls back to "rewrite".
+
+    Returns:
+        Tuple of (recipe to run, strategy used)
+    """
+    strategy = get_faststart_strategy(recipe)
+    args = recipe.ffmpeg_args
+
+    if strategy == "rewrite":
+        if not has_faststart(args):
+            args = set_movflags(args, "+faststart")
+    elif strategy == "none":
+        if not has_faststart(args):
+            return recipe, strategy
+        args = set_movflags(args, None)
+    elif strategy == "fragmented":
+        args = set_movflags(args, FRAGMENTED_FLAGS)
+    elif strategy == "reserve":
+        duration = get_range_duration(info.duration, recipe)
+        if not duration:
+            return apply_faststart(replace(recipe, options={**recipe.options, "faststart": "rewrite"}), info)
+
+        fps = None
+        if not info.has_video or "-vn" in args:
+            fps = 0.0
+        elif info.fps:
+            fps = info.fps
+            rate = _arg(args, "-r")
+            if rate and re.fullmatch(r"[\d.]+", rate):
+                fps = max(fps, float(rate))
+        sample_rate = _arg(args, "-ar")
+        sample_rate = int(sample_rate) if sample_rate and sample_rate.isdigit() else info.sample_rate
+
+        moov_size = estimate_moov_size(duration, fps, sample_rate)
+        args = set_movflags(args, None) + ["-moov_size", str(moov_size)]
+
+    return replace(recipe, ffmpeg_args=args), strategy
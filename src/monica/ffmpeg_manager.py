@@ -11,6 +11,7 @@ from pathlib import Path
 from colorama import Fore, Style
 
 from monica.logger import log_info, log_error, log_warning
+from monica.tracing import traced
 
 
 # FFmpeg download URLs
@@ -49,6 +50,7 @@ def check_ffmpeg_local(base_dir: Path) -> str | None:
     return None
 
 
+@traced("ffmpeg_manager.locate")
 def get_ffmpeg_path(base_dir: Path) -> str | None:
     """Get the path to FFmpeg, checking local first then PATH."""
     local_path = check_ffmpeg_local(base_dir)
@@ -157,6 +159,7 @@ def download_ffmpeg(base_dir: Path) -> bool:
         return False
 
 
+@traced("ffmpeg_manager.verify")
 def verify_ffmpeg(ffmpeg_path: str) -> bool:
     """Verify that FFmpeg works by running a version check."""
     try:
@@ -1,16 +1,168 @@
 """File selection UI for MONICA."""
 
+import fnmatch
+import os
+import stat
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterator
 import questionary
 from colorama import Fore, Style
 
+from monica.fingerprint import find_duplicates
+from monica.picker import REFRESH_INTERVAL, VIRTUAL_PICKER_THRESHOLD, run_picker
+from monica.prober import BackgroundProber, format_details
+from monica.query import MediaTable
+from monica.tracing import span
 
-def get_files_in_directory(directory: Path, extensions: list[str] = None) -> list[Path]:
+
+@dataclass
+class FileEntry:
+    """A scanned file with the stat data read during the scan."""
+    path: Path
+    size: int
+    mtime: float
+
+
+def matches_patterns(rel_path: str, name: str, patterns: list[str]) -> bool:
+    """Check a relative path (or just its name) against glob patterns."""
+    return any(
+        fnmatch.fnmatch(rel_path, pattern) or fnmatch.fnmatch(name, pattern)
+        for pattern in patterns
+    )
+
+
+def scan_directory(
+    directory: Path,
+    extensions: list[str] = None,
+    recursive: bool = False,
+    include: list[str] = None,
+    exclude: list[str] = None
+) -> Iterator[FileEntry]:
+    """Scan a directory with os.scandir, yielding matching files as found.
+
+    Uses each DirEntry's cached type and stat data, so a file costs at most
+    one stat call. Excluded directories are not descended into.
+
+    Args:
+        directory: The directory to scan
+        extensions: List of extensions to filter by (e.g., ['.mp4', '.mkv'])
+        recursive: Also scan subdirectories
+        include: Glob patterns a file's relative path or name must match
+        exclude: Glob patterns for files and directories to skip
+
+    Yields:
+        FileEntry for each matching file (in directory order, not sorted)
+    """
+    extensions = {e.lower() for e in extensions} if extensions else None
+    exclude = exclude or []
+    pending = [(directory, "")]
+
+    while pending:
+        current, prefix = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    rel_path = prefix + entry.name
+                    if exclude and matches_patterns(rel_path, entry.name, exclude):
+                        continue
+                    try:
+                        if entry.is_dir():
+                            if recursive:
+                                pending.append((Path(entry.path), rel_path + "/"))
+                            continue
+                        if not entry.is_file():
+                            continue
+                        if extensions is not None and os.path.splitext(entry.name)[1].lower() not in extensions:
+                            continue
+                        if include and not matches_patterns(rel_path, entry.name, include):
+                            continue
+                        info = entry.stat()
+                    except OSError:
+                        continue
+                    if stat.S_ISREG(info.st_mode):
+                        yield FileEntry(Path(entry.path), info.st_size, info.st_mtime)
+        except OSError:
+            continue
+
+
+class BackgroundScan:
+    """Run a scan in a thread, handing out entries as they're found.
+
+    Args:
+        entries: The scan to run, e.g. scan_directory(...) or ImportIndex.scan(...)
+        name: Span name the scan is traced under
+    """
+
+    def __init__(self, entries: Iterator[FileEntry], name: str = "scan.directory"):
+        self._scan = entries
+        self._name = name
+        self._found: list[FileEntry] = []
+        self._taken = 0
+        self._stop = False
+        self._changed = threading.Condition()
+        self.done = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "BackgroundScan":
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        with span(self._name) as scan:
+            try:
+                for entry in self._scan:
+                    with self._changed:
+                        if self._stop:
+                            break
+                        self._found.append(entry)
+                        self._changed.notify_all()
+            finally:
+                with self._changed:
+                    self.done = True
+                    self._changed.notify_all()
+                scan.set(files=len(self._found))
+
+    def wait(self, count: int) -> bool:
+        """Wait until `count` files are found or the scan ends.
+
+        Returns:
+            True if the scan has ended
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self.done or len(self._found) >= count)
+            return self.done
+
+    def take(self) -> list[FileEntry]:
+        """Entries found since the last call."""
+        with self._changed:
+            new = self._found[self._taken:]
+            self._taken = len(self._found)
+            return new
+
+    def close(self) -> None:
+        """Stop scanning at the next file found (without waiting for it)."""
+        with self._changed:
+            self._stop = True
+
+
+def get_files_in_directory(
+    directory: Path,
+    extensions: list[str] = None,
+    recursive: bool = False,
+    include: list[str] = None,
+    exclude: list[str] = None
+) -> list[Path]:
     """Get all files in a directory, optionally filtered by extension.
 
     Args:
         directory: The directory to search
         extensions: List of extensions to filter by (e.g., ['.mp4', '.mkv'])
+        recursive: Also search subdirectories
+        include: Glob patterns a file's relative path or name must match
+        exclude: Glob patterns for files and directories to skip
 
     Returns:
         List of file paths
@@ -18,19 +170,56 @@ def get_files_in_directory(directory: Path, extensions: list[str] = None) -> lis
     if not directory.exists():
         return []
 
-    files = []
-    for item in directory.iterdir():
-        if item.is_file():
-            if extensions is None or item.suffix.lower() in extensions:
-                files.append(item)
+    entries = scan_directory(directory, extensions, recursive, include, exclude)
+    return [e.path for e in sort_entries(entries, directory)]
+
+
+def sort_entries(entries, directory: Path) -> list[FileEntry]:
+    """Sort entries by path relative to the directory, case-insensitively."""
+    return sorted(entries, key=lambda e: display_name(e.path, directory).lower())
+
+
+def display_name(path: Path, directory: Path) -> str:
+    """A file's path relative to the scanned directory (just the name if flat)."""
+    try:
+        return path.relative_to(directory).as_posix()
+    except ValueError:
+        return path.name
 
-    return sorted(files, key=lambda x: x.name.lower())
+
+def _metadata_filter(entries: list[FileEntry], prober: BackgroundProber, root: Path):
+    """Query function for the picker over the files probed so far.
+
+    While files are still being found or probed, the table is rebuilt at
+    most once per REFRESH_INTERVAL; keystrokes in between query the last
+    one. A build covers every file, so one per keystroke would stall typing
+    on large folders.
+    """
+    cache = {}
+
+    def run_query(text: str) -> list[int]:
+        probed = (len(entries), len(prober.results))
+        stale = "table" not in cache or (
+            probed != cache["probed"] and time.monotonic() - cache["built"] >= REFRESH_INTERVAL
+        )
+        if stale:
+            cache["probed"] = probed
+            cache["table"] = MediaTable.build(entries, [prober.get(i) for i in range(len(entries))], root)
+            cache["built"] = time.monotonic()
+        return cache["table"].query(text)
+
+    return run_query
 
 
 def select_files(
     import_dir: Path,
     extensions: list[str] = None,
-    message: str = "Select files to process"
+    message: str = "Select files to process",
+    recursive: bool = False,
+    include: list[str] = None,
+    exclude: list[str] = None,
+    index=None,
+    ffmpeg_path: str = None
 ) -> list[Path]:
     """Display a multi-select file picker for the import directory.
 
@@ -38,11 +227,36 @@ def select_files(
         import_dir: The import directory path
         extensions: Optional list of extensions to filter by
         message: The prompt message to display
+        recursive: Also list files in subdirectories
+        include: Glob patterns a file's relative path or name must match
+        exclude: Glob patterns for files and directories to skip
+        index: Optional ImportIndex of the import directory; only folders
+            that changed since the last visit are scanned again
+        ffmpeg_path: If given, files are probed in the background and their
+            duration, resolution, codecs and bitrate shown as they arrive
 
     Returns:
         List of selected file paths, or empty list if cancelled
     """
-    files = get_files_in_directory(import_dir, extensions)
+    if index is not None:
+        background = BackgroundScan(index.scan(extensions, recursive, include, exclude), "scan.index")
+    else:
+        background = BackgroundScan(scan_directory(import_dir, extensions, recursive, include, exclude))
+    background.start()
+    if not background.wait(VIRTUAL_PICKER_THRESHOLD):
+        # A long list: open the picker now and let the rest of the scan stream in
+        print()
+        try:
+            return _select_streaming(background, import_dir, message, index, ffmpeg_path)
+        finally:
+            background.close()
+            if index is not None:
+                index.save()
+    entries = background.take()
+    if index is not None:
+        index.save()
+    entries = sort_entries(entries, import_dir)
+    files = [e.path for e in entries]
 
     if not files:
         if extensions:
@@ -53,17 +267,85 @@ def select_files(
         print(f"Place your files in: {import_dir}")
         return []
 
-    # Create choices with file info
-    choices = []
-    for f in files:
-        size = f.stat().st_size
-        size_str = format_size(size)
-        choices.append(questionary.Choice(
-            title=f"{f.name} ({size_str})",
-            value=f
-        ))
+    # Same contents under different names are only converted once
+    with span("select.fingerprint", files=len(files)):
+        duplicates = find_duplicates(files)
+
+    # Titles with file info (sizes come from the scan, no extra stat)
+    titles = []
+    for entry in entries:
+        f = entry.path
+        title = f"{display_name(f, import_dir)} ({format_size(entry.size)})"
+        if f in duplicates:
+            title += f" [duplicate of {display_name(duplicates[f], import_dir)}]"
+        titles.append(title)
 
     print()  # Add spacing
+    if not ffmpeg_path:
+        if len(files) < VIRTUAL_PICKER_THRESHOLD:
+            return _select_with_checkbox(titles, files, message)
+        # Only the visible page is rendered, with type-to-filter
+        indices = run_picker(titles, message)
+        return [files[i] for i in indices] if indices is not None else []
+
+    # Rows fill in as probes finish; the rows on screen are probed first
+    prober = BackgroundProber(files, ffmpeg_path, index).start()
+    try:
+        indices = run_picker(
+            titles, message,
+            describe=lambda i: format_details(info) if (info := prober.get(i)) else None,
+            on_render=prober.prioritize,
+            expression_filter=_metadata_filter(entries, prober, import_dir),
+        )
+    finally:
+        prober.close()
+        if index is not None:
+            index.save()
+    return [files[i] for i in indices] if indices is not None else []
+
+
+def _select_streaming(
+    background: BackgroundScan,
+    import_dir: Path,
+    message: str,
+    index=None,
+    ffmpeg_path: str = None
+) -> list[Path]:
+    """Pick from files as a background scan finds them.
+
+    Rows appear in scan order rather than sorted, and without duplicate
+    marks (duplicates are still only converted once).
+    """
+    entries: list[FileEntry] = []
+    prober = BackgroundProber([], ffmpeg_path, index).start() if ffmpeg_path else None
+
+    def poll() -> tuple[list[str], bool]:
+        finished = background.done
+        new = background.take()
+        entries.extend(new)
+        if prober is not None:
+            prober.add([e.path for e in new])
+        return [f"{display_name(e.path, import_dir)} ({format_size(e.size)})" for e in new], finished
+
+    try:
+        if prober is None:
+            indices = run_picker([], message, poll=poll)
+        else:
+            indices = run_picker(
+                [], message,
+                describe=lambda i: format_details(info) if (info := prober.get(i)) else None,
+                on_render=prober.prioritize,
+                expression_filter=_metadata_filter(entries, prober, import_dir),
+                poll=poll,
+            )
+    finally:
+        if prober is not None:
+            prober.close()
+    return [entries[i].path for i in indices] if indices is not None else []
+
+
+def _select_with_checkbox(titles: list[str], files: list[Path], message: str) -> list[Path]:
+    choices = [questionary.Choice(title=title, value=f) for title, f in zip(titles, files)]
     selected = questionary.checkbox(
         message,
         choices=choices,
@@ -0,0 +1,146 @@
+"""Fast content fingerprints and duplicate detection for input files."""
+
+import hashlib
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+# Bytes read at each sample offset
+SAMPLE_SIZE = 64 * 1024
+
+# Sample offsets as fractions of the file size (the last block ends at EOF)
+SAMPLE_POSITIONS = (0.0, 0.25, 0.5, 0.75, 1.0)
+
+# Read size for full hashes
+CHUNK_SIZE = 1024 * 1024
+
+DEFAULT_WORKERS = min(8, (os.cpu_count() or 2) * 2)
+
+# (path, size, mtime_ns) -> fingerprint, so re-checks within a session are free
+_sampled_cache: dict[tuple, str] = {}
+_full_cache: dict[tuple, str] = {}
+_cache_lock = threading.Lock()
+
+
+def _stat_key(path: Path) -> tuple:
+    stat = path.stat()
+    return (str(path), stat.st_size, stat.st_mtime_ns)
+
+
+def is_fully_sampled(size: int) -> bool:
+    """Check whether a file is small enough that sampling reads all of it."""
+    return size <= SAMPLE_SIZE * len(SAMPLE_POSITIONS)
+
+
+def sample_offsets(size: int) -> list[int]:
+    """Start offsets of the sampled blocks for a file of the given size."""
+    last = size - SAMPLE_SIZE
+    return sorted({int(last * position) for position in SAMPLE_POSITIONS})
+
+
+def sampled_fingerprint(path: Path) -> str:
+    """Hash a file's size plus a few fixed-offset blocks.
+
+    Small files are hashed whole. For larger ones, different files almost
+    always differ here; equal fingerprints are confirmed with full_hash()
+    before being treated as duplicates.
+    """
+    key = _stat_key(path)
+    with _cache_lock:
+        if key in _sampled_cache:
+            return _sampled_cache[key]
+
+    size = key[1]
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    if is_fully_sampled(size):
+        digest.update(path.read_bytes())
+    else:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for offset in sample_offsets(size):
+                digest.update(data[offset:offset + SAMPLE_SIZE])
+
+    fingerprint = digest.hexdigest()
+    with _cache_lock:
+        _sampled_cache[key] = fingerprint
+    return fingerprint
+
+
+def full_hash(path: Path) -> str:
+    """Hash a file's entire contents."""
+    key = _stat_key(path)
+    with _cache_lock:
+        if key in _full_cache:
+            return _full_cache[key]
+
+    digest = hashlib.blake2b(digest_size=32)
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+
+    result = digest.hexdigest()
+    with _cache_lock:
+        _full_cache[key] = result
+    return result
+
+
+def _group_by(files: list[Path], key_func, workers: int) -> list[list[Path]]:
+    """Group files by a key computed on a thread pool; drop unreadable files and singletons."""
+    def safe_key(f):
+        try:
+            return key_func(f)
+        except OSError:
+            return None
+
+    groups: dict[str, list[Path]] = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for f, key in zip(files, pool.map(safe_key, files)):
+            if key is not None:
+                groups.setdefault(key, []).append(f)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def find_duplicates(files: list[Path], workers: int = DEFAULT_WORKERS) -> dict[Path, Path]:
+    """Find files with identical contents.
+
+    Files are compared by size first (no reads), then by sampled
+    fingerprint, and only files whose fingerprints collide are fully hashed.
+
+    Returns:
+        Mapping of each duplicate to the first file (in the given order)
+        with the same contents; unique files are not included
+    """
+    # Files that can't be read (removed, no permission) are left out
+    sizes: dict[Path, int] = {}
+    for f in files:
+        try:
+            sizes[f] = f.stat().st_size
+        except OSError:
+            continue
+    by_size: dict[int, list[Path]] = {}
+    for f, size in sizes.items():
+        by_size.setdefault(size, []).append(f)
+    candidates = [f for group in by_size.values() if len(group) > 1 for f in group]
+    if not candidates:
+        return {}
+
+    order = {f: i for i, f in enumerate(files)}
+    duplicates = {}
+    for group in _group_by(candidates, sampled_fingerprint, workers):
+        if is_fully_sampled(sizes[group[0]]):
+            confirmed = [group]
+        else:
+            confirmed = _group_by(group, full_hash, workers)
+        for same in confirmed:
+            original = min(same, key=order.get)
+            for f in same:
+                if f != original:
+                    duplicates[f] = original
+    return duplicates
@@ -0,0 +1,277 @@
+"""Persistent, incrementally refreshed index of the import folder."""
+
+import json
+import os
+import stat
+import threading
+import time
+from pathlib import Path
+from typing import Iterator
+
+from monica.file_selector import FileEntry, matches_patterns
+
+
+INDEX_FILE = "import_index.json"
+INDEX_VERSION = 1
+
+# Directory mtimes this close to the scan may have coarse resolution (e.g.
+# 1 s on some network file systems): a file added in the same tick wouldn't
+# change them, so such directories are listed again next time
+MTIME_RESOLUTION_NS = 2_000_000_000
+
+# Files modified this recently may still be growing (being copied in); their
+# size is re-read even if their directory hasn't changed
+RECENT_SECONDS = 120
+
+
+class ImportIndex:
+    """Index of files under a root directory, kept on disk between runs.
+
+    A directory is only listed again when its mtime changed (a file was
+    added, removed or renamed in it); unchanged directories cost one stat.
+    Changes to a file's contents don't touch its directory's mtime, so
+    sizes of files modified in place are only refreshed for recently
+    modified files or when something else in the directory changes.
+    """
+
+    def __init__(self, root: Path, index_file: Path):
+        self.root = Path(root)
+        self.index_file = Path(index_file)
+        self._lock = threading.Lock()
+        self._dirs = self._load()
+        self._dirty = False
+
+    def _load(self) -> dict:
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return {}
+        if data.get("root") != str(self.root.resolve()):
+            return {}
+        dirs = data.get("dirs")
+        return dirs if isinstance(dirs, dict) else {}
+
+    def save(self) -> bool:
+        """Write the index to disk atomically (only if it changed)."""
+        with self._lock:
+            if not self._dirty:
+                return True
+            data = {"version": INDEX_VERSION, "root": str(self.root.resolve()), "dirs": self._dirs}
+            try:
+                self.index_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.index_file.with_suffix(".tmp")
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_file, self.index_file)
+                self._dirty = False
+                return True
+            except OSError:
+                return False
+
+    def _scan_dir(self, path: Path, old: dict | None, mtime_ns: int) -> dict:
+        """List one directory, keeping metadata of unchanged files."""
+        old_files = old["files"] if old else {}
+        files = {}
+        subdirs = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        subdirs.append(entry.name)
+                        continue
+                    if not entry.is_file():
+                        continue
+                    info = entry.stat()
+                except OSError:
+                    continue
+                if not stat.S_ISREG(info.st_mode):
+                    continue
+                record = {"size": info.st_size, "mtime": info.st_mtime}
+                previous = old_files.get(entry.name)
+                if previous and previous.get("meta") is not None \
+                        and previous["size"] == record["size"] and previous["mtime"] == record["mtime"]:
+                    record["meta"] = previous["meta"]
+                files[entry.name] = record
+        if time.time_ns() - mtime_ns < MTIME_RESOLUTION_NS:
+            mtime_ns = -1
+        return {"mtime_ns": mtime_ns, "files": files, "subdirs": subdirs}
+
+    def _refresh_recent(self, path: Path, record: dict) -> bool:
+        """Re-stat recently modified files in an unchanged directory."""
+        changed = False
+        cutoff = time.time() - RECENT_SECONDS
+        for name, file_record in list(record["files"].items()):
+            if file_record["mtime"] < cutoff:
+                continue
+            try:
+                info = os.stat(path / name)
+            except OSError:
+                continue
+            if info.st_size != file_record["size"] or info.st_mtime != file_record["mtime"]:
+                record["files"][name] = {"size": info.st_size, "mtime": info.st_mtime}
+                changed = True
+        return changed
+
+    def _walk(self, recursive: bool, exclude: list[str]) -> Iterator[tuple[str, dict, bool]]:
+        """Bring directories up to date one at a time.
+
+        Yields (relative path, record, listed again) for each directory; the
+        index itself is only updated once the walk has finished. Records of
+        directories the walk didn't visit (a flat walk, excluded folders)
+        are kept; only directories that are gone are dropped, with
+        everything below them.
+        """
+        visited = {}
+        removed = []
+        pending = [(self.root, "")]
+
+        while pending:
+            path, rel = pending.pop()
+            old = self._dirs.get(rel)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                removed.append(rel)
+                continue
+
+            listed = False
+            if old and old.get("mtime_ns") == mtime_ns:
+                record = old
+                if self._refresh_recent(path, record):
+                    self._dirty = True
+            else:
+                try:
+                    record = self._scan_dir(path, old, mtime_ns)
+                except OSError:
+                    removed.append(rel)
+                    continue
+                listed = True
+                self._dirty = True
+                if old:
+                    prefix = f"{rel}/" if rel else ""
+                    removed += [prefix + name for name in set(old["subdirs"]) - set(record["subdirs"])]
+            visited[rel] = record
+            yield rel, record, listed
+
+            if recursive:
+                for name in record["subdirs"]:
+                    sub_rel = f"{rel}/{name}" if rel else name
+                    if exclude and matches_patterns(sub_rel, name, exclude):
+                        continue
+                    pending.append((path / name, sub_rel))
+
+        def is_gone(rel: str) -> bool:
+            return any(not gone or rel == gone or rel.startswith(f"{gone}/") for gone in removed)
+
+        with self._lock:
+            dirs = {**self._dirs, **visited}
+            if removed:
+                dirs = {rel: record for rel, record in dirs.items() if not is_gone(rel)}
+            if set(dirs) != set(self._dirs):
+                self._dirty = True
+            self._dirs = dirs
+
+    def refresh(self, recursive: bool = False, exclude: list[str] = None) -> int:
+        """Bring the index up to date with the file system.
+
+        Returns:
+            Number of directories that had to be listed again
+        """
+        return sum(listed for _, _, listed in self._walk(recursive, exclude or []))
+
+    def scan(
+        self,
+        extensions: list[str] = None,
+        recursive: bool = False,
+        include: list[str] = None,
+        exclude: list[str] = None
+    ) -> Iterator[FileEntry]:
+        """Refresh the index, yielding matching files a directory at a time.
+
+        Files come in walk order as each directory is brought up to date, so
+        a caller can show them before a long rescan has finished. Stopping
+        early leaves the index as it was.
+        """
+        extensions = {e.lower() for e in extensions} if extensions else None
+        exclude = exclude or []
+        for rel, record, _ in self._walk(recursive, exclude):
+            yield from self._matching(rel, record, extensions, include, exclude)
+
+    def entries(
+        self,
+        extensions: list[str] = None,
+        recursive: bool = False,
+        include: list[str] = None,
+        exclude: list[str] = None
+    ) -> list[FileEntry]:
+        """List indexed files matching the same filters as scan_directory."""
+        extensions = {e.lower() for e in extensions} if extensions else None
+        exclude = exclude or []
+        result = []
+        with self._lock:
+            dirs = list(self._dirs.items())
+        for rel, record in dirs:
+            if rel and not recursive:
+                continue
+            parts = rel.split("/") if rel else []
+            if exclude and any(
+                matches_patterns("/".join(parts[:i + 1]), part, exclude)
+                for i, part in enumerate(parts)
+            ):
+                continue
+            result.extend(self._matching(rel, record, extensions, include, exclude))
+        return result
+
+    def _matching(
+        self,
+        rel: str,
+        record: dict,
+        extensions: set[str] | None,
+        include: list[str] | None,
+        exclude: list[str]
+    ) -> list[FileEntry]:
+        """Files of one directory record that pass the filters."""
+        base = self.root / rel if rel else self.root
+        prefix = f"{rel}/" if rel else ""
+        result = []
+        for name, file_record in record["files"].items():
+            rel_path = prefix + name
+            if extensions is not None and os.path.splitext(name)[1].lower() not in extensions:
+                continue
+            if exclude and matches_patterns(rel_path, name, exclude):
+                continue
+            if include and not matches_patterns(rel_path, name, include):
+                continue
+            result.append(FileEntry(base / name, file_record["size"], file_record["mtime"]))
+        return result
+
+    def _file_record(self, path: Path) -> dict | None:
+        try:
+            rel = Path(path).relative_to(self.root)
+        except ValueError:
+            return None
+        parent = rel.parent.as_posix()
+        record = self._dirs.get("" if parent == "." else parent)
+        return record["files"].get(rel.name) if record else None
+
+    def get_metadata(self, path: Path) -> dict | None:
+        """Stored metadata (e.g. probe results) for a file, if any."""
+        with self._lock:
+            file_record = self._file_record(path)
+            return file_record.get("meta") if file_record else None
+
+    def set_metadata(self, path: Path, meta: dict) -> None:
+        """Store metadata for a file; it's kept until the file changes."""
+        with self._lock:
+            file_record = self._file_record(path)
+            if file_record is not None:
+                file_record["meta"] = meta
+                self._dirty = True
+
+
+def get_import_index(import_dir: Path, logs_dir: Path) -> ImportIndex:
+    """Get the index of an import directory, stored in the logs directory."""
+    return ImportIndex(import_dir, Path(logs_dir) / INDEX_FILE)
@@ -0,0 +1,126 @@
+"""Reading monica.log and its rotated backups without loading them whole.
+
+Files are read backwards in blocks, so the newest entries come first and
+only as much of the logs as is shown or searched gets read.
+"""
+
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from monica.logger import LOG_BACKUP_COUNT, LOG_FILE
+
+
+BLOCK_SIZE = 64 * 1024
+
+# "2026-01-08 14:32:10 | INFO     | message"; other lines continue the entry above
+HEADER_RE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) \| (\w+)\s* \| ")
+
+JOB_RE = re.compile(r"\| JOB (START|END): .*\(job ([0-9a-f]+)\)$")
+
+
+@dataclass
+class LogEntry:
+    """One log record, including the lines of a multi-line message."""
+    timestamp: str
+    level: str
+    lines: list[str]
+    source: Path
+    job_id: str | None = None
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+def log_files(logs_dir: Path) -> list[Path]:
+    """monica.log and its backups that exist, newest first."""
+    names = [LOG_FILE] + [f"{LOG_FILE}.{i}" for i in range(1, LOG_BACKUP_COUNT + 1)]
+    return [Path(logs_dir) / name for name in names if (Path(logs_dir) / name).exists()]
+
+
+def read_lines_reverse(path: Path, block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """Lines of a file, last line first, reading backwards in blocks."""
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        partial = b""
+        at_end = True
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            lines = (f.read(read_size) + partial).split(b"\n")
+            # The first piece may be the end of a line that starts in an earlier block
+            partial = lines.pop(0)
+            if at_end and lines and lines[-1] == b"":
+                lines.pop()
+            at_end = False
+            for line in reversed(lines):
+                yield line.decode("utf-8", errors="replace").rstrip("\r")
+        if partial:
+            yield partial.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def iter_entries(logs_dir: Path, block_size: int = BLOCK_SIZE) -> Iterator[LogEntry]:
+    """Log entries across monica.log and its backups, newest first.
+
+    Entries logged between a job's JOB START and JOB END lines get that
+    job's id.
+    """
+    job_id = None
+    for path in log_files(logs_dir):
+        continuation = []
+        try:
+            for line in read_lines_reverse(path, block_size):
+                match = HEADER_RE.match(line)
+                if match is None:
+                    continuation.append(line)
+                    continue
+                entry = LogEntry(match[1], match[2], [line] + continuation[::-1], path)
+                continuation = []
+
+                job = JOB_RE.search(line)
+                if job and job[1] == "END":
+                    job_id = job[2]
+                entry.job_id = job[2] if job else job_id
+                if job and job[1] == "START":
+                    job_id = None
+                yield entry
+        except OSError:
+            # Rotated away or removed while reading
+            continue
+
+
+def search_logs(
+    logs_dir: Path,
+    level: str = None,
+    job_id: str = None,
+    text: str = None,
+    block_size: int = BLOCK_SIZE
+) -> Iterator[LogEntry]:
+    """Entries matching all given filters, newest first.
+
+    Args:
+        logs_dir: Directory with monica.log
+        level: Minimum level, e.g. "WARNING" for warnings and errors
+        job_id: Job id (or its start) from JOB START lines or events.jsonl
+        text: Case-insensitive text, e.g. a file name
+    """
+    min_level = logging.getLevelName(level.upper()) if level else None
+    if min_level is not None and not isinstance(min_level, int):
+        raise ValueError(f"unknown log level: {level}")
+    text = text.lower() if text else None
+
+    for entry in iter_entries(logs_dir, block_size):
+        if min_level is not None:
+            entry_level = logging.getLevelName(entry.level)
+            if not isinstance(entry_level, int) or entry_level < min_level:
+                continue
+        if job_id and not (entry.job_id or "").startswith(job_id):
+            continue
+        if text and text not in entry.text.lower():
+            continue
+        yield entry
@@ -1,14 +1,141 @@
-"""Rolling log handler for MONICA."""
+"""Rolling log handler for MONICA.
 
+Records are put on a bounded queue and written (and rotated) by a
+background thread, so logging never waits on the disk. When the queue is
+full, DEBUG/INFO records are dropped and counted; warnings and errors wait
+up to BLOCK_SECONDS for room. A notice with the number of dropped records
+is logged once there's room again, and drops are counted in the metrics.
+Events (events.jsonl) are never dropped: their queue makes the caller
+wait for room instead.
+"""
+
+import atexit
 import os
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from datetime import datetime
 from pathlib import Path
 
+from monica.metrics import get_metrics
+from monica.tracing import span
+from monica.events import (
+    EVENTS_BACKUP_COUNT,
+    EVENTS_FILE,
+    EVENTS_MAX_BYTES,
+    classify_error,
+    format_event,
+    make_event,
+    summarize_error,
+)
+
+
+LOG_FILE = "monica.log"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# Records waiting to be written before the drop policy applies
+QUEUE_SIZE = 10000
+
+# Longest a warning or error waits for room in a full queue
+BLOCK_SECONDS = 1.0
+
+# Longer messages (e.g. a failed FFmpeg run's whole stderr) keep only their
+# end, where the error is
+MAX_MESSAGE_CHARS = 16 * 1024
+
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler for a bounded queue with a drop policy.
+
+    Records at block_level or above wait up to block_seconds for room
+    (None: as long as it takes); lower ones are dropped at once.
+    """
+
+    def __init__(self, log_queue: queue.Queue, block_level: int = logging.WARNING,
+                 block_seconds: float | None = BLOCK_SECONDS):
+        super().__init__(log_queue)
+        self.block_level = block_level
+        self.block_seconds = block_seconds
+        self.dropped = 0
+        self.listener: QueueListener | None = None
+        self.running = False
+        self._drop_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        if len(record.msg) > MAX_MESSAGE_CHARS:
+            cut = len(record.msg) - MAX_MESSAGE_CHARS
+            record.msg = f"[{cut} characters truncated] ...{record.msg[-MAX_MESSAGE_CHARS:]}"
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.dropped:
+            self._report_dropped(record.name)
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= self.block_level:
+                try:
+                    with span("log.blocked", level=record.levelname):
+                        self.queue.put(record, timeout=self.block_seconds)
+                    return
+                except queue.Full:
+                    pass
+            with self._drop_lock:
+                self.dropped += 1
+            get_metrics().log_dropped(record.name)
+
+    def _report_dropped(self, name: str) -> None:
+        """Queue a notice with the number of records dropped so far."""
+        with self._drop_lock:
+            dropped, self.dropped = self.dropped, 0
+        notice = logging.makeLogRecord({
+            "name": name,
+            "levelno": logging.WARNING,
+            "levelname": "WARNING",
+            "msg": f"Dropped {dropped} log message(s): log queue was full",
+        })
+        try:
+            self.queue.put_nowait(notice)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += dropped
+
+    def flush(self) -> None:
+        """Wait until every queued record has been written."""
+        if self.running:
+            self.queue.join()
+
+
+def _start_queued_handler(file_handler: logging.Handler, **policy) -> BoundedQueueHandler:
+    """Put a queue and writer thread in front of a file handler.
+
+    policy (block_level, block_seconds) is passed to BoundedQueueHandler.
+    """
+    handler = BoundedQueueHandler(queue.Queue(maxsize=QUEUE_SIZE), **policy)
+    handler.listener = QueueListener(handler.queue, file_handler, respect_handler_level=True)
+    handler.listener.start()
+    handler.running = True
+    return handler
+
+
+def _file_size(path) -> int | None:
+    try:
+        return os.stat(path).st_size
+    except (OSError, TypeError, ValueError):
+        return None
+
 
 class MonicaLogger:
-    """Handles logging for MONICA with rolling file support."""
+    """Handles logging for MONICA with rolling file support.
+
+    Job and item calls also write structured events to events.jsonl (see
+    monica.events).
+    """
 
     _instance = None
     _logger = None
@@ -32,11 +159,11 @@ class MonicaLogger:
         self._logger.setLevel(logging.DEBUG)
 
         if not self._logger.handlers:
-            log_file = self.logs_dir / "monica.log"
-            handler = RotatingFileHandler(
+            log_file = self.logs_dir / LOG_FILE
+            file_handler = RotatingFileHandler(
                 log_file,
-                maxBytes=5 * 1024 * 1024,  # 5 MB
-                backupCount=5,
+                maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUP_COUNT,
                 encoding="utf-8"
             )
 
@@ -44,8 +171,59 @@ class MonicaLogger:
                 "%(asctime)s | %(levelname)-8s | %(message)s",
                 datefmt="%Y-%m-%d %H:%M:%S"
             )
-            handler.setFormatter(formatter)
-            self._logger.addHandler(handler)
+            file_handler.setFormatter(formatter)
+
+            # The file handler (and its rotation) runs on the listener's thread
+            self._logger.addHandler(_start_queued_handler(file_handler))
+            atexit.register(self.close)
+
+        self._events = logging.getLogger("monica.events")
+        self._events.setLevel(logging.INFO)
+        self._events.propagate = False
+        if not self._events.handlers:
+            events_handler = RotatingFileHandler(
+                self.logs_dir / EVENTS_FILE,
+                maxBytes=EVENTS_MAX_BYTES,
+                backupCount=EVENTS_BACKUP_COUNT,
+                encoding="utf-8"
+            )
+            events_handler.setFormatter(logging.Formatter("%(message)s"))
+            # Every event is kept: a full queue slows logging down instead
+            self._events.addHandler(
+                _start_queued_handler(events_handler, block_level=logging.DEBUG, block_seconds=None)
+            )
+
+        self._state_lock = threading.Lock()
+        self._job: dict | None = None
+        self._items: dict[str, dict] = {}
+        self._current = threading.local()
+
+    def _queue_handlers(self) -> list[BoundedQueueHandler]:
+        return [
+            handler
+            for handler in self._logger.handlers + self._events.handlers
+            if isinstance(handler, BoundedQueueHandler)
+        ]
+
+    @property
+    def dropped(self) -> int:
+        """Records dropped because a queue was full (not yet reported)."""
+        return sum(handler.dropped for handler in self._queue_handlers())
+
+    def flush(self) -> None:
+        """Wait until everything logged so far is written to disk."""
+        for handler in self._logger.handlers + self._events.handlers:
+            handler.flush()
+
+    def close(self) -> None:
+        """Write out queued records and stop the writer threads."""
+        for handler in self._queue_handlers():
+            if not handler.running:
+                continue
+            handler.running = False
+            handler.listener.stop()
+            for target in handler.listener.handlers:
+                target.close()
 
     def info(self, message: str) -> None:
         """Log an info message."""
@@ -63,26 +241,145 @@ class MonicaLogger:
         """Log a debug message."""
         self._logger.debug(message)
 
-    def job_start(self, files: list, recipe_name: str) -> None:
-        """Log the start of a job."""
-        self.info(f"JOB START: Recipe '{recipe_name}' with {len(files)} file(s)")
+    def _event(self, event: str, job_id: str | None, **fields) -> None:
+        self._events.info(format_event(make_event(event, job_id, **fields)))
+
+    def job_start(self, files: list, recipe_name: str, category: str = None) -> str:
+        """Log the start of a job.
+
+        Returns:
+            The job's id in events.jsonl
+        """
+        job_id = uuid.uuid4().hex[:12]
+        self.info(f"JOB START: Recipe '{recipe_name}' with {len(files)} file(s) (job {job_id})")
         for f in files:
             self.info(f"  - {f}")
 
+        with self._state_lock:
+            self._job = {
+                "id": job_id, "started": time.monotonic(), "items": 0,
+                "succeeded": 0, "failed": 0, "input_bytes": 0, "output_bytes": 0,
+            }
+        self._event("job_start", job_id, recipe=recipe_name, category=category, files=len(files))
+        get_metrics().job_started(job_id, recipe_name, len(files))
+        return job_id
+
     def job_end(self, success: bool, recipe_name: str) -> None:
         """Log the end of a job."""
+        with self._state_lock:
+            job, self._job = self._job, None
+
         status = "SUCCESS" if success else "FAILED"
-        self.info(f"JOB END: Recipe '{recipe_name}' - {status}")
+        if job is None:
+            self.info(f"JOB END: Recipe '{recipe_name}' - {status}")
+            return
+        self.info(f"JOB END: Recipe '{recipe_name}' - {status} (job {job['id']})")
+        get_metrics().job_finished(job["id"])
+        self._event(
+            "job_end", job["id"],
+            recipe=recipe_name,
+            status="success" if success else "failed",
+            duration_s=round(time.monotonic() - job["started"], 3),
+            items=job["items"],
+            succeeded=job["succeeded"],
+            failed=job["failed"],
+            input_bytes=job["input_bytes"],
+            output_bytes=job["output_bytes"],
+        )
+
+    def item_start(self, filename: str, input_path: Path = None) -> str:
+        """Log start of processing a single item.
 
-    def item_start(self, filename: str) -> None:
-        """Log start of processing a single item."""
+        Returns:
+            The item's id, to pass to annotate_item() and item_end()
+        """
         self.info(f"ITEM START: {filename}")
 
-    def item_end(self, filename: str, success: bool) -> None:
-        """Log end of processing a single item."""
+        input_path = input_path or filename
+        with self._state_lock:
+            job_id = self._job["id"] if self._job else None
+            if self._job:
+                self._job["items"] += 1
+                item_id = f"{job_id}-{self._job['items']}"
+            else:
+                item_id = uuid.uuid4().hex[:12]
+            self._items[item_id] = {
+                "id": item_id, "job_id": job_id, "input": str(input_path),
+                "input_bytes": _file_size(input_path), "started": time.monotonic(), "fields": {},
+            }
+        self._current.item = item_id
+        self._event("item_start", job_id, item_id=item_id, input=str(input_path))
+        return item_id
+
+    def annotate_item(self, item_id: str = None, **fields) -> None:
+        """Attach fields (e.g. exit_code) to an item's item_end event.
+
+        Without an item_id, the item last started on this thread is used.
+        """
+        item_id = item_id or getattr(self._current, "item", None)
+        with self._state_lock:
+            item = self._items.get(item_id)
+            if item is not None:
+                item["fields"].update(fields)
+
+    def item_end(
+        self,
+        filename: str,
+        success: bool,
+        output_path: Path = None,
+        error: str = None,
+        exit_code: int = None,
+        item_id: str = None,
+        output_bytes: int = None
+    ) -> None:
+        """Log end of processing a single item.
+
+        item_id is the id item_start() returned; without it, the item last
+        started on this thread is used. output_bytes defaults to the size of
+        output_path; pass it when the output isn't there yet (write-behind).
+        """
         status = "SUCCESS" if success else "FAILED"
         self.info(f"ITEM END: {filename} - {status}")
 
+        item_id = item_id or getattr(self._current, "item", None)
+        with self._state_lock:
+            item = self._items.pop(item_id, None)
+        if item is None:
+            return
+        if not success:
+            output_bytes = None
+        elif output_bytes is None and output_path:
+            output_bytes = _file_size(output_path)
+        duration = time.monotonic() - item["started"]
+        fields = {"exit_code": exit_code, "media_duration_s": None, **item["fields"]}
+        if exit_code is not None:
+            fields["exit_code"] = exit_code
+        elif success and fields["exit_code"] is None:
+            fields["exit_code"] = 0
+
+        with self._state_lock:
+            if self._job is not None and self._job["id"] == item["job_id"]:
+                self._job["succeeded" if success else "failed"] += 1
+                self._job["input_bytes"] += item["input_bytes"] or 0
+                self._job["output_bytes"] += output_bytes or 0
+        media_seconds = fields["media_duration_s"]
+        get_metrics().item_finished(item["job_id"], success, duration, output_bytes, media_seconds)
+
+        self._event(
+            "item_end", item["job_id"],
+            item_id=item["id"],
+            input=item["input"],
+            output=str(output_path) if output_path else None,
+            status="success" if success else "failed",
+            duration_s=round(duration, 3),
+            input_bytes=item["input_bytes"],
+            output_bytes=output_bytes,
+            **fields,
+            speed_factor=round(media_seconds / duration, 3) if success and media_seconds and duration > 0 else None,
+            error_class=None if success else classify_error(error) or "unknown",
+            error=None if success else summarize_error(error),
+        )
+
 
 # Global logger instance
 _logger = None
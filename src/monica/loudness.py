@@ -0,0 +1,220 @@
+"""Two-pass EBU R128 loudness normalization with cached measurements."""
+
+import json
+import os
+import re
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+
+from monica.fingerprint import sampled_fingerprint
+from monica.logger import get_logger
+from monica.recipes import Recipe
+
+
+# Normalization targets (integrated loudness, true peak, loudness range)
+TARGET_I = -16.0
+TARGET_TP = -1.5
+TARGET_LRA = 11.0
+
+# loudnorm resamples to 192 kHz internally; set an output rate if the recipe doesn't
+OUTPUT_SAMPLE_RATE = "48000"
+
+CACHE_FILE = "loudness_cache.json"
+
+# Recipe categories whose output is audio only, so loudness can be normalized
+NORMALIZE_CATEGORIES = ("audio", "extract")
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 2)
+
+MEASURE_TIMEOUT = 1800
+
+# Measured values needed for the second pass
+MEASUREMENT_KEYS = ("input_i", "input_tp", "input_lra", "input_thresh", "target_offset")
+
+
+def target_spec() -> str:
+    """loudnorm target parameters."""
+    return f"I={TARGET_I:g}:TP={TARGET_TP:g}:LRA={TARGET_LRA:g}"
+
+
+def input_fingerprint(input_file: Path) -> str:
+    """Identify an input file's contents for caching.
+
+    The sampled fingerprint only reads a few blocks, so the size and mtime
+    are part of the key too: a measurement is reused for the same file
+    under another name or folder, but never for a different file whose
+    sampled blocks happen to match.
+    """
+    stat = input_file.stat()
+    return f"{sampled_fingerprint(input_file)}-{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def parse_loudnorm_output(output: str) -> dict | None:
+    """Extract the measurement JSON printed by loudnorm's first pass."""
+    matches = re.findall(r"\{[^{}]*\}", output)
+    if not matches:
+        return None
+    try:
+        data = json.loads(matches[-1])
+    except json.JSONDecodeError:
+        return None
+    if not all(key in data for key in MEASUREMENT_KEYS):
+        return None
+    return {key: data[key] for key in MEASUREMENT_KEYS}
+
+
+def measure_loudness(ffmpeg_path: str, input_file: Path) -> dict | None:
+    """Run loudnorm's measurement pass over a file's audio.
+
+    Returns:
+        Dict of measured values, or None if measuring failed
+    """
+    cmd = [
+        ffmpeg_path, "-hide_banner", "-nostdin", "-nostats",
+        "-i", str(input_file),
+        "-map", "0:a:0", "-vn", "-sn",
+        "-af", f"loudnorm={target_spec()}:print_format=json",
+        "-f", "null", "-",
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=MEASURE_TIMEOUT)
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    if result.returncode != 0:
+        return None
+    return parse_loudnorm_output(result.stderr)
+
+
+def build_loudnorm_filter(measurement: dict | None) -> str:
+    """Build the loudnorm filter for the apply pass.
+
+    Without a measurement this falls back to single-pass (dynamic) mode.
+    """
+    if measurement is None:
+        return f"loudnorm={target_spec()}"
+    return (
+        f"loudnorm={target_spec()}"
+        f":measured_I={measurement['input_i']}"
+        f":measured_TP={measurement['input_tp']}"
+        f":measured_LRA={measurement['input_lra']}"
+        f":measured_thresh={measurement['input_thresh']}"
+        f":offset={measurement['target_offset']}"
+        ":linear=true"
+    )
+
+
+def apply_normalization(recipe: Recipe, measurement: dict | None) -> Recipe:
+    """Return a copy of the recipe with the loudnorm apply pass added."""
+    args = list(recipe.ffmpeg_args)
+    loudnorm = build_loudnorm_filter(measurement)
+
+    if "-af" in args:
+        i = args.index("-af") + 1
+        args[i] = f"{args[i]},{loudnorm}"
+    else:
+        args += ["-af", loudnorm]
+    if "-ar" not in args:
+        args += ["-ar", OUTPUT_SAMPLE_RATE]
+
+    return replace(recipe, ffmpeg_args=args)
+
+
+class LoudnessCache:
+    """Persistent cache of loudness measurements keyed by input fingerprint."""
+
+    def __init__(self, cache_file: Path):
+        self.cache_file = Path(cache_file)
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def _key(fingerprint: str) -> str:
+        return f"{fingerprint}|{target_spec()}"
+
+    def get(self, fingerprint: str) -> dict | None:
+        """Get a cached measurement."""
+        with self._lock:
+            return self._entries.get(self._key(fingerprint))
+
+    def put(self, fingerprint: str, measurement: dict) -> None:
+        """Store a measurement (call save() to persist)."""
+        with self._lock:
+            self._entries[self._key(fingerprint)] = measurement
+
+    def save(self) -> bool:
+        """Write the cache to disk atomically."""
+        with self._lock:
+            data = dict(self._entries)
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.cache_file)
+            return True
+        except OSError:
+            return False
+
+
+def get_loudness_cache() -> LoudnessCache:
+    """Get the loudness cache stored alongside the logs."""
+    return LoudnessCache(get_logger().logs_dir / CACHE_FILE)
+
+
+def measure_files(
+    ffmpeg_path: str,
+    files: list[Path],
+    cache: LoudnessCache | None = None,
+    workers: int = DEFAULT_WORKERS
+) -> dict[Path, dict | None]:
+    """Measure loudness for a batch, reusing cached results.
+
+    Cache misses are measured in parallel; new results are saved once the
+    batch is done.
+
+    Returns:
+        Mapping of file to measurement (None where measuring failed)
+    """
+    logger = get_logger()
+    if cache is None:
+        cache = get_loudness_cache()
+
+    results = {}
+    pending = {}
+    for input_file in files:
+        try:
+            fingerprint = input_fingerprint(input_file)
+        except OSError:
+            results[input_file] = None
+            continue
+        cached = cache.get(fingerprint)
+        if cached is not None:
+            results[input_file] = cached
+        else:
+            pending[input_file] = fingerprint
+
+    logger.info(f"Loudness: {len(files) - len(pending)} cached, {len(pending)} to measure")
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            measured = pool.map(lambda f: measure_loudness(ffmpeg_path, f), pending)
+            for input_file, measurement in zip(pending, measured):
+                results[input_file] = measurement
+                if measurement is not None:
+                    cache.put(pending[input_file], measurement)
+                else:
+                    logger.warning(f"Loudness measurement failed for {input_file.name}")
+        cache.save()
+
+    return results
@@ -11,9 +11,14 @@ from pathlib import Path
 from colorama import init, Fore, Style
 init()
 
+from monica.cli import build_parser, run_command
 from monica.ffmpeg_manager import ensure_ffmpeg
 from monica.logger import get_logger
 from monica.menu import run_menu_loop
+from monica.metrics import start_metrics
+from monica.profiling import Profile, configure_batch_profiling, profile_prefix
+from monica.settings import SETTINGS_FILE, get_settings
+from monica.tracing import get_tracer, trace_path
 
 
 def setup_directories(base_dir: Path) -> tuple[Path, Path, Path]:
@@ -35,16 +40,77 @@ def setup_directories(base_dir: Path) -> tuple[Path, Path, Path]:
     return import_dir, export_dir, logs_dir
 
 
-def main() -> int:
+def export_trace(logs_dir: Path) -> None:
+    """Save the session's trace, if tracing was on."""
+    tracer = get_tracer()
+    if not tracer.enabled:
+        return
+    path = trace_path(logs_dir)
+    success, message = tracer.export(path)
+    if success:
+        print(f"Trace saved to {path}", file=sys.stderr)
+        get_logger().info(f"Trace saved to {path} ({len(tracer.spans)} spans)")
+    else:
+        get_logger().error(f"Could not save trace: {message}")
+
+
+def save_profile(profile: Profile, logs_dir: Path) -> None:
+    """Save a session profile."""
+    prefix = profile_prefix(logs_dir, "session")
+    success, message = profile.save(prefix)
+    if success:
+        print(f"Profile saved to {prefix}.txt and {prefix.name}.collapsed", file=sys.stderr)
+        get_logger().info(f"Profile saved to {prefix}.txt / .collapsed")
+    else:
+        get_logger().error(f"Could not save profile: {message}")
+
+
+def main(argv: list[str] | None = None) -> int:
     """Main entry point."""
     base_dir = Path().resolve()
 
+    args = build_parser().parse_args(sys.argv[1:] if argv is None else argv)
+    logs_dir = base_dir / "logs"
+    if args.trace:
+        get_tracer().start()
+    profile = None
+    if args.profile and args.profile_batches:
+        configure_batch_profiling(args.profile, logs_dir)
+    elif args.profile:
+        profile = Profile(args.profile).start()
+    try:
+        return run_session(args, base_dir)
+    finally:
+        if profile is not None:
+            profile.stop()
+            save_profile(profile, logs_dir)
+        export_trace(logs_dir)
+
+
+def run_session(args, base_dir: Path) -> int:
+    """Run a headless command, or the interactive menu."""
+    if args.command:
+        # Headless mode: only the logs directory is needed
+        logs_dir = base_dir / "logs"
+        logs_dir.mkdir(parents=True, exist_ok=True)
+        logger = get_logger(logs_dir)
+        settings = get_settings(base_dir / SETTINGS_FILE)
+        port = getattr(args, "metrics_port", None) or settings.metrics_port
+        success, message = start_metrics(port, settings.metrics_textfile)
+        if not success:
+            logger.warning(message)
+        return run_command(args, base_dir)
+
     # Setup directories
     import_dir, export_dir, logs_dir = setup_directories(base_dir)
 
     # Initialize logger
     logger = get_logger(logs_dir)
     logger.info("MONICA started")
+    settings = get_settings(base_dir / SETTINGS_FILE)
+    success, message = start_metrics(settings.metrics_port, settings.metrics_textfile)
+    if not success:
+        logger.warning(message)
 
     # Check/download FFmpeg
     ffmpeg_path = ensure_ffmpeg(base_dir)
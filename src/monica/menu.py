@@ -1,5 +1,7 @@
 """Interactive menu system for MONICA."""
 
+from dataclasses import replace
+from itertools import islice
 from pathlib import Path
 import questionary
 from colorama import Fore, Style
@@ -9,8 +11,17 @@ from monica.recipes import (
     get_recipes_by_category,
     get_input_extensions_for_category
 )
-from monica.file_selector import select_files, display_selected_files
-from monica.executor import execute_jobs
+from monica.file_selector import select_files, display_selected_files, format_size
+from monica.executor import ProgressIndicator, execute_jobs
+from monica.logger import get_logger
+from monica.log_viewer import log_files, search_logs
+from monica.loudness import NORMALIZE_CATEGORIES
+from monica.preflight import PreflightResult, get_size_history, run_preflight
+from monica.import_index import get_import_index
+from monica.settings import get_settings
+from monica.batch import execute_batched_jobs, should_batch
+from monica.thumbnails import execute_thumbnail_jobs
+from monica.trim import parse_timestamp
 from monica.ffmpeg_manager import print_ffmpeg_status
 
 
@@ -23,6 +34,9 @@ MAIN_MENU_OPTIONS = [
     ("Remux (no re-encode)", "remux"),
     ("YouTube", "youtube"),
     ("Short-form content", "shortform"),
+    ("Thumbnails / contact sheets", "thumbnail"),
+    ("Trim / cut", "trim"),
+    ("GIF", "gif"),
     ("Logs / status", "status"),
     ("Help", "help"),
     ("Exit", "exit"),
@@ -98,6 +112,22 @@ You don't need to know any of that - MONICA handles it all!
   and completely lossless - the video/audio data stays identical.
   {Fore.YELLOW}Best for:{Style.RESET_ALL} MKV to MP4 for Apple devices, quick format fixes
 
+{Fore.GREEN}Thumbnails / Contact Sheets{Style.RESET_ALL}
+  Creates preview images tiled from evenly spaced frames. Only
+  keyframes are decoded, so even long videos take seconds.
+  {Fore.YELLOW}Best for:{Style.RESET_ALL} Browsing a large library, player seek previews
+
+{Fore.GREEN}Trim / Cut{Style.RESET_ALL}
+  Cuts a section out of a video at the exact frames you choose.
+  Only the few frames around each cut point are re-encoded; the
+  rest is copied, so it's nearly as fast as a remux.
+  {Fore.YELLOW}Best for:{Style.RESET_ALL} Clipping highlights, removing intros/outros
+
+{Fore.GREEN}GIF{Style.RESET_ALL}
+  Turns a video clip into an animated GIF with an optimized color
+  palette. Pick a start and end time - only that part is decoded.
+  {Fore.YELLOW}Best for:{Style.RESET_ALL} Reactions, bug reports, docs and READMEs
+
 {Fore.GREEN}Logs / Status{Style.RESET_ALL}
   View FFmpeg status, check logs, and see what MONICA has been doing.
   Useful for troubleshooting if something goes wrong.
@@ -478,6 +508,82 @@ def select_recipe(category: str) -> Recipe | None:
     return selected
 
 
+def _validate_timestamp(text: str, allow_empty: bool = False) -> bool | str:
+    """questionary validator for HH:MM:SS timestamps."""
+    if allow_empty and not text.strip():
+        return True
+    try:
+        parse_timestamp(text)
+        return True
+    except ValueError:
+        return "Enter a time like 90, 01:30 or 00:01:30.5"
+
+
+def ask_time_range(recipe: Recipe) -> Recipe | None:
+    """Ask for a start/end time and return a recipe carrying them.
+
+    Returns:
+        Recipe with start/end options set, or None if cancelled
+    """
+    start = questionary.text(
+        "Start time (e.g. 00:01:30):",
+        default="0",
+        validate=_validate_timestamp
+    ).ask()
+    if start is None:
+        return None
+
+    end = questionary.text(
+        "End time (leave empty for end of file):",
+        validate=lambda text: _validate_timestamp(text, allow_empty=True)
+    ).ask()
+    if end is None:
+        return None
+
+    start_s = parse_timestamp(start)
+    end_s = parse_timestamp(end) if end.strip() else None
+    if end_s is not None and end_s <= start_s:
+        print(f"{Fore.YELLOW}End time must be after start time.{Style.RESET_ALL}")
+        return None
+
+    return replace(recipe, options={**recipe.options, "start": start_s, "end": end_s})
+
+
+def confirm_preflight(files: list[Path], result: PreflightResult) -> list[Path] | None:
+    """Show the space estimate and, if the batch won't fit, ask what to run.
+
+    Returns:
+        The files to process (possibly fewer, smallest first), or None to cancel
+    """
+    print(f"\n    Estimated output: {format_size(result.total_bytes)} "
+          f"(free: {format_size(result.free_bytes)})")
+    if result.fits:
+        return files
+
+    if result.scratch_free_bytes is not None and result.scratch_needed_bytes > result.scratch_free_bytes:
+        print(f"{Fore.RED}Not enough scratch space: needs {format_size(result.scratch_needed_bytes)}, "
+              f"{format_size(result.scratch_free_bytes)} free.{Style.RESET_ALL}")
+    else:
+        print(f"{Fore.YELLOW}Warning: the estimated output is larger than the free space "
+              f"on the export drive.{Style.RESET_ALL}")
+
+    choices = []
+    if result.fitting and len(result.fitting) < len(files):
+        choices.append(questionary.Choice(
+            f"Process the {len(result.fitting)} file(s) that fit (smallest first)",
+            value="fitting"
+        ))
+    choices.append(questionary.Choice("Process all anyway", value="all"))
+    choices.append(questionary.Choice("Cancel", value="cancel"))
+
+    action = questionary.select("What would you like to do?", choices=choices).ask()
+    if action == "fitting":
+        return result.fitting
+    if action == "all":
+        return files
+    return None
+
+
 def handle_conversion(
     category: str,
     ffmpeg_path: str,
@@ -497,16 +603,69 @@ def handle_conversion(
     if recipe is None:
         return
 
+    if category in ("trim", "gif"):
+        recipe = ask_time_range(recipe)
+        if recipe is None:
+            return
+
+    if category in NORMALIZE_CATEGORIES:
+        normalize = questionary.confirm(
+            "Normalize loudness (EBU R128, -16 LUFS)?",
+            default=False
+        ).ask()
+        if normalize is None:
+            return
+        if normalize:
+            recipe = replace(recipe, options={**recipe.options, "normalize": True})
+
+    if category == "shortform":
+        benchmark = questionary.confirm(
+            "Benchmark each filter stage (slower; for tuning recipes)?",
+            default=False
+        ).ask()
+        if benchmark is None:
+            return
+        if benchmark:
+            recipe = replace(recipe, options={**recipe.options, "benchmark": True})
+
     # Get valid extensions for this category
     extensions = get_input_extensions_for_category(category)
 
     # Select files
-    files = select_files(import_dir, extensions)
+    settings = get_settings()
+    files = select_files(
+        import_dir, extensions,
+        recursive=settings.scan_recursive,
+        include=settings.scan_include,
+        exclude=settings.scan_exclude,
+        index=get_import_index(import_dir, get_logger().logs_dir),
+        ffmpeg_path=ffmpeg_path
+    )
     if not files:
         return
 
     display_selected_files(files)
 
+    # Check the batch will fit on the export drive before encoding anything
+    scratch_dir = None
+    if settings.write_behind:
+        scratch_dir = settings.get_scratch_dir()
+    elif recipe.category == "trim":
+        scratch_dir = export_dir
+
+    spinner = ProgressIndicator("Estimating output size")
+    spinner.start()
+    result = run_preflight(
+        ffmpeg_path, files, recipe, export_dir,
+        history=get_size_history(get_logger().logs_dir),
+        scratch_dir=scratch_dir
+    )
+    spinner.stop()
+    files = confirm_preflight(files, result)
+    if not files:
+        print(f"{Fore.YELLOW}Cancelled.{Style.RESET_ALL}")
+        return
+
     # Confirm
     print()
     if not questionary.confirm("Start processing?", default=True).ask():
@@ -514,13 +673,48 @@ def handle_conversion(
         return
 
     # Execute
-    execute_jobs(ffmpeg_path, files, recipe, export_dir)
+    if recipe.category == "thumbnail":
+        execute_thumbnail_jobs(ffmpeg_path, files, recipe, export_dir)
+    elif should_batch(files, recipe):
+        execute_batched_jobs(ffmpeg_path, files, recipe, export_dir)
+    else:
+        execute_jobs(ffmpeg_path, files, recipe, export_dir)
 
     # Pause before returning to menu
     print()
     questionary.press_any_key_to_continue("Press any key to continue...").ask()
 
 
+LOG_PAGE_SIZE = 20
+
+
+def show_log_entries(entries) -> None:
+    """Print log entries a page at a time, newest page first.
+
+    Only the entries shown are read from the log files.
+    """
+    shown = 0
+    try:
+        while True:
+            page = list(islice(entries, LOG_PAGE_SIZE))
+            for entry in reversed(page):
+                print(entry.text)
+            shown += len(page)
+            if len(page) < LOG_PAGE_SIZE:
+                break
+            print()
+            if not questionary.confirm("Show older entries?", default=False).ask():
+                return
+            print()
+    except Exception as e:
+        print(f"{Fore.RED}Error reading log: {e}{Style.RESET_ALL}")
+
+    if not shown:
+        print(f"{Fore.YELLOW}No matching log entries.{Style.RESET_ALL}")
+    print()
+    questionary.press_any_key_to_continue("Press any key to continue...").ask()
+
+
 def handle_status(base_dir: Path, logs_dir: Path) -> None:
     """Display status information and log viewer.
 
@@ -533,19 +727,25 @@ def handle_status(base_dir: Path, logs_dir: Path) -> None:
     # FFmpeg status
     print_ffmpeg_status(base_dir)
 
-    # Log file info
+    # Log file info (written in the background; wait for queued records)
+    get_logger().flush()
     log_file = logs_dir / "monica.log"
     if log_file.exists():
         size = log_file.stat().st_size
         size_kb = size / 1024
         print(f"Log file: {Fore.GREEN}{size_kb:.1f} KB{Style.RESET_ALL}")
 
+        backups = len(log_files(logs_dir)) - 1
+        if backups:
+            print(f"Rotated logs: {Fore.GREEN}{backups}{Style.RESET_ALL}")
+
         # Offer to view logs
         print()
         view_choice = questionary.select(
             "What would you like to do?",
             choices=[
-                questionary.Choice("View recent logs (last 20 lines)", "view"),
+                questionary.Choice(f"View recent logs (last {LOG_PAGE_SIZE} entries)", "view"),
+                questionary.Choice("Search logs (level, job id, file name)", "search"),
                 questionary.Choice("Clear log file", "clear"),
                 questionary.Choice("<- Back to main menu", "back"),
             ]
@@ -553,16 +753,22 @@ def handle_status(base_dir: Path, logs_dir: Path) -> None:
 
         if view_choice == "view":
             print(f"\n{Fore.CYAN}=== Recent Logs ==={Style.RESET_ALL}\n")
-            try:
-                with open(log_file, "r", encoding="utf-8") as f:
-                    lines = f.readlines()
-                    for line in lines[-20:]:
-                        print(line.rstrip())
-            except Exception as e:
-                print(f"{Fore.RED}Error reading log: {e}{Style.RESET_ALL}")
-
-            print()
-            questionary.press_any_key_to_continue("Press any key to continue...").ask()
+            show_log_entries(search_logs(logs_dir))
+
+        elif view_choice == "search":
+            level = questionary.select(
+                "Minimum level:",
+                choices=[
+                    questionary.Choice("Any", ""),
+                    questionary.Choice("Warnings and errors", "WARNING"),
+                    questionary.Choice("Errors only", "ERROR"),
+                ]
+            ).ask()
+            job_id = questionary.text("Job id (blank for any):").ask()
+            text = questionary.text("File name or text (blank for any):").ask()
+            if job_id is not None and text is not None:
+                print(f"\n{Fore.CYAN}=== Matching Logs ==={Style.RESET_ALL}\n")
+                show_log_entries(search_logs(logs_dir, level, job_id.strip(), text.strip()))
 
         elif view_choice == "clear":
             if questionary.confirm("Are you sure you want to clear the log file?", default=False).ask():
@@ -655,7 +861,7 @@ def run_menu_loop(
         elif action == "help":
             handle_help()
 
-        elif action in ("video", "audio", "extract", "resize", "remux", "youtube", "shortform"):
+        elif action in ("video", "audio", "extract", "resize", "remux", "youtube", "shortform", "thumbnail", "trim", "gif"):
             handle_conversion(action, ffmpeg_path, import_dir, export_dir)
 
         else:
@@ -0,0 +1,232 @@
+"""Job metrics for unattended runs, in OpenMetrics text format.
+
+Counters and gauges are updated as jobs run (through MonicaLogger's job
+and item calls, and probe_media); the text is only built when it's
+scraped or written. Publish it on a local HTTP port (settings
+`metrics_port`, served at /metrics) or as a file for node_exporter's
+textfile collector (`metrics_textfile`), rewritten after every item.
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+METRICS_HOST = "127.0.0.1"
+
+# Histogram bucket upper bounds, in seconds
+PROBE_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ENCODE_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0, 7200.0)
+
+
+class Histogram:
+    """Bucketed observations (cumulative counts are computed when rendered)."""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def samples(self, name: str) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            cumulative += count
+            le = bound if isinstance(bound, str) else _format_number(bound)
+            lines.append(f'{name}_bucket{{le="{le}"}} {cumulative}')
+        lines.append(f"{name}_count {self.count}")
+        lines.append(f"{name}_sum {_format_number(self.sum)}")
+        return lines
+
+
+def _format_number(value: float) -> str:
+    if float(value).is_integer():
+        return f"{value:.1f}"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class JobMetrics:
+    """Counters, gauges and histograms for the jobs of this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # job_id -> recipe, items left, media and encode seconds so far
+        self.active: dict[str, dict] = {}
+        self.items_completed = 0
+        self.items_failed = 0
+        self.output_bytes = 0
+        self.probe_seconds = Histogram(PROBE_BUCKETS)
+        self.encode_seconds = Histogram(ENCODE_BUCKETS)
+        self.log_records_dropped: dict[str, int] = {}  # Logger name -> count
+        self.textfile: Path | None = None
+
+    def job_started(self, job_id: str, recipe: str, items: int) -> None:
+        with self._lock:
+            self.active[job_id] = {"recipe": recipe, "queued": items, "media": 0.0, "encode": 0.0}
+        self.write_textfile()
+
+    def item_finished(
+        self,
+        job_id: str | None,
+        success: bool,
+        duration: float,
+        output_bytes: int = None,
+        media_seconds: float = None
+    ) -> None:
+        with self._lock:
+            if success:
+                self.items_completed += 1
+            else:
+                self.items_failed += 1
+            self.output_bytes += output_bytes or 0
+            self.encode_seconds.observe(duration)
+            job = self.active.get(job_id)
+            if job is not None:
+                job["queued"] = max(0, job["queued"] - 1)
+                if success and media_seconds:
+                    job["media"] += media_seconds
+                    job["encode"] += duration
+        self.write_textfile()
+
+    def job_finished(self, job_id: str) -> None:
+        with self._lock:
+            self.active.pop(job_id, None)
+        self.write_textfile()
+
+    def observe_probe(self, seconds: float) -> None:
+        with self._lock:
+            self.probe_seconds.observe(seconds)
+
+    def log_dropped(self, logger: str) -> None:
+        with self._lock:
+            self.log_records_dropped[logger] = self.log_records_dropped.get(logger, 0) + 1
+
+    def render(self) -> str:
+        """All metrics as OpenMetrics text."""
+        with self._lock:
+            lines = [
+                "# TYPE monica_active_jobs gauge",
+                "# HELP monica_active_jobs Jobs currently running.",
+                f"monica_active_jobs {len(self.active)}",
+                "# TYPE monica_queue_depth gauge",
+                "# HELP monica_queue_depth Items of running jobs not processed yet.",
+                f"monica_queue_depth {sum(job['queued'] for job in self.active.values())}",
+                "# TYPE monica_items_completed counter",
+                "# HELP monica_items_completed Items processed successfully.",
+                f"monica_items_completed_total {self.items_completed}",
+                "# TYPE monica_items_failed counter",
+                "# HELP monica_items_failed Items that failed.",
+                f"monica_items_failed_total {self.items_failed}",
+                "# TYPE monica_output_bytes counter",
+                "# UNIT monica_output_bytes bytes",
+                "# HELP monica_output_bytes Bytes of output written.",
+                f"monica_output_bytes_total {self.output_bytes}",
+                "# TYPE monica_job_speed_factor gauge",
+                "# HELP monica_job_speed_factor Media seconds processed per second of encoding, per running job.",
+            ]
+            for job_id, job in self.active.items():
+                if job["encode"] > 0:
+                    lines.append(
+                        f'monica_job_speed_factor{{job_id="{_escape(job_id)}",recipe="{_escape(job["recipe"])}"}} '
+                        f"{_format_number(round(job['media'] / job['encode'], 3))}"
+                    )
+            lines += [
+                "# TYPE monica_log_records_dropped counter",
+                "# HELP monica_log_records_dropped Log records dropped because the log queue was full.",
+            ]
+            for logger, count in self.log_records_dropped.items():
+                lines.append(f'monica_log_records_dropped_total{{logger="{_escape(logger)}"}} {count}')
+            lines += [
+                "# TYPE monica_probe_duration_seconds histogram",
+                "# UNIT monica_probe_duration_seconds seconds",
+                "# HELP monica_probe_duration_seconds Time to probe a media file.",
+                *self.probe_seconds.samples("monica_probe_duration_seconds"),
+                "# TYPE monica_encode_duration_seconds histogram",
+                "# UNIT monica_encode_duration_seconds seconds",
+                "# HELP monica_encode_duration_seconds Time to process one item.",
+                *self.encode_seconds.samples("monica_encode_duration_seconds"),
+                "# EOF",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self) -> None:
+        """Rewrite the textfile, if one is set."""
+        if self.textfile is None:
+            return
+        temp_file = self.textfile.with_name(f".{self.textfile.name}.{threading.get_ident()}.tmp")
+        try:
+            temp_file.write_text(self.render(), encoding="utf-8")
+            os.replace(temp_file, self.textfile)
+        except OSError:
+            temp_file.unlink(missing_ok=True)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = get_metrics().render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes would otherwise print to stderr
+
+
+def start_metrics_server(port: int, host: str = METRICS_HOST) -> ThreadingHTTPServer:
+    """Serve /metrics on a background thread.
+
+    Raises:
+        OSError: If the port can't be bound
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_metrics(port: int = None, textfile: str = None) -> tuple[bool, str]:
+    """Publish metrics as configured (nothing if neither is set).
+
+    Returns:
+        Tuple of (success, error_message)
+    """
+    if textfile:
+        get_metrics().textfile = Path(textfile)
+        get_metrics().write_textfile()
+    if port:
+        try:
+            start_metrics_server(port)
+        except OSError as e:
+            return False, f"Can't serve metrics on port {port}: {e}"
+    return True, ""
+
+
+# Global metrics instance
+_metrics = None
+
+
+def get_metrics() -> JobMetrics:
+    """Get the global metrics."""
+    global _metrics
+    if _metrics is None:
+        _metrics = JobMetrics()
+    return _metrics
@@ -0,0 +1,108 @@
+"""Write-behind export: move finished outputs from scratch in the background."""
+
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+from monica.logger import get_logger
+from monica.tracing import span
+
+
+# Finished outputs waiting to be moved before new jobs block (bounds scratch use)
+MAX_PENDING = 2
+
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def _same_filesystem(a: Path, b: Path) -> bool:
+    try:
+        return os.stat(a).st_dev == os.stat(b).st_dev
+    except OSError:
+        return False
+
+
+def move_atomically(source: Path, dest: Path) -> None:
+    """Move a file so `dest` only ever appears complete.
+
+    Across filesystems the data is copied to a hidden temporary name next to
+    `dest`, flushed to disk, and renamed into place.
+    """
+    if _same_filesystem(source.parent, dest.parent):
+        os.replace(source, dest)
+        return
+
+    partial = dest.with_name(f".{dest.name}.part")
+    try:
+        with open(source, "rb") as src, open(partial, "wb") as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            dst.flush()
+            os.fsync(dst.fileno())
+        shutil.copystat(source, partial)
+        os.replace(partial, dest)
+    finally:
+        partial.unlink(missing_ok=True)
+    source.unlink()
+
+
+class OutputMover:
+    """Encode into local scratch and move outputs to the export directory.
+
+    Jobs write to work_path(); submit() hands the finished file to a
+    background thread, so the next job encodes while the previous output
+    is transferred.
+    """
+
+    def __init__(self, scratch_dir: Path, max_pending: int = MAX_PENDING):
+        self.work_dir = Path(tempfile.mkdtemp(prefix="monica_out_", dir=scratch_dir))
+        self.errors: list[tuple[Path, str]] = []
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def work_path(self, output_file: Path) -> Path:
+        """Scratch location to encode an output into."""
+        return self.work_dir / output_file.name
+
+    def submit(self, work_file: Path, output_file: Path) -> None:
+        """Queue a finished output for moving (blocks while the queue is full)."""
+        self._queue.put((work_file, output_file))
+
+    def _run(self) -> None:
+        logger = get_logger()
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                work_file, output_file = item
+                try:
+                    with span("move.file", file=output_file.name):
+                        move_atomically(work_file, output_file)
+                    logger.debug(f"Moved {output_file.name} to export")
+                except OSError as e:
+                    logger.error(f"Could not move {output_file.name} to export: {e}")
+                    self.errors.append((output_file, str(e)))
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Wait until every submitted output has been moved."""
+        self._queue.join()
+
+    def close(self) -> list[tuple[Path, str]]:
+        """Finish pending moves and remove the scratch directory.
+
+        If any move failed, the scratch directory is kept so those outputs
+        can be recovered.
+
+        Returns:
+            List of (output_file, error_message) for outputs that weren't moved
+        """
+        self._queue.put(None)
+        self._thread.join()
+        if not self.errors:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+        return self.errors
@@ -0,0 +1,272 @@
+"""Virtualized, filterable multi-select picker for long file lists.
+
+questionary.checkbox builds and renders a row for every choice, which gets
+slow and hard to navigate with tens of thousands of files. This picker only
+renders the visible page and narrows the list as you type.
+"""
+
+import re
+from typing import Callable
+
+from prompt_toolkit.application import Application
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.key_binding import KeyBindings
+from prompt_toolkit.layout import HSplit, Layout, VSplit, Window
+from prompt_toolkit.layout.controls import BufferControl, FormattedTextControl
+from prompt_toolkit.styles import Style
+
+
+PAGE_SIZE = 20
+
+# Seconds between redraws while row details are still being filled in
+REFRESH_INTERVAL = 0.5
+
+# Filter text starting with this is a metadata query (see monica.query)
+QUERY_PREFIX = "?"
+
+# Lists at least this long use the picker instead of questionary.checkbox
+VIRTUAL_PICKER_THRESHOLD = 500
+
+STYLE = Style.from_dict({
+    "question": "bold",
+    "cursor": "reverse",
+    "hint": "#888888",
+})
+
+HELP_TEXT = "Type to filter (?query for metadata) · ↑/↓ PgUp/PgDn move · Tab select · Ctrl-A all matching · Ctrl-D none matching · Enter confirm"
+
+
+def fuzzy_patterns(query: str) -> list[re.Pattern]:
+    """Patterns for a filter query.
+
+    Each whitespace-separated term matches its characters in order, with
+    anything in between ("tr24" matches "trip_2024.mp4"); all terms must
+    match.
+    """
+    return [
+        re.compile(".*?".join(re.escape(c) for c in term))
+        for term in query.lower().split()
+    ]
+
+
+class PickerState:
+    """Filter, cursor and selection state of the picker (no UI).
+
+    `expression_filter`, if given, handles filter text starting with
+    QUERY_PREFIX: it gets the rest of the text and returns the matching
+    indices in display order, or raises ValueError for an invalid query.
+    """
+
+    def __init__(
+        self,
+        titles: list[str],
+        page_size: int = PAGE_SIZE,
+        expression_filter: Callable[[str], list[int]] = None
+    ):
+        self.titles = titles
+        self.expression_filter = expression_filter
+        self._expression_matches: list[int] | None = None
+        self.error: str | None = None
+        self.page_size = max(1, page_size)
+        self._keys = [t.lower() for t in titles]
+        self.query = ""
+        # Filter results for each prefix of the current query, so typing only
+        # narrows the previous matches and backspace reuses earlier ones
+        self._results: list[tuple[str, list[int]]] = [("", list(range(len(titles))))]
+        self.cursor = 0
+        self.top = 0
+        self.selected: set[int] = set()
+
+    @property
+    def matches(self) -> list[int]:
+        """Indices of titles matching the current filter."""
+        if self._expression_matches is not None:
+            return self._expression_matches
+        return self._results[-1][1]
+
+    def set_query(self, query: str) -> None:
+        """Change the filter text."""
+        self.query = query
+        self.cursor = 0
+        self.top = 0
+        if self.expression_filter is not None and query.startswith(QUERY_PREFIX):
+            # While a query is being typed it's often incomplete; keep the
+            # last valid result until it parses again
+            try:
+                self._expression_matches = self.expression_filter(query[len(QUERY_PREFIX):])
+                self.error = None
+            except ValueError as e:
+                self.error = str(e)
+                if self._expression_matches is None:
+                    self._expression_matches = list(range(len(self.titles)))
+            return
+        self._expression_matches = None
+        self.error = None
+
+        while len(self._results) > 1 and not query.lower().startswith(self._results[-1][0]):
+            self._results.pop()
+        base_query, candidates = self._results[-1]
+        if query.lower() != base_query:
+            patterns = fuzzy_patterns(query)
+            keys = self._keys
+            matches = [i for i in candidates if all(p.search(keys[i]) for p in patterns)]
+            self._results.append((query.lower(), matches))
+
+    def extend(self, titles: list[str]) -> None:
+        """Add titles, e.g. files found by a scan that is still running.
+
+        They join the fuzzy filter results they match; a metadata query
+        only picks them up once it's changed.
+        """
+        start = len(self.titles)
+        self.titles.extend(titles)
+        self._keys.extend(t.lower() for t in titles)
+        keys = self._keys
+        for query, matches in self._results:
+            patterns = fuzzy_patterns(query)
+            matches.extend(i for i in range(start, len(keys)) if all(p.search(keys[i]) for p in patterns))
+
+    def move(self, delta: int) -> None:
+        """Move the cursor, scrolling the visible window with it."""
+        if not self.matches:
+            return
+        self.cursor = min(max(self.cursor + delta, 0), len(self.matches) - 1)
+        if self.cursor < self.top:
+            self.top = self.cursor
+        elif self.cursor >= self.top + self.page_size:
+            self.top = self.cursor - self.page_size + 1
+
+    def page(self, delta: int) -> None:
+        """Move the cursor by whole pages."""
+        self.move(delta * self.page_size)
+
+    def current(self) -> int | None:
+        """Index of the title under the cursor."""
+        return self.matches[self.cursor] if self.matches else None
+
+    def toggle(self) -> None:
+        """Select or deselect the title under the cursor."""
+        index = self.current()
+        if index is not None:
+            self.selected ^= {index}
+
+    def select_matching(self) -> None:
+        """Select every title matching the filter."""
+        self.selected.update(self.matches)
+
+    def deselect_matching(self) -> None:
+        """Deselect every title matching the filter."""
+        self.selected.difference_update(self.matches)
+
+    def visible(self) -> list[tuple[int, bool, bool]]:
+        """Rows in the visible window as (index, is_selected, is_cursor)."""
+        window = self.matches[self.top:self.top + self.page_size]
+        return [
+            (index, index in self.selected, self.top + row == self.cursor)
+            for row, index in enumerate(window)
+        ]
+
+    def status(self) -> str:
+        """Counts and page position for the status line."""
+        total_pages = max(1, -(-len(self.matches) // self.page_size))
+        page = self.cursor // self.page_size + 1
+        status = (
+            f"{len(self.matches):,} of {len(self.titles):,} shown · "
+            f"{len(self.selected):,} selected · page {page}/{total_pages}"
+        )
+        if self.error:
+            status += f" · {self.error}"
+        return status
+
+
+def run_picker(
+    titles: list[str],
+    message: str,
+    page_size: int = PAGE_SIZE,
+    describe: Callable[[int], str | None] = None,
+    on_render: Callable[[list[int]], None] = None,
+    expression_filter: Callable[[str], list[int]] = None,
+    poll: Callable[[], tuple[list[str], bool]] = None
+) -> list[int] | None:
+    """Show the picker and let the user select titles.
+
+    Args:
+        titles: Row titles
+        message: The prompt message to display
+        page_size: Rows shown at once
+        describe: Optional details shown after a row's title; may return
+            None while they aren't known yet (the list redraws periodically)
+        on_render: Called with the indices of the visible rows on each draw
+        expression_filter: Handles filter text starting with QUERY_PREFIX
+            (see PickerState)
+        poll: Called on each draw while the list is still growing; returns
+            the titles added since the last call, and whether that was all
+
+    Returns:
+        Sorted indices of the selected titles, or None if cancelled
+    """
+    state = PickerState(list(titles), page_size, expression_filter)
+    query = Buffer(multiline=False, on_text_changed=lambda buf: state.set_query(buf.text))
+    growing = poll is not None
+
+    def list_text():
+        nonlocal growing
+        if growing:
+            added, finished = poll()
+            state.extend(added)
+            growing = not finished
+        rows = state.visible()
+        if on_render is not None:
+            on_render([index for index, _, _ in rows])
+        lines = []
+        for index, selected, is_cursor in rows:
+            style = "class:cursor" if is_cursor else ""
+            mark = "●" if selected else "○"
+            lines.append((style, f"{'»' if is_cursor else ' '} {mark} {state.titles[index]}"))
+            if describe is not None:
+                details = describe(index)
+                lines.append(("class:hint", f"  {details if details is not None else '…'}"))
+            lines.append(("", "\n"))
+        if not lines:
+            lines.append(("class:hint", "  Scanning…\n" if growing else "  No matching files\n"))
+        return lines
+
+    bindings = KeyBindings()
+    bindings.add("up")(lambda event: state.move(-1))
+    bindings.add("down")(lambda event: state.move(1))
+    bindings.add("pageup")(lambda event: state.page(-1))
+    bindings.add("pagedown")(lambda event: state.page(1))
+    bindings.add("tab")(lambda event: state.toggle())
+    bindings.add("c-a")(lambda event: state.select_matching())
+    bindings.add("c-d")(lambda event: state.deselect_matching())
+
+    @bindings.add("enter")
+    def _accept(event):
+        event.app.exit(result=sorted(state.selected))
+
+    @bindings.add("c-c")
+    @bindings.add("escape", eager=True)
+    def _cancel(event):
+        event.app.exit(result=None)
+
+    layout = Layout(HSplit([
+        Window(FormattedTextControl([("class:question", f"? {message}")]), height=1),
+        VSplit([
+            Window(FormattedTextControl("Filter: "), width=8),
+            Window(BufferControl(query), height=1),
+        ]),
+        Window(FormattedTextControl(list_text), height=state.page_size),
+        Window(FormattedTextControl(
+            lambda: [("class:hint", state.status() + (" · scanning…" if growing else ""))]
+        ), height=1),
+        Window(FormattedTextControl([("class:hint", HELP_TEXT)]), height=1),
+    ]), focused_element=query)
+
+    app = Application(
+        layout=layout,
+        key_bindings=bindings,
+        style=STYLE,
+        full_screen=False,
+        refresh_interval=REFRESH_INTERVAL if describe is not None or growing else None,
+    )
+    return app.run()
@@ -0,0 +1,179 @@
+"""Streaming (stdin/stdout) job support for headless pipelines."""
+
+import subprocess
+from pathlib import Path
+
+from monica.recipes import Recipe, get_input_args
+from monica.logger import get_logger
+
+
+# Muxer settings for containers that can be written to a non-seekable pipe
+STREAM_CONTAINERS = {
+    "mp4": ["-f", "mp4", "-movflags", "frag_keyframe+empty_moov+default_base_moof"],
+    "mkv": ["-f", "matroska"],
+    "mpegts": ["-f", "mpegts"],
+    "webm": ["-f", "webm"],
+    "mp3": ["-f", "mp3"],
+    "adts": ["-f", "adts"],
+    "ogg": ["-f", "ogg"],
+    "flac": ["-f", "flac"],
+    "wav": ["-f", "wav"],
+    "gif": ["-f", "gif"],
+}
+
+# Streaming container used for a recipe extension when none is given
+EXTENSION_CONTAINERS = {
+    ".mp4": "mp4",
+    ".m4v": "mp4",
+    ".mov": "mp4",
+    ".mkv": "mkv",
+    ".webm": "webm",
+    ".mp3": "mp3",
+    ".m4a": "adts",
+    ".ogg": "ogg",
+    ".opus": "ogg",
+    ".flac": "flac",
+    ".wav": "wav",
+    ".gif": "gif",
+}
+
+
+def is_pipe(target: str) -> bool:
+    """Check whether an input/output argument refers to a pipe ("-" or "pipe:N")."""
+    return target == "-" or target.startswith("pipe:")
+
+
+def ffmpeg_target(target: str, default_fd: int) -> str:
+    """Translate a CLI input/output argument into an FFmpeg URL."""
+    if target == "-":
+        return f"pipe:{default_fd}"
+    return target
+
+
+def strip_faststart(args: list[str]) -> list[str]:
+    """Remove -movflags +faststart, which needs a seekable output."""
+    result = []
+    skip = False
+    for i, arg in enumerate(args):
+        if skip:
+            skip = False
+            continue
+        if arg == "-movflags" and i + 1 < len(args) and "faststart" in args[i + 1]:
+            skip = True
+            continue
+        result.append(arg)
+    return result
+
+
+def get_stream_container(recipe: Recipe, container: str | None = None) -> str | None:
+    """Pick the streaming container for a recipe.
+
+    Returns None if the recipe's output format cannot be streamed and no
+    explicit container was requested.
+    """
+    if container:
+        return container
+    return EXTENSION_CONTAINERS.get(recipe.extension.lower())
+
+
+def build_stream_command(
+    ffmpeg_path: str,
+    source: str,
+    dest: str,
+    recipe: Recipe,
+    container: str | None = None
+) -> list[str]:
+    """Build the FFmpeg command for a headless job.
+
+    Args:
+        ffmpeg_path: Path to FFmpeg executable
+        source: Input path, "-" or "pipe:N"
+        dest: Output path, "-" or "pipe:N"
+        recipe: The recipe to apply
+        container: Streaming container name (see STREAM_CONTAINERS)
+
+    Returns:
+        The command as a list of arguments
+
+    Raises:
+        ValueError: If the output is a pipe and no streamable container applies
+    """
+    args = list(recipe.ffmpeg_args)
+    muxer_args = []
+
+    if is_pipe(dest) or container:
+        container = get_stream_container(recipe, container)
+        if container not in STREAM_CONTAINERS:
+            choices = ", ".join(STREAM_CONTAINERS)
+            raise ValueError(
+                f"Recipe '{recipe.name}' has no streamable container; choose one of: {choices}"
+            )
+        args = strip_faststart(args)
+        muxer_args = STREAM_CONTAINERS[container]
+
+    cmd = [ffmpeg_path, "-hide_banner", "-loglevel", "error", "-nostats"]
+    if not is_pipe(source):
+        # Keep FFmpeg from reading keypresses off our stdin
+        cmd.append("-nostdin")
+    cmd += [
+        *get_input_args(recipe),
+        "-i", ffmpeg_target(source, 0),
+        "-y",
+        *args,
+        *muxer_args,
+        ffmpeg_target(dest, 1),
+    ]
+    return cmd
+
+
+def run_stream_job(
+    ffmpeg_path: str,
+    source: str,
+    dest: str,
+    recipe: Recipe,
+    container: str | None = None
+) -> tuple[bool, str]:
+    """Run a job without a progress display, wiring pipes straight to FFmpeg.
+
+    stdin/stdout are inherited by the FFmpeg process when used as input or
+    output, so media data never passes through Python or a temp file.
+
+    Returns:
+        Tuple of (success, error_message)
+    """
+    logger = get_logger()
+
+    try:
+        cmd = build_stream_command(ffmpeg_path, source, dest, recipe, container)
+    except ValueError as e:
+        return False, str(e)
+
+    logger.debug(f"Running stream command: {' '.join(cmd)}")
+
+    try:
+        process = subprocess.Popen(
+            cmd,
+            stdin=None if is_pipe(source) else subprocess.DEVNULL,
+            stdout=None if is_pipe(dest) else subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        _, stderr = process.communicate()
+    except OSError as e:
+        return False, str(e)
+    logger.annotate_item(exit_code=process.returncode)
+
+    if process.returncode == 0:
+        return True, ""
+
+    logger.error(f"FFmpeg failed: {stderr}")
+    return False, stderr.strip() or f"FFmpeg exited with code {process.returncode}"
+
+
+def describe_target(target: str, is_output: bool = False) -> str:
+    """Human-readable name for an input/output argument (for logs)."""
+    if target == "-":
+        return "stdout" if is_output else "stdin"
+    if is_pipe(target):
+        return target
+    return Path(target).name
@@ -0,0 +1,313 @@
+"""Preflight checks: estimate output sizes and compare with free disk space."""
+
+import json
+import os
+import re
+import shutil
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from monica.probe import MediaInfo, probe_media
+from monica.recipes import Recipe, get_range_duration
+
+
+HISTORY_FILE = "size_history.json"
+
+# Output/input size ratios kept per recipe, and how many are needed to trust them
+HISTORY_LENGTH = 20
+MIN_HISTORY = 3
+
+# Headroom added to estimates, and space always left free on the disk
+SAFETY_FACTOR = 1.15
+RESERVE_BYTES = 512 * 1024 * 1024
+
+DEFAULT_WORKERS = min(8, (os.cpu_count() or 2) * 2)
+
+# Bits per pixel at CRF 23 (libx264-equivalent quality); each +6 CRF halves it
+BASE_BITS_PER_PIXEL = 0.07
+BASE_CRF = 23
+
+# Relative efficiency of encoders compared to libx264 at the same CRF
+ENCODER_EFFICIENCY = {
+    "libx264": 1.0,
+    "libx265": 0.6,
+    "libvpx-vp9": 0.65,
+    "libaom-av1": 0.5,
+    "libsvtav1": 0.5,
+    "mpeg4": 1.6,
+}
+
+# Fallback audio bitrates (kbps) by encoder when no -b:a is given
+AUDIO_ENCODER_KBPS = {
+    "flac": 900,
+    "pcm_s16le": 1411,
+    "libvorbis": 192,
+    "libopus": 128,
+    "aac": 128,
+    "libmp3lame": 192,
+}
+
+# Fixed-size outputs (contact sheets) are tiny compared to any budget
+THUMBNAIL_ESTIMATE_BYTES = 2 * 1024 * 1024
+
+
+def _arg(args: list[str], name: str) -> str | None:
+    """Value following an option in an FFmpeg arg list."""
+    if name in args:
+        i = args.index(name)
+        if i + 1 < len(args):
+            return args[i + 1]
+    return None
+
+
+def parse_kbps(text: str | None) -> float | None:
+    """Parse an FFmpeg bitrate ("192k", "8M", "128000") to kbps."""
+    if not text:
+        return None
+    match = re.fullmatch(r"([\d.]+)([kKmM]?)", text.strip())
+    if not match:
+        return None
+    value, unit = float(match.group(1)), match.group(2).lower()
+    return value * 1000 if unit == "m" else value if unit == "k" else value / 1000
+
+
+def output_height(args: list[str], info: MediaInfo) -> int | None:
+    """Output height after a `scale=W:H` filter, else the source height."""
+    vf = _arg(args, "-vf") or ""
+    match = re.search(r"scale=(-?\d+):(-?\d+)", vf)
+    if match:
+        width, height = int(match.group(1)), int(match.group(2))
+        if height > 0:
+            return height
+        if width > 0 and info.width and info.height:
+            return round(info.height * width / info.width)
+    return info.height
+
+
+def estimate_video_kbps(recipe: Recipe, info: MediaInfo) -> float | None:
+    """Estimate the output video bitrate of a recipe for a source."""
+    args = recipe.ffmpeg_args
+    if _arg(args, "-c:v") == "copy" or _arg(args, "-c") == "copy":
+        return info.video_bitrate_kbps or info.bitrate_kbps
+
+    explicit = parse_kbps(_arg(args, "-b:v")) or parse_kbps(_arg(args, "-maxrate"))
+    if explicit:
+        return explicit
+
+    crf = _arg(args, "-crf") or recipe.options.get("crf")
+    height = output_height(args, info)
+    if crf is None or not height or not info.height or not info.width:
+        return None
+
+    width = info.width * height / info.height
+    fps = info.fps or 30.0
+    encoder = _arg(args, "-c:v") or "libx264"
+    bits_per_pixel = (
+        BASE_BITS_PER_PIXEL
+        * 2 ** ((BASE_CRF - float(crf)) / 6)
+        * ENCODER_EFFICIENCY.get(encoder, 1.0)
+    )
+    return width * height * fps * bits_per_pixel / 1000
+
+
+def estimate_audio_kbps(recipe: Recipe, info: MediaInfo) -> float:
+    """Estimate the output audio bitrate of a recipe for a source."""
+    args = recipe.ffmpeg_args
+    if not info.has_audio or "-an" in args:
+        return 0.0
+    if _arg(args, "-c:a") == "copy" or _arg(args, "-c") == "copy":
+        return float(info.audio_bitrate_kbps or 128)
+    explicit = parse_kbps(_arg(args, "-b:a"))
+    if explicit:
+        return explicit
+    return float(AUDIO_ENCODER_KBPS.get(_arg(args, "-c:a") or "", 192))
+
+
+class SizeHistory:
+    """Observed output/input size ratios per recipe, kept alongside the logs."""
+
+    def __init__(self, history_file: Path):
+        self.history_file = Path(history_file)
+        self._lock = threading.Lock()
+        self._ratios = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.history_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def ratio(self, recipe: Recipe) -> float | None:
+        """Median output/input ratio for a recipe, if enough jobs were seen."""
+        with self._lock:
+            ratios = self._ratios.get(recipe.name, [])
+        if len(ratios) < MIN_HISTORY:
+            return None
+        return statistics.median(ratios)
+
+    def record(self, recipe: Recipe, input_bytes: int, output_bytes: int, fraction: float = 1.0) -> None:
+        """Add a finished job (call save() to persist).
+
+        `fraction` is the share of the input that was processed (time ranges).
+        """
+        if input_bytes <= 0 or output_bytes <= 0 or fraction <= 0:
+            return
+        with self._lock:
+            ratios = self._ratios.setdefault(recipe.name, [])
+            ratios.append(output_bytes / (input_bytes * fraction))
+            del ratios[:-HISTORY_LENGTH]
+
+    def save(self) -> bool:
+        """Write the history to disk atomically."""
+        with self._lock:
+            data = {name: list(ratios) for name, ratios in self._ratios.items()}
+        try:
+            self.history_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.history_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.history_file)
+            return True
+        except OSError:
+            return False
+
+
+def get_size_history(logs_dir: Path) -> SizeHistory:
+    """Get the size history stored in the logs directory."""
+    return SizeHistory(Path(logs_dir) / HISTORY_FILE)
+
+
+def range_fraction(info: MediaInfo, recipe: Recipe) -> float:
+    """Share of the input covered by the recipe's time range (1.0 if unknown)."""
+    duration = get_range_duration(info.duration, recipe)
+    if not info.duration or not duration:
+        return 1.0
+    return max(0.0, min(1.0, duration / info.duration))
+
+
+def estimate_output_bytes(
+    info: MediaInfo,
+    recipe: Recipe,
+    input_bytes: int,
+    history: SizeHistory | None = None
+) -> int:
+    """Estimate a job's output size.
+
+    Uses, in order: the recipe's historical output/input ratio, a bitrate
+    model from the recipe's CRF/bitrate and the probed source, and finally
+    the input size itself. Estimates include a safety margin.
+    """
+    if recipe.category == "thumbnail":
+        return THUMBNAIL_ESTIMATE_BYTES
+
+    fraction = range_fraction(info, recipe)
+    estimate = None
+
+    ratio = history.ratio(recipe) if history else None
+    if ratio is not None:
+        estimate = input_bytes * fraction * ratio
+    else:
+        duration = get_range_duration(info.duration, recipe)
+        video_kbps = estimate_video_kbps(recipe, info) if info.has_video and "-vn" not in recipe.ffmpeg_args else 0.0
+        if duration and video_kbps is not None:
+            audio_kbps = estimate_audio_kbps(recipe, info)
+            estimate = (video_kbps + audio_kbps) * 1000 / 8 * duration
+
+    if estimate is None:
+        estimate = input_bytes * fraction
+
+    return int(estimate * SAFETY_FACTOR)
+
+
+@dataclass
+class PreflightResult:
+    """Outcome of a preflight check."""
+    estimates: dict[Path, int]
+    free_bytes: int
+    scratch_free_bytes: int | None = None
+    scratch_needed_bytes: int = 0
+    fitting: list[Path] = field(default_factory=list)  # Smallest first, within free space
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self.estimates.values())
+
+    @property
+    def fits(self) -> bool:
+        if self.scratch_free_bytes is not None and self.scratch_needed_bytes > self.scratch_free_bytes:
+            return False
+        return self.total_bytes <= self.free_bytes
+
+
+def free_space(path: Path) -> int:
+    """Usable free bytes on the filesystem holding a path, minus a reserve."""
+    path = Path(path)
+    while not path.exists() and path != path.parent:
+        path = path.parent
+    return max(0, shutil.disk_usage(path).free - RESERVE_BYTES)
+
+
+def _same_filesystem(a: Path, b: Path) -> bool:
+    try:
+        return os.stat(a).st_dev == os.stat(b).st_dev
+    except OSError:
+        return False
+
+
+def run_preflight(
+    ffmpeg_path: str,
+    files: list[Path],
+    recipe: Recipe,
+    export_dir: Path,
+    history: SizeHistory | None = None,
+    scratch_dir: Path | None = None,
+    workers: int = DEFAULT_WORKERS
+) -> PreflightResult:
+    """Estimate the batch's output size and check it against free space.
+
+    Probing only reads headers and runs in parallel. Scratch space (for
+    multi-step jobs' intermediates) needs room for the largest single job;
+    if it shares a filesystem with the export directory, that room comes
+    out of the same budget.
+    """
+    def estimate(f: Path) -> int:
+        try:
+            input_bytes = f.stat().st_size
+        except OSError:
+            return 0
+        info = probe_media(ffmpeg_path, f)
+        return estimate_output_bytes(info, recipe, input_bytes, history)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        estimates = dict(zip(files, pool.map(estimate, files)))
+
+    free_bytes = free_space(export_dir)
+    scratch_free = None
+    scratch_needed = 0
+    if scratch_dir is not None:
+        scratch_needed = max(estimates.values(), default=0)
+        if _same_filesystem(scratch_dir, export_dir):
+            free_bytes = max(0, free_bytes - scratch_needed)
+        else:
+            scratch_free = free_space(scratch_dir)
+
+    fitting = []
+    budget = free_bytes
+    for f in sorted(files, key=lambda f: estimates[f]):
+        if estimates[f] > budget:
+            break
+        fitting.append(f)
+        budget -= estimates[f]
+
+    return PreflightResult(
+        estimates=estimates,
+        free_bytes=free_bytes,
+        scratch_free_bytes=scratch_free,
+        scratch_needed_bytes=scratch_needed,
+        fitting=fitting,
+    )
@@ -0,0 +1,255 @@
+"""Media probing (duration, streams, bitrate) via FFmpeg's input banner."""
+
+import re
+import subprocess
+import time
+from dataclasses import dataclass, asdict, fields
+from pathlib import Path
+from typing import Optional
+
+from monica.metrics import get_metrics
+
+
+@dataclass
+class MediaInfo:
+    """Basic information about a media file."""
+    duration: Optional[float] = None  # Seconds
+    start_time: Optional[float] = None  # Container start offset in seconds
+    bitrate_kbps: Optional[int] = None  # Overall bitrate
+    video_codec: Optional[str] = None
+    video_profile: Optional[str] = None
+    pix_fmt: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fps: Optional[float] = None
+    video_bitrate_kbps: Optional[int] = None
+    audio_codec: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    audio_bitrate_kbps: Optional[int] = None
+
+    @property
+    def has_video(self) -> bool:
+        return self.video_codec is not None
+
+    @property
+    def has_audio(self) -> bool:
+        return self.audio_codec is not None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MediaInfo":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+# Channel layout names as printed by FFmpeg
+CHANNEL_LAYOUTS = {
+    "mono": 1,
+    "stereo": 2,
+    "2.1": 3,
+    "quad": 4,
+    "4.0": 4,
+    "5.0": 5,
+    "5.1": 6,
+    "6.1": 7,
+    "7.1": 8,
+}
+
+
+def split_stream_fields(text: str) -> list[str]:
+    """Split a stream description on commas that are not inside parentheses."""
+    parts = []
+    depth = 0
+    current = ""
+    for char in text:
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth = max(0, depth - 1)
+        if char == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+        else:
+            current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def _parse_bitrate(parts: list[str]) -> int | None:
+    for part in parts:
+        match = re.match(r"(\d+) kb/s", part)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def _parse_video(description: str, info: MediaInfo) -> None:
+    parts = split_stream_fields(description)
+    codec_part = parts[0]
+    info.video_codec = codec_part.split()[0]
+
+    # "h264 (High) (avc1 / 0x31637661)": the profile is the group without a fourcc
+    for group in re.findall(r"\(([^)]*)\)", codec_part):
+        if "/" not in group:
+            info.video_profile = group
+            break
+
+    for part in parts[1:]:
+        size = re.match(r"(\d{2,5})x(\d{2,5})", part)
+        if size and info.width is None:
+            info.width, info.height = int(size.group(1)), int(size.group(2))
+            continue
+        fps = re.match(r"([\d.]+) fps", part)
+        if fps:
+            info.fps = float(fps.group(1))
+            continue
+        if info.pix_fmt is None and re.match(r"[a-z][a-z0-9_]*(\(|$)", part):
+            info.pix_fmt = part.split("(")[0]
+
+    info.video_bitrate_kbps = _parse_bitrate(parts)
+
+
+def _parse_audio(description: str, info: MediaInfo) -> None:
+    parts = split_stream_fields(description)
+    info.audio_codec = parts[0].split()[0]
+
+    for part in parts[1:]:
+        rate = re.match(r"(\d+) Hz", part)
+        if rate:
+            info.sample_rate = int(rate.group(1))
+            continue
+        layout = part.split("(")[0]
+        if layout in CHANNEL_LAYOUTS and info.channels is None:
+            info.channels = CHANNEL_LAYOUTS[layout]
+            continue
+        channels = re.match(r"(\d+) channels", part)
+        if channels:
+            info.channels = int(channels.group(1))
+
+    info.audio_bitrate_kbps = _parse_bitrate(parts)
+
+
+def parse_probe_output(output: str) -> MediaInfo:
+    """Parse FFmpeg's input description (stderr of `ffmpeg -i file`).
+
+    Only the first video stream (ignoring cover art) and the first audio
+    stream are considered.
+    """
+    info = MediaInfo()
+
+    for line in output.splitlines():
+        line = line.strip()
+
+        if line.startswith("Duration:"):
+            match = re.search(r"Duration:\s*(\d+):(\d+):(\d+)\.(\d+)", line)
+            if match:
+                hours, minutes, seconds, centiseconds = map(int, match.groups())
+                info.duration = hours * 3600 + minutes * 60 + seconds + centiseconds / 100
+            match = re.search(r"start:\s*(-?[\d.]+)", line)
+            if match:
+                info.start_time = float(match.group(1))
+            match = re.search(r"bitrate:\s*(\d+) kb/s", line)
+            if match:
+                info.bitrate_kbps = int(match.group(1))
+            continue
+
+        if not line.startswith("Stream #"):
+            continue
+
+        match = re.search(r": (Video|Audio): (.*)$", line)
+        if not match:
+            continue
+        kind, description = match.groups()
+
+        if kind == "Video" and info.video_codec is None and "attached pic" not in description:
+            _parse_video(description, info)
+        elif kind == "Audio" and info.audio_codec is None:
+            _parse_audio(description, info)
+
+    return info
+
+
+def _is_attached_pic(stream) -> bool:
+    disposition = getattr(stream, "disposition", None)
+    try:
+        import av
+        return bool(disposition & av.stream.Disposition.attached_pic)
+    except (AttributeError, TypeError, ImportError):
+        return False
+
+
+def probe_in_process(input_file: Path) -> MediaInfo | None:
+    """Probe a media file's headers through PyAV, if installed.
+
+    Returns:
+        MediaInfo, or None if PyAV is missing or can't open the file
+    """
+    try:
+        import av
+    except ImportError:
+        return None
+
+    try:
+        with av.open(str(input_file)) as container:
+            info = MediaInfo()
+            if container.duration is not None:
+                info.duration = container.duration / av.time_base
+            if container.start_time is not None:
+                info.start_time = container.start_time / av.time_base
+            if container.bit_rate:
+                info.bitrate_kbps = container.bit_rate // 1000
+
+            video = next((s for s in container.streams.video if not _is_attached_pic(s)), None)
+            if video is not None:
+                ctx = video.codec_context
+                info.video_codec = ctx.name
+                info.video_profile = ctx.profile or None
+                info.pix_fmt = ctx.pix_fmt
+                info.width, info.height = ctx.width or None, ctx.height or None
+                if video.average_rate:
+                    info.fps = round(float(video.average_rate), 2)
+                if ctx.bit_rate:
+                    info.video_bitrate_kbps = ctx.bit_rate // 1000
+
+            if container.streams.audio:
+                ctx = container.streams.audio[0].codec_context
+                info.audio_codec = ctx.name
+                info.sample_rate = ctx.sample_rate or None
+                info.channels = ctx.channels or None
+                if ctx.bit_rate:
+                    info.audio_bitrate_kbps = ctx.bit_rate // 1000
+
+            return info
+    except Exception:
+        return None
+
+
+def probe_media(ffmpeg_path: str, input_file: Path, timeout: int = 30) -> MediaInfo:
+    """Probe a media file without decoding it.
+
+    Uses PyAV in-process when installed; otherwise runs `ffmpeg -i <file>`
+    with no output, which only reads the container headers and prints the
+    stream layout.
+
+    Returns:
+        MediaInfo (fields are None when unknown or if probing failed)
+    """
+    started = time.monotonic()
+    try:
+        info = probe_in_process(input_file)
+        if info is not None:
+            return info
+
+        cmd = [ffmpeg_path, "-hide_banner", "-nostdin", "-i", str(input_file)]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        except (subprocess.TimeoutExpired, OSError):
+            return MediaInfo()
+
+        return parse_probe_output(result.stderr)
+    finally:
+        get_metrics().observe_probe(time.monotonic() - started)
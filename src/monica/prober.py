@@ -0,0 +1,143 @@
+"""Background probing of import files for the file picker."""
+
+import threading
+from collections import deque
+from itertools import islice
+from pathlib import Path
+
+from monica.probe import MediaInfo, probe_media
+
+
+PROBE_WORKERS = 4
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as M:SS or H:MM:SS."""
+    total = int(round(seconds))
+    hours, rest = divmod(total, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
+def format_details(info: MediaInfo) -> str:
+    """One-line summary of a file's duration, resolution, codecs and bitrate."""
+    parts = []
+    if info.duration is not None:
+        parts.append(format_duration(info.duration))
+    if info.width and info.height:
+        parts.append(f"{info.width}x{info.height}")
+    codecs = "/".join(c for c in (info.video_codec, info.audio_codec) if c)
+    if codecs:
+        parts.append(codecs)
+    if info.bitrate_kbps:
+        if info.bitrate_kbps >= 1000:
+            parts.append(f"{info.bitrate_kbps / 1000:.1f} Mbps")
+        else:
+            parts.append(f"{info.bitrate_kbps} kbps")
+    return " · ".join(parts) if parts else "unknown format"
+
+
+class BackgroundProber:
+    """Probe a list of files in a small thread pool.
+
+    Results already stored in the import index are used without probing,
+    and new results are stored there. Files asked for with prioritize()
+    (e.g. the rows on screen) are probed before the rest.
+    """
+
+    def __init__(
+        self,
+        files: list[Path],
+        ffmpeg_path: str,
+        index=None,
+        workers: int = PROBE_WORKERS
+    ):
+        self.files: list[Path] = []
+        self.ffmpeg_path = ffmpeg_path
+        self.index = index
+        self.workers = max(1, workers)
+        self.results: dict[int, MediaInfo] = {}
+        self._lock = threading.Lock()
+        self._pending = deque()
+        self._claimed: set[int] = set()
+        self._stop = False
+        self._started = False
+        self._running = 0
+        self._threads: list[threading.Thread] = []
+        self.add(files)
+
+    def start(self) -> "BackgroundProber":
+        self._started = True
+        self._spawn()
+        return self
+
+    def add(self, files: list[Path]) -> None:
+        """Queue more files, e.g. as a scan that is still running finds them."""
+        with self._lock:
+            for path in files:
+                i = len(self.files)
+                self.files.append(path)
+                meta = self.index.get_metadata(path) if self.index is not None else None
+                if meta is not None:
+                    self.results[i] = MediaInfo.from_dict(meta)
+                else:
+                    self._pending.append(i)
+        if self._started:
+            self._spawn()
+
+    def _spawn(self) -> None:
+        # Workers exit when the queue runs dry; start more when files arrive
+        with self._lock:
+            count = max(0, min(self.workers, len(self._pending)) - self._running)
+            self._running += count
+        for _ in range(count):
+            thread = threading.Thread(target=self._run, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _next(self) -> int | None:
+        with self._lock:
+            while self._pending and not self._stop:
+                i = self._pending.popleft()
+                if i not in self._claimed:
+                    self._claimed.add(i)
+                    return i
+            self._running -= 1
+            return None
+
+    def _run(self) -> None:
+        while (i := self._next()) is not None:
+            info = probe_media(self.ffmpeg_path, self.files[i])
+            with self._lock:
+                self.results[i] = info
+            if self.index is not None:
+                self.index.set_metadata(self.files[i], info.to_dict())
+
+    def prioritize(self, indices: list[int]) -> None:
+        """Probe these files next."""
+        with self._lock:
+            wanted = [i for i in indices if i not in self._claimed and i not in self.results]
+            # Called on every redraw; usually the same rows are already in front
+            if not wanted or list(islice(self._pending, len(wanted))) == wanted:
+                return
+            moved = set(wanted)
+            self._pending = deque(wanted + [i for i in self._pending if i not in moved])
+
+    def get(self, i: int) -> MediaInfo | None:
+        """Probe result for files[i], or None if not probed yet."""
+        return self.results.get(i)
+
+    def wait(self) -> dict[int, MediaInfo]:
+        """Wait for every file to be probed."""
+        for thread in self._threads:
+            thread.join()
+        return self.results
+
+    def close(self) -> None:
+        """Stop probing; files being probed right now still finish."""
+        with self._lock:
+            self._stop = True
+        for thread in self._threads:
+            thread.join()
@@ -0,0 +1,256 @@
+"""Profiling MONICA's own Python code (menus, scanning, progress loop, logging).
+
+Two modes:
+
+- "cprofile": deterministic, every call on the main thread is timed.
+  Accurate call counts, but slows Python-heavy code noticeably.
+- "sample": a background thread records every thread's stack 100 times a
+  second. Costs well under 1% and is safe to leave on for production
+  batches.
+
+Either mode writes `<name>.txt` (functions sorted by cumulative time) and
+`<name>.collapsed` (one "frame;frame;frame value" line per stack, the
+input format of flamegraph.pl, speedscope and inferno). cProfile mode
+also writes the raw `<name>.prof` for snakeviz and friends; its collapsed
+stacks are reconstructed from the call graph (values in microseconds),
+while sampled ones are exact (values are sample counts).
+"""
+
+import cProfile
+import functools
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from monica.logger import get_logger
+
+
+PROFILE_MODES = ("cprofile", "sample")
+
+# Seconds between stack samples
+SAMPLE_INTERVAL = 0.01
+
+# Deepest stack kept in collapsed output
+MAX_STACK_DEPTH = 128
+
+# Lines of the sorted stats report
+STATS_LINES = 60
+
+# Call graph paths worth less than this (seconds) are left out of the
+# collapsed stacks reconstructed from cProfile
+MIN_PATH_SECONDS = 1e-5
+
+
+def _frame_label(module: str, function: str) -> str:
+    # ";" separates frames in the collapsed format
+    return f"{module}:{function}".replace(";", ":")
+
+
+class SamplingProfiler:
+    """Periodically record the stack of every thread."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="monica-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(_frame_label(frame.f_globals.get("__name__", "?"), frame.f_code.co_name))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, "thread").replace(";", ":"))
+                self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> list[str]:
+        return [f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()]
+
+    def stats_text(self) -> str:
+        """Functions by the share of samples they were on a stack (total) or running (self).
+
+        Shares are per thread, so a function on several threads at once can
+        exceed 100%.
+        """
+        total = Counter()
+        own = Counter()
+        for stack, count in self.stacks.items():
+            for label in set(stack[1:]):
+                total[label] += count
+            if len(stack) > 1:
+                own[stack[-1]] += count
+        samples = max(1, self.samples)
+        lines = [
+            f"{self.samples} samples every {self.interval * 1000:g} ms "
+            f"({sum(self.stacks.values())} thread stacks)",
+            "",
+            f"{'total%':>7} {'self%':>7}  function",
+        ]
+        for label, count in total.most_common(STATS_LINES):
+            lines.append(f"{100 * count / samples:7.1f} {100 * own[label] / samples:7.1f}  {label}")
+        return "\n".join(lines) + "\n"
+
+
+def _cprofile_label(func: tuple) -> str:
+    filename, _, name = func
+    if filename == "~":
+        return name  # Built-in, e.g. "<built-in method time.sleep>"
+    return _frame_label(Path(filename).stem, name)
+
+
+def collapsed_from_stats(stats: pstats.Stats) -> list[str]:
+    """Approximate collapsed stacks from cProfile's caller/callee graph.
+
+    A function's own time is split between its callers in proportion to
+    the time each caller's calls took.
+    """
+    raw = stats.stats
+    callees = defaultdict(list)
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees[caller].append((func, edge[3]))
+
+    stacks = Counter()
+
+    def walk(func, path, on_path, share):
+        _, _, own_time, cumulative, _ = raw[func]
+        path = path + [_cprofile_label(func)]
+        micros = round(own_time * share * 1e6)
+        if micros:
+            stacks[";".join(path)] += micros
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_time in callees[func]:
+            callee_time = raw[callee][3]
+            callee_share = share * edge_time / callee_time if callee_time else 0
+            if callee in on_path or callee_share * callee_time < MIN_PATH_SECONDS:
+                continue
+            walk(callee, path, on_path | {callee}, callee_share)
+
+    for func, (_, _, _, _, callers) in raw.items():
+        if not callers:
+            walk(func, [], {func}, 1.0)
+    return [f"{stack} {value}" for stack, value in stacks.most_common()]
+
+
+class Profile:
+    """A profiling run in one of PROFILE_MODES."""
+
+    def __init__(self, mode: str, interval: float = SAMPLE_INTERVAL):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"unknown profile mode: {mode}")
+        self.mode = mode
+        self.interval = interval
+        self._profiler = None
+        self.started = 0.0
+        self.elapsed = 0.0
+
+    def start(self) -> "Profile":
+        self.started = time.monotonic()
+        if self.mode == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._profiler = SamplingProfiler(self.interval)
+            self._profiler.start()
+        return self
+
+    def stop(self) -> None:
+        if self.mode == "cprofile":
+            self._profiler.disable()
+        else:
+            self._profiler.stop()
+        self.elapsed = time.monotonic() - self.started
+
+    def save(self, prefix: Path) -> tuple[bool, str]:
+        """Write prefix.txt, prefix.collapsed (and prefix.prof for cProfile).
+
+        Returns:
+            Tuple of (success, error_message)
+        """
+        prefix = Path(prefix)
+        try:
+            prefix.parent.mkdir(parents=True, exist_ok=True)
+            if self.mode == "cprofile":
+                self._profiler.dump_stats(prefix.with_name(prefix.name + ".prof"))
+                report = io.StringIO()
+                stats = pstats.Stats(self._profiler, stream=report)
+                stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(STATS_LINES)
+                text = report.getvalue()
+                collapsed = collapsed_from_stats(stats)
+            else:
+                text = self._profiler.stats_text()
+                collapsed = self._profiler.collapsed()
+            header = f"MONICA profile ({self.mode}), {self.elapsed:.1f} s\n\n"
+            prefix.with_name(prefix.name + ".txt").write_text(header + text, encoding="utf-8")
+            prefix.with_name(prefix.name + ".collapsed").write_text(
+                "".join(line + "\n" for line in collapsed), encoding="utf-8"
+            )
+        except OSError as e:
+            return False, str(e)
+        return True, ""
+
+
+def profile_prefix(logs_dir: Path, scope: str) -> Path:
+    """Output path (without extension) for a profile of a session or batch."""
+    millis = int(time.time() * 1000) % 1000
+    return Path(logs_dir) / f"profile-{scope}-{time.strftime('%Y%m%d-%H%M%S')}-{millis:03d}"
+
+
+# Per-batch profiling, set up by configure_batch_profiling
+_batch_mode = None
+_batch_logs_dir = None
+_batch_running = threading.Lock()
+
+
+def configure_batch_profiling(mode: str | None, logs_dir: Path = None) -> None:
+    """Profile every batch run through a @profiled function (None to stop)."""
+    global _batch_mode, _batch_logs_dir
+    if mode is not None and mode not in PROFILE_MODES:
+        raise ValueError(f"unknown profile mode: {mode}")
+    _batch_mode = mode
+    _batch_logs_dir = logs_dir
+
+
+def profiled(func):
+    """Decorator: profile each call while batch profiling is configured."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Batches started from inside a profiled batch are part of its profile
+        if _batch_mode is None or not _batch_running.acquire(blocking=False):
+            return func(*args, **kwargs)
+        profile = Profile(_batch_mode).start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.stop()
+            _batch_running.release()
+            prefix = profile_prefix(_batch_logs_dir, "batch")
+            success, message = profile.save(prefix)
+            if success:
+                get_logger().info(f"Profile saved to {prefix}.txt / .collapsed")
+            else:
+                get_logger().error(f"Could not save profile: {message}")
+    return wrapper
@@ -0,0 +1,378 @@
+"""Select import files by probed metadata.
+
+A query is a filter expression over file columns, e.g.
+
+    height > 1080 and vcodec != h264 and duration > 5m
+
+Comparisons are joined with `and`, `or` and `not`, grouped with
+parentheses, and may be followed by `order by <column> [asc|desc]`. Text
+columns compare case-insensitively; `~` matches a glob pattern
+(`name ~ "*trip*"`). A comparison against a value a file doesn't have
+(e.g. the video codec of an audio file, or a file not probed yet) is
+false.
+"""
+
+import fnmatch
+import math
+import operator
+import os
+import re
+from array import array
+from datetime import datetime
+from pathlib import Path
+
+from monica.probe import MediaInfo
+
+
+# Column -> MediaInfo field (None for columns from the scan)
+NUMERIC_COLUMNS = {
+    "size": None,
+    "mtime": None,
+    "duration": "duration",
+    "width": "width",
+    "height": "height",
+    "fps": "fps",
+    "bitrate": "bitrate_kbps",
+    "vbitrate": "video_bitrate_kbps",
+    "abitrate": "audio_bitrate_kbps",
+    "sample_rate": "sample_rate",
+    "channels": "channels",
+}
+
+TEXT_COLUMNS = {
+    "name": None,
+    "path": None,
+    "ext": None,
+    "vcodec": "video_codec",
+    "acodec": "audio_codec",
+    "profile": "video_profile",
+    "pix_fmt": "pix_fmt",
+}
+
+COLUMNS = list(NUMERIC_COLUMNS) + list(TEXT_COLUMNS)
+
+COMPARISONS = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "kb": 1024, "m": 1024 ** 2, "mb": 1024 ** 2,
+              "g": 1024 ** 3, "gb": 1024 ** 3, "t": 1024 ** 4, "tb": 1024 ** 4}
+BITRATE_UNITS = {"": 1, "k": 1, "kbps": 1, "m": 1000, "mbps": 1000}
+DURATION_UNITS = {"": 1, "s": 1, "m": 60, "min": 60, "h": 3600}
+HEIGHT_NAMES = {"4k": 2160, "8k": 4320}
+
+ORDER_RE = re.compile(r"(?:^|\s)order\s+by\s+(\w+)(?:\s+(asc|desc))?\s*$", re.IGNORECASE)
+
+TOKEN_RE = re.compile(r"""\s*(?:(?P<paren>[()])|(?P<op><=|>=|!=|==|=|<|>|~)|"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<word>[^\s()<>=!~"']+))""")
+
+
+class QueryError(ValueError):
+    """Raised for a query that can't be parsed."""
+
+
+def _number_with_unit(text: str, units: dict[str, float]) -> float | None:
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([a-z]*)", text.lower())
+    if not match or match.group(2) not in units:
+        return None
+    return float(match.group(1)) * units[match.group(2)]
+
+
+def parse_value(column: str, text: str) -> float:
+    """Parse a value for a numeric column, allowing units.
+
+    Sizes take B/KB/MB/GB/TB (1024-based, like the picker), durations s/m/h
+    or H:MM:SS, bitrates kbps/Mbps, heights a "p" suffix (1080p) or 4k/8k,
+    and mtime a date (YYYY-MM-DD).
+    """
+    value = None
+    lowered = text.lower()
+    if column == "size":
+        value = _number_with_unit(lowered, SIZE_UNITS)
+    elif column == "duration":
+        if ":" in lowered and re.fullmatch(r"[\d:.]+", lowered):
+            value = 0.0
+            for part in lowered.split(":"):
+                value = value * 60 + float(part or 0)
+        else:
+            value = _number_with_unit(lowered, DURATION_UNITS)
+    elif column in ("bitrate", "vbitrate", "abitrate"):
+        value = _number_with_unit(lowered, BITRATE_UNITS)
+    elif column in ("height", "width"):
+        value = HEIGHT_NAMES.get(lowered) if column == "height" else None
+        if value is None:
+            value = _number_with_unit(lowered.removesuffix("p"), {"": 1})
+    elif column == "mtime":
+        try:
+            value = datetime.fromisoformat(text).timestamp()
+        except ValueError:
+            value = _number_with_unit(lowered, {"": 1})
+    else:
+        value = _number_with_unit(lowered, {"": 1})
+
+    if value is None:
+        raise QueryError(f"invalid value for {column}: {text}")
+    return value
+
+
+class _Parser:
+    """Recursive-descent parser producing a nested tuple tree."""
+
+    def __init__(self, expression: str):
+        self.tokens = []
+        position = 0
+        expression = expression.rstrip()
+        while position < len(expression):
+            match = TOKEN_RE.match(expression, position)
+            if not match or match.end() == position:
+                raise QueryError(f"unexpected character: {expression[position:].strip()[:1]}")
+            position = match.end()
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind in ("dq", "sq"):
+                kind = "string"
+            self.tokens.append((kind, value))
+        self.position = 0
+
+    def peek(self) -> tuple[str, str] | None:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self) -> tuple[str, str]:
+        token = self.peek()
+        if token is None:
+            raise QueryError("unexpected end of query")
+        self.position += 1
+        return token
+
+    def keyword(self, word: str) -> bool:
+        token = self.peek()
+        if token and token[0] == "word" and token[1].lower() == word:
+            self.position += 1
+            return True
+        return False
+
+    def parse(self):
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise QueryError(f"unexpected: {self.peek()[1]}")
+        return node
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.keyword("or"):
+            node = ("or", node, self.parse_and())
+        return node
+
+    def parse_and(self):
+        node = self.parse_not()
+        while self.keyword("and"):
+            node = ("and", node, self.parse_not())
+        return node
+
+    def parse_not(self):
+        if self.keyword("not"):
+            return ("not", self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self):
+        kind, value = self.take()
+        if (kind, value) == ("paren", "("):
+            node = self.parse_or()
+            if self.take() != ("paren", ")"):
+                raise QueryError("expected )")
+            return node
+        if kind != "word":
+            raise QueryError(f"expected a column, got {value}")
+
+        column = value.lower()
+        if column not in NUMERIC_COLUMNS and column not in TEXT_COLUMNS:
+            raise QueryError(f"unknown column: {value} (columns: {', '.join(COLUMNS)})")
+        kind, op = self.take()
+        if kind != "op":
+            raise QueryError(f"expected a comparison after {column}")
+        kind, text = self.take()
+        if kind not in ("word", "string"):
+            raise QueryError(f"expected a value after {column} {op}")
+
+        if column in NUMERIC_COLUMNS:
+            if op == "~":
+                raise QueryError(f"~ only works on text columns, not {column}")
+            return ("cmp", column, op, parse_value(column, text))
+        if op not in ("~", "=", "==", "!="):
+            raise QueryError(f"{op} only works on numeric columns, not {column}")
+        return ("cmp", column, op, text.lower())
+
+
+def parse_query(expression: str):
+    """Parse a filter expression (raises QueryError)."""
+    return _Parser(expression).parse()
+
+
+def split_order(text: str) -> tuple[str, str | None, bool]:
+    """Split a trailing `order by` clause off a query.
+
+    Returns:
+        Tuple of (filter expression, order column or None, descending)
+    """
+    match = ORDER_RE.search(text)
+    if not match:
+        return text, None, False
+    descending = (match.group(2) or "").lower() == "desc"
+    return text[:match.start()], match.group(1).lower(), descending
+
+
+def validate_query(text: str) -> None:
+    """Check a query (with optional `order by`) without running it.
+
+    Raises:
+        QueryError: If the query is invalid
+    """
+    expression, order_by, _ = split_order(text)
+    if expression.strip():
+        parse_query(expression)
+    if order_by and order_by not in COLUMNS:
+        raise QueryError(f"unknown column: {order_by} (columns: {', '.join(COLUMNS)})")
+
+
+class MediaTable:
+    """Columnar table of files and their probed metadata.
+
+    Numeric columns are packed float arrays (NaN when unknown), text columns
+    lists of lowercase strings (None when unknown). Filters run column by
+    column over the rows still matching, so `and` narrows as it goes.
+    """
+
+    def __init__(self, paths: list[Path], columns: dict):
+        self.paths = paths
+        self.columns = columns
+
+    @classmethod
+    def build(
+        cls,
+        entries: list,
+        infos: list[MediaInfo | None],
+        root: Path = None
+    ) -> "MediaTable":
+        """Build a table from scanned entries and their probe results.
+
+        Args:
+            entries: Scanned files (FileEntry)
+            infos: Probe result per entry (None if not probed)
+            root: Directory `path` is relative to (default: full paths)
+        """
+        # Built a column at a time with comprehensions: this covers every file
+        paths = [str(e.path) for e in entries]
+        names = [os.path.basename(p).lower() for p in paths]
+        if root is None:
+            relative = [p.lower() for p in paths]
+        else:
+            prefix = str(root).rstrip(os.sep) + os.sep
+            relative = [
+                p[len(prefix):].replace(os.sep, "/").lower() if p.startswith(prefix) else n
+                for p, n in zip(paths, names)
+            ]
+
+        nan = math.nan
+        columns = {
+            "size": array("d", [e.size for e in entries]),
+            "mtime": array("d", [e.mtime for e in entries]),
+            "name": names,
+            "path": relative,
+            "ext": [os.path.splitext(n)[1].lstrip(".") for n in names],
+        }
+        for name, attr in NUMERIC_COLUMNS.items():
+            if attr:
+                values = [getattr(i, attr) if i is not None else None for i in infos]
+                columns[name] = array("d", [nan if v is None else v for v in values])
+        for name, attr in TEXT_COLUMNS.items():
+            if attr:
+                values = [getattr(i, attr) if i is not None else None for i in infos]
+                columns[name] = [v.lower() if v else None for v in values]
+
+        return cls([e.path for e in entries], columns)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def _compare(self, column: str, op: str, value, rows: list[int]) -> list[int]:
+        data = self.columns[column]
+        if op == "~":
+            pattern = re.compile(fnmatch.translate(value))
+            return [i for i in rows if data[i] is not None and pattern.match(data[i])]
+        compare = COMPARISONS[op]
+        if column in TEXT_COLUMNS:
+            return [i for i in rows if data[i] is not None and compare(data[i], value)]
+        # NaN compares false with everything except !=, so only that needs a check
+        if op == "!=":
+            return [i for i in rows if data[i] == data[i] and data[i] != value]
+        return [i for i in rows if compare(data[i], value)]
+
+    def _evaluate(self, node, rows: list[int]) -> list[int]:
+        kind = node[0]
+        if kind == "cmp":
+            return self._compare(node[1], node[2], node[3], rows)
+        if kind == "and":
+            return self._evaluate(node[2], self._evaluate(node[1], rows))
+        if kind == "or":
+            matched = set(self._evaluate(node[1], rows))
+            rest = [i for i in rows if i not in matched]
+            matched.update(self._evaluate(node[2], rest))
+            return [i for i in rows if i in matched]
+        excluded = set(self._evaluate(node[1], rows))
+        return [i for i in rows if i not in excluded]
+
+    def filter(self, expression: str, rows: list[int] = None) -> list[int]:
+        """Indices of rows matching an expression (all rows if it's empty)."""
+        rows = list(range(len(self))) if rows is None else rows
+        if not expression.strip():
+            return rows
+        return self._evaluate(parse_query(expression), rows)
+
+    def order(self, rows: list[int], column: str, descending: bool = False) -> list[int]:
+        """Sort rows by a column; rows without a value go last."""
+        column = column.lower()
+        if column not in self.columns:
+            raise QueryError(f"unknown column: {column} (columns: {', '.join(COLUMNS)})")
+        data = self.columns[column]
+        if column in NUMERIC_COLUMNS:
+            known = [i for i in rows if data[i] == data[i]]
+        else:
+            known = [i for i in rows if data[i] is not None]
+        known_set = set(known)
+        missing = [i for i in rows if i not in known_set]
+        return sorted(known, key=data.__getitem__, reverse=descending) + missing
+
+    def query(self, text: str) -> list[int]:
+        """Indices of rows matching a query, in its `order by` order."""
+        expression, order_by, descending = split_order(text)
+        rows = self.filter(expression)
+        if order_by:
+            rows = self.order(rows, order_by, descending)
+        return rows
+
+    def select(
+        self,
+        text: str = "",
+        order_by: str = None,
+        descending: bool = False,
+        limit: int = None
+    ) -> list[Path]:
+        """Paths of the files matching a query, optionally sorted.
+
+        An `order_by` given here takes the place of the query's own
+        `order by`, so rows are only sorted once.
+        """
+        expression, query_order, query_descending = split_order(text)
+        if not order_by:
+            order_by, descending = query_order, query_descending
+        rows = self.filter(expression)
+        if order_by:
+            rows = self.order(rows, order_by, descending)
+        if limit is not None:
+            rows = rows[:limit]
+        return [self.paths[i] for i in rows]
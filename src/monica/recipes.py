@@ -10,13 +10,15 @@ from typing import Optional
 class Recipe:
     """Represents an FFmpeg recipe/preset."""
     name: str
-    category: str  # video, audio, extract, resize, remux, youtube, shortform
+    category: str  # video, audio, extract, resize, remux, youtube, shortform, thumbnail, trim, gif
     extension: str
     ffmpeg_args: list[str]
     description: str = ""
     input_extensions: list[str] = field(default_factory=list)
     max_duration_seconds: Optional[int] = None  # Platform duration limit
     max_file_size_mb: Optional[int] = None  # Platform file size limit
+    options: dict = field(default_factory=dict)  # Category-specific settings (e.g. sprite layout)
+    in_process: bool = False  # Can run in an in-process engine (see engines.py)
 
     def to_dict(self) -> dict:
         return asdict(self)
@@ -86,7 +88,8 @@ AUDIO_RECIPES = [
         extension=".mp3",
         ffmpeg_args=["-vn", "-c:a", "libmp3lame", "-b:a", "320k"],
         description="High quality MP3",
-        input_extensions=[".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".mp3", ".opus"]
+        input_extensions=[".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".mp3", ".opus"],
+        in_process=True
     ),
     Recipe(
         name="MP3 (192 kbps)",
@@ -94,7 +97,8 @@ AUDIO_RECIPES = [
         extension=".mp3",
         ffmpeg_args=["-vn", "-c:a", "libmp3lame", "-b:a", "192k"],
         description="Standard quality MP3",
-        input_extensions=[".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".mp3", ".opus"]
+        input_extensions=[".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".mp3", ".opus"],
+        in_process=True
     ),
     Recipe(
         name="MP3 (128 kbps)",
@@ -102,7 +106,8 @@ AUDIO_RECIPES = [
         extension=".mp3",
         ffmpeg_args=["-vn", "-c:a", "libmp3lame", "-b:a", "128k"],
         description="Smaller file size MP3",
-        input_extensions=[".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".mp3", ".opus"]
+        input_extensions=[".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".mp3", ".opus"],
+        in_process=True
     ),
     Recipe(
         name="AAC (256 kbps)",
@@ -110,7 +115,8 @@ AUDIO_RECIPES = [
         extension=".m4a",
         ffmpeg_args=["-vn", "-c:a", "aac", "-b:a", "256k"],
         description="High quality AAC",
-        input_extensions=[".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".mp3", ".opus"]
+        input_extensions=[".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".mp3", ".opus"],
+        in_process=True
     ),
     Recipe(
         name="FLAC (Lossless)",
@@ -118,7 +124,8 @@ AUDIO_RECIPES = [
         extension=".flac",
         ffmpeg_args=["-vn", "-c:a", "flac"],
         description="Lossless audio compression",
-        input_extensions=[".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".mp3", ".opus"]
+        input_extensions=[".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".mp3", ".opus"],
+        in_process=True
     ),
     Recipe(
         name="WAV (Uncompressed)",
@@ -126,7 +133,8 @@ AUDIO_RECIPES = [
         extension=".wav",
         ffmpeg_args=["-vn", "-c:a", "pcm_s16le"],
         description="Uncompressed PCM audio",
-        input_extensions=[".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".mp3", ".opus"]
+        input_extensions=[".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".mp3", ".opus"],
+        in_process=True
     ),
     Recipe(
         name="OGG Vorbis",
@@ -142,7 +150,8 @@ AUDIO_RECIPES = [
         extension=".opus",
         ffmpeg_args=["-vn", "-c:a", "libopus", "-b:a", "128k"],
         description="Opus audio codec",
-        input_extensions=[".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".mp3", ".opus"]
+        input_extensions=[".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".mp3", ".opus"],
+        in_process=True
     ),
 ]
 
@@ -154,7 +163,8 @@ EXTRACT_RECIPES = [
         extension=".mp3",
         ffmpeg_args=["-vn", "-c:a", "libmp3lame", "-b:a", "320k"],
         description="Extract audio from video as MP3",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        in_process=True
     ),
     Recipe(
         name="Extract to MP3 (192 kbps)",
@@ -162,7 +172,8 @@ EXTRACT_RECIPES = [
         extension=".mp3",
         ffmpeg_args=["-vn", "-c:a", "libmp3lame", "-b:a", "192k"],
         description="Extract audio from video as MP3 (smaller)",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        in_process=True
     ),
     Recipe(
         name="Extract to AAC",
@@ -170,7 +181,8 @@ EXTRACT_RECIPES = [
         extension=".m4a",
         ffmpeg_args=["-vn", "-c:a", "aac", "-b:a", "192k"],
         description="Extract audio from video as AAC",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        in_process=True
     ),
     Recipe(
         name="Extract to WAV",
@@ -178,7 +190,8 @@ EXTRACT_RECIPES = [
         extension=".wav",
         ffmpeg_args=["-vn", "-c:a", "pcm_s16le"],
         description="Extract audio from video as uncompressed WAV",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        in_process=True
     ),
     Recipe(
         name="Extract to FLAC",
@@ -186,7 +199,8 @@ EXTRACT_RECIPES = [
         extension=".flac",
         ffmpeg_args=["-vn", "-c:a", "flac"],
         description="Extract audio from video as lossless FLAC",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        in_process=True
     ),
 ]
 
@@ -265,7 +279,8 @@ YOUTUBE_RECIPES = [
             "-movflags", "+faststart"
         ],
         description="Best quality for 4K YouTube uploads",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"],
+        options={"faststart": "reserve"}
     ),
     Recipe(
         name="YouTube 1080p (Full HD)",
@@ -280,7 +295,8 @@ YOUTUBE_RECIPES = [
             "-movflags", "+faststart"
         ],
         description="Standard HD for most YouTube uploads",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"],
+        options={"faststart": "reserve"}
     ),
     Recipe(
         name="YouTube 720p (HD)",
@@ -295,7 +311,8 @@ YOUTUBE_RECIPES = [
             "-movflags", "+faststart"
         ],
         description="Good quality with faster upload times",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"],
+        options={"faststart": "reserve"}
     ),
     Recipe(
         name="YouTube 480p (SD)",
@@ -310,7 +327,8 @@ YOUTUBE_RECIPES = [
             "-movflags", "+faststart"
         ],
         description="Low bandwidth option for slower connections",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"],
+        options={"faststart": "reserve"}
     ),
     Recipe(
         name="YouTube Shorts (1080x1920)",
@@ -325,7 +343,8 @@ YOUTUBE_RECIPES = [
             "-movflags", "+faststart"
         ],
         description="Vertical 9:16 format for YouTube Shorts (Full HD)",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"],
+        options={"faststart": "reserve"}
     ),
     Recipe(
         name="YouTube Shorts (720x1280)",
@@ -340,7 +359,8 @@ YOUTUBE_RECIPES = [
             "-movflags", "+faststart"
         ],
         description="Vertical 9:16 format for YouTube Shorts (smaller)",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"],
+        options={"faststart": "reserve"}
     ),
     Recipe(
         name="YouTube High Quality",
@@ -354,7 +374,8 @@ YOUTUBE_RECIPES = [
             "-movflags", "+faststart"
         ],
         description="Maximum quality, keeps original resolution (slower encode)",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"],
+        options={"faststart": "reserve"}
     ),
     Recipe(
         name="YouTube Fast Upload",
@@ -368,7 +389,8 @@ YOUTUBE_RECIPES = [
             "-movflags", "+faststart"
         ],
         description="Balanced quality for quick encoding and upload",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"],
+        options={"faststart": "reserve"}
     ),
     Recipe(
         name="YouTube Small File",
@@ -383,7 +405,8 @@ YOUTUBE_RECIPES = [
             "-movflags", "+faststart"
         ],
         description="Minimize file size for limited bandwidth",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"],
+        options={"faststart": "reserve"}
     ),
 ]
 
@@ -440,6 +463,7 @@ SHORTFORM_RECIPES = [
         ],
         description="Full HD vertical 9:16 for TikTok and Instagram Reels",
         input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        options={"faststart": "reserve"},
         max_duration_seconds=600,
         max_file_size_mb=287
     ),
@@ -457,6 +481,7 @@ SHORTFORM_RECIPES = [
         ],
         description="720p vertical for YouTube Shorts (max 60 sec)",
         input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        options={"faststart": "reserve"},
         max_duration_seconds=60
     ),
     Recipe(
@@ -473,6 +498,7 @@ SHORTFORM_RECIPES = [
         ],
         description="Optimized for Instagram and Facebook Stories",
         input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        options={"faststart": "reserve"},
         max_duration_seconds=60
     ),
     Recipe(
@@ -488,7 +514,8 @@ SHORTFORM_RECIPES = [
             "-movflags", "+faststart"
         ],
         description="Fast encode, smaller file for drafts and previews",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        options={"faststart": "reserve"}
     ),
     # === Repurpose Horizontal to Vertical ===
     Recipe(
@@ -504,7 +531,8 @@ SHORTFORM_RECIPES = [
             "-movflags", "+faststart"
         ],
         description="Crop center of horizontal video to vertical",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        options={"faststart": "reserve"}
     ),
     Recipe(
         name="Letterbox with Black Bars",
@@ -519,7 +547,8 @@ SHORTFORM_RECIPES = [
             "-movflags", "+faststart"
         ],
         description="Fit horizontal video in vertical frame with black bars",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        options={"faststart": "reserve"}
     ),
     Recipe(
         name="Blur Background Fill",
@@ -539,7 +568,8 @@ SHORTFORM_RECIPES = [
             "-movflags", "+faststart"
         ],
         description="Blurred background fill (popular social media effect)",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        options={"faststart": "reserve"}
     ),
     Recipe(
         name="Split Screen Vertical (Top/Bottom)",
@@ -559,7 +589,8 @@ SHORTFORM_RECIPES = [
             "-movflags", "+faststart"
         ],
         description="Split video into top/bottom vertical stack",
-        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"]
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        options={"faststart": "reserve"}
     ),
     # === Platform-Specific Exports ===
     Recipe(
@@ -577,6 +608,7 @@ SHORTFORM_RECIPES = [
         ],
         description="TikTok optimized (max 10 min, 287MB limit)",
         input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        options={"faststart": "reserve"},
         max_duration_seconds=600,
         max_file_size_mb=287
     ),
@@ -594,6 +626,7 @@ SHORTFORM_RECIPES = [
         ],
         description="Instagram Reels optimized (max 90 sec)",
         input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        options={"faststart": "reserve"},
         max_duration_seconds=90
     ),
     Recipe(
@@ -610,6 +643,7 @@ SHORTFORM_RECIPES = [
         ],
         description="YouTube Shorts optimized (max 60 sec, high quality)",
         input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        options={"faststart": "reserve"},
         max_duration_seconds=60
     ),
     Recipe(
@@ -626,6 +660,7 @@ SHORTFORM_RECIPES = [
         ],
         description="Snapchat Spotlight optimized (max 60 sec)",
         input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        options={"faststart": "reserve"},
         max_duration_seconds=60
     ),
     Recipe(
@@ -642,10 +677,128 @@ SHORTFORM_RECIPES = [
         ],
         description="Facebook Reels optimized (max 90 sec)",
         input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        options={"faststart": "reserve"},
         max_duration_seconds=90
     ),
 ]
 
+# Thumbnail / contact sheet recipes (keyframes only, tiled into one image)
+THUMBNAIL_RECIPES = [
+    Recipe(
+        name="Contact Sheet 4x4 (JPG)",
+        category="thumbnail",
+        extension=".jpg",
+        ffmpeg_args=["-q:v", "3"],
+        description="16 evenly spaced frames in one preview image",
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"],
+        options={"columns": 4, "rows": 4, "width": 320}
+    ),
+    Recipe(
+        name="Contact Sheet 3x3 (JPG)",
+        category="thumbnail",
+        extension=".jpg",
+        ffmpeg_args=["-q:v", "3"],
+        description="9 larger frames in one preview image",
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"],
+        options={"columns": 3, "rows": 3, "width": 480}
+    ),
+    Recipe(
+        name="Scrub Sprite 10x10 (JPG)",
+        category="thumbnail",
+        extension=".jpg",
+        ffmpeg_args=["-q:v", "5"],
+        description="100 small frames for video player seek previews",
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"],
+        options={"columns": 10, "rows": 10, "width": 160}
+    ),
+    Recipe(
+        name="Single Thumbnail (JPG)",
+        category="thumbnail",
+        extension=".jpg",
+        ffmpeg_args=["-q:v", "2"],
+        description="One frame from the middle of the video",
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"],
+        options={"columns": 1, "rows": 1, "width": 1280}
+    ),
+    Recipe(
+        name="Contact Sheet 4x4 (PNG)",
+        category="thumbnail",
+        extension=".png",
+        ffmpeg_args=[],
+        description="Lossless 16-frame preview image",
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpeg", ".mpg"],
+        options={"columns": 4, "rows": 4, "width": 320}
+    ),
+]
+
+# Trim recipes (frame-accurate smart cut; start/end are asked for at run time)
+TRIM_RECIPES = [
+    Recipe(
+        name="Smart Trim to MP4",
+        category="trim",
+        extension=".mp4",
+        ffmpeg_args=["-movflags", "+faststart"],
+        description="Frame-accurate cut, re-encodes only the frames at each cut point",
+        input_extensions=[".mp4", ".mkv", ".mov", ".m4v", ".ts"],
+        options={"crf": 18}
+    ),
+    Recipe(
+        name="Smart Trim to MKV",
+        category="trim",
+        extension=".mkv",
+        ffmpeg_args=[],
+        description="Frame-accurate cut into MKV (any codec)",
+        input_extensions=[".mp4", ".mkv", ".mov", ".m4v", ".webm", ".ts"],
+        options={"crf": 18}
+    ),
+]
+
+# GIF recipes: one decode feeds both palettegen and paletteuse via split
+GIF_RECIPES = [
+    Recipe(
+        name="GIF 480px (12 fps)",
+        category="gif",
+        extension=".gif",
+        ffmpeg_args=[
+            "-filter_complex",
+            "[0:v]fps=12,scale=480:-2:flags=lanczos,split[a][b];"
+            "[a]palettegen=stats_mode=diff[p];"
+            "[b][p]paletteuse=dither=bayer:bayer_scale=5:diff_mode=rectangle[out]",
+            "-map", "[out]", "-an", "-loop", "0"
+        ],
+        description="Good-looking GIF for chat and docs",
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".gif"]
+    ),
+    Recipe(
+        name="GIF 320px (10 fps, small)",
+        category="gif",
+        extension=".gif",
+        ffmpeg_args=[
+            "-filter_complex",
+            "[0:v]fps=10,scale=320:-2:flags=lanczos,split[a][b];"
+            "[a]palettegen=max_colors=128:stats_mode=diff[p];"
+            "[b][p]paletteuse=dither=bayer:bayer_scale=5:diff_mode=rectangle[out]",
+            "-map", "[out]", "-an", "-loop", "0"
+        ],
+        description="Small file size for quick reactions and previews",
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".gif"]
+    ),
+    Recipe(
+        name="GIF 720px (15 fps, high quality)",
+        category="gif",
+        extension=".gif",
+        ffmpeg_args=[
+            "-filter_complex",
+            "[0:v]fps=15,scale=720:-2:flags=lanczos,split[a][b];"
+            "[a]palettegen=stats_mode=full[p];"
+            "[b][p]paletteuse=dither=sierra2_4a[out]",
+            "-map", "[out]", "-an", "-loop", "0"
+        ],
+        description="Large, smooth GIF with high quality dithering",
+        input_extensions=[".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".gif"]
+    ),
+]
+
 
 # All built-in recipes
 BUILTIN_RECIPES = {
@@ -656,14 +809,62 @@ BUILTIN_RECIPES = {
     "remux": REMUX_RECIPES,
     "youtube": YOUTUBE_RECIPES,
     "shortform": SHORTFORM_RECIPES,
+    "thumbnail": THUMBNAIL_RECIPES,
+    "trim": TRIM_RECIPES,
+    "gif": GIF_RECIPES,
 }
 
 
+def get_input_args(recipe: Recipe) -> list[str]:
+    """FFmpeg input options for a recipe's optional time range.
+
+    options["start"] / options["end"] (seconds) are applied before -i, so
+    only that part of the input is read and decoded.
+    """
+    start = recipe.options.get("start")
+    end = recipe.options.get("end")
+    args = []
+    if start:
+        args += ["-ss", f"{float(start):.3f}"]
+    if end is not None:
+        args += ["-t", f"{float(end) - float(start or 0):.3f}"]
+    return args
+
+
+def get_range_duration(duration: float | None, recipe: Recipe) -> float | None:
+    """Length of the part of an input a recipe will process."""
+    start = float(recipe.options.get("start") or 0)
+    end = recipe.options.get("end")
+    if end is not None:
+        end = float(end) if duration is None else min(float(end), duration)
+    else:
+        end = duration
+    if end is None:
+        return None
+    return max(0.0, end - start)
+
+
 def get_recipes_by_category(category: str) -> list[Recipe]:
     """Get all recipes for a specific category."""
     return BUILTIN_RECIPES.get(category, [])
 
 
+def find_recipe(name: str, category: str | None = None) -> Recipe | None:
+    """Find a built-in recipe by name, optionally restricted to a category.
+
+    Names are matched case-insensitively. Some names exist in more than one
+    category, in which case the first match in menu order is returned unless
+    a category is given.
+    """
+    wanted = name.strip().lower()
+    categories = [category] if category else list(BUILTIN_RECIPES)
+    for cat in categories:
+        for recipe in get_recipes_by_category(cat):
+            if recipe.name.lower() == wanted:
+                return recipe
+    return None
+
+
 def get_all_recipes() -> dict[str, list[Recipe]]:
     """Get all built-in recipes organized by category."""
     return BUILTIN_RECIPES.copy()
@@ -0,0 +1,86 @@
+"""User settings for MONICA (settings.json in the working directory)."""
+
+import json
+import tempfile
+from dataclasses import dataclass, asdict, field, fields
+from pathlib import Path
+from typing import Optional
+
+
+SETTINGS_FILE = "settings.json"
+
+
+@dataclass
+class Settings:
+    """Tunable behaviour that isn't part of a recipe."""
+    scratch_dir: Optional[str] = None  # Fast local directory (default: system temp)
+
+    # Import folder scanning
+    scan_recursive: bool = False  # Include files in subfolders
+    scan_include: list[str] = field(default_factory=list)  # Glob patterns files must match
+    scan_exclude: list[str] = field(default_factory=list)  # Glob patterns for files/folders to skip
+
+    # Input staging for slow/network import directories
+    staging_enabled: bool = False
+    staging_mode: str = "copy"  # "copy" to scratch, or "cache" (read ahead into the page cache)
+    staging_lookahead: int = 2  # Upcoming inputs staged while the current job runs
+    staging_max_mb: int = 8192  # Scratch space used by staged copies at once
+    staging_bandwidth_mbps: Optional[float] = None  # Copy speed limit in MB/s (None = unlimited)
+
+    # Encode into scratch and move finished outputs to the export directory in the background
+    write_behind: bool = False
+
+    # Job metrics (see monica.metrics)
+    metrics_port: Optional[int] = None  # Serve OpenMetrics on http://127.0.0.1:<port>/metrics
+    metrics_textfile: Optional[str] = None  # Also write them to this file after every item
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Settings":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+    def get_scratch_dir(self) -> Path:
+        """The scratch directory, created if needed."""
+        path = Path(self.scratch_dir) if self.scratch_dir else Path(tempfile.gettempdir()) / "monica"
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+
+def load_settings(settings_file: Path) -> Settings:
+    """Load settings from a JSON file (defaults if missing or invalid)."""
+    if not settings_file.exists():
+        return Settings()
+
+    try:
+        with open(settings_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return Settings.from_dict(data)
+    except (OSError, json.JSONDecodeError, AttributeError, TypeError):
+        return Settings()
+
+
+def save_settings(settings: Settings, settings_file: Path) -> bool:
+    """Save settings to a JSON file."""
+    try:
+        with open(settings_file, "w", encoding="utf-8") as f:
+            json.dump(settings.to_dict(), f, indent=2)
+        return True
+    except Exception:
+        return False
+
+
+# Global settings instance
+_settings = None
+
+
+def get_settings(settings_file: Path = None) -> Settings:
+    """Get the global settings, loading them on first use."""
+    global _settings
+    if _settings is None:
+        if settings_file is None:
+            settings_file = Path().resolve() / SETTINGS_FILE
+        _settings = load_settings(Path(settings_file))
+    return _settings
@@ -0,0 +1,213 @@
+"""Prefetch upcoming inputs from slow (network) storage while jobs run."""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from monica.logger import get_logger
+from monica.settings import Settings
+
+
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# Space always left free on the scratch filesystem
+SCRATCH_RESERVE_BYTES = 1024 * 1024 * 1024
+
+
+def _throttle(copied: int, started: float, bandwidth: float | None) -> None:
+    """Sleep so that `copied` bytes since `started` stay under `bandwidth` bytes/s."""
+    if not bandwidth:
+        return
+    ahead = copied / bandwidth - (time.monotonic() - started)
+    if ahead > 0:
+        time.sleep(ahead)
+
+
+class InputStager:
+    """Stage the next few inputs of a queue in a background thread.
+
+    In "copy" mode inputs are copied to a private scratch directory and jobs
+    read the local copy; in "cache" mode they are only read ahead so the OS
+    page cache holds them when the job starts. The first input is not
+    staged (its job starts right away), and the amount staged at once is
+    bounded by `lookahead` files and `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        files: list[Path],
+        scratch_dir: Path,
+        mode: str = "copy",
+        lookahead: int = 2,
+        max_bytes: int = 8 * 1024 ** 3,
+        bandwidth: float | None = None
+    ):
+        self.files = list(files)
+        self._queued = set(self.files)
+        self.mode = mode
+        self.lookahead = max(1, lookahead)
+        self.max_bytes = max_bytes
+        self.bandwidth = bandwidth
+        self.stage_dir = None
+        if mode == "copy":
+            self.stage_dir = Path(tempfile.mkdtemp(prefix="monica_stage_", dir=scratch_dir))
+
+        self._cond = threading.Condition()
+        self._staged: dict[Path, Path] = {}  # original -> local copy (or itself in cache mode)
+        self._sizes: dict[Path, int] = {}
+        self._in_progress: Path | None = None
+        self._skipped: set[Path] = set()
+        self._released = 0
+        self._used_bytes = 0
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "InputStager":
+        self._thread.start()
+        return self
+
+    def _can_stage(self, index: int, size: int) -> bool:
+        """Whether the window and space bounds allow staging files[index] now."""
+        if index - self._released > self.lookahead:
+            return False
+        return self._used_bytes + size <= self.max_bytes
+
+    def _scratch_has_room(self, size: int) -> bool:
+        if self.stage_dir is None:
+            return True
+        return shutil.disk_usage(self.stage_dir).free - size >= SCRATCH_RESERVE_BYTES
+
+    def _run(self) -> None:
+        logger = get_logger()
+        for index, source in enumerate(self.files[1:], 1):
+            try:
+                size = source.stat().st_size
+            except OSError:
+                continue
+            if size > self.max_bytes:
+                continue
+
+            with self._cond:
+                while not self._stop and not self._can_stage(index, size):
+                    self._cond.wait()
+                if self._stop:
+                    return
+                if source in self._skipped or not self._scratch_has_room(size):
+                    continue
+                self._in_progress = source
+                self._used_bytes += size
+
+            staged = None
+            try:
+                staged = self._stage(source, index)
+            except OSError as e:
+                logger.warning(f"Could not stage {source.name}: {e}")
+
+            with self._cond:
+                self._in_progress = None
+                if staged is not None and not self._stop:
+                    self._staged[source] = staged
+                    self._sizes[source] = size
+                    logger.debug(f"Staged {source.name} ({self.mode})")
+                else:
+                    self._used_bytes -= size
+                    if staged is not None and staged != source:
+                        staged.unlink(missing_ok=True)
+                self._cond.notify_all()
+
+    def _stage(self, source: Path, index: int) -> Path | None:
+        """Copy (or read ahead) one file; returns None if stopped midway."""
+        started = time.monotonic()
+        copied = 0
+
+        if self.mode == "cache":
+            with open(source, "rb", buffering=0) as f:
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                while not self._stop:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        return source
+                    copied += len(chunk)
+                    _throttle(copied, started, self.bandwidth)
+            return None
+
+        target = self.stage_dir / f"{index:04d}_{source.name}"
+        partial = target.with_name(target.name + ".part")
+        try:
+            with open(source, "rb") as src, open(partial, "wb") as dst:
+                while not self._stop:
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    copied += len(chunk)
+                    _throttle(copied, started, self.bandwidth)
+                else:
+                    return None
+            shutil.copystat(source, partial)
+            os.replace(partial, target)
+            return target
+        finally:
+            partial.unlink(missing_ok=True)
+
+    def get(self, source: Path) -> Path:
+        """Path a job should read for an input.
+
+        Waits if the input is being staged right now; inputs not staged yet
+        are skipped and read from their original location.
+        """
+        with self._cond:
+            while self._in_progress == source and not self._stop:
+                self._cond.wait()
+            if source in self._staged:
+                return self._staged[source]
+            self._skipped.add(source)
+            return source
+
+    def release(self, source: Path) -> None:
+        """Mark an input's job as finished and free its staged copy."""
+        if source not in self._queued:
+            return
+        with self._cond:
+            self._released += 1
+            staged = self._staged.pop(source, None)
+            self._used_bytes -= self._sizes.pop(source, 0)
+            self._cond.notify_all()
+        if staged is not None and staged != source:
+            staged.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Stop staging and delete all staged copies."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._staged.clear()
+        if self.stage_dir is not None:
+            shutil.rmtree(self.stage_dir, ignore_errors=True)
+
+    def __enter__(self) -> "InputStager":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def create_stager(files: list[Path], settings: Settings) -> InputStager | None:
+    """Start staging for a queue if enabled in the settings."""
+    if not settings.staging_enabled or len(files) < 2:
+        return None
+    bandwidth = settings.staging_bandwidth_mbps * 1024 * 1024 if settings.staging_bandwidth_mbps else None
+    return InputStager(
+        files,
+        settings.get_scratch_dir(),
+        mode=settings.staging_mode,
+        lookahead=settings.staging_lookahead,
+        max_bytes=settings.staging_max_mb * 1024 * 1024,
+        bandwidth=bandwidth,
+    ).start()
@@ -0,0 +1,165 @@
+"""Keyframe-only thumbnail and contact-sheet generation."""
+
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from colorama import Fore, Style
+
+from monica.executor import generate_output_filename, unique_output_path
+from monica.logger import get_logger
+from monica.probe import probe_media
+from monica.profiling import profiled
+from monica.recipes import Recipe
+
+
+# Parallel FFmpeg processes when generating sheets for many files
+DEFAULT_WORKERS = min(8, os.cpu_count() or 2)
+
+# Per-file timeout; keyframe-only decoding keeps sheets fast even for long files
+SHEET_TIMEOUT = 300
+
+
+def sprite_timestamps(duration: float | None, count: int) -> list[float]:
+    """Evenly spaced timestamps (centre of each slice) across the duration."""
+    if not duration or duration <= 0:
+        return [0.0]
+    step = duration / count
+    return [round(step * (i + 0.5), 3) for i in range(count)]
+
+
+def build_sprite_command(
+    ffmpeg_path: str,
+    input_file: Path,
+    output_file: Path,
+    recipe: Recipe,
+    duration: float | None
+) -> list[str]:
+    """Build an FFmpeg command that tiles keyframes into one image.
+
+    Each tile is a separate input seeked (fast, demuxer-level) to its
+    timestamp with `-skip_frame nokey`, so only one keyframe per tile is
+    ever decoded instead of the whole file.
+    """
+    columns = recipe.options.get("columns", 4)
+    rows = recipe.options.get("rows", 4)
+    width = recipe.options.get("width", 320)
+
+    timestamps = sprite_timestamps(duration, columns * rows)
+    if len(timestamps) == 1:
+        columns = rows = 1
+
+    cmd = [ffmpeg_path, "-hide_banner", "-nostdin", "-loglevel", "error"]
+    for ts in timestamps:
+        # -noaccurate_seek keeps the keyframe at/before ts instead of
+        # discarding it and decoding on to the next one
+        cmd += ["-skip_frame", "nokey", "-noaccurate_seek", "-ss", f"{ts:.3f}", "-i", str(input_file)]
+
+    chains = [
+        f"[{i}:v:0]trim=end_frame=1,setpts=PTS-STARTPTS,scale={width}:-2,setsar=1[t{i}]"
+        for i in range(len(timestamps))
+    ]
+    labels = "".join(f"[t{i}]" for i in range(len(timestamps)))
+    chains.append(f"{labels}concat=n={len(timestamps)}:v=1:a=0,tile={columns}x{rows}[sheet]")
+
+    cmd += [
+        "-filter_complex", ";".join(chains),
+        "-map", "[sheet]",
+        "-frames:v", "1",
+        "-y",
+        *recipe.ffmpeg_args,
+        str(output_file),
+    ]
+    return cmd
+
+
+def run_thumbnail_job(
+    ffmpeg_path: str,
+    input_file: Path,
+    output_file: Path,
+    recipe: Recipe
+) -> tuple[bool, str]:
+    """Generate a contact sheet for one file (no progress display).
+
+    Returns:
+        Tuple of (success, error_message)
+    """
+    info = probe_media(ffmpeg_path, input_file)
+    if not info.has_video:
+        return False, "No video stream found"
+
+    cmd = build_sprite_command(ffmpeg_path, input_file, output_file, recipe, info.duration)
+    get_logger().debug(f"Running command: {' '.join(cmd)}")
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=SHEET_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return False, "Process timed out"
+    except OSError as e:
+        return False, str(e)
+
+    if result.returncode != 0:
+        return False, result.stderr.strip() or f"FFmpeg exited with code {result.returncode}"
+    return True, ""
+
+
+@profiled
+def execute_thumbnail_jobs(
+    ffmpeg_path: str,
+    files: list[Path],
+    recipe: Recipe,
+    export_dir: Path,
+    workers: int = DEFAULT_WORKERS
+) -> bool:
+    """Generate contact sheets for many files in parallel.
+
+    Unlike execute_jobs, a failure does not stop the batch; every file is
+    attempted and failures are reported at the end.
+
+    Returns:
+        True if all sheets were generated, False otherwise
+    """
+    logger = get_logger()
+    logger.job_start([str(f) for f in files], recipe.name, recipe.category)
+
+    total = len(files)
+    print(f"\n{Fore.CYAN}Generating {total} sheet(s) with '{recipe.name}' "
+          f"({workers} at a time)...{Style.RESET_ALL}")
+
+    failed = []
+    used_outputs = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for input_file in files:
+            # Names are reserved here, before any worker writes, so same-named
+            # inputs from different folders get their own sheets
+            output_file = unique_output_path(
+                generate_output_filename(input_file, recipe, export_dir), used_outputs
+            )
+            item_id = logger.item_start(input_file.name, input_file)
+            future = pool.submit(run_thumbnail_job, ffmpeg_path, input_file, output_file, recipe)
+            futures[future] = input_file, output_file, item_id
+
+        for done, future in enumerate(as_completed(futures), 1):
+            input_file, output_file, item_id = futures[future]
+            success, error = future.result()
+            logger.item_end(input_file.name, success, output_path=output_file, error=error or None,
+                            item_id=item_id)
+
+            if success:
+                print(f"{Fore.CYAN}[{done}/{total}]{Style.RESET_ALL} {input_file.name} "
+                      f"{Fore.GREEN}Done{Style.RESET_ALL}")
+            else:
+                failed.append(input_file)
+                logger.error(f"Error processing {input_file.name}: {error}")
+                print(f"{Fore.CYAN}[{done}/{total}]{Style.RESET_ALL} {input_file.name} "
+                      f"{Fore.RED}Failed{Style.RESET_ALL}")
+
+    logger.job_end(not failed, recipe.name)
+
+    if failed:
+        print(f"\n{Fore.RED}{len(failed)} of {total} file(s) failed. See logs for details.{Style.RESET_ALL}")
+        return False
+
+    print(f"\n{Fore.GREEN}All {total} sheet(s) generated successfully!{Style.RESET_ALL}")
+    return True
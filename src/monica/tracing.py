@@ -0,0 +1,163 @@
+"""Lightweight tracing of MONICA's own stages, exported as Chrome trace JSON.
+
+Wrap a stage in `with span("name", key=value):`. Spans nest by time on
+each thread, and carry monotonic start/end times and attributes. Tracing
+is off unless started with `monica --trace`; a disabled span() only
+checks a flag. Open the exported file in chrome://tracing or
+https://ui.perfetto.dev.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+# Spans kept per session; later ones are counted but not recorded
+MAX_SPANS = 200_000
+
+
+class _NoSpan:
+    """Stand-in for span() while tracing is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Span:
+    """A timed stage; use as a context manager."""
+
+    __slots__ = ("tracer", "name", "attributes", "start_ns", "end_ns", "thread_id")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: dict):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.thread_id = 0
+
+    def set(self, **attributes) -> None:
+        """Add attributes, e.g. results only known at the end."""
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        self.thread_id = threading.get_ident()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.tracer._finish(self)
+        return False
+
+
+class Tracer:
+    """Collects finished spans while enabled."""
+
+    def __init__(self):
+        self.enabled = False
+        self.spans: list[Span] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._thread_names: dict[int, str] = {}
+
+    def start(self) -> None:
+        self.enabled = True
+
+    def _finish(self, span: Span) -> None:
+        with self._lock:
+            if len(self.spans) >= MAX_SPANS:
+                self.dropped += 1
+                return
+            self.spans.append(span)
+            if span.thread_id not in self._thread_names:
+                self._thread_names[span.thread_id] = threading.current_thread().name
+
+    def to_chrome_trace(self) -> dict:
+        """The spans as a Chrome trace-event document ("X" events, microseconds)."""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+            thread_names = dict(self._thread_names)
+            dropped = self.dropped
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in thread_names.items()
+        ]
+        for span in spans:
+            events.append({
+                "name": span.name,
+                "cat": span.name.split(".")[0],
+                "ph": "X",
+                "ts": span.start_ns / 1000,
+                "dur": (span.end_ns - span.start_ns) / 1000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": span.attributes,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"dropped_spans": dropped}}
+
+    def export(self, path: Path) -> tuple[bool, str]:
+        """Write the Chrome trace JSON (atomically).
+
+        Returns:
+            Tuple of (success, error_message)
+        """
+        path = Path(path)
+        temp_file = path.with_name(path.name + ".tmp")
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(self.to_chrome_trace(), f, default=str)
+            os.replace(temp_file, path)
+        except OSError as e:
+            temp_file.unlink(missing_ok=True)
+            return False, str(e)
+        return True, ""
+
+
+def trace_path(logs_dir: Path) -> Path:
+    """Where this session's trace is exported."""
+    return Path(logs_dir) / f"trace-{time.strftime('%Y%m%d-%H%M%S')}.json"
+
+
+# Global tracer instance
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Get the global tracer."""
+    return _tracer
+
+
+def span(name: str, **attributes):
+    """Time a stage: `with span("encode", file=name) as s: ...; s.set(exit_code=0)`."""
+    if not _tracer.enabled:
+        return _NO_SPAN
+    return Span(_tracer, name, attributes)
+
+
+def traced(name: str):
+    """Decorator: run the whole function in a span."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return func(*args, **kwargs)
+            with Span(_tracer, name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
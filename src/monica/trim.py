@@ -0,0 +1,296 @@
+"""Smart-cut trimming: stream-copy between keyframes, re-encode only the edges."""
+
+import re
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from monica.executor import ProgressIndicator
+from monica.logger import get_logger
+from monica.probe import MediaInfo, probe_media
+from monica.recipes import Recipe
+
+
+# Encoder to use for each source codec when re-encoding the cut edges
+EDGE_ENCODERS = {
+    "h264": "libx264",
+    "hevc": "libx265",
+    "vp9": "libvpx-vp9",
+    "vp8": "libvpx",
+    "mpeg4": "mpeg4",
+    "mpeg2video": "mpeg2video",
+}
+
+# FFmpeg profile names (as probed) to x264/x265 -profile:v values
+ENCODER_PROFILES = {
+    "constrained baseline": "baseline",
+    "baseline": "baseline",
+    "main": "main",
+    "high": "high",
+    "high 10": "high10",
+    "high 4:2:2": "high422",
+    "high 4:4:4 predictive": "high444",
+    "main 10": "main10",
+}
+
+# Codecs whose segments can be joined as MPEG-TS (parameter sets in-band)
+TS_CODECS = {"h264", "hevc", "mpeg2video"}
+
+# Timestamps closer than this are treated as equal (seconds)
+EPSILON = 0.002
+
+STEP_TIMEOUT = 3600
+
+
+@dataclass
+class Segment:
+    """One piece of a smart cut."""
+    start: float
+    end: float
+    copy: bool  # True = stream copy, False = re-encode
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def parse_timestamp(text: str) -> float:
+    """Parse "SS", "MM:SS" or "HH:MM:SS" (with optional fraction) to seconds.
+
+    Raises:
+        ValueError: If the text is not a valid timestamp
+    """
+    text = text.strip()
+    if not re.fullmatch(r"\d+(:\d{1,2}){0,2}(\.\d+)?", text):
+        raise ValueError(f"Invalid timestamp: {text!r}")
+
+    seconds = 0.0
+    for part in text.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def plan_smart_cut(start: float, end: float, keyframes: list[float]) -> list[Segment]:
+    """Split [start, end) into re-encoded edges and a stream-copied middle.
+
+    The middle runs from the first keyframe at/after start to the last
+    keyframe at/before end; everything outside it is a partial GOP that
+    must be re-encoded for a frame-accurate cut.
+    """
+    inside = [k for k in keyframes if start - EPSILON <= k <= end + EPSILON]
+    if len(inside) < 2:
+        return [Segment(start, end, copy=False)]
+
+    first_key, last_key = inside[0], inside[-1]
+    segments = []
+    if first_key - start > EPSILON:
+        segments.append(Segment(start, first_key, copy=False))
+    segments.append(Segment(first_key, last_key, copy=True))
+    if end - last_key > EPSILON:
+        segments.append(Segment(last_key, end, copy=False))
+    return segments
+
+
+def list_keyframes(
+    ffmpeg_path: str,
+    input_file: Path,
+    start: float,
+    end: float,
+    start_time: float = 0.0
+) -> list[float]:
+    """List video keyframe times (relative to the file start) within a range.
+
+    Only keyframes are decoded (-skip_frame nokey), and reading stops as soon
+    as a keyframe past `end` is seen.
+    """
+    cmd = [
+        ffmpeg_path, "-hide_banner", "-nostdin",
+        "-skip_frame", "nokey", "-copyts",
+        "-ss", f"{start:.3f}", "-noaccurate_seek",
+        "-i", str(input_file),
+        "-map", "0:v:0", "-vf", "showinfo", "-f", "null", "-",
+    ]
+
+    keyframes = []
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    try:
+        for line in process.stderr:
+            match = re.search(r"pts_time:\s*(-?[\d.]+)", line)
+            if not match:
+                continue
+            ts = float(match.group(1)) - start_time
+            keyframes.append(ts)
+            if ts > end:
+                break
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+
+    return keyframes
+
+
+def edge_encoder_args(info: MediaInfo, recipe: Recipe) -> list[str]:
+    """Encoder settings for the re-encoded edges, matched to the source stream."""
+    encoder = EDGE_ENCODERS.get(info.video_codec or "", "libx264")
+    args = ["-c:v", encoder]
+
+    profile = ENCODER_PROFILES.get((info.video_profile or "").lower())
+    if profile and encoder in ("libx264", "libx265"):
+        args += ["-profile:v", profile]
+    if info.pix_fmt:
+        args += ["-pix_fmt", info.pix_fmt]
+
+    if encoder in ("libx264", "libx265", "libvpx-vp9", "libvpx"):
+        args += ["-crf", str(recipe.options.get("crf", 18))]
+        if encoder.startswith("libvpx"):
+            args += ["-b:v", "0"]
+    elif info.video_bitrate_kbps:
+        args += ["-b:v", f"{info.video_bitrate_kbps}k"]
+    return args
+
+
+def build_segment_command(
+    ffmpeg_path: str,
+    input_file: Path,
+    segment: Segment,
+    segment_file: Path,
+    encoder_args: list[str]
+) -> list[str]:
+    """Build the command that writes one video-only segment."""
+    if segment.copy:
+        # Nudge past the keyframe so rounding can't seek to the previous GOP,
+        # and stop just short of the closing keyframe (the tail starts there)
+        seek = segment.start + EPSILON / 2
+        duration = segment.duration - EPSILON
+        codec_args = ["-c:v", "copy"]
+    else:
+        seek = segment.start
+        duration = segment.duration
+        codec_args = encoder_args
+
+    return [
+        ffmpeg_path, "-hide_banner", "-nostdin", "-loglevel", "error",
+        "-ss", f"{seek:.3f}",
+        "-i", str(input_file),
+        "-t", f"{duration:.3f}",
+        "-map", "0:v:0", "-an", "-sn",
+        *codec_args,
+        "-y", str(segment_file),
+    ]
+
+
+def build_join_command(
+    ffmpeg_path: str,
+    list_file: Path,
+    input_file: Path,
+    start: float,
+    end: float,
+    output_file: Path,
+    recipe: Recipe
+) -> list[str]:
+    """Join the video segments and stream-copy the original audio for the range."""
+    return [
+        ffmpeg_path, "-hide_banner", "-nostdin", "-loglevel", "error",
+        "-f", "concat", "-safe", "0", "-i", str(list_file),
+        "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-i", str(input_file),
+        "-map", "0:v", "-map", "1:a?",
+        "-c", "copy",
+        *recipe.ffmpeg_args,
+        "-y", str(output_file),
+    ]
+
+
+def concat_list(files: list[Path]) -> str:
+    """Contents of a concat demuxer list file."""
+    lines = []
+    for f in files:
+        escaped = f.as_posix().replace("'", "'\\''")
+        lines.append(f"file '{escaped}'\n")
+    return "".join(lines)
+
+
+def _run_step(cmd: list[str]) -> tuple[bool, str]:
+    get_logger().debug(f"Running command: {' '.join(cmd)}")
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=STEP_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return False, "Process timed out"
+    except OSError as e:
+        return False, str(e)
+    if result.returncode != 0:
+        return False, result.stderr.strip() or f"FFmpeg exited with code {result.returncode}"
+    return True, ""
+
+
+def run_trim_job(
+    ffmpeg_path: str,
+    input_file: Path,
+    output_file: Path,
+    recipe: Recipe
+) -> tuple[bool, str]:
+    """Trim one file to recipe.options["start"]..["end"] with a smart cut.
+
+    Returns:
+        Tuple of (success, error_message)
+    """
+    logger = get_logger()
+    spinner = ProgressIndicator("Finding keyframes")
+    spinner.start()
+
+    try:
+        info = probe_media(ffmpeg_path, input_file)
+        if not info.has_video:
+            return False, "No video stream found"
+
+        start = float(recipe.options.get("start") or 0)
+        end = recipe.options.get("end")
+        end = float(end) if end is not None else info.duration
+        if end is None:
+            return False, "Could not determine the end time"
+        if info.duration:
+            end = min(end, info.duration)
+        if end <= start:
+            return False, "End time must be after start time"
+
+        keyframes = list_keyframes(ffmpeg_path, input_file, start, end, info.start_time or 0.0)
+        segments = plan_smart_cut(start, end, keyframes)
+        copied = sum(s.duration for s in segments if s.copy)
+        logger.info(f"Smart cut {input_file.name}: {len(segments)} segment(s), "
+                    f"{copied:.1f}s of {end - start:.1f}s stream-copied")
+
+        suffix = ".ts" if info.video_codec in TS_CODECS else ".mkv"
+        encoder_args = edge_encoder_args(info, recipe)
+
+        with tempfile.TemporaryDirectory(prefix=".monica_trim_", dir=output_file.parent) as tmp:
+            tmp_dir = Path(tmp)
+            segment_files = []
+            for i, segment in enumerate(segments):
+                spinner.update_message(
+                    f"{'Copying' if segment.copy else 'Re-encoding'} segment {i + 1}/{len(segments)}"
+                )
+                segment_file = tmp_dir / f"segment_{i:02d}{suffix}"
+                ok, error = _run_step(
+                    build_segment_command(ffmpeg_path, input_file, segment, segment_file, encoder_args)
+                )
+                if not ok:
+                    return False, error
+                segment_files.append(segment_file)
+
+            list_file = tmp_dir / "segments.txt"
+            list_file.write_text(concat_list(segment_files), encoding="utf-8")
+
+            spinner.update_message("Joining")
+            ok, error = _run_step(
+                build_join_command(ffmpeg_path, list_file, input_file, start, end, output_file, recipe)
+            )
+            if not ok:
+                return False, error
+
+        return True, ""
+
+    except Exception as e:
+        return False, str(e)
+    finally:
+        spinner.stop()
@@ -0,0 +1,358 @@
+"""Watch-folder mode: convert files as they are dropped into the import folder.
+
+On Linux the import folder is watched with inotify (through ctypes, no
+extra dependency); elsewhere, or if inotify isn't usable, it's polled.
+A file is only handed on once it's completely written: its size and mtime
+must stay unchanged for `settle_seconds` after its last event. With
+inotify, a file that was written to but not yet closed (the writer may
+just be stalled) has to stay unchanged several times longer. Files that
+become ready close together are collected into one batch.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+from monica.file_selector import matches_patterns, scan_directory
+from monica.logger import get_logger
+
+
+# Seconds a file's size and mtime must stay unchanged before it's converted
+SETTLE_SECONDS = 2.0
+
+# Files inotify saw written but not closed must stay unchanged this many
+# times longer
+OPEN_SETTLE_FACTOR = 5
+
+# Files that become ready within this many seconds of each other share a batch
+BATCH_WINDOW = 5.0
+MAX_BATCH = 100
+
+POLL_INTERVAL = 2.0
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Report file activity under a directory using inotify.
+
+    read() returns (path, closed) pairs: `closed` is True when the writer
+    closed the file or it was moved in whole, False for creation and
+    writes that may still be in progress, None for files found in a newly
+    created folder.
+    """
+
+    def __init__(self, directory: Path, recursive: bool = False, exclude: list[str] = None):
+        self.directory = Path(directory)
+        self.recursive = recursive
+        self.exclude = exclude or []
+        self._libc = _load_libc()
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: dict[int, Path] = {}
+        try:
+            self._add_tree(self.directory)
+        except OSError:
+            self.close()
+            raise
+
+    @staticmethod
+    def available() -> bool:
+        """Whether inotify can be used on this system."""
+        return sys.platform.startswith("linux") and _load_libc() is not None
+
+    def _add_watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_add_watch failed: {os.strerror(err)}", str(directory))
+        self._watches[wd] = directory
+
+    def _add_tree(self, directory: Path) -> list[Path]:
+        """Watch a directory (and its subdirectories if recursive).
+
+        Returns:
+            Files already inside, for directories that appear while watching
+        """
+        self._add_watch(directory)
+        found = []
+        if self.recursive:
+            pending = [directory]
+            while pending:
+                current = pending.pop()
+                try:
+                    with os.scandir(current) as entries:
+                        for entry in entries:
+                            path = Path(entry.path)
+                            rel_path = path.relative_to(self.directory).as_posix()
+                            if entry.is_dir(follow_symlinks=False):
+                                if matches_patterns(rel_path, entry.name, self.exclude):
+                                    continue
+                                self._add_watch(path)
+                                pending.append(path)
+                            elif entry.is_file():
+                                found.append(path)
+                except OSError:
+                    continue
+        return found
+
+    def read(self, timeout: float) -> list[tuple[Path, bool | None]]:
+        """Wait up to `timeout` seconds for activity."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        activity = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                activity.extend(self._handle_event(wd, mask, os.fsdecode(name)))
+        return activity
+
+    def _handle_event(self, wd: int, mask: int, name: str) -> list[tuple[Path, bool | None]]:
+        if mask & IN_Q_OVERFLOW:
+            get_logger().warning("Watch: event queue overflowed; some new files may be missed")
+            return []
+        if mask & IN_IGNORED:
+            self._watches.pop(wd, None)
+            return []
+        directory = self._watches.get(wd)
+        if directory is None or not name:
+            return []
+        path = directory / name
+
+        if mask & IN_ISDIR:
+            rel_path = path.relative_to(self.directory).as_posix()
+            if self.recursive and mask & (IN_CREATE | IN_MOVED_TO) \
+                    and not matches_patterns(rel_path, name, self.exclude):
+                try:
+                    # Files can land in a new folder before its watch exists
+                    return [(f, None) for f in self._add_tree(path)]
+                except OSError as e:
+                    get_logger().warning(f"Watch: can't watch {path}: {e}")
+            return []
+        return [(path, bool(mask & (IN_CLOSE_WRITE | IN_MOVED_TO)))]
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """Report file activity by rescanning a directory periodically.
+
+    read() returns (path, None) pairs: whether a file is still open isn't
+    known.
+    """
+
+    def __init__(self, directory: Path, recursive: bool = False, exclude: list[str] = None,
+                 interval: float = POLL_INTERVAL):
+        self.directory = Path(directory)
+        self.recursive = recursive
+        self.exclude = exclude or []
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, float]]:
+        return {
+            entry.path: (entry.size, entry.mtime)
+            for entry in scan_directory(self.directory, None, self.recursive, None, self.exclude)
+        }
+
+    def read(self, timeout: float) -> list[tuple[Path, None]]:
+        """Wait up to `timeout` seconds (at most one poll interval) for changes."""
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._scan()
+        changed = [(path, None) for path, stat in snapshot.items() if self._snapshot.get(path) != stat]
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def _load_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def create_watcher(directory: Path, recursive: bool = False, exclude: list[str] = None,
+                   polling: bool = False):
+    """Watch with inotify when possible, otherwise by polling."""
+    if not polling and InotifyWatcher.available():
+        try:
+            return InotifyWatcher(directory, recursive, exclude)
+        except OSError as e:
+            # e.g. the inotify watch limit, or a file system without inotify support
+            get_logger().warning(f"Watch: inotify unavailable ({e}); polling instead")
+    return PollingWatcher(directory, recursive, exclude)
+
+
+class PendingFiles:
+    """Files seen changing, waiting until they are completely written."""
+
+    def __init__(self, settle_seconds: float = SETTLE_SECONDS):
+        self.settle_seconds = settle_seconds
+        # path -> (time of last activity, quiet time needed, (size, mtime) then)
+        self._files: dict[Path, tuple[float, float, tuple[int, float] | None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def touch(self, path: Path, now: float, closed: bool | None = None) -> None:
+        """Record activity on a file (restarts its settle time).
+
+        Args:
+            closed: True if the writer closed the file, False if it may
+                still be open, None if unknown
+        """
+        quiet = self.settle_seconds * (OPEN_SETTLE_FACTOR if closed is False else 1)
+        self._files[path] = (now, quiet, _stat(path))
+
+    def ready(self, now: float) -> list[Path]:
+        """Remove and return files whose size and mtime have settled."""
+        ready = []
+        for path, (since, quiet, last_stat) in list(self._files.items()):
+            if now - since < quiet:
+                continue
+            current = _stat(path)
+            if current is None:
+                del self._files[path]  # Removed or renamed away
+            elif current == last_stat:
+                del self._files[path]
+                ready.append(path)
+            else:
+                # Changed without an event (e.g. written over NFS): wait again
+                self._files[path] = (now, quiet, current)
+        return sorted(ready)
+
+
+def _stat(path: Path) -> tuple[int, float] | None:
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return info.st_size, info.st_mtime
+
+
+def watch_folder(
+    import_dir: Path,
+    handle_batch: Callable[[list[Path]], None],
+    extensions: list[str] = None,
+    recursive: bool = False,
+    include: list[str] = None,
+    exclude: list[str] = None,
+    settle_seconds: float = SETTLE_SECONDS,
+    batch_window: float = BATCH_WINDOW,
+    max_batch: int = MAX_BATCH,
+    process_existing: bool = False,
+    polling: bool = False,
+    stop: threading.Event = None,
+    watcher=None
+) -> None:
+    """Convert files dropped into a folder until `stop` is set.
+
+    Args:
+        import_dir: Folder to watch
+        handle_batch: Called with each batch of completely written files
+        extensions: Only files with these extensions are handed on
+        recursive: Also watch subfolders
+        include: Glob patterns a file's relative path or name must match
+        exclude: Glob patterns for files and folders to ignore
+        settle_seconds: How long a file must stay unchanged
+        batch_window: Wait this long for more files before starting a batch
+        max_batch: Start a batch once it has this many files
+        process_existing: Also convert files already in the folder
+        polling: Poll instead of using inotify
+        stop: Set to stop watching
+        watcher: Watcher to use (default: create_watcher)
+    """
+    logger = get_logger()
+    stop = stop or threading.Event()
+    extensions = {e.lower() for e in extensions} if extensions else None
+    watcher = watcher or create_watcher(import_dir, recursive, exclude, polling)
+    pending = PendingFiles(settle_seconds)
+    batch: list[Path] = []
+
+    def wanted(path: Path) -> bool:
+        if extensions is not None and path.suffix.lower() not in extensions:
+            return False
+        # Partial copies of write-behind / staging / many copy tools
+        if path.name.startswith(".") or path.name.endswith((".part", ".tmp")):
+            return False
+        try:
+            rel_path = path.relative_to(import_dir).as_posix()
+        except ValueError:
+            return False
+        if exclude and matches_patterns(rel_path, path.name, exclude):
+            return False
+        return not include or matches_patterns(rel_path, path.name, include)
+
+    if process_existing:
+        now = time.monotonic()
+        for entry in scan_directory(import_dir, None, recursive, include, exclude):
+            if wanted(entry.path):
+                pending.touch(entry.path, now)
+
+    logger.info(f"Watching {import_dir} ({type(watcher).__name__})")
+    last_ready = 0.0
+    try:
+        while not stop.is_set():
+            for path, closed in watcher.read(settle_seconds if pending or batch else 1.0):
+                if wanted(path):
+                    pending.touch(path, time.monotonic(), closed)
+
+            now = time.monotonic()
+            ready = [p for p in pending.ready(now) if p not in batch]
+            if ready:
+                # Each new file extends the window, so a burst ends up in one batch
+                batch.extend(ready)
+                last_ready = now
+
+            if batch and (len(batch) >= max_batch or now - last_ready >= batch_window):
+                files, batch = batch[:max_batch], batch[max_batch:]
+                logger.info(f"Watch: converting {len(files)} new file(s)")
+                try:
+                    handle_batch(files)
+                except Exception as e:
+                    logger.error(f"Watch: batch failed: {e}")
+    finally:
+        watcher.close()
@@ -0,0 +1,204 @@
+"""Tests for src/monica/batch.py"""
+
+import pytest
+from pathlib import Path
+from unittest.mock import ANY, patch
+
+from monica.batch import (
+    is_batchable,
+    should_batch,
+    plan_batches,
+    build_batch_command,
+    run_batch,
+    execute_batched_jobs,
+    MIN_BATCH_FILES,
+)
+from monica.recipes import Recipe, find_recipe
+
+
+@pytest.fixture
+def mp3_recipe():
+    """The built-in MP3 (192 kbps) recipe."""
+    return find_recipe("MP3 (192 kbps)")
+
+
+@pytest.fixture
+def clips(tmp_path):
+    """Ten small audio clips, all different."""
+    import_dir = tmp_path / "clips"
+    import_dir.mkdir()
+    files = []
+    for i in range(10):
+        f = import_dir / f"clip{i}.wav"
+        f.write_bytes(b"RIFF" + bytes([i]) * 100)
+        files.append(f)
+    return files
+
+
+class TestIsBatchable:
+    """Tests for is_batchable function."""
+
+    def test_audio_recipe(self, mp3_recipe):
+        """Test simple audio recipes can be batched."""
+        assert is_batchable(mp3_recipe) is True
+
+    def test_video_recipe(self, sample_recipe):
+        """Test video recipes are not batched."""
+        assert is_batchable(sample_recipe) is False
+
+    def test_recipe_with_map(self):
+        """Test recipes with their own -map can't be repeated per output."""
+        recipe = Recipe(name="x", category="audio", extension=".mp3", ffmpeg_args=["-map", "0:a:1"])
+
+        assert is_batchable(recipe) is False
+
+
+class TestShouldBatch:
+    """Tests for should_batch function."""
+
+    def test_many_small_files(self, clips, mp3_recipe):
+        """Test many small files are batched."""
+        assert should_batch(clips, mp3_recipe) is True
+
+    def test_few_files(self, clips, mp3_recipe):
+        """Test a handful of files run normally."""
+        assert should_batch(clips[:MIN_BATCH_FILES - 1], mp3_recipe) is False
+
+
+class TestPlanBatches:
+    """Tests for plan_batches function."""
+
+    def test_chunks(self, clips):
+        """Test files are chunked by batch size in order."""
+        batches = plan_batches(clips, batch_size=4)
+
+        assert [len(b) for b in batches] == [4, 4, 2]
+        assert [f for b in batches for f in b] == clips
+
+    @patch("monica.batch.SMALL_FILE_BYTES", 50)
+    def test_large_files_alone(self, clips):
+        """Test large files get a batch of their own."""
+        batches = plan_batches(clips[:3], batch_size=4)
+
+        assert batches == [[clips[0]], [clips[1]], [clips[2]]]
+
+
+class TestBuildBatchCommand:
+    """Tests for build_batch_command function."""
+
+    def test_inputs_mapped_to_outputs(self, mp3_recipe):
+        """Test each input's audio is mapped to its own output."""
+        jobs = [
+            (Path("a.wav"), Path("a.mp3"), mp3_recipe),
+            (Path("b.wav"), Path("b.mp3"), mp3_recipe),
+        ]
+
+        cmd = build_batch_command("ffmpeg", jobs)
+
+        assert cmd.count("-i") == 2
+        first = cmd.index("-map")
+        second = cmd.index("-map", first + 1)
+        assert cmd[first + 1] == "0:a:0"
+        assert cmd[second - 1] == "a.mp3"
+        assert cmd[second + 1] == "1:a:0"
+        assert cmd[-1] == "b.mp3"
+        assert cmd.count("libmp3lame") == 2
+
+
+class TestRunBatch:
+    """Tests for run_batch function."""
+
+    def test_success(self, tmp_path, mp3_recipe):
+        """Test a successful batch with outputs reports no failures."""
+        out = tmp_path / "a.mp3"
+        out.write_bytes(b"ID3")
+
+        with patch("monica.batch._run", return_value=(True, "")):
+            assert run_batch("ffmpeg", [(Path("a.wav"), out, mp3_recipe)]) == {}
+
+    def test_failure_attributed(self, tmp_path, mp3_recipe):
+        """Test a failed batch is re-run per file to find the culprit."""
+        jobs = [
+            (Path("good.wav"), tmp_path / "good.mp3", mp3_recipe),
+            (Path("bad.wav"), tmp_path / "bad.mp3", mp3_recipe),
+        ]
+
+        def fake_run(cmd):
+            if "bad.wav" in cmd:
+                return False, "bad.wav: Invalid data found when processing input"
+            return True, ""
+
+        with patch("monica.batch._run", side_effect=fake_run):
+            failures = run_batch("ffmpeg", jobs)
+
+        assert list(failures) == [Path("bad.wav")]
+        assert "Invalid data" in failures[Path("bad.wav")]
+
+
+class TestExecuteBatchedJobs:
+    """Tests for execute_batched_jobs function."""
+
+    @pytest.fixture(autouse=True)
+    def mock_logger(self):
+        """One logger for the batch loop and its JobQueue; no size history on disk."""
+        with patch("monica.batch.get_logger") as mock, \
+                patch("monica.executor.get_logger", mock), \
+                patch("monica.executor.get_size_history"), \
+                patch("monica.batch.ProgressIndicator"):
+            yield mock
+
+    @patch("monica.batch.run_batch", return_value={})
+    def test_all_batches_run(self, mock_run, mock_logger, clips, mp3_recipe, tmp_export_dir):
+        """Test every batch runs and each file is logged."""
+        result = execute_batched_jobs("ffmpeg", clips, mp3_recipe, tmp_export_dir, batch_size=4)
+
+        assert result is True
+        assert mock_run.call_count == 3
+        assert mock_logger.return_value.item_end.call_count == 10
+
+    @patch("monica.batch.run_batch")
+    def test_stops_after_failed_batch(self, mock_run, mock_logger, clips, mp3_recipe, tmp_export_dir):
+        """Test processing stops after the batch with a failure."""
+        mock_run.side_effect = lambda ff, jobs: {jobs[1][0]: "boom"}
+
+        result = execute_batched_jobs("ffmpeg", clips, mp3_recipe, tmp_export_dir, batch_size=4)
+
+        assert result is False
+        assert mock_run.call_count == 1
+        mock_logger.return_value.item_end.assert_any_call(clips[1].name, False, error="boom", item_id=ANY)
+
+    @patch("monica.batch.run_batch", return_value={})
+    def test_unique_outputs(self, mock_run, mock_logger, tmp_path, mp3_recipe, tmp_export_dir):
+        """Test same-named inputs in one batch get distinct outputs."""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        files = [tmp_path / "a" / "x.wav", tmp_path / "b" / "x.wav"]
+        for n, f in enumerate(files):
+            f.write_bytes(b"RIFF" + bytes([n]))
+
+        execute_batched_jobs("ffmpeg", files, mp3_recipe, tmp_export_dir)
+
+        outputs = [job[1] for job in mock_run.call_args.args[1]]
+        assert len(set(outputs)) == 2
+
+    @patch("monica.batch.run_batch")
+    def test_duplicates_linked(self, mock_run, mock_logger, clips, mp3_recipe, tmp_export_dir):
+        """Test a duplicate input is linked to its original's output, not converted."""
+        copy = clips[0].parent / "copy0.wav"
+        copy.write_bytes(clips[0].read_bytes())
+
+        def fake_run(ffmpeg_path, jobs):
+            for _, output_file, _ in jobs:
+                output_file.write_bytes(b"mp3")
+            return {}
+        mock_run.side_effect = fake_run
+
+        result = execute_batched_jobs("ffmpeg", clips + [copy], mp3_recipe, tmp_export_dir)
+
+        encoded = [job[0] for call in mock_run.call_args_list for job in call.args[1]]
+        assert result is True
+        assert copy not in encoded
+        [linked] = tmp_export_dir.glob("copy0_*.mp3")
+        [original] = tmp_export_dir.glob("clip0_*.mp3")
+        assert linked.read_bytes() == b"mp3"
+        assert linked.stat().st_ino == original.stat().st_ino
@@ -0,0 +1,261 @@
+"""Tests for src/monica/benchmark.py"""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+from unittest.mock import patch
+
+from monica.benchmark import (
+    BenchmarkTotals,
+    find_filtergraph,
+    format_breakdown,
+    instrument_stage,
+    list_stages,
+    parse_benchmark,
+    parse_filter_timing,
+    split_filtergraph,
+    time_filters,
+)
+from monica.recipes import Recipe
+
+
+BLUR_GRAPH = (
+    "[0:v]split[bg][fg];"
+    "[bg]scale=1080:1920,boxblur=20:5[blurred];"
+    "[fg]scale=1080:-2[scaled];"
+    "[blurred][scaled]overlay=(W-w)/2:(H-h)/2[outv]"
+)
+
+
+@pytest.fixture
+def blur_recipe():
+    """A recipe with a branching filter graph."""
+    return Recipe(
+        name="Blur",
+        category="shortform",
+        extension=".mp4",
+        ffmpeg_args=["-filter_complex", BLUR_GRAPH, "-map", "[outv]", "-c:v", "libx264"],
+    )
+
+
+def bench_output(*times: float) -> str:
+    """bench=stop stderr for frames taking the given seconds."""
+    lines = []
+    for n, t in enumerate(times, 1):
+        avg = sum(times[:n]) / n
+        lines.append(f"[bench @ 0x55d0c0a0] t:{t:f} avg:{avg:f} max:{max(times[:n]):f} min:{min(times[:n]):f}")
+    return "\n".join(lines) + "\n"
+
+
+class TestSplitFiltergraph:
+    """Tests for split_filtergraph function."""
+
+    def test_chains_and_filters(self):
+        """Test chains split on ; and filters on ,."""
+        chains = split_filtergraph("[0:v]split[a][b];[a]scale=640:-2,setsar=1[out]")
+
+        assert chains == [["[0:v]split[a][b]"], ["[a]scale=640:-2", "setsar=1[out]"]]
+
+    def test_quoted_separators_kept(self):
+        """Test commas and semicolons inside quotes or escaped stay in the filter."""
+        chains = split_filtergraph(r"drawtext=text='a, b; c',scale=iw\,ih")
+
+        assert chains == [["drawtext=text='a, b; c'", r"scale=iw\,ih"]]
+
+
+class TestFindFiltergraph:
+    """Tests for find_filtergraph function."""
+
+    def test_complex_graph(self):
+        """Test a complex graph is found with media left to its labels."""
+        assert find_filtergraph(["-filter_complex", "[0:v]null[v]", "-map", "[v]"]) == (1, None)
+
+    def test_audio_filter(self):
+        """Test -af graphs filter audio."""
+        assert find_filtergraph(["-c:a", "aac", "-af", "volume=2"]) == (3, "audio")
+
+    def test_no_filters(self):
+        """Test recipes without filters return None."""
+        assert find_filtergraph(["-c:v", "libx264"]) is None
+
+
+class TestListStages:
+    """Tests for list_stages function."""
+
+    def test_branching_graph(self):
+        """Test every single-output filter is a stage, repeated names numbered."""
+        stages = list_stages(BLUR_GRAPH)
+
+        assert [s["stage"] for s in stages] == ["scale", "boxblur", "scale#2", "overlay"]
+        assert all(s["media"] == "video" for s in stages)
+
+    def test_media_follows_labels(self):
+        """Test audio chains are found from stream labels and pad labels."""
+        graph = "[0:a]aresample=48000[r];[r]volume=2[aout];[0:v]scale=640:-2[vout]"
+
+        stages = list_stages(graph)
+
+        assert [(s["stage"], s["media"]) for s in stages] == [
+            ("aresample", "audio"), ("volume", "audio"), ("scale", "video")
+        ]
+
+
+class TestInstrumentStage:
+    """Tests for instrument_stage function."""
+
+    def test_single_input_filter(self):
+        """Test a filter in a chain gets a bench pair around it."""
+        stages = list_stages(BLUR_GRAPH)
+
+        graph = instrument_stage(BLUR_GRAPH, stages[1])
+
+        assert "scale=1080:1920,bench=start,boxblur=20:5,bench=stop[blurred]" in graph
+
+    def test_multi_input_filter(self):
+        """Test a multi-input filter is timed from its main input."""
+        stages = list_stages(BLUR_GRAPH)
+
+        graph = instrument_stage(BLUR_GRAPH, stages[3])
+
+        assert graph.endswith(
+            "[blurred]bench=start[monica_bench];"
+            "[monica_bench][scaled]overlay=(W-w)/2:(H-h)/2,bench=stop[outv]"
+        )
+
+    def test_audio_filter(self):
+        """Test audio filters are wrapped in abench."""
+        graph = instrument_stage("volume=2", list_stages("volume=2", "audio")[0])
+
+        assert graph == "abench=start,volume=2,abench=stop"
+
+
+class TestParseBenchmark:
+    """Tests for parse_benchmark function."""
+
+    def test_calls_and_totals(self):
+        """Test per-call lines are summed by kind and totals read."""
+        lines = [
+            "bench:     1000 user       10 sys     1200 real decode_video 0.0 \n",
+            "bench:     3000 user       20 sys     3100 real decode_video 0.0 \n",
+            "bench:    50000 user      100 sys    51000 real encode_video 0.0 \n",
+            "bench: utime=1.250s stime=0.050s rtime=0.900s\n",
+            "bench: maxrss=123456KiB\n",
+        ]
+
+        result = parse_benchmark(lines)
+
+        assert result["stages"]["decode_video"] == {"user_s": 0.004, "sys_s": 0.00003, "real_s": 0.0043, "calls": 2}
+        assert result["stages"]["encode_video"]["calls"] == 1
+        assert result["total"] == {"utime_s": 1.25, "stime_s": 0.05, "rtime_s": 0.9, "maxrss_kb": 123456}
+
+    def test_no_output(self):
+        """Test missing output gives an empty breakdown."""
+        assert parse_benchmark([]) == {"total": {}, "stages": {}}
+
+
+class TestBenchmarkTotals:
+    """Tests for BenchmarkTotals class."""
+
+    def test_only_benchmark_lines_counted(self):
+        """Test add() takes bench: lines and hands other output back."""
+        totals = BenchmarkTotals()
+
+        taken = [
+            totals.add("bench:     1000 user       10 sys     1200 real decode_video 0.0 \n"),
+            totals.add("frame=   10 fps=0.0 time=00:00:01.00\n"),
+            totals.add("bench: maxrss=2048KiB\n"),
+        ]
+
+        assert taken == [True, False, True]
+        assert totals.result() == {
+            "total": {"maxrss_kb": 2048},
+            "stages": {"decode_video": {"user_s": 0.001, "sys_s": 0.00001, "real_s": 0.0012, "calls": 1}},
+        }
+
+    def test_clear(self):
+        """Test clear() starts the sums over."""
+        totals = BenchmarkTotals()
+        totals.add("bench:     1000 user       10 sys     1200 real decode_video 0.0 \n")
+
+        totals.clear()
+
+        assert totals.result() == {"total": {}, "stages": {}}
+
+
+class TestParseFilterTiming:
+    """Tests for parse_filter_timing function."""
+
+    def test_last_line_used(self):
+        """Test the running figures of the last frame are reported."""
+        output = "frame=    2 fps=0.0\n" + bench_output(0.002, 0.004)
+
+        timing = parse_filter_timing(output)
+
+        assert timing == {"frames": 2, "avg_ms": 3.0, "max_ms": 4.0, "min_ms": 2.0}
+
+    def test_no_frames(self):
+        """Test output without bench lines returns None."""
+        assert parse_filter_timing("frame=    0 fps=0.0\n") is None
+
+
+class TestTimeFilters:
+    """Tests for time_filters function."""
+
+    @patch("monica.benchmark.subprocess.run")
+    def test_each_stage_timed(self, mock_run, blur_recipe):
+        """Test each stage runs on a sample into the null muxer."""
+        outputs = iter([bench_output(0.001), bench_output(0.006), bench_output(0.001), bench_output(0.002)])
+        mock_run.side_effect = lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 0, "", next(outputs))
+
+        results = time_filters("ffmpeg", Path("in.mp4"), blur_recipe, sample_seconds=5)
+
+        cmd = mock_run.call_args_list[1].args[0]
+        assert cmd[1:5] == ["-t", "5.000", "-i", "in.mp4"]
+        assert "bench=start,boxblur=20:5,bench=stop" in cmd[cmd.index("-filter_complex") + 1]
+        assert cmd[-3:] == ["-f", "null", "-"]
+        assert [r["stage"] for r in results] == ["scale", "boxblur", "scale#2", "overlay"]
+        assert results[1]["avg_ms"] == 6.0
+        assert results[1]["share"] == 60.0
+
+    @patch("monica.benchmark.subprocess.run")
+    def test_failed_stage(self, mock_run, blur_recipe):
+        """Test a stage whose sample run fails reports FFmpeg's last line."""
+        mock_run.side_effect = lambda cmd, **kwargs: subprocess.CompletedProcess(
+            cmd, 1, "", "Input #0\nNo such filter: 'bench'\n"
+        )
+
+        results = time_filters("ffmpeg", Path("in.mp4"), blur_recipe)
+
+        assert results[0]["error"] == "No such filter: 'bench'"
+        assert "avg_ms" not in results[0]
+
+    def test_no_filters(self, sample_recipe):
+        """Test recipes without a filter graph have no stages."""
+        assert time_filters("ffmpeg", Path("in.mp4"), sample_recipe) == []
+
+
+class TestFormatBreakdown:
+    """Tests for format_breakdown function."""
+
+    def test_slowest_first(self):
+        """Test calls and filters are listed slowest first."""
+        breakdown = {
+            "total": {"utime_s": 3.0, "stime_s": 1.0, "rtime_s": 2.0},
+            "stages": {
+                "decode_video": {"user_s": 0.5, "sys_s": 0.0, "real_s": 0.5, "calls": 10},
+                "encode_video": {"user_s": 2.0, "sys_s": 0.0, "real_s": 1.0, "calls": 10},
+            },
+            "filters": [
+                {"stage": "scale", "media": "video", "avg_ms": 1.0, "max_ms": 2.0, "share": 20.0},
+                {"stage": "boxblur", "media": "video", "avg_ms": 4.0, "max_ms": 5.0, "share": 80.0},
+                {"stage": "overlay", "media": "video", "error": "failed"},
+            ],
+        }
+
+        lines = format_breakdown(breakdown)
+
+        assert lines[0] == "Total: 2.00 s wall, 4.00 s CPU"
+        assert lines[1].split()[0] == "encode_video"
+        assert [line.split()[0] for line in lines[4:]] == ["boxblur", "scale", "overlay"]
+        assert lines[-1].endswith("not timed: failed")
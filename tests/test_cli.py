@@ -0,0 +1,192 @@
+"""Tests for src/monica/cli.py"""
+
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from monica.cli import build_parser, run_command
+from monica.probe import MediaInfo
+from monica.settings import Settings
+
+
+class TestBuildParser:
+    """Tests for build_parser function."""
+
+    def test_no_arguments_is_interactive(self):
+        """Test no arguments leaves command unset."""
+        args = build_parser().parse_args([])
+
+        assert args.command is None
+
+    def test_run_arguments(self):
+        """Test run command arguments are parsed."""
+        args = build_parser().parse_args(
+            ["run", "-", "-", "--recipe", "MP4 (H.264)", "--container", "mpegts"]
+        )
+
+        assert args.command == "run"
+        assert args.input == "-"
+        assert args.output == "-"
+        assert args.recipe == "MP4 (H.264)"
+        assert args.container == "mpegts"
+
+    def test_run_requires_recipe(self):
+        """Test run command requires a recipe."""
+        with pytest.raises(SystemExit):
+            build_parser().parse_args(["run", "in.mp4", "out.mp4"])
+
+    def test_rejects_unknown_container(self):
+        """Test unknown containers are rejected."""
+        with pytest.raises(SystemExit):
+            build_parser().parse_args(["run", "-", "-", "-r", "Opus", "-f", "avi"])
+
+
+class TestRunCommand:
+    """Tests for run_command dispatch."""
+
+    @pytest.fixture(autouse=True)
+    def mock_logger(self):
+        """Keep the global logger out of these tests."""
+        with patch("monica.cli.get_logger") as mock:
+            yield mock
+
+    def test_unknown_recipe(self, tmp_path, capsys):
+        """Test unknown recipe exits with an error on stderr."""
+        args = build_parser().parse_args(["run", "-", "-", "-r", "No Such Recipe"])
+
+        assert run_command(args, tmp_path) == 1
+        assert "unknown recipe" in capsys.readouterr().err
+
+    def test_multi_step_recipe_rejected(self, tmp_path):
+        """Test recipes that need several steps are rejected."""
+        args = build_parser().parse_args(["run", "in.mp4", "out.mp4", "-r", "Smart Trim to MP4"])
+
+        assert run_command(args, tmp_path) == 1
+
+    def test_normalize_rejected_for_video(self, tmp_path, capsys):
+        """Test --normalize is refused for recipes that aren't audio only."""
+        args = build_parser().parse_args(["run", "-", "-", "-r", "MP4 (H.264)", "--normalize"])
+
+        assert run_command(args, tmp_path) == 1
+        assert "--normalize" in capsys.readouterr().err
+
+    @patch("monica.cli.run_stream_job", return_value=(True, ""))
+    @patch("monica.cli.resolve_ffmpeg", return_value="ffmpeg")
+    def test_run_success(self, mock_resolve, mock_run, tmp_path):
+        """Test successful run exits with 0."""
+        args = build_parser().parse_args(["run", "-", "-", "-r", "mp3 (192 kbps)"])
+
+        assert run_command(args, tmp_path) == 0
+        recipe = mock_run.call_args.args[3]
+        assert recipe.name == "MP3 (192 kbps)"
+
+    @patch("monica.cli.resolve_ffmpeg", return_value=None)
+    def test_run_without_ffmpeg(self, mock_resolve, tmp_path):
+        """Test missing FFmpeg exits with 1."""
+        args = build_parser().parse_args(["run", "-", "-", "-r", "Opus"])
+
+        assert run_command(args, tmp_path) == 1
+
+
+class TestQueryCommand:
+    """Tests for the 'query' command."""
+
+    @pytest.fixture(autouse=True)
+    def mock_logger(self, tmp_path):
+        """Keep the global logger and settings out of these tests."""
+        with patch("monica.cli.get_logger") as mock, \
+                patch("monica.cli.get_settings", return_value=Settings()):
+            mock.return_value.logs_dir = tmp_path / "logs"
+            yield mock
+
+    @pytest.fixture
+    def import_dir(self, tmp_path):
+        import_dir = tmp_path / "import"
+        import_dir.mkdir()
+        (import_dir / "big.mp4").write_text("a" * 30)
+        (import_dir / "small.mkv").write_text("a" * 10)
+        (import_dir / "notes.txt").write_text("a")
+        return import_dir
+
+    @patch("monica.prober.probe_media")
+    @patch("monica.cli.resolve_ffmpeg", return_value="ffmpeg")
+    def test_prints_matching_paths(self, mock_resolve, mock_probe, import_dir, tmp_path, capsys):
+        """Test matching media files are printed in the requested order."""
+        mock_probe.side_effect = lambda ffmpeg, path: MediaInfo(height=2160 if path.suffix == ".mp4" else 720)
+        args = build_parser().parse_args(["query", "size > 5", "--order-by", "size"])
+
+        assert run_command(args, tmp_path) == 0
+        assert capsys.readouterr().out.splitlines() == [
+            str(import_dir / "small.mkv"), str(import_dir / "big.mp4"),
+        ]
+        assert (tmp_path / "logs" / "import_index.json").exists()
+
+    @patch("monica.prober.probe_media")
+    @patch("monica.cli.resolve_ffmpeg", return_value="ffmpeg")
+    def test_filters_by_metadata(self, mock_resolve, mock_probe, import_dir, tmp_path, capsys):
+        """Test the expression filters on probed metadata."""
+        mock_probe.side_effect = lambda ffmpeg, path: MediaInfo(height=2160 if path.suffix == ".mp4" else 720)
+        args = build_parser().parse_args(["query", "height >= 4k"])
+
+        assert run_command(args, tmp_path) == 0
+        assert capsys.readouterr().out.splitlines() == [str(import_dir / "big.mp4")]
+
+    def test_invalid_query(self, import_dir, tmp_path, capsys):
+        """Test an invalid query exits with an error before probing."""
+        args = build_parser().parse_args(["query", "colour = red"])
+
+        assert run_command(args, tmp_path) == 1
+        assert "unknown column" in capsys.readouterr().err
+
+
+class TestWatchCommand:
+    """Tests for the 'watch' command."""
+
+    @pytest.fixture(autouse=True)
+    def mock_logger(self):
+        """Keep the global logger and settings out of these tests."""
+        with patch("monica.cli.get_logger") as mock, \
+                patch("monica.cli.get_settings", return_value=Settings()):
+            yield mock
+
+    def test_watch_arguments(self):
+        """Test watch command arguments are parsed."""
+        args = build_parser().parse_args(["watch", "-r", "Opus", "--settle", "5", "--poll", "-R"])
+
+        assert args.command == "watch"
+        assert args.settle == 5.0
+        assert args.poll is True
+        assert args.recursive is True
+
+    @patch("monica.cli.execute_jobs")
+    @patch("monica.cli.watch_folder")
+    @patch("monica.cli.resolve_ffmpeg", return_value="ffmpeg")
+    def test_watches_import_folder(self, mock_resolve, mock_watch, mock_execute, tmp_path):
+        """Test the import folder is watched and batches go to execute_jobs."""
+        (tmp_path / "import").mkdir()
+        args = build_parser().parse_args(["watch", "-r", "Opus", "--normalize", "--existing"])
+
+        assert run_command(args, tmp_path) == 0
+
+        assert mock_watch.call_args.args[0] == tmp_path / "import"
+        assert mock_watch.call_args.kwargs["process_existing"] is True
+        assert ".wav" in mock_watch.call_args.kwargs["extensions"]
+        handle_batch = mock_watch.call_args.args[1]
+        handle_batch([tmp_path / "import" / "a.wav"])
+        recipe = mock_execute.call_args.args[2]
+        assert recipe.options["normalize"] is True
+        assert mock_execute.call_args.args[3] == tmp_path / "export"
+
+    def test_multi_step_recipe_rejected(self, tmp_path):
+        """Test recipes that need several steps are rejected."""
+        args = build_parser().parse_args(["watch", "-r", "Smart Trim to MP4"])
+
+        assert run_command(args, tmp_path) == 1
+
+    @patch("monica.cli.resolve_ffmpeg", return_value="ffmpeg")
+    def test_missing_import_folder(self, mock_resolve, tmp_path, capsys):
+        """Test a missing import folder exits with an error."""
+        args = build_parser().parse_args(["watch", "-r", "Opus"])
+
+        assert run_command(args, tmp_path) == 1
+        assert "import folder not found" in capsys.readouterr().err
@@ -0,0 +1,261 @@
+"""Tests for src/monica/engines.py"""
+
+import pytest
+import shutil
+import subprocess
+from dataclasses import replace
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+from monica.engines import (
+    Engine,
+    copy_tags,
+    parse_bitrate,
+    parse_audio_args,
+    PyAVEngine,
+    find_in_process_engine,
+)
+from monica.executor import FFmpegEngine, run_ffmpeg_job, select_engines
+from monica.loudness import apply_normalization
+from monica.recipes import Recipe, find_recipe
+
+
+def _av_installed():
+    try:
+        import av  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+needs_both_engines = pytest.mark.skipif(
+    not (_av_installed() and shutil.which("ffmpeg")), reason="PyAV and ffmpeg not both installed"
+)
+
+
+def _fake_av(source, dest):
+    """A stand-in av module whose open() returns the given containers."""
+    for container in (source, dest):
+        container.__enter__.return_value = container
+    av = MagicMock()
+    av.open.side_effect = [source, dest]
+    av.AudioResampler.return_value.resample.return_value = []
+    return av
+
+
+class TestParseBitrate:
+    """Tests for parse_bitrate function."""
+
+    def test_kilobits(self):
+        """Test "k" suffix."""
+        assert parse_bitrate("192k") == 192000
+
+    def test_megabits(self):
+        """Test "M" suffix."""
+        assert parse_bitrate("1.5M") == 1500000
+
+    def test_plain(self):
+        """Test bits per second without suffix."""
+        assert parse_bitrate("128000") == 128000
+
+
+class TestParseAudioArgs:
+    """Tests for parse_audio_args function."""
+
+    def test_simple_recipe(self):
+        """Test a plain audio recipe is translated."""
+        settings = parse_audio_args(["-vn", "-c:a", "libmp3lame", "-b:a", "192k", "-ac", "2"])
+
+        assert settings == {"codec": "libmp3lame", "bit_rate": 192000, "sample_rate": None, "channels": 2}
+
+    def test_filters_unsupported(self):
+        """Test filters are left to the FFmpeg subprocess."""
+        assert parse_audio_args(["-vn", "-c:a", "aac", "-af", "loudnorm"]) is None
+
+    def test_stream_copy_unsupported(self):
+        """Test stream copy is left to the FFmpeg subprocess."""
+        assert parse_audio_args(["-vn", "-c:a", "copy"]) is None
+
+    def test_video_unsupported(self):
+        """Test video encoding is left to the FFmpeg subprocess."""
+        assert parse_audio_args(["-c:v", "libx264", "-c:a", "aac"]) is None
+
+
+class TestPyAVEngine:
+    """Tests for PyAVEngine."""
+
+    def test_unavailable_without_av(self):
+        """Test the engine reports unavailable when PyAV is not installed."""
+        with patch.dict("sys.modules", {"av": None}):
+            assert PyAVEngine().available() is False
+
+    def test_supports_in_process_recipe(self):
+        """Test built-in audio recipes marked in_process are supported."""
+        assert PyAVEngine().supports(find_recipe("MP3 (192 kbps)")) is True
+
+    def test_not_supported_without_flag(self):
+        """Test recipes not marked in_process are not supported."""
+        recipe = Recipe(name="x", category="audio", extension=".mp3", ffmpeg_args=["-c:a", "libmp3lame"])
+
+        assert PyAVEngine().supports(recipe) is False
+
+    def test_not_supported_with_normalization(self):
+        """Test the loudnorm filter sends the job to the subprocess."""
+        recipe = apply_normalization(find_recipe("MP3 (192 kbps)"), None)
+
+        assert PyAVEngine().supports(recipe) is False
+
+
+class TestCopyTags:
+    """Tests for copy_tags function."""
+
+    def test_copies_tags(self):
+        """Test tags are copied over existing ones."""
+        dest = {"title": "old"}
+
+        copy_tags({"title": "Song", "artist": "Band"}, dest)
+
+        assert dest == {"title": "Song", "artist": "Band"}
+
+    def test_skips_encoder(self):
+        """Test the source's encoder tag is left for the muxer."""
+        dest = {}
+
+        copy_tags({"encoder": "Lavf58", "title": "Song"}, dest)
+
+        assert dest == {"title": "Song"}
+
+
+class TestPyAVEngineTags:
+    """Tests for tag passthrough in PyAVEngine.run."""
+
+    def test_container_and_stream_tags_copied(self):
+        """Test the output keeps the input's container and audio stream tags."""
+        source, dest = MagicMock(duration=None), MagicMock()
+        source.metadata = {"title": "Song", "artist": "Band"}
+        source.streams.audio[0].metadata = {"language": "eng"}
+        source.decode.return_value = []
+        dest.metadata = {}
+        dest.add_stream.return_value.metadata = {}
+        dest.add_stream.return_value.encode.return_value = []
+
+        with patch.dict("sys.modules", {"av": _fake_av(source, dest)}):
+            result = PyAVEngine().run(Path("a.wav"), Path("a.mp3"), find_recipe("MP3 (192 kbps)"))
+
+        assert result == (True, "")
+        assert dest.metadata == {"title": "Song", "artist": "Band"}
+        assert dest.add_stream.return_value.metadata == {"language": "eng"}
+
+    @needs_both_engines
+    def test_same_tags_as_subprocess(self, tmp_path):
+        """Test both engines write the same tags for a tagged input."""
+        import av
+
+        input_file = tmp_path / "in.wav"
+        subprocess.run(
+            ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "sine=duration=1",
+             "-metadata", "title=Song", "-metadata", "artist=Band", str(input_file)],
+            check=True,
+        )
+        recipe = find_recipe("MP3 (192 kbps)")
+
+        assert PyAVEngine().run(input_file, tmp_path / "pyav.mp3", recipe) == (True, "")
+        assert FFmpegEngine("ffmpeg").run(input_file, tmp_path / "ffmpeg.mp3", recipe)[0]
+
+        def tags(path):
+            with av.open(str(path)) as container:
+                return {key: value for key, value in container.metadata.items() if key != "encoder"}
+
+        assert tags(tmp_path / "pyav.mp3") == tags(tmp_path / "ffmpeg.mp3")
+        assert tags(tmp_path / "pyav.mp3")["title"] == "Song"
+
+
+class TestEngine:
+    """Tests for the Engine interface."""
+
+    def test_abstract(self):
+        """Test an engine must implement the whole interface."""
+        class Partial(Engine):
+            def available(self):
+                return True
+
+        with pytest.raises(TypeError):
+            Partial()
+
+
+class TestFindInProcessEngine:
+    """Tests for find_in_process_engine function."""
+
+    def test_none_when_unavailable(self):
+        """Test no engine is chosen when PyAV is not installed."""
+        engine = MagicMock(available=MagicMock(return_value=False))
+
+        with patch("monica.engines.IN_PROCESS_ENGINES", [engine]):
+            assert find_in_process_engine(find_recipe("MP3 (192 kbps)")) is None
+
+    @patch("monica.engines.get_logger")
+    def test_available_engine(self, mock_logger):
+        """Test an installed, supporting engine is chosen."""
+        engine = MagicMock()
+        engine.available.return_value = True
+        engine.supports.return_value = True
+
+        with patch("monica.engines.IN_PROCESS_ENGINES", [engine]):
+            assert find_in_process_engine(find_recipe("MP3 (192 kbps)")) is engine
+
+
+class TestRunFfmpegJobEngines:
+    """Tests for engine selection in run_ffmpeg_job."""
+
+    @patch("monica.executor.get_logger")
+    @patch("monica.executor.subprocess.Popen")
+    @patch("monica.executor.find_in_process_engine")
+    def test_in_process_success_skips_subprocess(self, mock_find, mock_popen, mock_logger, capsys):
+        """Test a successful in-process run doesn't start FFmpeg."""
+        mock_find.return_value.run.return_value = (True, "")
+
+        result = run_ffmpeg_job("ffmpeg", Path("a.wav"), Path("a.mp3"), find_recipe("MP3 (192 kbps)"))
+
+        assert result == (True, "")
+        mock_popen.assert_not_called()
+
+    @patch("monica.executor.get_logger")
+    @patch("monica.executor.probe_media")
+    @patch("monica.executor.subprocess.Popen")
+    @patch("monica.executor.find_in_process_engine")
+    def test_in_process_failure_falls_back(self, mock_find, mock_popen, mock_probe, mock_logger, capsys):
+        """Test a failed in-process run falls back to the FFmpeg subprocess."""
+        mock_find.return_value.run.return_value = (False, "encoder not found")
+        mock_probe.return_value.duration = None
+        mock_popen.return_value.poll.return_value = 0
+        mock_popen.return_value.returncode = 0
+        mock_popen.return_value.stderr = iter([])
+
+        result = run_ffmpeg_job("ffmpeg", Path("a.wav"), Path("a.mp3"), find_recipe("MP3 (192 kbps)"))
+
+        assert result == (True, "")
+        mock_popen.assert_called_once()
+        mock_logger.return_value.warning.assert_called_once()
+
+
+class TestSelectEngines:
+    """Tests for select_engines function."""
+
+    @patch("monica.executor.find_in_process_engine")
+    def test_subprocess_last(self, mock_find):
+        """Test an in-process engine is tried before the FFmpeg subprocess."""
+        engines = select_engines("ffmpeg", find_recipe("MP3 (192 kbps)"))
+
+        assert engines[0] is mock_find.return_value
+        assert isinstance(engines[-1], FFmpegEngine)
+        assert engines[-1].ffmpeg_path == "ffmpeg"
+
+    @patch("monica.executor.find_in_process_engine")
+    def test_benchmark_subprocess_only(self, mock_find):
+        """Test benchmarked jobs only use the FFmpeg subprocess."""
+        recipe = replace(find_recipe("MP3 (192 kbps)"), options={"benchmark": True})
+
+        engines = select_engines("ffmpeg", recipe)
+
+        assert [engine.name for engine in engines] == ["ffmpeg"]
+        mock_find.assert_not_called()
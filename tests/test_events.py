@@ -0,0 +1,69 @@
+"""Tests for src/monica/events.py"""
+
+import json
+
+from monica.events import (
+    MAX_ERROR_CHARS,
+    SCHEMA_VERSION,
+    classify_error,
+    format_event,
+    make_event,
+    summarize_error,
+)
+
+
+class TestClassifyError:
+    """Tests for classify_error function."""
+
+    def test_no_error(self):
+        """Test no message has no class."""
+        assert classify_error(None) is None
+        assert classify_error("") is None
+
+    def test_known_errors(self):
+        """Test common FFmpeg failures get their class."""
+        assert classify_error("in.mp4: No such file or directory") == "input_missing"
+        assert classify_error("moov atom not found") == "invalid_input"
+        assert classify_error("Unknown encoder 'libfoo'") == "bad_arguments"
+        assert classify_error("Process timed out") == "timeout"
+
+    def test_unknown_error(self):
+        """Test other messages are classified as other."""
+        assert classify_error("something odd happened") == "other"
+
+
+class TestSummarizeError:
+    """Tests for summarize_error function."""
+
+    def test_last_line_kept(self):
+        """Test only the last non-empty line is kept."""
+        message = "ffmpeg version 6.0\nInput #0 ...\nConversion failed!\n\n"
+
+        assert summarize_error(message) == "Conversion failed!"
+
+    def test_long_line_shortened(self):
+        """Test long messages are cut to MAX_ERROR_CHARS."""
+        assert len(summarize_error("x" * 1000)) == MAX_ERROR_CHARS
+
+
+class TestFormatEvent:
+    """Tests for make_event and format_event."""
+
+    def test_common_fields(self):
+        """Test events carry the schema version, UTC time, name and job id."""
+        record = make_event("item_end", "abc123", status="success")
+
+        assert record["v"] == SCHEMA_VERSION
+        assert record["ts"].endswith("Z")
+        assert record["event"] == "item_end"
+        assert record["job_id"] == "abc123"
+        assert record["status"] == "success"
+
+    def test_one_line(self):
+        """Test events are serialized as a single JSON line."""
+        record = make_event("item_end", "abc123", error="line one\nline two")
+
+        line = format_event(record)
+
+        assert "\n" not in line
+        assert json.loads(line) == record
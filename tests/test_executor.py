@@ -1,6 +1,7 @@
 """Tests for src/monica/executor.py"""
 
 import pytest
+from dataclasses import replace
 from pathlib import Path
 from datetime import datetime
 from unittest.mock import Mock, patch, MagicMock
@@ -14,7 +15,12 @@ from monica.executor import (
     generate_output_filename,
     display_progress_bar,
     ProgressIndicator,
+    execute_jobs,
+    report_benchmark,
+    history_fraction,
 )
+from monica.benchmark import parse_benchmark
+from monica.probe import MediaInfo
 from monica.recipes import Recipe
 
 
@@ -264,3 +270,151 @@ class TestDisplayProgressBar:
 
         captured = capsys.readouterr()
         assert "0.0%" in captured.out
+
+
+class TestExecuteJobsDuplicates:
+    """Tests for duplicate handling in execute_jobs."""
+
+    @patch("monica.executor.get_size_history")
+    @patch("monica.executor.get_logger")
+    @patch("monica.executor.run_ffmpeg_job")
+    def test_duplicate_linked_not_encoded(self, mock_run, mock_logger, mock_history, tmp_path, sample_recipe, tmp_export_dir, capsys):
+        """Test an input with the same contents as an earlier one is linked."""
+        original = tmp_path / "clip.mp4"
+        copy = tmp_path / "clip (1).mp4"
+        original.write_bytes(b"same content")
+        copy.write_bytes(b"same content")
+
+        def fake_run(ffmpeg_path, input_file, output_file, recipe):
+            output_file.write_bytes(b"encoded")
+            return True, ""
+
+        mock_run.side_effect = fake_run
+
+        result = execute_jobs("ffmpeg", [original, copy], sample_recipe, tmp_export_dir)
+
+        assert result is True
+        assert mock_run.call_count == 1
+        outputs = sorted(tmp_export_dir.iterdir())
+        assert len(outputs) == 2
+        assert all(f.read_bytes() == b"encoded" for f in outputs)
+
+
+class TestExecuteJobsWriteBehind:
+    """Tests for write-behind export in execute_jobs."""
+
+    @patch("monica.executor.get_size_history")
+    @patch("monica.executor.get_logger")
+    @patch("monica.executor.run_ffmpeg_job")
+    def test_encodes_to_scratch(self, mock_run, mock_logger, mock_history, tmp_path, sample_recipe, tmp_export_dir, capsys):
+        """Test outputs are encoded in scratch and moved to the export directory."""
+        from monica.settings import Settings
+
+        scratch = tmp_path / "scratch"
+        source = tmp_path / "clip.mp4"
+        source.write_bytes(b"source")
+        written = []
+
+        def fake_run(ffmpeg_path, input_file, output_file, recipe):
+            written.append(output_file)
+            output_file.write_bytes(b"encoded")
+            return True, ""
+
+        mock_run.side_effect = fake_run
+        settings = Settings(write_behind=True, scratch_dir=str(scratch))
+
+        with patch("monica.mover.get_logger"):
+            result = execute_jobs("ffmpeg", [source], sample_recipe, tmp_export_dir, settings=settings)
+
+        assert result is True
+        assert scratch in written[0].parents
+        assert [f.read_bytes() for f in tmp_export_dir.iterdir()] == [b"encoded"]
+        assert list(scratch.iterdir()) == []
+
+    @patch("monica.executor.get_size_history")
+    @patch("monica.executor.get_logger")
+    @patch("monica.executor.run_ffmpeg_job")
+    def test_event_records_export_path(self, mock_run, mock_logger, mock_history, tmp_path, sample_recipe, tmp_export_dir, capsys):
+        """Test item_end names the export path, sized from the scratch file."""
+        from monica.settings import Settings
+
+        source = tmp_path / "clip.mp4"
+        source.write_bytes(b"source")
+
+        def fake_run(ffmpeg_path, input_file, output_file, recipe):
+            output_file.write_bytes(b"encoded")
+            return True, ""
+
+        mock_run.side_effect = fake_run
+        settings = Settings(write_behind=True, scratch_dir=str(tmp_path / "scratch"))
+
+        with patch("monica.mover.get_logger"):
+            execute_jobs("ffmpeg", [source], sample_recipe, tmp_export_dir, settings=settings)
+
+        call = mock_logger.return_value.item_end.call_args
+        assert call.kwargs["output_path"].parent == tmp_export_dir
+        assert call.kwargs["output_bytes"] == len(b"encoded")
+
+
+class TestHistoryFraction:
+    """Tests for history_fraction function."""
+
+    @patch("monica.executor.probe_media", return_value=MediaInfo(duration=100.0))
+    def test_share_of_input(self, mock_probe, sample_recipe):
+        """Test the fraction is the range's share of the input's duration."""
+        recipe = replace(sample_recipe, options={"start": 10.0, "end": 35.0})
+
+        assert history_fraction("ffmpeg", Path("in.mp4"), recipe) == 0.25
+
+    @patch("monica.executor.probe_media", return_value=MediaInfo())
+    def test_unknown_duration(self, mock_probe, sample_recipe):
+        """Test an unknown duration gives 0.0, so nothing is recorded."""
+        recipe = replace(sample_recipe, options={"start": 10.0})
+
+        assert history_fraction("ffmpeg", Path("in.mp4"), recipe) == 0.0
+
+    @patch("monica.executor.probe_media", return_value=MediaInfo(duration=100.0))
+    @patch("monica.executor.get_size_history")
+    @patch("monica.executor.get_logger")
+    @patch("monica.executor.run_ffmpeg_job")
+    def test_ranged_job_recorded(self, mock_run, mock_logger, mock_history, mock_probe,
+                                 tmp_path, sample_recipe, tmp_export_dir, capsys):
+        """Test execute_jobs records ranged jobs with the converted fraction."""
+        source = tmp_path / "clip.mp4"
+        source.write_bytes(b"source")
+
+        def fake_run(ffmpeg_path, input_file, output_file, recipe):
+            output_file.write_bytes(b"enc")
+            return True, ""
+
+        mock_run.side_effect = fake_run
+        recipe = replace(sample_recipe, options={"start": 0.0, "end": 50.0})
+
+        execute_jobs("ffmpeg", [source], recipe, tmp_export_dir)
+
+        mock_history.return_value.record.assert_called_once_with(recipe, 6, 3, 0.5)
+
+
+class TestReportBenchmark:
+    """Tests for report_benchmark function."""
+
+    @patch("monica.executor.get_logger")
+    @patch("monica.executor.time_filters")
+    def test_breakdown_attached(self, mock_time_filters, mock_logger, capsys):
+        """Test the job's stages and filter timings go on its item_end event."""
+        recipe = Recipe(
+            name="Blur",
+            category="shortform",
+            extension=".mp4",
+            ffmpeg_args=["-vf", "boxblur=20:5", "-c:v", "libx264"],
+        )
+        filters = [{"stage": "boxblur", "media": "video", "avg_ms": 4.0, "max_ms": 5.0, "share": 100.0}]
+        mock_time_filters.return_value = filters
+        measured = parse_benchmark(["bench:     2000 user        0 sys     2000 real encode_video 0.0 \n"])
+
+        report_benchmark("ffmpeg", Path("in.mp4"), recipe, measured)
+
+        breakdown = mock_logger.return_value.annotate_item.call_args.kwargs["benchmark"]
+        assert breakdown["stages"]["encode_video"]["calls"] == 1
+        assert breakdown["filters"] == filters
+        assert "boxblur" in capsys.readouterr().out
@@ -0,0 +1,154 @@
+"""Tests for src/monica/faststart.py"""
+
+import pytest
+
+from monica.faststart import (
+    get_faststart_strategy,
+    set_movflags,
+    estimate_moov_size,
+    apply_faststart,
+    moov_space_exceeded,
+    FRAGMENTED_FLAGS,
+)
+from monica.probe import MediaInfo
+from monica.recipes import Recipe, find_recipe
+
+
+def mp4_recipe(strategy=None, args=None):
+    """An MP4 recipe with +faststart and an optional strategy."""
+    options = {"faststart": strategy} if strategy else {}
+    return Recipe(
+        name="Test MP4",
+        category="video",
+        extension=".mp4",
+        ffmpeg_args=args or ["-c:v", "libx264", "-c:a", "aac", "-movflags", "+faststart"],
+        options=options,
+    )
+
+
+@pytest.fixture
+def source():
+    """A 10-minute 30 fps source with 48 kHz audio."""
+    return MediaInfo(duration=600.0, video_codec="h264", fps=30.0, audio_codec="aac", sample_rate=48000)
+
+
+class TestMoovSpaceExceeded:
+    """Tests for moov_space_exceeded function."""
+
+    def test_overflow_message(self):
+        """Test the muxer's -moov_size overflow error is recognised."""
+        stderr = "[mp4 @ 0x5581] reserved_moov_size is too small, needed 5120 additional\n"
+
+        assert moov_space_exceeded(stderr) is True
+
+    def test_other_moov_errors_ignored(self):
+        """Test unrelated moov errors, e.g. from a broken input, don't count."""
+        stderr = "[mov,mp4,m4a,3gp,3g2,mj2 @ 0x5581] moov atom not found\nin.mp4: Invalid data\n"
+
+        assert moov_space_exceeded(stderr) is False
+
+
+class TestGetFaststartStrategy:
+    """Tests for get_faststart_strategy function."""
+
+    def test_default_rewrite(self):
+        """Test recipes with +faststart default to the rewrite."""
+        assert get_faststart_strategy(mp4_recipe()) == "rewrite"
+
+    def test_option(self):
+        """Test the recipe option selects the strategy."""
+        assert get_faststart_strategy(mp4_recipe("fragmented")) == "fragmented"
+
+    def test_non_mp4(self):
+        """Test non-MP4 outputs have no strategy."""
+        recipe = Recipe(name="x", category="video", extension=".mkv", ffmpeg_args=[], options={"faststart": "reserve"})
+
+        assert get_faststart_strategy(recipe) == "none"
+
+    def test_builtin_youtube_reserves(self):
+        """Test the built-in YouTube recipes avoid the rewrite."""
+        assert get_faststart_strategy(find_recipe("YouTube 4K (2160p)")) == "reserve"
+
+
+class TestSetMovflags:
+    """Tests for set_movflags function."""
+
+    def test_drop(self):
+        """Test removing +faststart removes the option."""
+        assert set_movflags(["-c", "copy", "-movflags", "+faststart"], None) == ["-c", "copy"]
+
+    def test_keeps_other_flags(self):
+        """Test other movflags are preserved."""
+        args = set_movflags(["-movflags", "+faststart+use_metadata_tags"], "+frag_keyframe")
+
+        assert args == ["-movflags", "+frag_keyframe+use_metadata_tags"]
+
+
+class TestEstimateMoovSize:
+    """Tests for estimate_moov_size function."""
+
+    def test_grows_with_duration(self):
+        """Test longer outputs reserve more space."""
+        assert estimate_moov_size(3600, 30, 48000) > estimate_moov_size(60, 30, 48000)
+
+    def test_audio_only(self):
+        """Test fps of 0 reserves no video sample tables."""
+        assert estimate_moov_size(600, 0.0, 48000) < estimate_moov_size(600, None, 48000)
+
+    def test_covers_sample_tables(self):
+        """Test the estimate covers 4 bytes per sample for sizes and offsets at least."""
+        frames = 600 * 30
+        packets = 600 * 48000 / 1024
+
+        assert estimate_moov_size(600, 30, 48000) > (frames + packets) * 12
+
+
+class TestApplyFaststart:
+    """Tests for apply_faststart function."""
+
+    def test_reserve(self, source):
+        """Test reserve replaces +faststart with -moov_size."""
+        recipe, strategy = apply_faststart(mp4_recipe("reserve"), source)
+
+        assert strategy == "reserve"
+        assert "-movflags" not in recipe.ffmpeg_args
+        size = int(recipe.ffmpeg_args[recipe.ffmpeg_args.index("-moov_size") + 1])
+        assert size == estimate_moov_size(600.0, 30.0, 48000)
+
+    def test_reserve_without_duration(self):
+        """Test reserve falls back to the rewrite when the duration is unknown."""
+        recipe, strategy = apply_faststart(mp4_recipe("reserve"), MediaInfo())
+
+        assert strategy == "rewrite"
+        assert recipe.ffmpeg_args[-2:] == ["-movflags", "+faststart"]
+
+    def test_reserve_uses_time_range(self, source):
+        """Test a time range reserves for the clip, not the whole source."""
+        ranged = mp4_recipe("reserve")
+        ranged.options.update({"start": 0, "end": 60})
+
+        recipe, _ = apply_faststart(ranged, source)
+
+        size = int(recipe.ffmpeg_args[recipe.ffmpeg_args.index("-moov_size") + 1])
+        assert size == estimate_moov_size(60.0, 30.0, 48000)
+
+    def test_fragmented(self, source):
+        """Test fragmented MP4 flags replace +faststart."""
+        recipe, _ = apply_faststart(mp4_recipe("fragmented"), source)
+
+        assert recipe.ffmpeg_args[-2:] == ["-movflags", FRAGMENTED_FLAGS]
+
+    def test_none(self, source):
+        """Test none drops +faststart."""
+        recipe, _ = apply_faststart(mp4_recipe("none"), source)
+
+        assert "-movflags" not in recipe.ffmpeg_args
+
+    def test_rewrite_unchanged(self, source):
+        """Test the default leaves the recipe as written."""
+        original = mp4_recipe()
+
+        recipe, strategy = apply_faststart(original, source)
+
+        assert strategy == "rewrite"
+        assert recipe.ffmpeg_args == original.ffmpeg_args
@@ -1,12 +1,50 @@
 """Tests for src/monica/file_selector.py"""
 
 import pytest
+import threading
+import time
 from pathlib import Path
 
+from unittest.mock import MagicMock, patch
+
 from monica.file_selector import (
+    BackgroundScan,
+    _metadata_filter,
     format_size,
     get_files_in_directory,
+    scan_directory,
+    select_files,
 )
+from monica.import_index import ImportIndex
+from monica.probe import MediaInfo
+
+
+@pytest.fixture
+def media_tree(tmp_path):
+    """An import tree with nested folders."""
+    root = tmp_path / "tree"
+    (root / "2024" / "trip").mkdir(parents=True)
+    (root / "@eaDir").mkdir()
+    (root / "top.mp4").write_text("a")
+    (root / "2024" / "a.mp4").write_text("bb")
+    (root / "2024" / "trip" / "b.MKV").write_text("ccc")
+    (root / "2024" / "trip" / "notes.txt").write_text("x")
+    (root / "@eaDir" / "thumb.mp4").write_text("x")
+    return root
+
+
+def drain(poll) -> list[str]:
+    """Titles a streaming picker's poll() hands out until the scan ends.
+
+    poll is None when the scan ended before the picker opened.
+    """
+    titles = []
+    finished = poll is None
+    while not finished:
+        added, finished = poll()
+        titles += added
+        time.sleep(0.001)
+    return titles
 
 
 class TestFormatSize:
@@ -148,3 +186,259 @@ class TestGetFilesInDirectory:
         # Should only get the top-level file, not nested
         assert len(files) == 1
         assert files[0].name == "file.mp4"
+
+
+class TestScanDirectory:
+    """Tests for scan_directory function."""
+
+    def test_flat_by_default(self, media_tree):
+        """Test only top-level files are scanned by default."""
+        entries = list(scan_directory(media_tree, [".mp4", ".mkv"]))
+
+        assert [e.path.name for e in entries] == ["top.mp4"]
+
+    def test_recursive(self, media_tree):
+        """Test subdirectories are scanned when recursive."""
+        names = sorted(e.path.name for e in scan_directory(media_tree, [".mp4", ".mkv"], recursive=True))
+
+        assert names == ["a.mp4", "b.MKV", "thumb.mp4", "top.mp4"]
+
+    def test_exclude_prunes_directories(self, media_tree):
+        """Test excluded directories are not descended into."""
+        with patch("monica.file_selector.os.scandir", wraps=__import__("os").scandir) as mock_scandir:
+            names = sorted(
+                e.path.name for e in scan_directory(media_tree, [".mp4"], recursive=True, exclude=["@eaDir"])
+            )
+
+        assert names == ["a.mp4", "top.mp4"]
+        scanned = [Path(call.args[0]).name for call in mock_scandir.call_args_list]
+        assert "@eaDir" not in scanned
+
+    def test_include_relative_path(self, media_tree):
+        """Test include globs match the path relative to the root."""
+        entries = list(scan_directory(media_tree, recursive=True, include=["2024/trip/*"]))
+
+        assert sorted(e.path.name for e in entries) == ["b.MKV", "notes.txt"]
+
+    def test_entry_stat_data(self, media_tree):
+        """Test entries carry the size read during the scan."""
+        entry = next(scan_directory(media_tree, [".mp4"]))
+
+        assert entry.size == 1
+        assert entry.mtime > 0
+
+    def test_lazy(self, media_tree):
+        """Test results are yielded before the scan completes."""
+        scan = scan_directory(media_tree, recursive=True)
+
+        first = next(scan)
+
+        assert first.path.exists()
+
+
+class TestBackgroundScan:
+    """Tests for BackgroundScan class."""
+
+    def test_entries_handed_out_once(self, media_tree):
+        """Test take() returns each entry once, and wait() reports the end."""
+        scan = BackgroundScan(scan_directory(media_tree, [".mp4"], recursive=True, exclude=["@eaDir"])).start()
+
+        finished = scan.wait(100)
+        first = scan.take()
+        second = scan.take()
+
+        assert finished is True
+        assert sorted(e.path.name for e in first) == ["a.mp4", "top.mp4"]
+        assert second == []
+
+    def test_wait_for_count(self, media_tree):
+        """Test wait() returns once enough files are found."""
+        scan = BackgroundScan(scan_directory(media_tree, recursive=True)).start()
+
+        scan.wait(1)
+
+        assert len(scan.take()) >= 1
+        scan.close()
+
+
+class TestGetFilesRecursive:
+    """Tests for recursive get_files_in_directory."""
+
+    def test_sorted_by_relative_path(self, media_tree):
+        """Test recursive results sort by their path within the tree."""
+        files = get_files_in_directory(media_tree, [".mp4", ".mkv"], recursive=True, exclude=["@eaDir"])
+
+        assert [f.relative_to(media_tree).as_posix() for f in files] == [
+            "2024/a.mp4", "2024/trip/b.MKV", "top.mp4"
+        ]
+
+
+class TestMetadataFilter:
+    """Tests for _metadata_filter function."""
+
+    @patch("monica.file_selector.time.monotonic")
+    @patch("monica.file_selector.MediaTable")
+    def test_rebuilds_at_most_once_per_interval(self, mock_table, mock_clock):
+        """Test probe results arriving between keystrokes don't rebuild the table each time."""
+        entries = [MagicMock(), MagicMock()]
+        prober = MagicMock(results={})
+        mock_clock.return_value = 100.0
+        run_query = _metadata_filter(entries, prober, Path("/import"))
+
+        run_query("height >= 1080")
+        prober.results[0] = MediaInfo()
+        mock_clock.return_value = 100.1
+        run_query("height >= 1080 and")
+        builds_within_interval = mock_table.build.call_count
+        mock_clock.return_value = 101.0
+        run_query("height >= 1080 and codec = h264")
+
+        assert builds_within_interval == 1
+        assert mock_table.build.call_count == 2
+
+    @patch("monica.file_selector.time.monotonic")
+    @patch("monica.file_selector.MediaTable")
+    def test_no_rebuild_when_unchanged(self, mock_table, mock_clock):
+        """Test the table is reused once every file is probed."""
+        prober = MagicMock(results={0: MediaInfo()})
+        mock_clock.return_value = 100.0
+        run_query = _metadata_filter([MagicMock()], prober, Path("/import"))
+
+        run_query("size > 1")
+        mock_clock.return_value = 200.0
+        run_query("size > 2")
+
+        mock_table.build.assert_called_once()
+
+
+class TestSelectFiles:
+    """Tests for select_files function."""
+
+    @patch("monica.file_selector.questionary.checkbox")
+    def test_choices_show_relative_paths(self, mock_checkbox, media_tree, capsys):
+        """Test nested files are listed with their folder."""
+        mock_checkbox.return_value.ask.return_value = []
+
+        select_files(media_tree, [".mp4"], recursive=True, exclude=["@eaDir"])
+
+        titles = [c.title for c in mock_checkbox.call_args.kwargs["choices"]]
+        assert titles == ["2024/a.mp4 (2.0 B)", "top.mp4 (1.0 B)"]
+
+    @patch("monica.file_selector.questionary.checkbox")
+    def test_uses_index(self, mock_checkbox, media_tree, tmp_path, capsys):
+        """Test files come from the import index when one is given."""
+        mock_checkbox.return_value.ask.return_value = []
+        index = ImportIndex(media_tree, tmp_path / "logs" / "import_index.json")
+
+        select_files(media_tree, [".mp4"], recursive=True, exclude=["@eaDir"], index=index)
+
+        titles = [c.title for c in mock_checkbox.call_args.kwargs["choices"]]
+        assert titles == ["2024/a.mp4 (2.0 B)", "top.mp4 (1.0 B)"]
+        assert (tmp_path / "logs" / "import_index.json").exists()
+
+    @patch("monica.file_selector.run_picker")
+    @patch("monica.file_selector.VIRTUAL_PICKER_THRESHOLD", 2)
+    def test_large_lists_use_virtual_picker(self, mock_picker, media_tree, capsys):
+        """Test long file lists open the filterable picker, filled as the scan runs."""
+        shown = []
+
+        def pick(titles, message, poll=None):
+            shown.extend(titles + drain(poll))
+            return [shown.index("top.mp4 (1.0 B)")]
+        mock_picker.side_effect = pick
+
+        result = select_files(media_tree, [".mp4"], recursive=True, exclude=["@eaDir"])
+
+        assert result == [media_tree / "top.mp4"]
+        assert sorted(shown) == ["2024/a.mp4 (2.0 B)", "top.mp4 (1.0 B)"]
+
+    @patch("monica.file_selector.run_picker")
+    @patch("monica.file_selector.VIRTUAL_PICKER_THRESHOLD", 2)
+    def test_index_scan_streamed(self, mock_picker, media_tree, tmp_path, capsys):
+        """Test the import index's refresh streams into the picker too."""
+        shown = []
+
+        def pick(titles, message, poll=None):
+            shown.extend(titles + drain(poll))
+            return []
+        mock_picker.side_effect = pick
+        index = ImportIndex(media_tree, tmp_path / "logs" / "import_index.json")
+
+        select_files(media_tree, [".mp4"], recursive=True, exclude=["@eaDir"], index=index)
+
+        assert sorted(shown) == ["2024/a.mp4 (2.0 B)", "top.mp4 (1.0 B)"]
+        assert (tmp_path / "logs" / "import_index.json").exists()
+
+    @patch("monica.file_selector.run_picker", return_value=None)
+    @patch("monica.file_selector.VIRTUAL_PICKER_THRESHOLD", 2)
+    def test_virtual_picker_cancelled(self, mock_picker, media_tree, capsys):
+        """Test cancelling the filterable picker selects nothing."""
+        result = select_files(media_tree, [".mp4"], recursive=True)
+
+        assert result == []
+
+    @patch("monica.prober.probe_media")
+    @patch("monica.file_selector.run_picker")
+    def test_short_list_opens_before_probes(self, mock_picker, mock_probe, media_tree, capsys):
+        """Test short lists with details open the picker without waiting for probes."""
+        release = threading.Event()
+
+        def slow_probe(ffmpeg_path, path):
+            release.wait(5)
+            return MediaInfo(duration=61, video_codec="h264")
+        mock_probe.side_effect = slow_probe
+        seen = []
+
+        def pick(titles, message, describe, on_render, expression_filter):
+            seen.append((titles, describe(0)))
+            release.set()
+            return [0]
+        mock_picker.side_effect = pick
+
+        result = select_files(media_tree, [".mp4"], ffmpeg_path="ffmpeg")
+
+        assert result == [media_tree / "top.mp4"]
+        assert seen == [(["top.mp4 (1.0 B)"], None)]
+
+    @patch("monica.prober.probe_media")
+    @patch("monica.file_selector.run_picker")
+    @patch("monica.file_selector.VIRTUAL_PICKER_THRESHOLD", 1)
+    def test_probes_files_for_details(self, mock_picker, mock_probe, media_tree, capsys):
+        """Test streamed files are probed and their details passed to the picker."""
+        mock_probe.return_value = MediaInfo(duration=61, video_codec="h264")
+        details = []
+
+        def pick(titles, message, describe, on_render, expression_filter, poll=None):
+            drain(poll)
+            deadline = time.monotonic() + 5
+            while describe(0) is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            details.append(describe(0))
+            return [0]
+        mock_picker.side_effect = pick
+
+        result = select_files(media_tree, [".mp4"], ffmpeg_path="ffmpeg")
+
+        assert result == [media_tree / "top.mp4"]
+        assert details == ["1:01 · h264"]
+
+    @patch("monica.prober.probe_media")
+    @patch("monica.file_selector.run_picker")
+    @patch("monica.file_selector.VIRTUAL_PICKER_THRESHOLD", 1)
+    def test_metadata_query_filter(self, mock_picker, mock_probe, media_tree, capsys):
+        """Test the picker gets a query filter over the probed files."""
+        mock_probe.side_effect = lambda ffmpeg, path: MediaInfo(height=2160 if path.name == "a.mp4" else 720)
+        rows = []
+
+        def pick(titles, message, describe, on_render, expression_filter, poll=None):
+            shown = titles + drain(poll)
+            deadline = time.monotonic() + 5
+            while (describe(0) is None or describe(1) is None) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            rows.append([shown[i] for i in expression_filter("height > 1080p")])
+            return []
+        mock_picker.side_effect = pick
+
+        select_files(media_tree, [".mp4"], recursive=True, exclude=["@eaDir"], ffmpeg_path="ffmpeg")
+
+        assert rows == [["2024/a.mp4 (2.0 B)"]]
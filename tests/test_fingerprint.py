@@ -0,0 +1,140 @@
+"""Tests for src/monica/fingerprint.py"""
+
+import os
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from monica.fingerprint import (
+    sample_offsets,
+    sampled_fingerprint,
+    full_hash,
+    find_duplicates,
+    SAMPLE_SIZE,
+    SAMPLE_POSITIONS,
+)
+
+
+LARGE_SIZE = SAMPLE_SIZE * len(SAMPLE_POSITIONS) * 4
+
+
+@pytest.fixture
+def large_file(tmp_path):
+    """A file large enough to be sampled rather than read whole."""
+    f = tmp_path / "large.bin"
+    f.write_bytes(os.urandom(LARGE_SIZE))
+    return f
+
+
+class TestSampleOffsets:
+    """Tests for sample_offsets function."""
+
+    def test_first_and_last_block(self):
+        """Test sampling covers the start and the end of the file."""
+        offsets = sample_offsets(LARGE_SIZE)
+
+        assert offsets[0] == 0
+        assert offsets[-1] == LARGE_SIZE - SAMPLE_SIZE
+        assert len(offsets) == len(SAMPLE_POSITIONS)
+
+
+class TestSampledFingerprint:
+    """Tests for sampled_fingerprint function."""
+
+    def test_same_contents_same_fingerprint(self, tmp_path, large_file):
+        """Test renamed copies share a fingerprint."""
+        copy = tmp_path / "copy.bin"
+        copy.write_bytes(large_file.read_bytes())
+
+        assert sampled_fingerprint(copy) == sampled_fingerprint(large_file)
+
+    def test_unsampled_change_not_seen(self, tmp_path, large_file):
+        """Test a change between sampled blocks keeps the fingerprint (full hash catches it)."""
+        data = bytearray(large_file.read_bytes())
+        data[SAMPLE_SIZE + 10] ^= 0xFF
+        changed = tmp_path / "changed.bin"
+        changed.write_bytes(bytes(data))
+
+        assert sampled_fingerprint(changed) == sampled_fingerprint(large_file)
+        assert full_hash(changed) != full_hash(large_file)
+
+    def test_small_file_hashed_whole(self, tmp_path):
+        """Test small files differing anywhere get different fingerprints."""
+        a = tmp_path / "a.bin"
+        b = tmp_path / "b.bin"
+        a.write_bytes(b"x" * 1000)
+        b.write_bytes(b"x" * 999 + b"y")
+
+        assert sampled_fingerprint(a) != sampled_fingerprint(b)
+
+
+class TestFindDuplicates:
+    """Tests for find_duplicates function."""
+
+    def test_duplicates_map_to_first(self, tmp_path, large_file):
+        """Test each copy maps to the first file with the same contents."""
+        copy = tmp_path / "copy.bin"
+        copy.write_bytes(large_file.read_bytes())
+        other = tmp_path / "other.bin"
+        other.write_bytes(os.urandom(LARGE_SIZE))
+
+        duplicates = find_duplicates([large_file, other, copy])
+
+        assert duplicates == {copy: large_file}
+
+    def test_unique_sizes_not_read(self, tmp_path):
+        """Test files with unique sizes are never hashed."""
+        files = []
+        for i in range(3):
+            f = tmp_path / f"f{i}.bin"
+            f.write_bytes(b"x" * (i + 1))
+            files.append(f)
+
+        with patch("monica.fingerprint.sampled_fingerprint") as mock_fingerprint:
+            assert find_duplicates(files) == {}
+
+        mock_fingerprint.assert_not_called()
+
+    def test_sample_collision_confirmed_by_full_hash(self, tmp_path, large_file):
+        """Test files that only match on sampled blocks are not duplicates."""
+        data = bytearray(large_file.read_bytes())
+        data[SAMPLE_SIZE + 10] ^= 0xFF
+        changed = tmp_path / "changed.bin"
+        changed.write_bytes(bytes(data))
+
+        assert find_duplicates([large_file, changed]) == {}
+
+    def test_small_duplicates_skip_full_hash(self, tmp_path):
+        """Test small files don't need a second, full hash."""
+        a = tmp_path / "a.wav"
+        b = tmp_path / "b.wav"
+        a.write_bytes(b"RIFF" * 10)
+        b.write_bytes(b"RIFF" * 10)
+
+        with patch("monica.fingerprint.full_hash") as mock_full:
+            assert find_duplicates([a, b]) == {b: a}
+
+        mock_full.assert_not_called()
+
+    def test_unreadable_files_left_out(self, tmp_path):
+        """Test files that can't be read are skipped instead of failing."""
+        a = tmp_path / "a.wav"
+        b = tmp_path / "b.wav"
+        a.write_bytes(b"RIFF" * 10)
+        b.write_bytes(b"RIFF" * 10)
+
+        assert find_duplicates([tmp_path / "gone.wav", a, b]) == {b: a}
+
+    def test_file_removed_while_checking(self, tmp_path, large_file):
+        """Test a file disappearing after the size pass doesn't raise."""
+        copy = tmp_path / "copy.bin"
+        copy.write_bytes(large_file.read_bytes())
+
+        def fingerprint_then_remove(path):
+            result = sampled_fingerprint(path)
+            if path == copy:
+                copy.unlink()
+            return result
+
+        with patch("monica.fingerprint.sampled_fingerprint", side_effect=fingerprint_then_remove):
+            assert find_duplicates([copy, large_file]) == {}
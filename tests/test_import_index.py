@@ -0,0 +1,257 @@
+"""Tests for src/monica/import_index.py"""
+
+import json
+import os
+import pytest
+
+from monica.import_index import ImportIndex, get_import_index
+
+
+OLD_TIME = 1_600_000_000
+
+
+def age(*paths):
+    """Backdate mtimes so directories count as settled."""
+    for path in paths:
+        os.utime(path, (OLD_TIME, OLD_TIME))
+
+
+@pytest.fixture
+def media_tree(tmp_path):
+    """An import tree with nested folders and settled mtimes."""
+    root = tmp_path / "tree"
+    (root / "2024" / "trip").mkdir(parents=True)
+    (root / "@eaDir").mkdir()
+    (root / "top.mp4").write_text("a")
+    (root / "2024" / "a.mp4").write_text("bb")
+    (root / "2024" / "trip" / "b.MKV").write_text("ccc")
+    (root / "@eaDir" / "thumb.mp4").write_text("x")
+    age(
+        root / "top.mp4", root / "2024" / "a.mp4", root / "2024" / "trip" / "b.MKV",
+        root / "@eaDir" / "thumb.mp4", root / "2024" / "trip", root / "2024", root / "@eaDir", root,
+    )
+    return root
+
+
+@pytest.fixture
+def index_file(tmp_path):
+    return tmp_path / "logs" / "import_index.json"
+
+
+class TestRefresh:
+    """Tests for ImportIndex.refresh."""
+
+    def test_first_refresh_scans_every_directory(self, media_tree, index_file):
+        """Test all directories are listed on an empty index."""
+        index = ImportIndex(media_tree, index_file)
+
+        rescanned = index.refresh(recursive=True)
+
+        assert rescanned == 4
+
+    def test_unchanged_directories_not_rescanned(self, media_tree, index_file):
+        """Test a second refresh lists nothing when nothing changed."""
+        index = ImportIndex(media_tree, index_file)
+        index.refresh(recursive=True)
+
+        rescanned = index.refresh(recursive=True)
+
+        assert rescanned == 0
+
+    def test_new_file_rescans_its_directory(self, media_tree, index_file):
+        """Test only the directory that gained a file is listed again."""
+        index = ImportIndex(media_tree, index_file)
+        index.refresh(recursive=True)
+        (media_tree / "2024" / "new.mp4").write_text("n")
+
+        rescanned = index.refresh(recursive=True)
+
+        assert rescanned == 1
+        names = [e.path.name for e in index.entries([".mp4"], recursive=True)]
+        assert "new.mp4" in names
+
+    def test_recently_changed_directory_rescanned(self, tmp_path, index_file):
+        """Test directories modified just before the scan are listed again."""
+        root = tmp_path / "fresh"
+        root.mkdir()
+        index = ImportIndex(root, index_file)
+        index.refresh()
+
+        rescanned = index.refresh()
+
+        assert rescanned == 1
+
+    def test_excluded_directories_not_scanned(self, media_tree, index_file):
+        """Test excluded folders are pruned from the walk."""
+        index = ImportIndex(media_tree, index_file)
+
+        rescanned = index.refresh(recursive=True, exclude=["@eaDir"])
+
+        assert rescanned == 3
+
+    def test_removed_file_dropped(self, media_tree, index_file):
+        """Test deleted files disappear from the index."""
+        index = ImportIndex(media_tree, index_file)
+        index.refresh()
+        (media_tree / "top.mp4").unlink()
+
+        index.refresh()
+
+        assert index.entries([".mp4"]) == []
+
+    def test_flat_refresh_keeps_subfolders(self, media_tree, index_file):
+        """Test a flat refresh leaves subfolder records and their metadata alone."""
+        index = ImportIndex(media_tree, index_file)
+        index.refresh(recursive=True)
+        index.set_metadata(media_tree / "2024" / "a.mp4", {"duration": 5.0})
+
+        index.refresh()
+        rescanned = index.refresh(recursive=True)
+
+        assert rescanned == 0
+        assert index.get_metadata(media_tree / "2024" / "a.mp4") == {"duration": 5.0}
+
+    def test_removed_folder_dropped(self, media_tree, index_file):
+        """Test a deleted folder is dropped along with the folders below it."""
+        index = ImportIndex(media_tree, index_file)
+        index.refresh(recursive=True)
+        (media_tree / "2024" / "trip" / "b.MKV").unlink()
+        (media_tree / "2024" / "trip").rmdir()
+        (media_tree / "2024" / "a.mp4").unlink()
+        (media_tree / "2024").rmdir()
+
+        index.refresh()
+
+        names = sorted(e.path.name for e in index.entries([".mp4", ".mkv"], recursive=True))
+        assert names == ["thumb.mp4", "top.mp4"]
+
+
+class TestEntries:
+    """Tests for ImportIndex.entries."""
+
+    def test_flat_by_default(self, media_tree, index_file):
+        """Test only top-level files are listed when not recursive."""
+        index = ImportIndex(media_tree, index_file)
+        index.refresh(recursive=True)
+
+        entries = index.entries([".mp4", ".mkv"])
+
+        assert [e.path for e in entries] == [media_tree / "top.mp4"]
+
+    def test_recursive_with_filters(self, media_tree, index_file):
+        """Test extension, include and exclude filters match scan_directory."""
+        index = ImportIndex(media_tree, index_file)
+        index.refresh(recursive=True)
+
+        entries = index.entries([".mp4", ".mkv"], recursive=True, include=["2024/*"], exclude=["@eaDir"])
+
+        assert sorted(e.path.name for e in entries) == ["a.mp4", "b.MKV"]
+        assert {e.path.name: e.size for e in entries}["b.MKV"] == 3
+
+
+class TestScan:
+    """Tests for ImportIndex.scan."""
+
+    def test_yields_matching_files_and_refreshes(self, media_tree, index_file):
+        """Test scan yields what entries() would and updates the index."""
+        index = ImportIndex(media_tree, index_file)
+
+        scanned = list(index.scan([".mp4", ".mkv"], recursive=True, exclude=["@eaDir"]))
+
+        assert sorted(e.path.name for e in scanned) == ["a.mp4", "b.MKV", "top.mp4"]
+        assert sorted(scanned, key=str) == sorted(index.entries([".mp4", ".mkv"], recursive=True, exclude=["@eaDir"]), key=str)
+        assert index.refresh(recursive=True, exclude=["@eaDir"]) == 0
+
+    def test_stopped_early_leaves_index(self, media_tree, index_file):
+        """Test abandoning a scan part way doesn't replace the index."""
+        index = ImportIndex(media_tree, index_file)
+        scan = index.scan(recursive=True)
+
+        next(scan)
+        scan.close()
+
+        assert index.entries(recursive=True) == []
+
+
+class TestMetadata:
+    """Tests for ImportIndex metadata storage."""
+
+    def test_metadata_kept_while_unchanged(self, media_tree, index_file):
+        """Test metadata survives a refresh of the file's directory."""
+        index = ImportIndex(media_tree, index_file)
+        index.refresh()
+        index.set_metadata(media_tree / "top.mp4", {"duration": 5.0})
+        (media_tree / "other.mp4").write_text("o")
+
+        index.refresh()
+
+        assert index.get_metadata(media_tree / "top.mp4") == {"duration": 5.0}
+
+    def test_metadata_dropped_when_file_changes(self, media_tree, index_file):
+        """Test metadata is discarded once the file's size or mtime changes."""
+        index = ImportIndex(media_tree, index_file)
+        index.refresh()
+        index.set_metadata(media_tree / "top.mp4", {"duration": 5.0})
+        (media_tree / "top.mp4").write_text("changed")
+        (media_tree / "other.mp4").write_text("o")
+
+        index.refresh()
+
+        assert index.get_metadata(media_tree / "top.mp4") is None
+
+    def test_unknown_file_ignored(self, media_tree, index_file):
+        """Test metadata for files outside the index is ignored."""
+        index = ImportIndex(media_tree, index_file)
+        index.refresh()
+
+        index.set_metadata(media_tree.parent / "elsewhere.mp4", {"duration": 1.0})
+
+        assert index.get_metadata(media_tree.parent / "elsewhere.mp4") is None
+
+
+class TestPersistence:
+    """Tests for saving and loading the index."""
+
+    def test_round_trip(self, media_tree, index_file):
+        """Test a saved index is reused without rescanning."""
+        index = ImportIndex(media_tree, index_file)
+        index.refresh(recursive=True)
+        index.set_metadata(media_tree / "top.mp4", {"duration": 5.0})
+        index.save()
+
+        reloaded = ImportIndex(media_tree, index_file)
+        rescanned = reloaded.refresh(recursive=True)
+
+        assert rescanned == 0
+        assert reloaded.get_metadata(media_tree / "top.mp4") == {"duration": 5.0}
+
+    def test_other_root_resets_index(self, media_tree, tmp_path, index_file):
+        """Test an index saved for another folder is not reused."""
+        index = ImportIndex(media_tree, index_file)
+        index.refresh(recursive=True)
+        index.save()
+        other = tmp_path / "other"
+        other.mkdir()
+
+        rescanned = ImportIndex(other, index_file).refresh()
+
+        assert rescanned == 1
+
+    def test_corrupt_file_ignored(self, media_tree, index_file):
+        """Test an unreadable index file starts an empty index."""
+        index_file.parent.mkdir(parents=True)
+        index_file.write_text("{not json")
+
+        rescanned = ImportIndex(media_tree, index_file).refresh()
+
+        assert rescanned == 1
+
+    def test_get_import_index_uses_logs_dir(self, media_tree, tmp_path):
+        """Test the index file is stored in the logs directory."""
+        index = get_import_index(media_tree, tmp_path / "logs")
+        index.refresh()
+
+        index.save()
+
+        data = json.loads((tmp_path / "logs" / "import_index.json").read_text())
+        assert data["root"] == str(media_tree.resolve())
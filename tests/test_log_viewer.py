@@ -0,0 +1,150 @@
+"""Tests for src/monica/log_viewer.py"""
+
+import pytest
+from itertools import islice
+
+from monica.log_viewer import iter_entries, log_files, read_lines_reverse, search_logs
+
+
+def log_line(second: int, level: str, message: str) -> str:
+    return f"2026-01-08 14:32:{second:02d} | {level:<8} | {message}\n"
+
+
+@pytest.fixture
+def logs(tmp_path):
+    """A log directory with monica.log and one rotated backup."""
+    (tmp_path / "monica.log.1").write_text(
+        log_line(0, "INFO", "JOB START: Recipe 'MP3' with 1 file(s) (job aaa111)")
+        + log_line(1, "INFO", "ITEM START: old.wav")
+        + log_line(2, "ERROR", "FFmpeg failed: old.wav\nInvalid data found\nConversion failed!")
+        + log_line(3, "INFO", "JOB END: Recipe 'MP3' - FAILED (job aaa111)"),
+        encoding="utf-8",
+    )
+    (tmp_path / "monica.log").write_text(
+        log_line(10, "INFO", "JOB START: Recipe 'MP4' with 1 file(s) (job bbb222)")
+        + log_line(11, "INFO", "ITEM START: new.mov")
+        + log_line(12, "WARNING", "Reserved moov space too small for new.mov")
+        + log_line(13, "INFO", "JOB END: Recipe 'MP4' - SUCCESS (job bbb222)")
+        + log_line(14, "DEBUG", "Menu selection: status"),
+        encoding="utf-8",
+    )
+    return tmp_path
+
+
+class TestReadLinesReverse:
+    """Tests for read_lines_reverse function."""
+
+    def test_lines_reversed_across_blocks(self, tmp_path):
+        """Test lines come last first, including lines split between blocks."""
+        path = tmp_path / "a.log"
+        lines = [f"line {i} " + "x" * i for i in range(50)]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        result = list(read_lines_reverse(path, block_size=16))
+
+        assert result == lines[::-1]
+
+    def test_no_trailing_newline(self, tmp_path):
+        """Test a last line without a newline is still read."""
+        path = tmp_path / "a.log"
+        path.write_text("one\ntwo", encoding="utf-8")
+
+        assert list(read_lines_reverse(path, block_size=3)) == ["two", "one"]
+
+    def test_utf8_split_between_blocks(self, tmp_path):
+        """Test multi-byte characters cut by a block boundary decode correctly."""
+        path = tmp_path / "a.log"
+        path.write_text("café ünïcode\nsecond\n", encoding="utf-8")
+
+        assert list(read_lines_reverse(path, block_size=2)) == ["second", "café ünïcode"]
+
+    def test_empty_file(self, tmp_path):
+        """Test an empty file has no lines."""
+        path = tmp_path / "a.log"
+        path.write_text("")
+
+        assert list(read_lines_reverse(path)) == []
+
+
+class TestIterEntries:
+    """Tests for iter_entries function."""
+
+    def test_newest_first_across_backups(self, logs):
+        """Test entries come newest first, continuing into monica.log.1."""
+        entries = list(iter_entries(logs, block_size=32))
+
+        assert [e.timestamp[-2:] for e in entries] == ["14", "13", "12", "11", "10", "03", "02", "01", "00"]
+        assert entries[-1].source.name == "monica.log.1"
+
+    def test_multiline_message_kept_together(self, logs):
+        """Test continuation lines belong to the entry above them."""
+        error = [e for e in iter_entries(logs) if e.level == "ERROR"][0]
+
+        assert error.lines[1:] == ["Invalid data found", "Conversion failed!"]
+
+    def test_job_ids_assigned(self, logs):
+        """Test entries between JOB START and JOB END get the job's id."""
+        entries = list(iter_entries(logs))
+
+        assert [e.job_id for e in entries] == [None] + ["bbb222"] * 4 + ["aaa111"] * 4
+
+    def test_lazy(self, logs, monkeypatch):
+        """Test taking the newest entries doesn't read the backups."""
+        import monica.log_viewer
+        opened = []
+        original = monica.log_viewer.read_lines_reverse
+
+        def recording(path, block_size):
+            opened.append(path.name)
+            return original(path, block_size)
+
+        monkeypatch.setattr(monica.log_viewer, "read_lines_reverse", recording)
+
+        newest = list(islice(iter_entries(logs), 3))
+
+        assert len(newest) == 3
+        assert opened == ["monica.log"]
+
+
+class TestSearchLogs:
+    """Tests for search_logs function."""
+
+    def test_minimum_level(self, logs):
+        """Test a level includes the levels above it."""
+        entries = list(search_logs(logs, level="WARNING"))
+
+        assert [e.level for e in entries] == ["WARNING", "ERROR"]
+
+    def test_job_id(self, logs):
+        """Test filtering by (the start of) a job id."""
+        entries = list(search_logs(logs, job_id="aaa"))
+
+        assert len(entries) == 4
+        assert all(e.source.name == "monica.log.1" for e in entries)
+
+    def test_file_name(self, logs):
+        """Test text filters are case-insensitive."""
+        entries = list(search_logs(logs, text="OLD.WAV"))
+
+        assert [e.level for e in entries] == ["ERROR", "INFO"]
+
+    def test_combined_filters(self, logs):
+        """Test all filters must match."""
+        assert list(search_logs(logs, level="ERROR", job_id="bbb222")) == []
+
+    def test_unknown_level(self, logs):
+        """Test an unknown level is rejected."""
+        with pytest.raises(ValueError):
+            list(search_logs(logs, level="LOUD"))
+
+
+class TestLogFiles:
+    """Tests for log_files function."""
+
+    def test_existing_files_newest_first(self, logs):
+        """Test monica.log comes before its backups."""
+        assert [p.name for p in log_files(logs)] == ["monica.log", "monica.log.1"]
+
+    def test_no_logs(self, tmp_path):
+        """Test an empty directory has no log files."""
+        assert log_files(tmp_path) == []
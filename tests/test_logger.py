@@ -1,9 +1,15 @@
 """Tests for src/monica/logger.py"""
 
+import json
+import logging
 import pytest
+import queue
+import threading
+from logging.handlers import QueueListener
 from pathlib import Path
+from unittest.mock import patch
 
-from monica.logger import MonicaLogger, get_logger
+from monica.logger import MAX_MESSAGE_CHARS, BoundedQueueHandler, MonicaLogger, get_logger
 
 
 # Reset the global logger between tests
@@ -182,3 +188,217 @@ class TestGetLogger:
         logger2 = get_logger()
 
         assert logger2 is logger1
+
+
+class TestBoundedQueueHandler:
+    """Tests for BoundedQueueHandler class."""
+
+    def make_record(self, message, level=logging.INFO):
+        return logging.makeLogRecord({"msg": message, "levelno": level, "levelname": logging.getLevelName(level)})
+
+    def test_drops_info_when_full(self):
+        """Test low-level records are dropped and counted when the queue is full."""
+        handler = BoundedQueueHandler(queue.Queue(maxsize=1))
+        handler.handle(self.make_record("first"))
+
+        handler.handle(self.make_record("second"))
+
+        assert handler.queue.qsize() == 1
+        assert handler.dropped == 1
+
+    def test_warnings_wait_for_room(self):
+        """Test warnings block until there's room rather than being dropped."""
+        handler = BoundedQueueHandler(queue.Queue(maxsize=1), block_seconds=5)
+        handler.handle(self.make_record("first"))
+        threading.Timer(0.1, handler.queue.get_nowait).start()
+
+        handler.handle(self.make_record("important", logging.WARNING))
+
+        assert handler.dropped == 0
+        assert handler.queue.get_nowait().msg == "important"
+
+    def test_warnings_dropped_after_timeout(self):
+        """Test a warning is only dropped once the wait times out."""
+        handler = BoundedQueueHandler(queue.Queue(maxsize=1), block_seconds=0.05)
+        handler.handle(self.make_record("first"))
+
+        handler.handle(self.make_record("important", logging.ERROR))
+
+        assert handler.dropped == 1
+
+    def test_drop_counted_in_metrics(self):
+        """Test each dropped record is counted in the metrics by logger name."""
+        handler = BoundedQueueHandler(queue.Queue(maxsize=1))
+        handler.handle(self.make_record("first"))
+        record = self.make_record("lost")
+        record.name = "monica"
+
+        with patch("monica.logger.get_metrics") as mock_metrics:
+            handler.handle(record)
+
+        mock_metrics.return_value.log_dropped.assert_called_once_with("monica")
+
+    def test_no_timeout_waits_for_room(self):
+        """Test block_seconds=None makes even info records wait instead of dropping."""
+        handler = BoundedQueueHandler(queue.Queue(maxsize=1), block_level=logging.DEBUG, block_seconds=None)
+        handler.handle(self.make_record("first"))
+        threading.Timer(0.1, handler.queue.get_nowait).start()
+
+        handler.handle(self.make_record("event"))
+
+        assert handler.dropped == 0
+        assert handler.queue.get_nowait().msg == "event"
+
+    def test_drop_notice(self):
+        """Test the number of dropped records is reported once there's room."""
+        handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+        for message in ("first", "second", "lost"):
+            handler.handle(self.make_record(message))
+        handler.queue.get_nowait()
+        handler.queue.get_nowait()
+
+        handler.handle(self.make_record("next"))
+
+        assert handler.dropped == 0
+        assert "Dropped 1 log message" in handler.queue.get_nowait().msg
+        assert handler.queue.get_nowait().msg == "next"
+
+    def test_long_messages_keep_the_end(self):
+        """Test oversized messages are truncated from the front."""
+        handler = BoundedQueueHandler(queue.Queue())
+
+        handler.handle(self.make_record("x" * (MAX_MESSAGE_CHARS + 10) + "real error"))
+
+        message = handler.queue.get_nowait().msg
+        assert message.startswith("[20 characters truncated]")
+        assert message.endswith("real error")
+
+    def test_listener_writes_and_flush_waits(self, tmp_path):
+        """Test records reach the target handler by the time flush returns."""
+        target = logging.FileHandler(tmp_path / "out.log", encoding="utf-8")
+        handler = BoundedQueueHandler(queue.Queue(maxsize=100))
+        handler.listener = QueueListener(handler.queue, target)
+        handler.listener.start()
+        handler.running = True
+        try:
+            for i in range(50):
+                handler.handle(self.make_record(f"line {i}"))
+
+            handler.flush()
+
+            assert (tmp_path / "out.log").read_text().count("line") == 50
+        finally:
+            handler.listener.stop()
+            target.close()
+
+
+@pytest.fixture
+def event_logger(tmp_logs_dir):
+    """A MonicaLogger of its own, writing to tmp_logs_dir."""
+    def detach():
+        for name in ("monica", "monica.events"):
+            for handler in logging.getLogger(name).handlers[:]:
+                logging.getLogger(name).removeHandler(handler)
+
+    saved = MonicaLogger._instance
+    detach()
+    MonicaLogger._instance = None
+    logger = MonicaLogger(tmp_logs_dir)
+    yield logger
+    logger.close()
+    detach()
+    MonicaLogger._instance = saved
+
+
+def read_events(logger):
+    logger.flush()
+    lines = (logger.logs_dir / "events.jsonl").read_text(encoding="utf-8").splitlines()
+    return [json.loads(line) for line in lines]
+
+
+class TestJobEvents:
+    """Tests for the structured events written by MonicaLogger."""
+
+    def test_events_never_dropped(self, event_logger):
+        """Test the events queue waits for room rather than dropping events."""
+        handler = logging.getLogger("monica.events").handlers[0]
+
+        assert handler.block_level == logging.DEBUG
+        assert handler.block_seconds is None
+
+    def test_job_events_written(self, event_logger, tmp_path):
+        """Test a job writes start, item and end events sharing a job id."""
+        source = tmp_path / "in.mp4"
+        source.write_bytes(b"x" * 100)
+        output = tmp_path / "out.mp4"
+        output.write_bytes(b"y" * 40)
+
+        job_id = event_logger.job_start([str(source)], "Test Recipe", "video")
+        event_logger.item_start(source.name, source)
+        event_logger.annotate_item(exit_code=0, media_duration_s=30.0)
+        event_logger.item_end(source.name, True, output_path=output)
+        event_logger.job_end(True, "Test Recipe")
+        events = read_events(event_logger)
+
+        assert [e["event"] for e in events] == ["job_start", "item_start", "item_end", "job_end"]
+        assert {e["job_id"] for e in events} == {job_id}
+        assert events[0]["category"] == "video"
+        item_end = events[2]
+        assert item_end["item_id"] == events[1]["item_id"]
+        assert item_end["status"] == "success"
+        assert item_end["input_bytes"] == 100
+        assert item_end["output_bytes"] == 40
+        assert item_end["exit_code"] == 0
+        assert item_end["error_class"] is None
+        assert item_end["speed_factor"] > 0
+        assert events[3]["succeeded"] == 1
+        assert events[3]["output_bytes"] == 40
+
+    def test_failed_item_classified(self, event_logger):
+        """Test a failed item records its exit code and error class."""
+        event_logger.job_start(["missing.mp4"], "Test Recipe")
+        event_logger.item_start("missing.mp4")
+        event_logger.annotate_item(exit_code=1)
+        event_logger.item_end("missing.mp4", False, error="missing.mp4: No such file or directory")
+        event_logger.job_end(False, "Test Recipe")
+        events = read_events(event_logger)
+
+        item_end = events[2]
+        assert item_end["status"] == "failed"
+        assert item_end["exit_code"] == 1
+        assert item_end["error_class"] == "input_missing"
+        assert item_end["input_bytes"] is None
+        assert events[3]["failed"] == 1
+
+    def test_same_name_items_kept_apart(self, event_logger, tmp_path):
+        """Test overlapping items with the same file name end separately."""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        first = tmp_path / "a" / "clip.wav"
+        second = tmp_path / "b" / "clip.wav"
+
+        event_logger.job_start([str(first), str(second)], "MP3")
+        first_id = event_logger.item_start(first.name, first)
+        second_id = event_logger.item_start(second.name, second)
+        event_logger.annotate_item(first_id, exit_code=3)
+        event_logger.item_end(first.name, False, error="boom", item_id=first_id)
+        event_logger.item_end(second.name, True, item_id=second_id)
+        event_logger.job_end(False, "MP3")
+        events = read_events(event_logger)
+
+        ends = {e["input"]: e for e in events if e["event"] == "item_end"}
+        assert ends[str(first)]["status"] == "failed"
+        assert ends[str(first)]["exit_code"] == 3
+        assert ends[str(second)]["status"] == "success"
+        assert events[-1]["failed"] == 1
+        assert events[-1]["succeeded"] == 1
+
+    def test_human_log_unchanged(self, event_logger):
+        """Test events don't show up in monica.log."""
+        event_logger.job_start(["a.mp4"], "Test Recipe")
+        event_logger.flush()
+
+        content = (event_logger.logs_dir / "monica.log").read_text(encoding="utf-8")
+
+        assert "JOB START: Recipe 'Test Recipe'" in content
+        assert "job_start" not in content
@@ -0,0 +1,177 @@
+"""Tests for src/monica/loudness.py"""
+
+import os
+import pytest
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+from monica.loudness import (
+    LoudnessCache,
+    parse_loudnorm_output,
+    build_loudnorm_filter,
+    apply_normalization,
+    input_fingerprint,
+    measure_files,
+)
+from monica.recipes import Recipe
+
+
+LOUDNORM_OUTPUT = """[Parsed_loudnorm_0 @ 0x55d5c0a0] 
+{
+	"input_i" : "-23.54",
+	"input_tp" : "-7.96",
+	"input_lra" : "0.00",
+	"input_thresh" : "-34.17",
+	"output_i" : "-16.58",
+	"output_tp" : "-1.50",
+	"output_lra" : "0.00",
+	"output_thresh" : "-27.12",
+	"normalization_type" : "dynamic",
+	"target_offset" : "0.58"
+}
+"""
+
+MEASUREMENT = {
+    "input_i": "-23.54",
+    "input_tp": "-7.96",
+    "input_lra": "0.00",
+    "input_thresh": "-34.17",
+    "target_offset": "0.58",
+}
+
+
+@pytest.fixture
+def mp3_recipe():
+    """Simple audio recipe."""
+    return Recipe(
+        name="MP3",
+        category="audio",
+        extension=".mp3",
+        ffmpeg_args=["-vn", "-c:a", "libmp3lame", "-b:a", "192k"],
+    )
+
+
+class TestParseLoudnormOutput:
+    """Tests for parse_loudnorm_output function."""
+
+    def test_parses_measurement(self):
+        """Test the JSON block is extracted."""
+        assert parse_loudnorm_output(LOUDNORM_OUTPUT) == MEASUREMENT
+
+    def test_no_json(self):
+        """Test output without JSON returns None."""
+        assert parse_loudnorm_output("Error opening input") is None
+
+
+class TestApplyNormalization:
+    """Tests for build_loudnorm_filter and apply_normalization."""
+
+    def test_two_pass_filter(self):
+        """Test measured values are passed to the apply pass."""
+        result = build_loudnorm_filter(MEASUREMENT)
+
+        assert "measured_I=-23.54" in result
+        assert "offset=0.58" in result
+        assert "linear=true" in result
+
+    def test_single_pass_fallback(self):
+        """Test a missing measurement uses dynamic mode."""
+        assert "measured_I" not in build_loudnorm_filter(None)
+
+    def test_adds_filter_and_rate(self, mp3_recipe):
+        """Test -af and -ar are added without touching the original."""
+        result = apply_normalization(mp3_recipe, MEASUREMENT)
+
+        assert result.ffmpeg_args[-4] == "-af"
+        assert result.ffmpeg_args[-2:] == ["-ar", "48000"]
+        assert "-af" not in mp3_recipe.ffmpeg_args
+
+    def test_chains_existing_filter(self, mp3_recipe):
+        """Test an existing -af chain is extended."""
+        mp3_recipe.ffmpeg_args = ["-af", "highpass=f=80", "-ar", "44100"]
+
+        result = apply_normalization(mp3_recipe, MEASUREMENT)
+
+        assert result.ffmpeg_args[1].startswith("highpass=f=80,loudnorm=")
+        assert result.ffmpeg_args.count("-ar") == 1
+
+
+class TestLoudnessCache:
+    """Tests for LoudnessCache class."""
+
+    def test_persists(self, tmp_path):
+        """Test saved measurements load in a new cache."""
+        cache = LoudnessCache(tmp_path / "cache.json")
+        cache.put("abc", MEASUREMENT)
+        cache.save()
+
+        assert LoudnessCache(tmp_path / "cache.json").get("abc") == MEASUREMENT
+
+    def test_corrupt_file(self, tmp_path):
+        """Test a corrupt cache file starts empty."""
+        (tmp_path / "cache.json").write_text("{not json")
+
+        assert LoudnessCache(tmp_path / "cache.json").get("abc") is None
+
+
+class TestMeasureFiles:
+    """Tests for measure_files function."""
+
+    @patch("monica.loudness.get_logger")
+    @patch("monica.loudness.measure_loudness", return_value=MEASUREMENT)
+    def test_measures_once(self, mock_measure, mock_logger, tmp_path):
+        """Test a second batch for the same source hits the cache."""
+        source = tmp_path / "song.wav"
+        source.write_bytes(b"RIFF")
+        cache = LoudnessCache(tmp_path / "cache.json")
+
+        first = measure_files("ffmpeg", [source], cache)
+        second = measure_files("ffmpeg", [source], LoudnessCache(tmp_path / "cache.json"))
+
+        assert first[source] == second[source] == MEASUREMENT
+        assert mock_measure.call_count == 1
+
+    @patch("monica.loudness.get_logger")
+    @patch("monica.loudness.measure_loudness", return_value=MEASUREMENT)
+    def test_renamed_file_uses_cache(self, mock_measure, mock_logger, tmp_path):
+        """Test the cache key doesn't include the file's name."""
+        source = tmp_path / "song.wav"
+        source.write_bytes(b"RIFF")
+        cache = LoudnessCache(tmp_path / "cache.json")
+
+        measure_files("ffmpeg", [source], cache)
+        renamed = source.rename(tmp_path / "renamed.wav")
+        result = measure_files("ffmpeg", [renamed], cache)
+
+        assert result[renamed] == MEASUREMENT
+        assert mock_measure.call_count == 1
+
+    @patch("monica.loudness.get_logger")
+    @patch("monica.loudness.measure_loudness", return_value=MEASUREMENT)
+    def test_same_samples_other_file_measured(self, mock_measure, mock_logger, tmp_path):
+        """Test a file that only matches on sampled blocks isn't served from the cache."""
+        source = tmp_path / "song.wav"
+        source.write_bytes(b"RIFF")
+        other = tmp_path / "other.wav"
+        other.write_bytes(b"RIFF")
+        os.utime(other, ns=(0, source.stat().st_mtime_ns + 1_000_000_000))
+        cache = LoudnessCache(tmp_path / "cache.json")
+
+        with patch("monica.loudness.sampled_fingerprint", return_value="same"):
+            measure_files("ffmpeg", [source], cache)
+            measure_files("ffmpeg", [other], cache)
+
+        assert mock_measure.call_count == 2
+
+    @patch("monica.loudness.get_logger")
+    @patch("monica.loudness.measure_loudness", return_value=None)
+    def test_failed_measurement_not_cached(self, mock_measure, mock_logger, tmp_path):
+        """Test failures are returned as None and not cached."""
+        source = tmp_path / "song.wav"
+        source.write_bytes(b"RIFF")
+        cache = LoudnessCache(tmp_path / "cache.json")
+
+        result = measure_files("ffmpeg", [source], cache)
+
+        assert result[source] is None
+        assert cache.get(input_fingerprint(source)) is None
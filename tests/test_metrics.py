@@ -0,0 +1,133 @@
+"""Tests for src/monica/metrics.py"""
+
+import urllib.error
+import urllib.request
+
+import pytest
+
+from monica.metrics import CONTENT_TYPE, Histogram, JobMetrics, start_metrics_server
+
+
+def sample(text: str, name: str) -> str:
+    """Value of the sample line starting with `name `."""
+    for line in text.splitlines():
+        if line.startswith(name + " "):
+            return line.split(" ")[-1]
+    raise AssertionError(f"no sample {name}")
+
+
+class TestHistogram:
+    """Tests for Histogram class."""
+
+    def test_cumulative_buckets(self):
+        """Test bucket counts are cumulative and end with +Inf."""
+        histogram = Histogram((1.0, 5.0))
+        for value in (0.5, 1.0, 3.0, 60.0):
+            histogram.observe(value)
+
+        lines = histogram.samples("h")
+
+        assert lines == [
+            'h_bucket{le="1.0"} 2',
+            'h_bucket{le="5.0"} 3',
+            'h_bucket{le="+Inf"} 4',
+            "h_count 4",
+            "h_sum 64.5",
+        ]
+
+
+class TestJobMetrics:
+    """Tests for JobMetrics class."""
+
+    def test_job_progress(self):
+        """Test gauges follow a job through its items."""
+        metrics = JobMetrics()
+
+        metrics.job_started("job1", "MP4 (H.264)", 3)
+        metrics.item_finished("job1", True, 10.0, output_bytes=1000, media_seconds=30.0)
+        metrics.item_finished("job1", False, 2.0)
+        text = metrics.render()
+
+        assert sample(text, "monica_active_jobs") == "1"
+        assert sample(text, "monica_queue_depth") == "1"
+        assert sample(text, "monica_items_completed_total") == "1"
+        assert sample(text, "monica_items_failed_total") == "1"
+        assert sample(text, "monica_output_bytes_total") == "1000"
+        assert 'monica_job_speed_factor{job_id="job1",recipe="MP4 (H.264)"} 3.0' in text
+
+    def test_job_finished(self):
+        """Test a finished job leaves the gauges but counters stay."""
+        metrics = JobMetrics()
+        metrics.job_started("job1", "MP3", 2)
+        metrics.item_finished("job1", True, 1.0)
+
+        metrics.job_finished("job1")
+        text = metrics.render()
+
+        assert sample(text, "monica_active_jobs") == "0"
+        assert sample(text, "monica_queue_depth") == "0"
+        assert sample(text, "monica_items_completed_total") == "1"
+        assert "monica_job_speed_factor{" not in text
+
+    def test_log_drops_counted(self):
+        """Test dropped log records are counted per logger."""
+        metrics = JobMetrics()
+
+        metrics.log_dropped("monica")
+        metrics.log_dropped("monica")
+        text = metrics.render()
+
+        assert sample(text, 'monica_log_records_dropped_total{logger="monica"}') == "2"
+
+    def test_openmetrics_format(self):
+        """Test the exposition ends with # EOF and escapes labels."""
+        metrics = JobMetrics()
+        metrics.job_started("job1", 'Say "hi"', 1)
+        metrics.item_finished("job1", True, 1.0, media_seconds=2.0)
+
+        text = metrics.render()
+
+        assert text.endswith("# EOF\n")
+        assert 'recipe="Say \\"hi\\""' in text
+
+    def test_textfile_written(self, tmp_path):
+        """Test the textfile is rewritten as items finish."""
+        metrics = JobMetrics()
+        metrics.textfile = tmp_path / "monica.prom"
+
+        metrics.job_started("job1", "MP3", 1)
+        metrics.item_finished("job1", True, 1.0)
+
+        assert sample(metrics.textfile.read_text(), "monica_items_completed_total") == "1"
+        assert [p.name for p in tmp_path.iterdir()] == ["monica.prom"]
+
+
+class TestMetricsServer:
+    """Tests for start_metrics_server function."""
+
+    @pytest.fixture
+    def server(self):
+        server = start_metrics_server(0)
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    def test_serves_metrics(self, server):
+        """Test /metrics returns the exposition with the OpenMetrics type."""
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode("utf-8")
+            content_type = response.headers["Content-Type"]
+
+        assert content_type == CONTENT_TYPE
+        assert body.endswith("# EOF\n")
+
+    def test_other_paths_not_found(self, server):
+        """Test other paths return 404."""
+        url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(url, timeout=5)
+
+        assert excinfo.value.code == 404
@@ -0,0 +1,95 @@
+"""Tests for src/monica/mover.py"""
+
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from monica.mover import move_atomically, OutputMover
+
+
+@pytest.fixture(autouse=True)
+def mock_logger():
+    """Keep the mover thread from creating the global logger."""
+    with patch("monica.mover.get_logger") as mock:
+        yield mock
+
+
+@pytest.fixture
+def scratch(tmp_path):
+    """Local scratch directory."""
+    path = tmp_path / "scratch"
+    path.mkdir()
+    return path
+
+
+class TestMoveAtomically:
+    """Tests for move_atomically function."""
+
+    def test_same_filesystem_rename(self, tmp_path):
+        """Test a same-filesystem move is a rename."""
+        source = tmp_path / "out.mp4"
+        source.write_bytes(b"video")
+        dest = tmp_path / "export.mp4"
+
+        with patch("monica.mover.shutil.copyfileobj") as mock_copy:
+            move_atomically(source, dest)
+
+        mock_copy.assert_not_called()
+        assert dest.read_bytes() == b"video"
+        assert not source.exists()
+
+    @patch("monica.mover._same_filesystem", return_value=False)
+    def test_cross_filesystem_copy(self, mock_same, tmp_path):
+        """Test a cross-filesystem move copies, renames and leaves no temp file."""
+        source = tmp_path / "out.mp4"
+        source.write_bytes(b"video")
+        export_dir = tmp_path / "export"
+        export_dir.mkdir()
+        dest = export_dir / "out.mp4"
+
+        move_atomically(source, dest)
+
+        assert dest.read_bytes() == b"video"
+        assert not source.exists()
+        assert list(export_dir.iterdir()) == [dest]
+
+
+class TestOutputMover:
+    """Tests for OutputMover class."""
+
+    def test_moves_submitted_outputs(self, scratch, tmp_export_dir):
+        """Test submitted outputs end up in the export directory."""
+        mover = OutputMover(scratch)
+        for name in ("a.mp4", "b.mp4"):
+            work_file = mover.work_path(tmp_export_dir / name)
+            work_file.write_bytes(name.encode())
+            mover.submit(work_file, tmp_export_dir / name)
+
+        errors = mover.close()
+
+        assert errors == []
+        assert (tmp_export_dir / "a.mp4").read_bytes() == b"a.mp4"
+        assert (tmp_export_dir / "b.mp4").exists()
+        assert list(scratch.iterdir()) == []
+
+    def test_work_path_in_scratch(self, scratch, tmp_export_dir):
+        """Test jobs are pointed at scratch, not the export directory."""
+        mover = OutputMover(scratch)
+
+        work_file = mover.work_path(tmp_export_dir / "a.mp4")
+        mover.close()
+
+        assert work_file.name == "a.mp4"
+        assert work_file.parent.parent == scratch
+
+    def test_failed_move_kept(self, scratch, tmp_path):
+        """Test outputs that can't be moved are reported and kept in scratch."""
+        mover = OutputMover(scratch)
+        work_file = mover.work_path(Path("a.mp4"))
+        work_file.write_bytes(b"video")
+
+        mover.submit(work_file, tmp_path / "missing" / "a.mp4")
+        errors = mover.close()
+
+        assert [e[0].name for e in errors] == ["a.mp4"]
+        assert work_file.exists()
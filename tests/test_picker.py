@@ -0,0 +1,295 @@
+"""Tests for src/monica/picker.py"""
+
+from prompt_toolkit.application import create_app_session
+from prompt_toolkit.input import create_pipe_input
+from prompt_toolkit.output import DummyOutput
+
+from monica.picker import PickerState, fuzzy_patterns, run_picker
+
+
+TITLES = [
+    "2023/beach.mp4 (1.0 MB)",
+    "2024/trip/day1.mp4 (2.0 MB)",
+    "2024/trip/day2.mkv (3.0 MB)",
+    "2024/party.mov (4.0 MB)",
+    "top.mp4 (5.0 MB)",
+]
+
+
+class TestFuzzyPatterns:
+    """Tests for fuzzy_patterns function."""
+
+    def test_characters_match_in_order(self):
+        """Test a term matches its characters with gaps between them."""
+        patterns = fuzzy_patterns("tr24")
+
+        assert patterns[0].search("trip_2024.mp4")
+        assert not patterns[0].search("2024_trip.mp4")
+
+    def test_terms_split_on_whitespace(self):
+        """Test each whitespace-separated term gets its own pattern."""
+        patterns = fuzzy_patterns("Trip  MKV")
+
+        assert [p.pattern for p in patterns] == ["t.*?r.*?i.*?p", "m.*?k.*?v"]
+
+    def test_special_characters_escaped(self):
+        """Test regex metacharacters match literally."""
+        patterns = fuzzy_patterns("a.b")
+
+        assert not patterns[0].search("axxb")
+        assert patterns[0].search("a.b")
+
+
+class TestPickerStateFilter:
+    """Tests for PickerState filtering."""
+
+    def test_empty_query_matches_all(self):
+        """Test every title is shown without a filter."""
+        state = PickerState(TITLES)
+
+        assert state.matches == [0, 1, 2, 3, 4]
+
+    def test_filter_is_case_insensitive(self):
+        """Test filtering ignores case."""
+        state = PickerState(TITLES)
+
+        state.set_query("TRIP")
+
+        assert state.matches == [1, 2]
+
+    def test_all_terms_must_match(self):
+        """Test a multi-term query narrows to titles matching every term."""
+        state = PickerState(TITLES)
+
+        state.set_query("trip mkv")
+
+        assert state.matches == [2]
+
+    def test_backspace_restores_previous_matches(self):
+        """Test shortening the query widens the matches again."""
+        state = PickerState(TITLES)
+        state.set_query("2024/")
+        state.set_query("2024/ mkv")
+
+        state.set_query("2024/")
+
+        assert state.matches == [1, 2, 3]
+
+    def test_changed_query_refilters(self):
+        """Test a query that isn't an extension of the last one filters from all titles."""
+        state = PickerState(TITLES)
+        state.set_query("trip")
+
+        state.set_query("top")
+
+        assert state.matches == [4]
+
+    def test_filter_resets_cursor(self):
+        """Test the cursor returns to the first match after filtering."""
+        state = PickerState(TITLES)
+        state.move(3)
+
+        state.set_query("mp4")
+
+        assert state.cursor == 0
+        assert state.current() == 0
+
+
+class TestPickerStateExpression:
+    """Tests for PickerState metadata queries."""
+
+    def test_prefixed_query_uses_expression_filter(self):
+        """Test filter text starting with ? goes to the expression filter."""
+        calls = []
+        state = PickerState(TITLES, expression_filter=lambda text: calls.append(text) or [4, 0])
+
+        state.set_query("?size > 1")
+
+        assert calls == ["size > 1"]
+        assert state.matches == [4, 0]
+
+    def test_invalid_query_keeps_last_matches(self):
+        """Test an incomplete query shows its error and keeps the last result."""
+        def expression_filter(text):
+            if text.endswith(">"):
+                raise ValueError("unexpected end of query")
+            return [1]
+        state = PickerState(TITLES, expression_filter=expression_filter)
+        state.set_query("?a")
+
+        state.set_query("?a >")
+
+        assert state.matches == [1]
+        assert "unexpected end of query" in state.status()
+
+    def test_back_to_fuzzy_filter(self):
+        """Test removing the prefix returns to fuzzy filtering."""
+        state = PickerState(TITLES, expression_filter=lambda text: [])
+        state.set_query("?x")
+
+        state.set_query("top")
+
+        assert state.matches == [4]
+        assert state.error is None
+
+    def test_without_expression_filter(self):
+        """Test ? is an ordinary character without an expression filter."""
+        state = PickerState(["what?.mp4", "other.mp4"])
+
+        state.set_query("?")
+
+        assert state.matches == [0]
+
+
+class TestPickerStateNavigation:
+    """Tests for PickerState cursor movement and windowing."""
+
+    def test_visible_window_limited_to_page(self):
+        """Test only one page of rows is produced."""
+        state = PickerState([f"file{i}.mp4" for i in range(100_000)], page_size=10)
+
+        rows = state.visible()
+
+        assert len(rows) == 10
+        assert rows[0] == (0, False, True)
+
+    def test_window_scrolls_with_cursor(self):
+        """Test moving past the page scrolls the window."""
+        state = PickerState(TITLES, page_size=2)
+
+        state.move(2)
+
+        assert state.top == 1
+        assert [row[0] for row in state.visible()] == [1, 2]
+
+    def test_cursor_clamped(self):
+        """Test the cursor stays within the matches."""
+        state = PickerState(TITLES, page_size=2)
+
+        state.page(10)
+
+        assert state.cursor == 4
+        state.page(-10)
+        assert state.cursor == 0
+
+    def test_move_with_no_matches(self):
+        """Test moving does nothing when nothing matches."""
+        state = PickerState(TITLES)
+        state.set_query("zzz")
+
+        state.move(1)
+
+        assert state.current() is None
+        assert state.visible() == []
+
+
+class TestPickerStateSelection:
+    """Tests for PickerState selection."""
+
+    def test_toggle(self):
+        """Test toggling selects and deselects the current title."""
+        state = PickerState(TITLES)
+        state.move(1)
+
+        state.toggle()
+        assert state.selected == {1}
+        state.toggle()
+        assert state.selected == set()
+
+    def test_select_matching(self):
+        """Test selecting all titles matching the filter."""
+        state = PickerState(TITLES)
+        state.set_query("2024/")
+
+        state.select_matching()
+
+        assert state.selected == {1, 2, 3}
+
+    def test_selection_kept_across_filters(self):
+        """Test selections survive changing the filter."""
+        state = PickerState(TITLES)
+        state.set_query("trip")
+        state.select_matching()
+        state.set_query("top")
+        state.select_matching()
+
+        state.set_query("day2.mkv")
+        state.deselect_matching()
+
+        assert state.selected == {1, 4}
+
+    def test_extend_keeps_filters(self):
+        """Test titles added later join the cached filter results they match."""
+        state = PickerState(["trip.mp4", "home.mp4"])
+        state.set_query("tr")
+
+        state.extend(["trip2.mkv", "work.mp4"])
+        state.set_query("tri")
+
+        assert state.matches == [0, 2]
+        state.set_query("")
+        assert state.matches == [0, 1, 2, 3]
+
+    def test_status(self):
+        """Test the status line shows counts and page."""
+        state = PickerState(TITLES, page_size=2)
+        state.select_matching()
+        state.move(2)
+
+        assert state.status() == "5 of 5 shown · 5 selected · page 2/3"
+
+
+class TestRunPicker:
+    """Tests for run_picker function."""
+
+    def run_with_keys(self, titles, keys, **kwargs):
+        with create_pipe_input() as pipe:
+            pipe.send_text(keys)
+            with create_app_session(input=pipe, output=DummyOutput()):
+                return run_picker(titles, "Select files", **kwargs)
+
+    def test_filter_and_select(self):
+        """Test typing filters and Tab/Enter return the selected indices."""
+        result = self.run_with_keys(TITLES, "trip\t\x1b[B\t\r")
+
+        assert result == [1, 2]
+
+    def test_select_all_matching(self):
+        """Test Ctrl-A selects every match of the filter."""
+        result = self.run_with_keys(TITLES, "mp4\x01\r")
+
+        assert result == [0, 1, 4]
+
+    def test_cancel(self):
+        """Test Ctrl-C cancels the picker."""
+        result = self.run_with_keys(TITLES, "\x03")
+
+        assert result is None
+
+    def test_titles_polled_while_growing(self):
+        """Test titles from poll() can be selected, and polling stops when finished."""
+        batches = iter([(["a.mp4"], False), (["b.mp4"], True)])
+        calls = []
+
+        def poll():
+            calls.append(1)
+            return next(batches)
+
+        result = self.run_with_keys([], "\x01\r", poll=poll)
+
+        assert result[0] == 0
+        assert len(calls) <= 2
+
+    def test_details_for_visible_rows(self):
+        """Test details are only requested for the rows on screen."""
+        described = set()
+        rendered = []
+
+        def describe(index):
+            described.add(index)
+            return None
+
+        self.run_with_keys(TITLES, "\r", page_size=2, describe=describe, on_render=rendered.append)
+
+        assert described == {0, 1}
+        assert rendered[0] == [0, 1]
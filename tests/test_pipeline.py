@@ -0,0 +1,185 @@
+"""Tests for src/monica/pipeline.py"""
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from monica.pipeline import (
+    is_pipe,
+    ffmpeg_target,
+    strip_faststart,
+    get_stream_container,
+    build_stream_command,
+    run_stream_job,
+    describe_target,
+)
+from monica.recipes import Recipe
+
+
+@pytest.fixture
+def faststart_recipe():
+    """Recipe with -movflags +faststart, like the YouTube presets."""
+    return Recipe(
+        name="Faststart Recipe",
+        category="youtube",
+        extension=".mp4",
+        ffmpeg_args=["-c:v", "libx264", "-movflags", "+faststart", "-crf", "20"],
+    )
+
+
+class TestIsPipe:
+    """Tests for is_pipe function."""
+
+    def test_dash_is_pipe(self):
+        """Test '-' is treated as a pipe."""
+        assert is_pipe("-") is True
+
+    def test_pipe_url_is_pipe(self):
+        """Test pipe:N URLs are treated as pipes."""
+        assert is_pipe("pipe:1") is True
+
+    def test_path_is_not_pipe(self):
+        """Test regular paths are not pipes."""
+        assert is_pipe("video.mp4") is False
+
+
+class TestFfmpegTarget:
+    """Tests for ffmpeg_target function."""
+
+    def test_dash_maps_to_fd(self):
+        """Test '-' maps to the default pipe descriptor."""
+        assert ffmpeg_target("-", 0) == "pipe:0"
+        assert ffmpeg_target("-", 1) == "pipe:1"
+
+    def test_path_unchanged(self):
+        """Test paths pass through unchanged."""
+        assert ffmpeg_target("in.mkv", 0) == "in.mkv"
+
+
+class TestStripFaststart:
+    """Tests for strip_faststart function."""
+
+    def test_removes_faststart_pair(self, faststart_recipe):
+        """Test -movflags +faststart is removed."""
+        result = strip_faststart(faststart_recipe.ffmpeg_args)
+
+        assert result == ["-c:v", "libx264", "-crf", "20"]
+
+    def test_keeps_other_args(self):
+        """Test args without faststart are unchanged."""
+        args = ["-c", "copy"]
+
+        assert strip_faststart(args) == args
+
+
+class TestGetStreamContainer:
+    """Tests for get_stream_container function."""
+
+    def test_explicit_container(self, sample_recipe):
+        """Test explicit container wins."""
+        assert get_stream_container(sample_recipe, "mpegts") == "mpegts"
+
+    def test_default_from_extension(self, sample_recipe):
+        """Test container derived from recipe extension."""
+        assert get_stream_container(sample_recipe) == "mp4"
+
+    def test_unstreamable_extension(self):
+        """Test unknown extensions have no default container."""
+        recipe = Recipe(name="AVI", category="video", extension=".avi", ffmpeg_args=[])
+
+        assert get_stream_container(recipe) is None
+
+
+class TestBuildStreamCommand:
+    """Tests for build_stream_command function."""
+
+    def test_pipe_to_pipe(self, faststart_recipe):
+        """Test stdin to stdout uses fragmented MP4 without faststart."""
+        cmd = build_stream_command("ffmpeg", "-", "-", faststart_recipe)
+
+        assert cmd[cmd.index("-i") + 1] == "pipe:0"
+        assert cmd[-1] == "pipe:1"
+        assert "+faststart" not in cmd
+        assert "frag_keyframe+empty_moov+default_base_moof" in cmd
+        assert "-nostdin" not in cmd
+
+    def test_file_to_file_keeps_recipe_args(self, faststart_recipe):
+        """Test file output without container keeps recipe args as-is."""
+        cmd = build_stream_command("ffmpeg", "in.mkv", "out.mp4", faststart_recipe)
+
+        assert "+faststart" in cmd
+        assert "-nostdin" in cmd
+        assert "-f" not in cmd
+
+    def test_explicit_container(self, sample_recipe):
+        """Test explicit container selects the muxer."""
+        cmd = build_stream_command("ffmpeg", "in.mkv", "-", sample_recipe, "mpegts")
+
+        assert cmd[-3:] == ["-f", "mpegts", "pipe:1"]
+
+    def test_time_range_before_input(self, sample_recipe):
+        """Test a recipe time range is applied as input options."""
+        sample_recipe.options = {"start": 5.0, "end": 8.0}
+
+        cmd = build_stream_command("ffmpeg", "in.mkv", "out.mp4", sample_recipe)
+
+        assert cmd.index("-ss") < cmd.index("-i")
+        assert cmd.index("-t") < cmd.index("-i")
+
+    def test_unstreamable_recipe_raises(self):
+        """Test pipe output with no streamable container raises."""
+        recipe = Recipe(name="AVI", category="video", extension=".avi", ffmpeg_args=[])
+
+        with pytest.raises(ValueError):
+            build_stream_command("ffmpeg", "in.mkv", "-", recipe)
+
+
+class TestRunStreamJob:
+    """Tests for run_stream_job function."""
+
+    @patch("monica.pipeline.subprocess.Popen")
+    def test_success(self, mock_popen, sample_recipe):
+        """Test successful job returns (True, '')."""
+        process = MagicMock(returncode=0)
+        process.communicate.return_value = ("", "")
+        mock_popen.return_value = process
+
+        assert run_stream_job("ffmpeg", "-", "-", sample_recipe) == (True, "")
+
+        kwargs = mock_popen.call_args.kwargs
+        assert kwargs["stdin"] is None
+        assert kwargs["stdout"] is None
+
+    @patch("monica.pipeline.subprocess.Popen")
+    def test_failure_returns_stderr(self, mock_popen, sample_recipe):
+        """Test failed job returns FFmpeg's stderr."""
+        process = MagicMock(returncode=1)
+        process.communicate.return_value = ("", "Invalid data found\n")
+        mock_popen.return_value = process
+
+        success, error = run_stream_job("ffmpeg", "in.mkv", "-", sample_recipe)
+
+        assert success is False
+        assert error == "Invalid data found"
+
+    def test_bad_container_does_not_spawn(self):
+        """Test an unstreamable recipe fails before spawning FFmpeg."""
+        recipe = Recipe(name="AVI", category="video", extension=".avi", ffmpeg_args=[])
+
+        with patch("monica.pipeline.subprocess.Popen") as mock_popen:
+            success, _ = run_stream_job("ffmpeg", "in.mkv", "-", recipe)
+
+        assert success is False
+        mock_popen.assert_not_called()
+
+
+class TestDescribeTarget:
+    """Tests for describe_target function."""
+
+    def test_stdin_stdout(self):
+        """Test '-' is described by direction."""
+        assert describe_target("-") == "stdin"
+        assert describe_target("-", is_output=True) == "stdout"
+
+    def test_path_uses_name(self):
+        """Test paths are described by file name."""
+        assert describe_target("/a/b/clip.mp4") == "clip.mp4"
@@ -0,0 +1,168 @@
+"""Tests for src/monica/preflight.py"""
+
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from monica.preflight import (
+    parse_kbps,
+    output_height,
+    estimate_video_kbps,
+    estimate_output_bytes,
+    SizeHistory,
+    run_preflight,
+    SAFETY_FACTOR,
+    MIN_HISTORY,
+)
+from monica.probe import MediaInfo
+from monica.recipes import Recipe, find_recipe
+
+
+@pytest.fixture
+def source_4k():
+    """A 10-minute 4K source with audio."""
+    return MediaInfo(
+        duration=600.0, width=3840, height=2160, fps=30.0,
+        video_codec="h264", video_bitrate_kbps=40000,
+        audio_codec="aac", audio_bitrate_kbps=192,
+    )
+
+
+class TestParseKbps:
+    """Tests for parse_kbps function."""
+
+    def test_units(self):
+        """Test k, M and plain bits per second."""
+        assert parse_kbps("192k") == 192
+        assert parse_kbps("8M") == 8000
+        assert parse_kbps("128000") == 128
+
+    def test_invalid(self):
+        """Test unparseable values give None."""
+        assert parse_kbps("fast") is None
+        assert parse_kbps(None) is None
+
+
+class TestOutputHeight:
+    """Tests for output_height function."""
+
+    def test_scale_height(self, source_4k):
+        """Test scale=-2:H sets the height."""
+        assert output_height(["-vf", "scale=-2:1080"], source_4k) == 1080
+
+    def test_scale_width(self, source_4k):
+        """Test scale=W:-2 keeps the aspect ratio."""
+        assert output_height(["-vf", "scale=1920:-2"], source_4k) == 1080
+
+    def test_no_scale(self, source_4k):
+        """Test the source height is used without a scale filter."""
+        assert output_height([], source_4k) == 2160
+
+
+class TestEstimateVideoKbps:
+    """Tests for estimate_video_kbps function."""
+
+    def test_lower_crf_is_larger(self, source_4k):
+        """Test a lower CRF estimates a higher bitrate."""
+        high = Recipe(name="a", category="video", extension=".mp4", ffmpeg_args=["-c:v", "libx264", "-crf", "18"])
+        low = Recipe(name="b", category="video", extension=".mp4", ffmpeg_args=["-c:v", "libx264", "-crf", "24"])
+
+        assert estimate_video_kbps(high, source_4k) == pytest.approx(2 * estimate_video_kbps(low, source_4k))
+
+    def test_explicit_bitrate(self, source_4k):
+        """Test -b:v is used as is."""
+        recipe = Recipe(name="a", category="video", extension=".mp4", ffmpeg_args=["-c:v", "libx264", "-b:v", "5M"])
+
+        assert estimate_video_kbps(recipe, source_4k) == 5000
+
+    def test_stream_copy(self, source_4k):
+        """Test stream copy keeps the source bitrate."""
+        recipe = Recipe(name="a", category="remux", extension=".mkv", ffmpeg_args=["-c", "copy"])
+
+        assert estimate_video_kbps(recipe, source_4k) == 40000
+
+
+class TestEstimateOutputBytes:
+    """Tests for estimate_output_bytes function."""
+
+    def test_audio_from_bitrate(self):
+        """Test an audio encode is estimated from its bitrate and duration."""
+        info = MediaInfo(duration=100.0, audio_codec="pcm_s16le")
+
+        estimate = estimate_output_bytes(info, find_recipe("MP3 (192 kbps)"), 17_640_000)
+
+        assert estimate == int(192 * 1000 / 8 * 100 * SAFETY_FACTOR)
+
+    def test_history_preferred(self, tmp_path, source_4k):
+        """Test historical ratios win over the bitrate model."""
+        recipe = find_recipe("YouTube 4K (2160p)")
+        history = SizeHistory(tmp_path / "history.json")
+        for _ in range(MIN_HISTORY):
+            history.record(recipe, 1000, 500)
+
+        estimate = estimate_output_bytes(source_4k, recipe, 1_000_000, history)
+
+        assert estimate == int(500_000 * SAFETY_FACTOR)
+
+    def test_falls_back_to_input_size(self):
+        """Test unknown sources are estimated at the input size."""
+        estimate = estimate_output_bytes(MediaInfo(), find_recipe("YouTube 4K (2160p)"), 1000)
+
+        assert estimate == int(1000 * SAFETY_FACTOR)
+
+
+class TestSizeHistory:
+    """Tests for SizeHistory class."""
+
+    def test_round_trip(self, tmp_path):
+        """Test ratios are saved and loaded."""
+        recipe = find_recipe("MP3 (192 kbps)")
+        history = SizeHistory(tmp_path / "history.json")
+        for ratio in (0.1, 0.2, 0.3):
+            history.record(recipe, 100, int(100 * ratio))
+
+        history.save()
+        loaded = SizeHistory(tmp_path / "history.json")
+
+        assert loaded.ratio(recipe) == pytest.approx(0.2)
+
+    def test_not_enough_samples(self, tmp_path):
+        """Test no ratio is given until enough jobs were seen."""
+        recipe = find_recipe("MP3 (192 kbps)")
+        history = SizeHistory(tmp_path / "history.json")
+        history.record(recipe, 100, 10)
+
+        assert history.ratio(recipe) is None
+
+
+class TestRunPreflight:
+    """Tests for run_preflight function."""
+
+    @patch("monica.preflight.free_space", return_value=2500)
+    @patch("monica.preflight.estimate_output_bytes", side_effect=[1000, 3000, 500])
+    @patch("monica.preflight.probe_media", return_value=MediaInfo())
+    def test_reorders_fitting_files(self, mock_probe, mock_estimate, mock_free, tmp_path):
+        """Test the files that fit are listed smallest first."""
+        files = []
+        for name in ("a", "b", "c"):
+            f = tmp_path / f"{name}.mp4"
+            f.write_bytes(b"x")
+            files.append(f)
+
+        result = run_preflight("ffmpeg", files, find_recipe("MP4 (H.264)"), tmp_path, workers=1)
+
+        assert result.fits is False
+        assert result.total_bytes == 4500
+        assert result.fitting == [files[2], files[0]]
+
+    @patch("monica.preflight.free_space", return_value=10_000)
+    @patch("monica.preflight.estimate_output_bytes", return_value=1000)
+    @patch("monica.preflight.probe_media", return_value=MediaInfo())
+    def test_fits(self, mock_probe, mock_estimate, mock_free, tmp_path):
+        """Test a batch within free space passes."""
+        f = tmp_path / "a.mp4"
+        f.write_bytes(b"x")
+
+        result = run_preflight("ffmpeg", [f], find_recipe("MP4 (H.264)"), tmp_path)
+
+        assert result.fits is True
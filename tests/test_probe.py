@@ -0,0 +1,130 @@
+"""Tests for src/monica/probe.py"""
+
+import pytest
+import subprocess
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+from monica.probe import (
+    MediaInfo,
+    split_stream_fields,
+    parse_probe_output,
+    probe_media,
+    probe_in_process,
+)
+
+
+SAMPLE_OUTPUT = """Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'clip.mp4':
+  Metadata:
+    major_brand     : isom
+  Duration: 00:01:30.50, start: 0.000000, bitrate: 2500 kb/s
+  Stream #0:0[0x1](und): Video: h264 (High) (avc1 / 0x31637661), yuv420p(tv, bt709, progressive), 1920x1080 [SAR 1:1 DAR 16:9], 2370 kb/s, 29.97 fps, 29.97 tbr, 30k tbn (default)
+  Stream #0:1[0x2](und): Audio: aac (LC) (mp4a / 0x6134706D), 48000 Hz, stereo, fltp, 128 kb/s (default)
+At least one output file must be specified
+"""
+
+AUDIO_WITH_COVER = """Input #0, mp3, from 'song.mp3':
+  Duration: 00:03:00.00, start: 0.025057, bitrate: 320 kb/s
+  Stream #0:0: Audio: mp3, 44100 Hz, mono, fltp, 320 kb/s
+  Stream #0:1: Video: mjpeg (Baseline), yuvj420p(pc, bt470bg/unknown/unknown), 500x500, 90k tbr, 90k tbn (attached pic)
+"""
+
+
+class TestSplitStreamFields:
+    """Tests for split_stream_fields function."""
+
+    def test_keeps_parenthesized_commas(self):
+        """Test commas inside parentheses don't split."""
+        result = split_stream_fields("yuv420p(tv, bt709), 1920x1080 [SAR 1:1, DAR 16:9], 30 fps")
+
+        assert result == ["yuv420p(tv, bt709)", "1920x1080 [SAR 1:1, DAR 16:9]", "30 fps"]
+
+
+class TestParseProbeOutput:
+    """Tests for parse_probe_output function."""
+
+    def test_parses_format(self):
+        """Test duration and overall bitrate."""
+        info = parse_probe_output(SAMPLE_OUTPUT)
+
+        assert info.duration == 90.5
+        assert info.start_time == 0.0
+        assert info.bitrate_kbps == 2500
+
+    def test_parses_video(self):
+        """Test video stream fields."""
+        info = parse_probe_output(SAMPLE_OUTPUT)
+
+        assert info.video_codec == "h264"
+        assert info.video_profile == "High"
+        assert info.pix_fmt == "yuv420p"
+        assert (info.width, info.height) == (1920, 1080)
+        assert info.fps == 29.97
+        assert info.video_bitrate_kbps == 2370
+
+    def test_parses_audio(self):
+        """Test audio stream fields."""
+        info = parse_probe_output(SAMPLE_OUTPUT)
+
+        assert info.audio_codec == "aac"
+        assert info.sample_rate == 48000
+        assert info.channels == 2
+        assert info.audio_bitrate_kbps == 128
+
+    def test_ignores_cover_art(self):
+        """Test attached pictures are not treated as video."""
+        info = parse_probe_output(AUDIO_WITH_COVER)
+
+        assert info.has_video is False
+        assert info.has_audio is True
+        assert info.channels == 1
+
+    def test_empty_output(self):
+        """Test unparseable output gives an empty MediaInfo."""
+        info = parse_probe_output("No such file or directory")
+
+        assert info == MediaInfo()
+
+
+class TestMediaInfo:
+    """Tests for MediaInfo dataclass."""
+
+    def test_roundtrip(self):
+        """Test dict serialization roundtrip."""
+        info = parse_probe_output(SAMPLE_OUTPUT)
+
+        assert MediaInfo.from_dict(info.to_dict()) == info
+
+    def test_from_dict_ignores_unknown_keys(self):
+        """Test unknown keys are ignored."""
+        info = MediaInfo.from_dict({"duration": 1.0, "future_field": "x"})
+
+        assert info.duration == 1.0
+
+
+class TestProbeMedia:
+    """Tests for probe_media function."""
+
+    @patch("monica.probe.subprocess.run")
+    def test_probe_parses_stderr(self, mock_run):
+        """Test probe reads FFmpeg's stderr."""
+        mock_run.return_value = MagicMock(returncode=1, stderr=SAMPLE_OUTPUT)
+
+        info = probe_media("ffmpeg", Path("clip.mp4"))
+
+        assert info.duration == 90.5
+        assert "-f" not in mock_run.call_args.args[0]  # no decode pass
+
+    @patch("monica.probe.subprocess.run", side_effect=subprocess.TimeoutExpired("ffmpeg", 30))
+    def test_probe_timeout(self, mock_run):
+        """Test timeout returns an empty MediaInfo."""
+        assert probe_media("ffmpeg", Path("clip.mp4")) == MediaInfo()
+
+
+class TestProbeInProcess:
+    """Tests for probe_in_process function."""
+
+    def test_none_without_pyav(self):
+        """Test in-process probing is skipped when PyAV is not installed."""
+        with patch.dict("sys.modules", {"av": None}):
+            assert probe_in_process(Path("clip.mp4")) is None
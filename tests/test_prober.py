@@ -0,0 +1,122 @@
+"""Tests for src/monica/prober.py"""
+
+from pathlib import Path
+from unittest.mock import patch
+
+from monica.import_index import ImportIndex
+from monica.probe import MediaInfo
+from monica.prober import BackgroundProber, format_details, format_duration
+
+
+class TestFormatDuration:
+    """Tests for format_duration function."""
+
+    def test_minutes(self):
+        """Test durations under an hour."""
+        assert format_duration(65.4) == "1:05"
+
+    def test_hours(self):
+        """Test durations of an hour or more."""
+        assert format_duration(3725) == "1:02:05"
+
+
+class TestFormatDetails:
+    """Tests for format_details function."""
+
+    def test_video(self):
+        """Test a video file's summary."""
+        info = MediaInfo(duration=90, width=1920, height=1080, video_codec="h264",
+                         audio_codec="aac", bitrate_kbps=8200)
+
+        result = format_details(info)
+
+        assert result == "1:30 · 1920x1080 · h264/aac · 8.2 Mbps"
+
+    def test_audio(self):
+        """Test an audio file's summary."""
+        info = MediaInfo(duration=200, audio_codec="mp3", bitrate_kbps=320)
+
+        result = format_details(info)
+
+        assert result == "3:20 · mp3 · 320 kbps"
+
+    def test_unknown(self):
+        """Test a failed probe."""
+        assert format_details(MediaInfo()) == "unknown format"
+
+
+class TestBackgroundProber:
+    """Tests for BackgroundProber class."""
+
+    @patch("monica.prober.probe_media")
+    def test_probes_all_files(self, mock_probe):
+        """Test every file gets a result."""
+        mock_probe.side_effect = lambda ffmpeg, path: MediaInfo(duration=float(path.stem))
+        files = [Path(f"{i}.mp4") for i in range(10)]
+
+        results = BackgroundProber(files, "ffmpeg", workers=3).start().wait()
+
+        assert {i: r.duration for i, r in results.items()} == {i: float(i) for i in range(10)}
+
+    @patch("monica.prober.probe_media")
+    def test_prioritized_files_first(self, mock_probe):
+        """Test prioritized files are probed before the rest."""
+        order = []
+        mock_probe.side_effect = lambda ffmpeg, path: order.append(path.name) or MediaInfo()
+        files = [Path(f"{i}.mp4") for i in range(4)]
+        prober = BackgroundProber(files, "ffmpeg", workers=1)
+
+        prober.prioritize([2, 3])
+        prober.start().wait()
+
+        assert order == ["2.mp4", "3.mp4", "0.mp4", "1.mp4"]
+
+    @patch("monica.prober.probe_media")
+    def test_files_added_later(self, mock_probe):
+        """Test files added after the workers ran dry are still probed."""
+        mock_probe.side_effect = lambda ffmpeg, path: MediaInfo(duration=float(path.stem))
+        prober = BackgroundProber([Path("0.mp4")], "ffmpeg").start()
+        prober.wait()
+
+        prober.add([Path("1.mp4"), Path("2.mp4")])
+        results = prober.wait()
+
+        assert {i: r.duration for i, r in results.items()} == {0: 0.0, 1: 1.0, 2: 2.0}
+
+    def test_repeated_prioritize_no_duplicates(self):
+        """Test prioritizing on every redraw doesn't grow the queue."""
+        prober = BackgroundProber([Path(f"{i}.mp4") for i in range(4)], "ffmpeg")
+
+        for _ in range(3):
+            prober.prioritize([2, 3])
+        prober.prioritize([1, 2])
+
+        assert list(prober._pending) == [1, 2, 3, 0]
+
+    @patch("monica.prober.probe_media")
+    def test_uses_and_fills_index(self, mock_probe, tmp_path):
+        """Test stored metadata is reused and new results are stored."""
+        (tmp_path / "a.mp4").write_text("a")
+        (tmp_path / "b.mp4").write_text("b")
+        index = ImportIndex(tmp_path, tmp_path / "index.json")
+        index.refresh()
+        index.set_metadata(tmp_path / "a.mp4", MediaInfo(duration=1.0).to_dict())
+        mock_probe.return_value = MediaInfo(duration=2.0)
+
+        prober = BackgroundProber([tmp_path / "a.mp4", tmp_path / "b.mp4"], "ffmpeg", index)
+        prober.start().wait()
+
+        mock_probe.assert_called_once_with("ffmpeg", tmp_path / "b.mp4")
+        assert prober.get(0).duration == 1.0
+        assert index.get_metadata(tmp_path / "b.mp4")["duration"] == 2.0
+
+    @patch("monica.prober.probe_media", return_value=MediaInfo())
+    def test_close_stops_pending_probes(self, mock_probe):
+        """Test closing leaves the remaining files unprobed."""
+        prober = BackgroundProber([Path(f"{i}.mp4") for i in range(100)], "ffmpeg", workers=1)
+
+        prober.close()
+        prober.start()
+        prober.wait()
+
+        assert prober.get(0) is None
@@ -0,0 +1,130 @@
+"""Tests for src/monica/profiling.py"""
+
+import cProfile
+import pstats
+import time
+
+import pytest
+from unittest.mock import patch
+
+from monica.profiling import (
+    Profile,
+    SamplingProfiler,
+    collapsed_from_stats,
+    configure_batch_profiling,
+    profiled,
+)
+
+
+def busy(seconds: float) -> int:
+    """Burn CPU for a while."""
+    total = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        total += sum(range(1000))
+    return total
+
+
+@pytest.fixture(autouse=True)
+def no_batch_profiling():
+    """Make sure batch profiling is off after each test."""
+    yield
+    configure_batch_profiling(None)
+
+
+class TestSamplingProfiler:
+    """Tests for SamplingProfiler class."""
+
+    def test_stacks_sampled(self):
+        """Test the busy function shows up in sampled stacks."""
+        profiler = SamplingProfiler(interval=0.002)
+
+        profiler.start()
+        busy(0.1)
+        profiler.stop()
+
+        assert profiler.samples > 0
+        assert any(stack[-1].endswith(":busy") for stack in profiler.stacks)
+
+    def test_collapsed_format(self):
+        """Test collapsed lines are semicolon-joined frames and a count."""
+        profiler = SamplingProfiler()
+        profiler.stacks[("MainThread", "mod:main", "mod:work")] = 3
+
+        assert profiler.collapsed() == ["MainThread;mod:main;mod:work 3"]
+
+    def test_stats_text(self):
+        """Test the report gives total and self shares per function."""
+        profiler = SamplingProfiler()
+        profiler.samples = 4
+        profiler.stacks[("MainThread", "mod:main", "mod:work")] = 3
+        profiler.stacks[("MainThread", "mod:main")] = 1
+
+        text = profiler.stats_text()
+
+        assert "100.0    25.0  mod:main" in text
+        assert "75.0    75.0  mod:work" in text
+
+
+class TestCollapsedFromStats:
+    """Tests for collapsed_from_stats function."""
+
+    def test_call_path_reconstructed(self):
+        """Test time spent in a callee appears under its caller."""
+        def outer():
+            return busy(0.05)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        outer()
+        profiler.disable()
+
+        lines = collapsed_from_stats(pstats.Stats(profiler))
+
+        assert any("outer;test_profiling:busy" in line for line in lines)
+        assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+
+
+class TestProfile:
+    """Tests for Profile class."""
+
+    @pytest.mark.parametrize("mode", ["cprofile", "sample"])
+    def test_save(self, mode, tmp_path):
+        """Test both modes write the stats and collapsed stacks."""
+        profile = Profile(mode, interval=0.002).start()
+        busy(0.05)
+        profile.stop()
+
+        success, error = profile.save(tmp_path / "profile")
+
+        assert success is True
+        assert error == ""
+        assert (tmp_path / "profile.txt").read_text().startswith(f"MONICA profile ({mode})")
+        assert (tmp_path / "profile.collapsed").read_text()
+        assert (tmp_path / "profile.prof").exists() == (mode == "cprofile")
+
+    def test_unknown_mode(self):
+        """Test an unknown mode is rejected."""
+        with pytest.raises(ValueError):
+            Profile("magic")
+
+
+class TestProfiled:
+    """Tests for profiled decorator."""
+
+    def test_off_by_default(self, tmp_path):
+        """Test nothing is profiled unless batch profiling is configured."""
+        work = profiled(lambda: 42)
+
+        assert work() == 42
+        assert list(tmp_path.iterdir()) == []
+
+    @patch("monica.profiling.get_logger")
+    def test_batch_profile_saved(self, mock_logger, tmp_path):
+        """Test each call saves its own profile."""
+        configure_batch_profiling("sample", tmp_path)
+        work = profiled(lambda: busy(0.02))
+
+        work()
+
+        assert len(list(tmp_path.glob("profile-batch-*.collapsed"))) == 1
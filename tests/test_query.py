@@ -0,0 +1,219 @@
+"""Tests for src/monica/query.py"""
+
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from monica.file_selector import FileEntry
+from monica.probe import MediaInfo
+from monica.query import (
+    MediaTable,
+    QueryError,
+    parse_query,
+    parse_value,
+    split_order,
+    validate_query,
+)
+
+
+ROOT = Path("/import")
+
+FILES = [
+    (FileEntry(ROOT / "uhd_h264.mp4", 4 * 1024 ** 3, 1000.0),
+     MediaInfo(duration=600, width=3840, height=2160, video_codec="h264", audio_codec="aac", bitrate_kbps=50000)),
+    (FileEntry(ROOT / "uhd_hevc.mkv", 3 * 1024 ** 3, 2000.0),
+     MediaInfo(duration=1200, width=3840, height=2160, video_codec="hevc", audio_codec="opus", bitrate_kbps=20000)),
+    (FileEntry(ROOT / "trip" / "short_hevc.mov", 200 * 1024 ** 2, 3000.0),
+     MediaInfo(duration=30, width=2560, height=1440, video_codec="HEVC", audio_codec="aac", bitrate_kbps=40000)),
+    (FileEntry(ROOT / "hd.mp4", 1024 ** 3, 4000.0),
+     MediaInfo(duration=900, width=1920, height=1080, video_codec="vp9", bitrate_kbps=8000)),
+    (FileEntry(ROOT / "song.flac", 30 * 1024 ** 2, 5000.0),
+     MediaInfo(duration=240, audio_codec="flac", bitrate_kbps=900)),
+    (FileEntry(ROOT / "unprobed.mp4", 10, 6000.0), None),
+]
+
+
+@pytest.fixture
+def table():
+    return MediaTable.build([f for f, _ in FILES], [i for _, i in FILES], ROOT)
+
+
+def names(table, rows):
+    return [table.paths[i].name for i in rows]
+
+
+class TestParseValue:
+    """Tests for parse_value function."""
+
+    @pytest.mark.parametrize("column,text,expected", [
+        ("size", "500MB", 500 * 1024 ** 2),
+        ("size", "1.5g", 1.5 * 1024 ** 3),
+        ("size", "100", 100),
+        ("duration", "5m", 300),
+        ("duration", "1h", 3600),
+        ("duration", "1:30", 90),
+        ("duration", "1:02:03", 3723),
+        ("bitrate", "8Mbps", 8000),
+        ("bitrate", "320k", 320),
+        ("height", "1080p", 1080),
+        ("height", "4k", 2160),
+        ("fps", "29.97", 29.97),
+    ])
+    def test_units(self, column, text, expected):
+        """Test values with units are converted to the column's unit."""
+        assert parse_value(column, text) == pytest.approx(expected)
+
+    def test_date(self):
+        """Test mtime accepts a date."""
+        assert parse_value("mtime", "2024-01-31") > 1.7e9
+
+    def test_invalid(self):
+        """Test a value that doesn't fit the column raises QueryError."""
+        with pytest.raises(QueryError):
+            parse_value("duration", "long")
+
+
+class TestParseQuery:
+    """Tests for parse_query function."""
+
+    def test_precedence(self):
+        """Test and binds tighter than or."""
+        tree = parse_query("ext = mp4 or ext = mkv and height > 1080")
+
+        assert tree[0] == "or"
+        assert tree[2][0] == "and"
+
+    def test_parentheses_and_not(self):
+        """Test grouping and negation."""
+        tree = parse_query("not (ext = mp4 or ext = mkv)")
+
+        assert tree[0] == "not"
+        assert tree[1][0] == "or"
+
+    def test_quoted_values(self):
+        """Test quoted values may contain spaces."""
+        tree = parse_query('name ~ "*my trip*"')
+
+        assert tree == ("cmp", "name", "~", "*my trip*")
+
+    @pytest.mark.parametrize("expression", [
+        "colour = red",
+        "height >",
+        "height 1080",
+        "(height > 1080",
+        "height > 1080 extra",
+        "vcodec > h264",
+        "size ~ big",
+    ])
+    def test_errors(self, expression):
+        """Test invalid queries raise QueryError."""
+        with pytest.raises(QueryError):
+            parse_query(expression)
+
+
+class TestSplitOrder:
+    """Tests for split_order and validate_query."""
+
+    def test_order_clause(self):
+        """Test a trailing order by clause is split off."""
+        assert split_order("height > 1080 order by size desc") == ("height > 1080", "size", True)
+
+    def test_no_order_clause(self):
+        """Test queries without order by are unchanged."""
+        assert split_order("name ~ *order*") == ("name ~ *order*", None, False)
+
+    def test_validate_unknown_order_column(self):
+        """Test ordering by an unknown column is rejected."""
+        with pytest.raises(QueryError):
+            validate_query("order by colour")
+
+
+class TestMediaTableFilter:
+    """Tests for MediaTable.filter."""
+
+    def test_example_query(self, table):
+        """Test the combined resolution, codec and duration query."""
+        rows = table.filter("height > 1080 and vcodec != h264 and duration > 5m")
+
+        assert names(table, rows) == ["uhd_hevc.mkv"]
+
+    def test_text_case_insensitive(self, table):
+        """Test text comparisons ignore case."""
+        rows = table.filter("vcodec = hevc")
+
+        assert names(table, rows) == ["uhd_hevc.mkv", "short_hevc.mov"]
+
+    def test_missing_values_never_match(self, table):
+        """Test files without a value fail every comparison, including !=."""
+        rows = table.filter("vcodec != h264")
+
+        assert names(table, rows) == ["uhd_hevc.mkv", "short_hevc.mov", "hd.mp4"]
+
+    def test_or_and_not(self, table):
+        """Test or keeps row order and not inverts."""
+        rows = table.filter("not (ext = mp4 or acodec = flac)")
+
+        assert names(table, rows) == ["uhd_hevc.mkv", "short_hevc.mov"]
+
+    def test_glob_on_path(self, table):
+        """Test ~ matches glob patterns against the relative path."""
+        rows = table.filter("path ~ trip/*")
+
+        assert names(table, rows) == ["short_hevc.mov"]
+
+    def test_size_units(self, table):
+        """Test size comparisons with units."""
+        rows = table.filter("size >= 1GB and size < 4GB")
+
+        assert names(table, rows) == ["uhd_hevc.mkv", "hd.mp4"]
+
+    def test_empty_expression_matches_all(self, table):
+        """Test an empty expression selects every row."""
+        assert table.filter("  ") == list(range(len(FILES)))
+
+    def test_large_table(self):
+        """Test filtering 100k rows."""
+        entries = [FileEntry(Path(f"/import/{i}.mp4"), i, 0.0) for i in range(100_000)]
+        infos = [MediaInfo(height=1080 if i % 2 else 2160, video_codec="h264") for i in range(100_000)]
+        big = MediaTable.build(entries, infos)
+
+        rows = big.filter("height > 1080 and size < 1000")
+
+        assert len(rows) == 500
+
+
+class TestMediaTableSelect:
+    """Tests for MediaTable ordering and select."""
+
+    def test_order_missing_last(self, table):
+        """Test rows without a value sort after the others."""
+        rows = table.order(list(range(len(FILES))), "duration", descending=True)
+
+        assert names(table, rows)[:2] == ["uhd_hevc.mkv", "hd.mp4"]
+        assert names(table, rows)[-1] == "unprobed.mp4"
+
+    def test_query_with_order_clause(self, table):
+        """Test query applies its order by clause."""
+        rows = table.query("vcodec = hevc order by duration")
+
+        assert names(table, rows) == ["short_hevc.mov", "uhd_hevc.mkv"]
+
+    def test_select_paths(self, table):
+        """Test select returns sorted, limited paths."""
+        result = table.select("height >= 1080", order_by="size", descending=True, limit=2)
+
+        assert result == [ROOT / "uhd_h264.mp4", ROOT / "uhd_hevc.mkv"]
+
+    def test_select_sorts_once(self, table):
+        """Test an order_by argument replaces the query's order by clause."""
+        with patch.object(MediaTable, "order", side_effect=MediaTable.order, autospec=True) as mock_order:
+            result = table.select("vcodec = hevc order by duration", order_by="duration", descending=True)
+
+        assert mock_order.call_count == 1
+        assert result == [ROOT / "uhd_hevc.mkv", ROOT / "trip" / "short_hevc.mov"]
+
+    def test_select_uses_order_clause(self, table):
+        """Test select without order_by follows the query's order by."""
+        result = table.select("vcodec = hevc order by duration desc")
+
+        assert result == [ROOT / "uhd_hevc.mkv", ROOT / "trip" / "short_hevc.mov"]
@@ -8,6 +8,9 @@ from monica.recipes import (
     Recipe,
     get_recipes_by_category,
     get_all_recipes,
+    find_recipe,
+    get_input_args,
+    get_range_duration,
     get_input_extensions_for_category,
     load_custom_recipes,
     save_custom_recipes,
@@ -15,6 +18,7 @@ from monica.recipes import (
     AUDIO_RECIPES,
     SHORTFORM_RECIPES,
     BUILTIN_RECIPES,
+    GIF_RECIPES,
 )
 
 
@@ -117,6 +121,78 @@ class TestGetRecipesByCategory:
         assert recipes == []
 
 
+class TestFindRecipe:
+    """Tests for find_recipe function."""
+
+    def test_find_by_name(self):
+        """Test finding a recipe by exact name."""
+        recipe = find_recipe("MP4 (H.264)")
+
+        assert recipe is not None
+        assert recipe.category == "video"
+
+    def test_find_case_insensitive(self):
+        """Test name matching ignores case."""
+        assert find_recipe("opus").name == "Opus"
+
+    def test_find_with_category(self):
+        """Test category disambiguates duplicate names."""
+        recipe = find_recipe("YouTube Shorts (720x1280)", "shortform")
+
+        assert recipe.category == "shortform"
+
+    def test_find_missing(self):
+        """Test unknown names return None."""
+        assert find_recipe("Not A Recipe") is None
+
+
+class TestTimeRange:
+    """Tests for get_input_args and get_range_duration."""
+
+    def test_no_range(self, sample_recipe):
+        """Test recipes without a range have no input args."""
+        assert get_input_args(sample_recipe) == []
+        assert get_range_duration(120.0, sample_recipe) == 120.0
+
+    def test_start_and_end(self, sample_recipe):
+        """Test a range seeks and limits the input."""
+        sample_recipe.options = {"start": 10.0, "end": 15.5}
+
+        assert get_input_args(sample_recipe) == ["-ss", "10.000", "-t", "5.500"]
+        assert get_range_duration(120.0, sample_recipe) == 5.5
+
+    def test_start_only(self, sample_recipe):
+        """Test an open-ended range runs to the end of the input."""
+        sample_recipe.options = {"start": 100.0, "end": None}
+
+        assert get_input_args(sample_recipe) == ["-ss", "100.000"]
+        assert get_range_duration(120.0, sample_recipe) == 20.0
+
+    def test_end_past_duration(self, sample_recipe):
+        """Test the range is clamped to the input duration."""
+        sample_recipe.options = {"start": 0, "end": 500.0}
+
+        assert get_range_duration(120.0, sample_recipe) == 120.0
+
+    def test_unknown_duration(self, sample_recipe):
+        """Test unknown duration without an end is unknown."""
+        assert get_range_duration(None, sample_recipe) is None
+
+
+class TestGifRecipes:
+    """Tests for the built-in GIF recipes."""
+
+    def test_single_decode_palette_graph(self):
+        """Test one graph downscales, then splits into palettegen and paletteuse."""
+        for recipe in GIF_RECIPES:
+            graph = recipe.ffmpeg_args[recipe.ffmpeg_args.index("-filter_complex") + 1]
+
+            assert graph.index("fps=") < graph.index("scale=") < graph.index("split")
+            assert "palettegen" in graph
+            assert "paletteuse" in graph
+            assert "-vf" not in recipe.ffmpeg_args
+
+
 class TestGetAllRecipes:
     """Tests for get_all_recipes function."""
 
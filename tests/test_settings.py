@@ -0,0 +1,50 @@
+"""Tests for src/monica/settings.py"""
+
+import pytest
+from pathlib import Path
+
+from monica.settings import Settings, load_settings, save_settings
+
+
+class TestLoadSettings:
+    """Tests for load_settings function."""
+
+    def test_missing_file(self, tmp_path):
+        """Test defaults are used without a settings file."""
+        assert load_settings(tmp_path / "settings.json") == Settings()
+
+    def test_invalid_json(self, tmp_path):
+        """Test defaults are used for a broken settings file."""
+        settings_file = tmp_path / "settings.json"
+        settings_file.write_text("{not json")
+
+        assert load_settings(settings_file) == Settings()
+
+    def test_unknown_keys_ignored(self, tmp_path):
+        """Test keys from newer or older versions don't break loading."""
+        settings_file = tmp_path / "settings.json"
+        settings_file.write_text('{"staging_enabled": true, "removed_option": 1}')
+
+        assert load_settings(settings_file).staging_enabled is True
+
+
+class TestSaveSettings:
+    """Tests for save_settings function."""
+
+    def test_round_trip(self, tmp_path):
+        """Test saved settings load back unchanged."""
+        settings_file = tmp_path / "settings.json"
+        settings = Settings(staging_enabled=True, staging_lookahead=4)
+
+        assert save_settings(settings, settings_file) is True
+        assert load_settings(settings_file) == settings
+
+
+class TestGetScratchDir:
+    """Tests for Settings.get_scratch_dir."""
+
+    def test_creates_directory(self, tmp_path):
+        """Test the configured scratch directory is created."""
+        settings = Settings(scratch_dir=str(tmp_path / "scratch"))
+
+        assert settings.get_scratch_dir().is_dir()
@@ -0,0 +1,157 @@
+"""Tests for src/monica/staging.py"""
+
+import time
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from monica.settings import Settings
+from monica.staging import InputStager, create_stager, _throttle
+
+
+@pytest.fixture(autouse=True)
+def mock_logger():
+    """Keep the staging thread from creating the global logger."""
+    with patch("monica.staging.get_logger") as mock:
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def no_reserve():
+    """Don't require free space on the test machine's temp filesystem."""
+    with patch("monica.staging.SCRATCH_RESERVE_BYTES", 0):
+        yield
+
+
+@pytest.fixture
+def queue(tmp_path):
+    """Four input files on "remote" storage."""
+    remote = tmp_path / "remote"
+    remote.mkdir()
+    files = []
+    for i in range(4):
+        f = remote / f"clip{i}.mp4"
+        f.write_bytes(bytes([i]) * 1000)
+        files.append(f)
+    return files
+
+
+@pytest.fixture
+def scratch(tmp_path):
+    """Local scratch directory."""
+    path = tmp_path / "scratch"
+    path.mkdir()
+    return path
+
+
+def wait_for(condition, timeout=5.0):
+    """Wait for the staging thread to reach a state."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting for stager")
+        time.sleep(0.01)
+
+
+class TestInputStager:
+    """Tests for InputStager class."""
+
+    def test_first_file_read_directly(self, queue, scratch):
+        """Test the first input isn't staged (its job starts immediately)."""
+        with InputStager(queue, scratch).start() as stager:
+            assert stager.get(queue[0]) == queue[0]
+
+    def test_next_file_copied(self, queue, scratch):
+        """Test upcoming inputs are copied to scratch with identical contents."""
+        with InputStager(queue, scratch).start() as stager:
+            stager.get(queue[0])
+            wait_for(lambda: queue[1] in stager._staged)
+
+            staged = stager.get(queue[1])
+
+            assert staged.parent == stager.stage_dir
+            assert staged.read_bytes() == queue[1].read_bytes()
+
+    def test_lookahead_bound(self, queue, scratch):
+        """Test no more than `lookahead` files are staged ahead."""
+        with InputStager(queue, scratch, lookahead=1).start() as stager:
+            wait_for(lambda: queue[1] in stager._staged)
+            time.sleep(0.05)
+
+            assert queue[2] not in stager._staged
+
+            stager.release(queue[0])
+            wait_for(lambda: queue[2] in stager._staged)
+
+    def test_space_bound(self, queue, scratch):
+        """Test staged bytes stay within max_bytes."""
+        with InputStager(queue, scratch, lookahead=3, max_bytes=1500).start() as stager:
+            wait_for(lambda: queue[1] in stager._staged)
+            time.sleep(0.05)
+
+            assert stager._used_bytes <= 1500
+            assert queue[2] not in stager._staged
+
+    def test_release_deletes_copy(self, queue, scratch):
+        """Test a staged copy is deleted once its job is done."""
+        with InputStager(queue, scratch).start() as stager:
+            wait_for(lambda: queue[1] in stager._staged)
+            staged = stager.get(queue[1])
+
+            stager.release(queue[1])
+
+            assert not staged.exists()
+
+    def test_close_removes_scratch(self, queue, scratch):
+        """Test closing removes every staged copy."""
+        stager = InputStager(queue, scratch).start()
+        wait_for(lambda: queue[1] in stager._staged)
+
+        stager.close()
+
+        assert list(scratch.iterdir()) == []
+
+    def test_cache_mode_reads_original(self, queue, scratch):
+        """Test cache mode reads ahead but jobs use the original path."""
+        with InputStager(queue, scratch, mode="cache").start() as stager:
+            wait_for(lambda: queue[1] in stager._staged)
+
+            assert stager.get(queue[1]) == queue[1]
+            assert stager.stage_dir is None
+
+
+class TestThrottle:
+    """Tests for _throttle function."""
+
+    @patch("monica.staging.time.sleep")
+    @patch("monica.staging.time.monotonic", return_value=100.0)
+    def test_sleeps_when_ahead(self, mock_time, mock_sleep):
+        """Test copying faster than the limit sleeps."""
+        _throttle(2_000_000, 100.0, 1_000_000)
+
+        mock_sleep.assert_called_once_with(pytest.approx(2.0))
+
+    @patch("monica.staging.time.sleep")
+    def test_unlimited(self, mock_sleep):
+        """Test no bandwidth limit never sleeps."""
+        _throttle(2_000_000, 0.0, None)
+
+        mock_sleep.assert_not_called()
+
+
+class TestCreateStager:
+    """Tests for create_stager function."""
+
+    def test_disabled(self, queue):
+        """Test staging is off by default."""
+        assert create_stager(queue, Settings()) is None
+
+    def test_enabled(self, queue, scratch):
+        """Test staging starts when enabled."""
+        settings = Settings(staging_enabled=True, scratch_dir=str(scratch))
+
+        stager = create_stager(queue, settings)
+        try:
+            assert isinstance(stager, InputStager)
+        finally:
+            stager.close()
@@ -0,0 +1,126 @@
+"""Tests for src/monica/thumbnails.py"""
+
+import pytest
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+from monica.probe import MediaInfo
+from monica.recipes import Recipe, THUMBNAIL_RECIPES
+from monica.thumbnails import (
+    sprite_timestamps,
+    build_sprite_command,
+    run_thumbnail_job,
+    execute_thumbnail_jobs,
+)
+
+
+@pytest.fixture
+def sheet_recipe():
+    """A 2x2 contact sheet recipe."""
+    return Recipe(
+        name="Test Sheet",
+        category="thumbnail",
+        extension=".jpg",
+        ffmpeg_args=["-q:v", "3"],
+        options={"columns": 2, "rows": 2, "width": 200}
+    )
+
+
+class TestSpriteTimestamps:
+    """Tests for sprite_timestamps function."""
+
+    def test_evenly_spaced(self):
+        """Test timestamps are centred in equal slices."""
+        assert sprite_timestamps(100, 4) == [12.5, 37.5, 62.5, 87.5]
+
+    def test_unknown_duration(self):
+        """Test unknown duration falls back to the first frame."""
+        assert sprite_timestamps(None, 16) == [0.0]
+
+
+class TestBuildSpriteCommand:
+    """Tests for build_sprite_command function."""
+
+    def test_one_keyframe_input_per_tile(self, sheet_recipe):
+        """Test every tile is a keyframe-only seeked input."""
+        cmd = build_sprite_command("ffmpeg", Path("in.mp4"), Path("out.jpg"), sheet_recipe, 100)
+
+        assert cmd.count("-i") == 4
+        assert cmd.count("nokey") == 4
+        ss_values = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-ss"]
+        assert ss_values == ["12.500", "37.500", "62.500", "87.500"]
+
+    def test_tiles_into_one_frame(self, sheet_recipe):
+        """Test the filter graph tiles into a single output frame."""
+        cmd = build_sprite_command("ffmpeg", Path("in.mp4"), Path("out.jpg"), sheet_recipe, 100)
+        graph = cmd[cmd.index("-filter_complex") + 1]
+
+        assert "concat=n=4:v=1:a=0,tile=2x2" in graph
+        assert "scale=200:-2" in graph
+        assert cmd[cmd.index("-frames:v") + 1] == "1"
+        assert cmd[-3:] == ["-q:v", "3", "out.jpg"]
+
+    def test_unknown_duration_single_tile(self, sheet_recipe):
+        """Test unknown duration produces a 1x1 sheet."""
+        cmd = build_sprite_command("ffmpeg", Path("in.mp4"), Path("out.jpg"), sheet_recipe, None)
+        graph = cmd[cmd.index("-filter_complex") + 1]
+
+        assert cmd.count("-i") == 1
+        assert "tile=1x1" in graph
+
+
+class TestRunThumbnailJob:
+    """Tests for run_thumbnail_job function."""
+
+    @patch("monica.thumbnails.probe_media", return_value=MediaInfo(audio_codec="mp3"))
+    def test_no_video_stream(self, mock_probe, sheet_recipe):
+        """Test audio-only files fail without running FFmpeg."""
+        success, error = run_thumbnail_job("ffmpeg", Path("a.mp3"), Path("o.jpg"), sheet_recipe)
+
+        assert success is False
+        assert "video" in error
+
+    @patch("monica.thumbnails.subprocess.run")
+    @patch("monica.thumbnails.probe_media", return_value=MediaInfo(duration=60, video_codec="h264"))
+    def test_success(self, mock_probe, mock_run, sheet_recipe):
+        """Test successful sheet generation."""
+        mock_run.return_value = MagicMock(returncode=0, stderr="")
+
+        assert run_thumbnail_job("ffmpeg", Path("in.mp4"), Path("o.jpg"), sheet_recipe) == (True, "")
+
+
+class TestExecuteThumbnailJobs:
+    """Tests for execute_thumbnail_jobs function."""
+
+    @patch("monica.thumbnails.get_logger")
+    @patch("monica.thumbnails.run_thumbnail_job")
+    def test_continues_after_failure(self, mock_job, mock_logger, sheet_recipe, tmp_export_dir):
+        """Test one failure doesn't stop the other files."""
+        mock_job.side_effect = lambda ff, inp, out, r: (inp.name != "bad.mp4", "boom")
+        files = [Path("a.mp4"), Path("bad.mp4"), Path("c.mp4")]
+
+        result = execute_thumbnail_jobs("ffmpeg", files, sheet_recipe, tmp_export_dir, workers=2)
+
+        assert result is False
+        assert mock_job.call_count == 3
+
+    @patch("monica.thumbnails.get_logger")
+    @patch("monica.thumbnails.run_thumbnail_job", return_value=(True, ""))
+    def test_same_names_get_own_sheets(self, mock_job, mock_logger, sheet_recipe, tmp_export_dir):
+        """Test same-named inputs from different folders don't share an output."""
+        files = [Path("a") / "clip.mp4", Path("b") / "clip.mp4"]
+
+        execute_thumbnail_jobs("ffmpeg", files, sheet_recipe, tmp_export_dir, workers=2)
+
+        outputs = [call.args[2] for call in mock_job.call_args_list]
+        assert len(set(outputs)) == 2
+
+
+class TestThumbnailRecipes:
+    """Tests for the built-in thumbnail recipes."""
+
+    def test_recipes_have_layout(self):
+        """Test every thumbnail recipe defines a sprite layout."""
+        for recipe in THUMBNAIL_RECIPES:
+            assert recipe.category == "thumbnail"
+            assert {"columns", "rows", "width"} <= set(recipe.options)
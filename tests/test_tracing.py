@@ -0,0 +1,128 @@
+"""Tests for src/monica/tracing.py"""
+
+import json
+import threading
+
+import pytest
+
+import monica.tracing
+from monica.tracing import Tracer, span, traced
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    """A fresh, enabled global tracer."""
+    tracer = Tracer()
+    tracer.start()
+    monkeypatch.setattr(monica.tracing, "_tracer", tracer)
+    return tracer
+
+
+class TestSpan:
+    """Tests for span function."""
+
+    def test_disabled_records_nothing(self, monkeypatch):
+        """Test spans are no-ops while tracing is off."""
+        tracer = Tracer()
+        monkeypatch.setattr(monica.tracing, "_tracer", tracer)
+
+        with span("scan", files=3) as s:
+            s.set(done=True)
+
+        assert tracer.spans == []
+
+    def test_nested_spans(self, tracer):
+        """Test an inner span lies within its outer span."""
+        with span("job"):
+            with span("ffmpeg.probe", file="a.mp4"):
+                pass
+
+        inner, outer = tracer.spans
+        assert inner.name == "ffmpeg.probe"
+        assert outer.start_ns <= inner.start_ns <= inner.end_ns <= outer.end_ns
+        assert inner.attributes == {"file": "a.mp4"}
+
+    def test_attributes_set_later(self, tracer):
+        """Test attributes can be added while the span runs."""
+        with span("scan") as s:
+            s.set(files=10)
+
+        assert tracer.spans[0].attributes == {"files": 10}
+
+    def test_exception_recorded(self, tracer):
+        """Test a failing stage is recorded with its exception type."""
+        with pytest.raises(OSError):
+            with span("move.file"):
+                raise OSError("disk full")
+
+        assert tracer.spans[0].attributes["error"] == "OSError"
+
+    def test_span_limit(self, tracer, monkeypatch):
+        """Test spans past the limit are counted, not kept."""
+        monkeypatch.setattr(monica.tracing, "MAX_SPANS", 2)
+
+        for _ in range(3):
+            with span("log.blocked"):
+                pass
+
+        assert len(tracer.spans) == 2
+        assert tracer.dropped == 1
+
+
+class TestTraced:
+    """Tests for traced decorator."""
+
+    def test_function_traced(self, tracer):
+        """Test the decorated function runs in a span and returns its result."""
+        @traced("job")
+        def work(x):
+            return x * 2
+
+        assert work(21) == 42
+        assert [s.name for s in tracer.spans] == ["job"]
+
+
+class TestChromeTrace:
+    """Tests for Tracer.to_chrome_trace and Tracer.export."""
+
+    def test_complete_events(self, tracer):
+        """Test spans become X events in microseconds, with thread names."""
+        def move():
+            with span("move.file"):
+                pass
+
+        thread = threading.Thread(target=move, name="mover")
+        with span("ffmpeg.encode", file="a.mp4"):
+            pass
+        thread.start()
+        thread.join()
+
+        trace = tracer.to_chrome_trace()
+
+        events = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+        names = {e["args"]["name"] for e in trace["traceEvents"] if e["ph"] == "M"}
+        encode = [e for e in events if e["name"] == "ffmpeg.encode"][0]
+        assert encode["cat"] == "ffmpeg"
+        assert encode["args"] == {"file": "a.mp4"}
+        assert encode["dur"] >= 0
+        assert "mover" in names
+        assert len({e["tid"] for e in events}) == 2
+
+    def test_export(self, tracer, tmp_path):
+        """Test the trace is written as JSON."""
+        with span("job"):
+            pass
+        path = tmp_path / "trace.json"
+
+        success, error = tracer.export(path)
+
+        assert success is True
+        assert error == ""
+        assert json.loads(path.read_text())["traceEvents"][-1]["name"] == "job"
+
+    def test_export_failure(self, tracer, tmp_path):
+        """Test an unwritable path returns an error."""
+        success, error = tracer.export(tmp_path / "missing" / "trace.json")
+
+        assert success is False
+        assert error
@@ -0,0 +1,175 @@
+"""Tests for src/monica/trim.py"""
+
+import pytest
+from dataclasses import replace
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+from monica.probe import MediaInfo
+from monica.recipes import TRIM_RECIPES
+from monica.trim import (
+    Segment,
+    parse_timestamp,
+    plan_smart_cut,
+    list_keyframes,
+    edge_encoder_args,
+    build_segment_command,
+    build_join_command,
+    concat_list,
+    run_trim_job,
+)
+
+
+@pytest.fixture
+def trim_recipe():
+    """Smart trim recipe with a 10s-40s range."""
+    return replace(TRIM_RECIPES[0], options={"crf": 18, "start": 10.0, "end": 40.0})
+
+
+class TestParseTimestamp:
+    """Tests for parse_timestamp function."""
+
+    def test_seconds(self):
+        """Test plain seconds."""
+        assert parse_timestamp("90") == 90
+
+    def test_minutes_seconds(self):
+        """Test MM:SS."""
+        assert parse_timestamp("01:30") == 90
+
+    def test_hours_fraction(self):
+        """Test HH:MM:SS.fff."""
+        assert parse_timestamp("01:00:01.5") == 3601.5
+
+    def test_invalid(self):
+        """Test invalid input raises ValueError."""
+        with pytest.raises(ValueError):
+            parse_timestamp("1m30s")
+
+
+class TestPlanSmartCut:
+    """Tests for plan_smart_cut function."""
+
+    def test_edges_and_copied_middle(self):
+        """Test partial GOPs are re-encoded and the middle is copied."""
+        segments = plan_smart_cut(12, 47, [0, 10, 20, 30, 40, 50])
+
+        assert segments == [
+            Segment(12, 20, copy=False),
+            Segment(20, 40, copy=True),
+            Segment(40, 47, copy=False),
+        ]
+
+    def test_cut_on_keyframes_is_pure_copy(self):
+        """Test cuts on keyframes need no re-encoding."""
+        segments = plan_smart_cut(10, 30, [0, 10, 20, 30])
+
+        assert segments == [Segment(10, 30, copy=True)]
+
+    def test_short_range_fully_encoded(self):
+        """Test ranges without two keyframes inside are re-encoded."""
+        segments = plan_smart_cut(12, 18, [0, 10, 20])
+
+        assert segments == [Segment(12, 18, copy=False)]
+
+
+class TestListKeyframes:
+    """Tests for list_keyframes function."""
+
+    @patch("monica.trim.subprocess.Popen")
+    def test_stops_after_end(self, mock_popen):
+        """Test reading stops once a keyframe past the end is seen."""
+        process = MagicMock()
+        process.stderr = iter([
+            "[Parsed_showinfo_0] n:0 pts:0 pts_time:1.5 ...\n",
+            "[Parsed_showinfo_0] n:1 pts:0 pts_time:3.5 ...\n",
+            "[Parsed_showinfo_0] n:2 pts:0 pts_time:5.5 ...\n",
+            "[Parsed_showinfo_0] n:3 pts:0 pts_time:7.5 ...\n",
+        ])
+        process.poll.return_value = None
+        mock_popen.return_value = process
+
+        keyframes = list_keyframes("ffmpeg", Path("in.mp4"), 0, 4, start_time=0.5)
+
+        assert keyframes == [1.0, 3.0, 5.0]
+        process.kill.assert_called_once()
+        assert "nokey" in mock_popen.call_args.args[0]
+
+
+class TestEdgeEncoderArgs:
+    """Tests for edge_encoder_args function."""
+
+    def test_matches_h264_source(self, trim_recipe):
+        """Test the edge encoder matches the source codec and profile."""
+        info = MediaInfo(video_codec="h264", video_profile="High", pix_fmt="yuv420p")
+
+        args = edge_encoder_args(info, trim_recipe)
+
+        assert args == ["-c:v", "libx264", "-profile:v", "high", "-pix_fmt", "yuv420p", "-crf", "18"]
+
+    def test_unknown_profile_omitted(self, trim_recipe):
+        """Test profiles without an encoder equivalent are skipped."""
+        info = MediaInfo(video_codec="hevc", video_profile="Rext")
+
+        args = edge_encoder_args(info, trim_recipe)
+
+        assert args[:2] == ["-c:v", "libx265"]
+        assert "-profile:v" not in args
+
+
+class TestBuildCommands:
+    """Tests for segment and join command builders."""
+
+    def test_copy_segment(self):
+        """Test copied segments use stream copy."""
+        cmd = build_segment_command("ffmpeg", Path("in.mp4"), Segment(20, 40, True), Path("s.ts"), ["-c:v", "libx264"])
+
+        assert cmd[cmd.index("-c:v") + 1] == "copy"
+        assert float(cmd[cmd.index("-t") + 1]) < 20
+
+    def test_encode_segment(self):
+        """Test edge segments are re-encoded from the exact start."""
+        cmd = build_segment_command("ffmpeg", Path("in.mp4"), Segment(12, 20, False), Path("s.ts"), ["-c:v", "libx264"])
+
+        assert cmd[cmd.index("-ss") + 1] == "12.000"
+        assert cmd[cmd.index("-t") + 1] == "8.000"
+        assert cmd[cmd.index("-c:v") + 1] == "libx264"
+
+    def test_join_copies_original_audio(self, trim_recipe):
+        """Test the join maps concatenated video plus original audio."""
+        cmd = build_join_command("ffmpeg", Path("l.txt"), Path("in.mp4"), 10, 40, Path("o.mp4"), trim_recipe)
+
+        assert ["-map", "0:v", "-map", "1:a?", "-c", "copy"] == cmd[cmd.index("-map"):cmd.index("-map") + 6]
+        assert "+faststart" in cmd
+
+    def test_concat_list_escapes_quotes(self):
+        """Test quotes in paths are escaped for the concat demuxer."""
+        assert concat_list([Path("/tmp/it's/a.ts")]) == "file '/tmp/it'\\''s/a.ts'\n"
+
+
+class TestRunTrimJob:
+    """Tests for run_trim_job function."""
+
+    @patch("monica.trim.ProgressIndicator")
+    @patch("monica.trim.probe_media", return_value=MediaInfo(duration=60, video_codec="h264"))
+    def test_end_before_start(self, mock_probe, mock_spinner, trim_recipe, tmp_path):
+        """Test an empty range fails before running FFmpeg."""
+        trim_recipe.options.update(start=30.0, end=20.0)
+
+        success, error = run_trim_job("ffmpeg", Path("in.mp4"), tmp_path / "o.mp4", trim_recipe)
+
+        assert success is False
+        assert "after start" in error
+
+    @patch("monica.trim._run_step", return_value=(True, ""))
+    @patch("monica.trim.list_keyframes", return_value=[0, 5, 15, 25, 35, 45])
+    @patch("monica.trim.ProgressIndicator")
+    @patch("monica.trim.get_logger")
+    @patch("monica.trim.probe_media", return_value=MediaInfo(duration=60, video_codec="h264"))
+    def test_runs_segments_then_join(self, mock_probe, mock_logger, mock_spinner, mock_keys, mock_step, trim_recipe, tmp_path):
+        """Test three segments are written and then joined."""
+        success, _ = run_trim_job("ffmpeg", Path("in.mp4"), tmp_path / "o.mp4", trim_recipe)
+
+        assert success is True
+        assert mock_step.call_count == 4
+        assert "concat" in mock_step.call_args.args[0]
@@ -0,0 +1,276 @@
+"""Tests for src/monica/watch.py"""
+
+import os
+import threading
+import time
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from monica.watch import (
+    InotifyWatcher,
+    PendingFiles,
+    PollingWatcher,
+    create_watcher,
+    watch_folder,
+)
+
+
+needs_inotify = pytest.mark.skipif(not InotifyWatcher.available(), reason="inotify not available")
+
+
+@pytest.fixture(autouse=True)
+def mock_logger():
+    """Keep the global logger out of these tests."""
+    with patch("monica.watch.get_logger") as mock:
+        yield mock
+
+
+def read_until(watcher, predicate, timeout=5.0):
+    """Collect watcher activity until predicate(activity) holds."""
+    activity = []
+    deadline = time.monotonic() + timeout
+    while not predicate(activity) and time.monotonic() < deadline:
+        activity += watcher.read(0.1)
+    return activity
+
+
+class FakeWatcher:
+    """Watcher returning scripted activity, one list per read."""
+
+    def __init__(self, reads, stop):
+        self.reads = list(reads)
+        self.stop = stop
+        self.closed = False
+
+    def read(self, timeout):
+        time.sleep(0.01)
+        if self.reads:
+            return self.reads.pop(0)
+        return []
+
+    def close(self):
+        self.closed = True
+
+
+class TestPendingFiles:
+    """Tests for PendingFiles class."""
+
+    def test_ready_after_settle(self, tmp_path):
+        """Test an unchanged file is ready once the settle time has passed."""
+        path = tmp_path / "a.mp4"
+        path.write_text("data")
+        pending = PendingFiles(settle_seconds=2)
+        pending.touch(path, now=100)
+
+        assert pending.ready(now=101) == []
+        assert pending.ready(now=102) == [path]
+        assert len(pending) == 0
+
+    def test_growing_file_waits(self, tmp_path):
+        """Test a file that changed since its last event waits another settle time."""
+        path = tmp_path / "a.mp4"
+        path.write_text("data")
+        pending = PendingFiles(settle_seconds=2)
+        pending.touch(path, now=100)
+        path.write_text("more data")
+
+        assert pending.ready(now=102) == []
+        assert pending.ready(now=104) == [path]
+
+    def test_open_file_waits_longer(self, tmp_path):
+        """Test files written but not closed need a longer quiet time."""
+        path = tmp_path / "a.mp4"
+        path.write_text("data")
+        pending = PendingFiles(settle_seconds=2)
+        pending.touch(path, now=100, closed=False)
+
+        assert pending.ready(now=102) == []
+        assert pending.ready(now=110) == [path]
+
+    def test_removed_file_dropped(self, tmp_path):
+        """Test files that disappear are forgotten."""
+        path = tmp_path / "a.mp4"
+        path.write_text("data")
+        pending = PendingFiles(settle_seconds=2)
+        pending.touch(path, now=100)
+        path.unlink()
+
+        assert pending.ready(now=102) == []
+        assert len(pending) == 0
+
+
+@needs_inotify
+class TestInotifyWatcher:
+    """Tests for InotifyWatcher class."""
+
+    def test_close_write_reported(self, tmp_path):
+        """Test a written file is reported, then reported closed."""
+        watcher = InotifyWatcher(tmp_path)
+        try:
+            (tmp_path / "a.mp4").write_text("data")
+
+            activity = read_until(watcher, lambda a: (tmp_path / "a.mp4", True) in a)
+        finally:
+            watcher.close()
+
+        assert (tmp_path / "a.mp4", True) in activity
+
+    def test_moved_in_file_is_closed(self, tmp_path):
+        """Test a file renamed into the folder counts as complete."""
+        source = tmp_path / "elsewhere"
+        source.mkdir()
+        (source / "a.mp4").write_text("data")
+        watched = tmp_path / "import"
+        watched.mkdir()
+        watcher = InotifyWatcher(watched)
+        try:
+            os.rename(source / "a.mp4", watched / "a.mp4")
+
+            activity = read_until(watcher, lambda a: bool(a))
+        finally:
+            watcher.close()
+
+        assert activity == [(watched / "a.mp4", True)]
+
+    def test_new_subfolder_watched_when_recursive(self, tmp_path):
+        """Test files in a folder created while watching are reported."""
+        watcher = InotifyWatcher(tmp_path, recursive=True)
+        try:
+            (tmp_path / "new").mkdir()
+            read_until(watcher, lambda a: False, timeout=0.2)
+            (tmp_path / "new" / "b.mp4").write_text("data")
+
+            activity = read_until(watcher, lambda a: (tmp_path / "new" / "b.mp4", True) in a)
+        finally:
+            watcher.close()
+
+        assert (tmp_path / "new" / "b.mp4", True) in activity
+
+    def test_excluded_subfolder_ignored(self, tmp_path):
+        """Test excluded folders aren't watched."""
+        (tmp_path / "@eaDir").mkdir()
+        watcher = InotifyWatcher(tmp_path, recursive=True, exclude=["@eaDir"])
+        try:
+            (tmp_path / "@eaDir" / "thumb.mp4").write_text("x")
+
+            activity = read_until(watcher, lambda a: False, timeout=0.3)
+        finally:
+            watcher.close()
+
+        assert activity == []
+
+
+class TestPollingWatcher:
+    """Tests for PollingWatcher class."""
+
+    def test_new_and_changed_files(self, tmp_path):
+        """Test new and modified files are reported, unchanged ones aren't."""
+        (tmp_path / "old.mp4").write_text("x")
+        (tmp_path / "changed.mp4").write_text("x")
+        watcher = PollingWatcher(tmp_path, interval=0.01)
+        (tmp_path / "new.mp4").write_text("x")
+        (tmp_path / "changed.mp4").write_text("longer")
+
+        activity = watcher.read(1.0)
+
+        assert sorted(activity) == [(tmp_path / "changed.mp4", None), (tmp_path / "new.mp4", None)]
+
+
+class TestCreateWatcher:
+    """Tests for create_watcher function."""
+
+    def test_polling_requested(self, tmp_path):
+        """Test polling can be forced."""
+        assert isinstance(create_watcher(tmp_path, polling=True), PollingWatcher)
+
+    @patch("monica.watch.InotifyWatcher", side_effect=OSError(28, "No space left on device"))
+    def test_falls_back_to_polling(self, mock_inotify, tmp_path):
+        """Test inotify errors (e.g. the watch limit) fall back to polling."""
+        mock_inotify.available.return_value = True
+
+        assert isinstance(create_watcher(tmp_path), PollingWatcher)
+
+
+class TestWatchFolder:
+    """Tests for watch_folder function."""
+
+    def run_watch(self, tmp_path, reads, wait_for=1, **kwargs):
+        """Run watch_folder with scripted activity until `wait_for` batches arrived."""
+        stop = threading.Event()
+        batches = []
+
+        def handle(files):
+            batches.append(files)
+            if len(batches) >= wait_for:
+                stop.set()
+
+        watcher = FakeWatcher(reads, stop)
+        timer = threading.Timer(5, stop.set)
+        timer.start()
+        try:
+            watch_folder(tmp_path, handle, stop=stop, watcher=watcher,
+                         settle_seconds=0.05, batch_window=0.2, **kwargs)
+        finally:
+            timer.cancel()
+        assert watcher.closed
+        return batches
+
+    def test_burst_coalesced_into_one_batch(self, tmp_path):
+        """Test files arriving together are converted as one batch."""
+        for name in ("a.mp4", "b.mp4", "c.mp4"):
+            (tmp_path / name).write_text(name)
+        reads = [[(tmp_path / "a.mp4", True)], [(tmp_path / "b.mp4", True)], [(tmp_path / "c.mp4", True)]]
+
+        batches = self.run_watch(tmp_path, reads)
+
+        assert batches == [[tmp_path / "a.mp4", tmp_path / "b.mp4", tmp_path / "c.mp4"]]
+
+    def test_filters_files(self, tmp_path):
+        """Test other extensions, partial copies and excluded files are ignored."""
+        for name in ("a.mp4", "notes.txt", ".a.mp4.part", "skip.mp4"):
+            (tmp_path / name).write_text(name)
+        reads = [[(tmp_path / name, True) for name in ("notes.txt", ".a.mp4.part", "skip.mp4", "a.mp4")]]
+
+        batches = self.run_watch(tmp_path, reads, extensions=[".MP4"], exclude=["skip.*"])
+
+        assert batches == [[tmp_path / "a.mp4"]]
+
+    def test_max_batch(self, tmp_path):
+        """Test large bursts are split into batches of max_batch files."""
+        names = [f"{i}.mp4" for i in range(5)]
+        for name in names:
+            (tmp_path / name).write_text(name)
+        reads = [[(tmp_path / name, True) for name in names]]
+
+        batches = self.run_watch(tmp_path, reads, wait_for=3, max_batch=2)
+
+        assert [len(b) for b in batches] == [2, 2, 1]
+
+    def test_process_existing(self, tmp_path):
+        """Test files already present are converted when asked to."""
+        (tmp_path / "old.mp4").write_text("x")
+
+        batches = self.run_watch(tmp_path, [], process_existing=True)
+
+        assert batches == [[tmp_path / "old.mp4"]]
+
+    def test_failed_batch_keeps_watching(self, tmp_path, mock_logger):
+        """Test an error converting a batch is logged and watching continues."""
+        (tmp_path / "a.mp4").write_text("a")
+        (tmp_path / "b.mp4").write_text("b")
+        stop = threading.Event()
+        batches = []
+
+        def handle(files):
+            batches.append(files)
+            if len(batches) == 1:
+                raise RuntimeError("boom")
+            stop.set()
+
+        reads = [[(tmp_path / "a.mp4", True)]] + [[]] * 30 + [[(tmp_path / "b.mp4", True)]]
+        watch_folder(tmp_path, handle, stop=stop, watcher=FakeWatcher(reads, stop),
+                     settle_seconds=0.05, batch_window=0.05)
+
+        assert batches == [[tmp_path / "a.mp4"], [tmp_path / "b.mp4"]]
+        assert "boom" in mock_logger.return_value.error.call_args.args[0]